@@ -111,7 +111,9 @@ class ConfigManager:
             
             self._redis_config = RedisConfig(
                 redis_url=redis_url,
-                redis_password=redis_password
+                redis_password=redis_password,
+                event_transport=os.getenv("REDIS_EVENT_TRANSPORT", "pubsub"),
+                stream_consumer_group=os.getenv("REDIS_STREAM_GROUP", "yabot")
             )
         return self._redis_config
     
@@ -17,12 +17,19 @@ from src.core.middleware import MiddlewareManager
 from src.core.error_handler import ErrorHandler
 from src.handlers.telegram_commands import CommandHandler
 from src.handlers.webhook import WebhookHandler
+from src.handlers.callback_processor import wait_for_pending_publishes
 from src.handlers.menu_router import MenuIntegrationRouter
 from src.handlers.menu_system import MenuSystemCoordinator
 from src.utils.logger import get_logger, configure_logging
 from src.database.manager import DatabaseManager
 from src.events.bus import EventBus
+from src.events.outbox import EventOutbox, OutboxRelay
+from src.events.processor import EventProcessor, create_event_processor
 from src.services.user import UserService
+from src.services.subscription import SubscriptionService
+from src.services.subscription_cache import subscription_status_cache
+from src.database.profiler import database_profile_middleware, database_profiler
+from src.services.user_scope import user_identity_middleware, user_identity_scope
 from src.utils.cache_manager import CacheManager
 from src.api.server import APIServer  # Added for API server initialization
 from src.shared.registry.module_registry import ModuleRegistry, ModuleState, ModuleHealthStatus
@@ -46,7 +53,11 @@ class BotApplication:
         # Initialize database and event components (will be set up during start)
         self.database_manager: Optional[DatabaseManager] = None
         self.event_bus: Optional[EventBus] = None
+        self.event_outbox: Optional[EventOutbox] = None
+        self.outbox_relay: Optional[OutboxRelay] = None
+        self.event_processor: Optional[EventProcessor] = None
         self.user_service: Optional[UserService] = None
+        self.subscription_service: Optional[SubscriptionService] = None
         self.module_registry: Optional[ModuleRegistry] = None
         self.cache_manager: Optional[CacheManager] = None
         
@@ -111,6 +122,12 @@ class BotApplication:
             # Set up user service after database and event bus
             await self._setup_user_service()
             
+            # Set up subscription service and its expiry sweep
+            await self._setup_subscription_service()
+            
+            # Set up event processor fed by the event bus
+            await self._setup_event_processor()
+            
             # Set up menu router and system coordinator
             await self._setup_menu_router()
 
@@ -203,6 +220,32 @@ class BotApplication:
                 except Exception as e:
                     logger.warning(f"Error waiting for polling task: {e}")
             
+            if self.subscription_service:
+                try:
+                    await self.subscription_service.stop_expiry_sweep()
+                except Exception as e:
+                    logger.warning(f"Error stopping subscription expiry sweep: {e}")
+            
+            # Let the event processor finish the events already queued
+            if self.event_processor:
+                try:
+                    await self.event_processor.stop_processing()
+                except Exception as e:
+                    logger.warning(f"Error stopping event processor: {e}")
+            
+            # Let callback events published in the background reach the event bus
+            try:
+                await wait_for_pending_publishes()
+            except Exception as e:
+                logger.warning(f"Error waiting for pending callback events: {e}")
+            
+            # Publish what is left in the event outbox while the databases and event bus are up
+            if self.outbox_relay:
+                try:
+                    await self.outbox_relay.stop()
+                except Exception as e:
+                    logger.warning(f"Error stopping event outbox relay: {e}")
+            
             # Close bot session
             if self.bot:
                 try:
@@ -370,6 +413,10 @@ class BotApplication:
             logger.error("Dispatcher or Menu Router not initialized, cannot register handlers.")
             return
 
+        # Attribute database commands to the update, then give it its own user identity map
+        self.dispatcher.update.outer_middleware(database_profile_middleware)
+        self.dispatcher.update.outer_middleware(user_identity_middleware)
+
         # Register the menu router to handle all messages and callback queries
         self.dispatcher.message.register(self.menu_router.route_message)
         self.dispatcher.callback_query.register(self.menu_router.route_callback)
@@ -442,6 +489,9 @@ class BotApplication:
                 logger.error("Failed to connect to databases")
                 return False
             
+            # Build missing indexes without delaying startup
+            self.database_manager.start_index_sync()
+            
             logger.info("Database connections set up successfully")
             return True
             
@@ -667,9 +717,17 @@ class BotApplication:
         logger.info("Setting up user service")
         
         try:
+            # Events of user state changes go through the transactional outbox when MongoDB is up
+            if self.database_manager and self.database_manager.is_connected and self.event_bus:
+                self.event_outbox = EventOutbox(self.database_manager.get_async_mongo_db())
+                self.outbox_relay = OutboxRelay(self.event_outbox, self.event_bus)
+                self.outbox_relay.start()
+            
             # Initialize user service with database manager, event bus, and cache manager
             # Even if database_manager is None, we can create a service that handles the absence
-            self.user_service = UserService(self.database_manager, self.event_bus, self.cache_manager)
+            self.user_service = UserService(
+                self.database_manager, self.event_bus, self.cache_manager, self.event_outbox
+            )
             logger.info("User service set up successfully")
             return True
                 
@@ -685,6 +743,68 @@ class BotApplication:
             logger.warning("Continuing without user service")
             return True
     
+    async def _setup_subscription_service(self) -> bool:
+        """Initialize the subscription service and start its expiry sweep.
+        
+        Returns:
+            bool: True if subscription service setup was successful, False otherwise
+        """
+        logger.info("Setting up subscription service")
+        
+        try:
+            if not (self.database_manager and self.event_bus):
+                logger.warning("Database manager or event bus not available, skipping subscription service")
+                return True
+            
+            # Subscription statuses are cached in process and in Redis, invalidated by subscription_updated
+            await subscription_status_cache.attach(self.event_bus, self.cache_manager)
+            self.subscription_service = SubscriptionService(
+                self.database_manager, self.event_bus, subscription_status_cache
+            )
+            self.subscription_service.start_expiry_sweep()
+            logger.info("Subscription service set up successfully")
+            return True
+                
+        except Exception as e:
+            error_context = {
+                "operation": "setup_subscription_service",
+                "component": "BotApplication"
+            }
+            user_message = await self.error_handler.handle_error(e, error_context)
+            logger.error("Error setting up subscription service: %s", user_message)
+            self.subscription_service = None
+            logger.warning("Continuing without subscription expiry sweep")
+            return True
+    
+    async def _setup_event_processor(self) -> bool:
+        """Start the event processor and subscribe it to the event bus.
+        
+        Returns:
+            bool: True if event processor setup was successful, False otherwise
+        """
+        logger.info("Setting up event processor")
+        
+        try:
+            if not self.event_bus:
+                logger.warning("Event bus not available, skipping event processor")
+                return True
+            
+            # Subscribed events are handed to the workers of their users
+            self.event_processor = await create_event_processor(self.event_bus, self.config_manager)
+            logger.info("Event processor set up successfully")
+            return True
+                
+        except Exception as e:
+            error_context = {
+                "operation": "setup_event_processor",
+                "component": "BotApplication"
+            }
+            user_message = await self.error_handler.handle_error(e, error_context)
+            logger.error("Error setting up event processor: %s", user_message)
+            self.event_processor = None
+            logger.warning("Continuing without event processor")
+            return True
+    
     async def _setup_api_server(self) -> bool:
         """Initialize API server as required by fase1 specification.
         
@@ -723,10 +843,14 @@ class BotApplication:
             from src.api.endpoints.users import router as user_router
             from src.api.endpoints.narrative import router as narrative_router
             
+            from src.dependencies import get_event_outbox
+            
             # Register routers with the API server
             if self.api_server:
                 self.api_server.app.include_router(user_router)
                 self.api_server.app.include_router(narrative_router)
+                # Endpoints writing besitos stage their events in the application's outbox
+                self.api_server.app.dependency_overrides[get_event_outbox] = lambda: self.event_outbox
                 logger.debug("API endpoints registered successfully")
             else:
                 logger.warning("API server not initialized, cannot register endpoints")
@@ -792,14 +916,15 @@ class BotApplication:
         logger.debug("Processing incoming update")
         
         try:
-            # Process through middleware
-            processed_update = await self.middleware_manager.process_request(update)
-            
-            # Route to appropriate handler
-            response = await self.router.route_update(processed_update)
-            
-            # Process response through middleware
-            processed_response = await self.middleware_manager.process_response(response)
+            async with database_profiler.scope("update"), user_identity_scope():
+                # Process through middleware
+                processed_update = await self.middleware_manager.process_request(update)
+                
+                # Route to appropriate handler
+                response = await self.router.route_update(processed_update)
+                
+                # Process response through middleware
+                processed_response = await self.middleware_manager.process_response(response)
             
             logger.debug("Update processed successfully")
             return processed_response
@@ -53,4 +53,6 @@ class DatabaseConfig(BaseModel):
 class RedisConfig(BaseModel):
     """Configuration model for Redis connection."""
     redis_url: str
-    redis_password: Optional[str] = None
\ No newline at end of file
+    redis_password: Optional[str] = None
+    event_transport: str = "pubsub"  # "pubsub" or "streams"
+    stream_consumer_group: str = "yabot"
\ No newline at end of file
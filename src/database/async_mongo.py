@@ -0,0 +1,352 @@
+"""
+Async MongoDB access layer for the YABOT system.
+
+This module wraps synchronous pymongo objects in awaitable, Motor-style
+counterparts. Every call that talks to the server runs on a bounded thread pool
+sized like the client's connection pool, so coroutines never block the event
+loop and at most one connection is checked out per worker thread. Each
+operation runs under a client-side timeout, so a slow server fails the call
+instead of holding a worker indefinitely.
+"""
+
+import asyncio
+import contextvars
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import pymongo
+from pymongo import MongoClient
+from pymongo.client_session import ClientSession
+from pymongo.collection import Collection
+from pymongo.database import Database
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_OPERATION_TIMEOUT = 10.0
+DEFAULT_CURSOR_BATCH_SIZE = 100
+
+
+class _AsyncMongoObject:
+    """Base class running blocking pymongo calls on the shared executor."""
+
+    def __init__(self, delegate: Any, executor: ThreadPoolExecutor, operation_timeout: Optional[float]):
+        """Initialize the wrapper.
+
+        Args:
+            delegate: Wrapped pymongo object
+            executor: Thread pool running the blocking calls
+            operation_timeout: Timeout in seconds for each operation, None to disable
+        """
+        self.delegate = delegate
+        self._executor = executor
+        self._operation_timeout = operation_timeout
+
+    async def _run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking pymongo call on the executor under the operation timeout."""
+        timeout = self._operation_timeout
+
+        def call() -> Any:
+            if timeout is None:
+                return func(*args, **kwargs)
+            with pymongo.timeout(timeout):
+                return func(*args, **kwargs)
+
+        # Run in a copy of the caller's context so command listeners see its contextvars
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, call)
+
+
+def _unwrap_session(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace an AsyncClientSession keyword argument by its pymongo session."""
+    session = kwargs.get("session")
+    if isinstance(session, AsyncClientSession):
+        kwargs["session"] = session.delegate
+    return kwargs
+
+
+class AsyncMongoClient(_AsyncMongoObject):
+    """Awaitable wrapper around a pymongo MongoClient."""
+
+    delegate: MongoClient
+
+    def __getitem__(self, name: str) -> "AsyncMongoDatabase":
+        return AsyncMongoDatabase(self.delegate[name], self._executor, self._operation_timeout, client=self)
+
+    def __getattr__(self, name: str) -> "AsyncMongoDatabase":
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    @property
+    def admin(self) -> "AsyncMongoDatabase":
+        return AsyncMongoDatabase(self.delegate.admin, self._executor, self._operation_timeout, client=self)
+
+    async def start_session(self, **kwargs: Any) -> "AsyncClientSession":
+        """Start a client session.
+
+        Returns:
+            AsyncClientSession: Session usable as ``async with await client.start_session()``
+        """
+        session = await self._run(self.delegate.start_session, **kwargs)
+        return AsyncClientSession(session, self._executor, self._operation_timeout)
+
+    def close(self) -> None:
+        """Close the underlying client."""
+        self.delegate.close()
+
+
+class AsyncMongoDatabase(_AsyncMongoObject):
+    """Awaitable wrapper around a pymongo Database."""
+
+    delegate: Database
+
+    def __init__(
+        self,
+        delegate: Database,
+        executor: ThreadPoolExecutor,
+        operation_timeout: Optional[float],
+        client: Optional[AsyncMongoClient] = None
+    ):
+        super().__init__(delegate, executor, operation_timeout)
+        self._client = client
+
+    @property
+    def client(self) -> AsyncMongoClient:
+        """Async client owning this database."""
+        if self._client is None:
+            self._client = AsyncMongoClient(self.delegate.client, self._executor, self._operation_timeout)
+        return self._client
+
+    @property
+    def name(self) -> str:
+        return self.delegate.name
+
+    def __getitem__(self, name: str) -> "AsyncMongoCollection":
+        return AsyncMongoCollection(self.delegate[name], self._executor, self._operation_timeout)
+
+    def __getattr__(self, name: str) -> "AsyncMongoCollection":
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str, **kwargs: Any) -> "AsyncMongoCollection":
+        return AsyncMongoCollection(
+            self.delegate.get_collection(name, **kwargs), self._executor, self._operation_timeout
+        )
+
+    async def command(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return await self._run(self.delegate.command, *args, **_unwrap_session(kwargs))
+
+    async def list_collection_names(self, **kwargs: Any) -> List[str]:
+        return await self._run(self.delegate.list_collection_names, **_unwrap_session(kwargs))
+
+
+class AsyncMongoCollection(_AsyncMongoObject):
+    """Awaitable wrapper around a pymongo Collection.
+
+    Single-round-trip operations are coroutines; ``find`` and ``aggregate``
+    return an AsyncMongoCursor that is chained synchronously and iterated with
+    ``async for`` or ``to_list``.
+    """
+
+    delegate: Collection
+
+    _OPERATIONS = (
+        "find_one", "insert_one", "insert_many", "update_one", "update_many",
+        "replace_one", "delete_one", "delete_many", "count_documents",
+        "estimated_document_count", "distinct", "bulk_write", "find_one_and_update",
+        "find_one_and_replace", "find_one_and_delete", "create_index",
+        "create_indexes", "drop_index", "index_information", "drop"
+    )
+
+    @property
+    def name(self) -> str:
+        return self.delegate.name
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in self._OPERATIONS:
+            raise AttributeError(name)
+        method = getattr(self.delegate, name)
+
+        @functools.wraps(method)
+        async def operation(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(method, *args, **_unwrap_session(kwargs))
+        return operation
+
+    def find(self, *args: Any, **kwargs: Any) -> "AsyncMongoCursor":
+        return AsyncMongoCursor(
+            functools.partial(self.delegate.find, *args, **_unwrap_session(kwargs)),
+            self._executor,
+            self._operation_timeout
+        )
+
+    def aggregate(self, pipeline: List[Dict[str, Any]], **kwargs: Any) -> "AsyncMongoCursor":
+        return AsyncMongoCursor(
+            functools.partial(self.delegate.aggregate, pipeline, **_unwrap_session(kwargs)),
+            self._executor,
+            self._operation_timeout,
+            chainable=False
+        )
+
+
+class AsyncMongoCursor(_AsyncMongoObject):
+    """Lazily opened cursor fetched in batches on the executor."""
+
+    def __init__(
+        self,
+        open_cursor: Callable[[], Any],
+        executor: ThreadPoolExecutor,
+        operation_timeout: Optional[float],
+        chainable: bool = True,
+        batch_size: int = DEFAULT_CURSOR_BATCH_SIZE
+    ):
+        """Initialize the cursor.
+
+        Args:
+            open_cursor: Creates the pymongo cursor; called on the first fetch
+            executor: Thread pool running the blocking calls
+            operation_timeout: Timeout in seconds for each batch fetch
+            chainable: Whether sort/skip/limit/projection modifiers are allowed
+            batch_size: Documents fetched per executor round trip when iterating
+        """
+        super().__init__(None, executor, operation_timeout)
+        self._open_cursor = open_cursor
+        self._chainable = chainable
+        self._modifiers: List[tuple] = []
+        self._batch_size = batch_size
+        self._buffer: List[Dict[str, Any]] = []
+        self._exhausted = False
+
+    def _modify(self, name: str, *args: Any, **kwargs: Any) -> "AsyncMongoCursor":
+        if not self._chainable:
+            raise AttributeError(f"{name} is not supported on this cursor")
+        if self.delegate is not None:
+            raise RuntimeError("Cannot modify a cursor after iteration has started")
+        self._modifiers.append((name, args, kwargs))
+        return self
+
+    def sort(self, *args: Any, **kwargs: Any) -> "AsyncMongoCursor":
+        return self._modify("sort", *args, **kwargs)
+
+    def skip(self, *args: Any, **kwargs: Any) -> "AsyncMongoCursor":
+        return self._modify("skip", *args, **kwargs)
+
+    def limit(self, *args: Any, **kwargs: Any) -> "AsyncMongoCursor":
+        return self._modify("limit", *args, **kwargs)
+
+    def batch_size(self, size: int) -> "AsyncMongoCursor":
+        self._batch_size = size
+        return self._modify("batch_size", size)
+
+    def _fetch(self, length: Optional[int]) -> List[Dict[str, Any]]:
+        """Open the cursor if needed and read up to ``length`` documents (blocking)."""
+        if self.delegate is None:
+            cursor = self._open_cursor()
+            for name, args, kwargs in self._modifiers:
+                cursor = getattr(cursor, name)(*args, **kwargs)
+            self.delegate = cursor
+        return list(itertools.islice(self.delegate, length))
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Read the remaining documents, at most ``length`` of them.
+
+        Args:
+            length: Maximum number of documents, None for all
+
+        Returns:
+            List[Dict[str, Any]]: Documents read
+        """
+        documents, self._buffer = self._buffer, []
+        if length is not None:
+            documents, self._buffer = documents[:length], documents[length:]
+            length -= len(documents)
+        if not self._exhausted and (length is None or length > 0):
+            fetched = await self._run(self._fetch, length)
+            if length is None or len(fetched) < length:
+                self._exhausted = True
+            documents.extend(fetched)
+        return documents
+
+    def __aiter__(self) -> "AsyncMongoCursor":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        if not self._buffer and not self._exhausted:
+            self._buffer = await self._run(self._fetch, self._batch_size)
+            self._exhausted = len(self._buffer) < self._batch_size
+        if not self._buffer:
+            raise StopAsyncIteration
+        return self._buffer.pop(0)
+
+    async def close(self) -> None:
+        if self.delegate is not None:
+            await self._run(self.delegate.close)
+
+
+class AsyncClientSession(_AsyncMongoObject):
+    """Awaitable wrapper around a pymongo ClientSession."""
+
+    delegate: ClientSession
+
+    async def __aenter__(self) -> "AsyncClientSession":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        await self.end_session()
+
+    def start_transaction(self, **kwargs: Any) -> "_AsyncTransaction":
+        """Start a transaction.
+
+        Returns:
+            Async context manager committing on success and aborting on error
+        """
+        self.delegate.start_transaction(**kwargs)
+        return _AsyncTransaction(self)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.delegate.in_transaction
+
+    async def commit_transaction(self) -> None:
+        await self._run(self.delegate.commit_transaction)
+
+    async def abort_transaction(self) -> None:
+        await self._run(self.delegate.abort_transaction)
+
+    async def end_session(self) -> None:
+        await self._run(self.delegate.end_session)
+
+
+class _AsyncTransaction:
+    """Async context manager ending the transaction of an AsyncClientSession."""
+
+    def __init__(self, session: AsyncClientSession):
+        self._session = session
+
+    async def __aenter__(self) -> AsyncClientSession:
+        return self._session
+
+    async def __aexit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        if not self._session.in_transaction:
+            return
+        if exc_type is None:
+            await self._session.commit_transaction()
+        else:
+            await self._session.abort_transaction()
+
+
+def create_mongo_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Create the thread pool running blocking MongoDB calls.
+
+    Args:
+        max_workers: Number of worker threads, matching the client's maxPoolSize
+
+    Returns:
+        ThreadPoolExecutor: Executor for AsyncMongoClient
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongo")
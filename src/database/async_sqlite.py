@@ -0,0 +1,283 @@
+"""
+Async SQLite access layer for the YABOT system.
+
+This module keeps SQLite work off the event loop. Reads run on a small pool of
+read-only connections, one per worker thread, so they proceed concurrently
+under WAL mode. Writes are queued to a single writer task that commits every
+write submitted within a short interval in one transaction, so a burst of
+INSERT/UPDATEs costs one fsync instead of one per statement. Each write unit
+runs inside its own savepoint, so a failing unit does not roll back the others
+in its group.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+Statement = Tuple[str, Sequence[Any]]
+
+
+@dataclass(frozen=True)
+class SQLiteWriteResult:
+    """Outcome of one write statement."""
+    rowcount: int
+    lastrowid: Optional[int]
+    rows: List[Dict[str, Any]] = field(default_factory=list)  # rows of a RETURNING clause
+
+
+class AsyncSQLite:
+    """Async SQLite facade with a reader pool and a group-commit writer."""
+
+    def __init__(
+        self,
+        database_path: str,
+        reader_count: int = 4,
+        commit_interval: float = 0.005,
+        max_batch_size: int = 512,
+        cached_statements: int = 256,
+        timeout: float = 30.0
+    ):
+        """Initialize the async SQLite facade. Connections are opened on first use.
+
+        Args:
+            database_path: Path to the SQLite database file
+            reader_count: Number of read-only connections and reader threads
+            commit_interval: Seconds the writer waits for more writes before committing
+            max_batch_size: Maximum number of write units committed together
+            cached_statements: Prepared statements cached per connection
+            timeout: Seconds a connection waits on a locked database
+        """
+        self.database_path = database_path
+        self.reader_count = reader_count
+        self.commit_interval = commit_interval
+        self.max_batch_size = max_batch_size
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+
+        # In-memory databases are private to one connection, so reads share the writer
+        self._shared_connection = database_path in ("", ":memory:")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Each thread opens its connection on first use; a failed open is retried by
+        # the next call instead of breaking the pool as an executor initializer would
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._reader_executor = self._writer_executor if self._shared_connection else ThreadPoolExecutor(
+            max_workers=reader_count,
+            thread_name_prefix="sqlite-reader"
+        )
+
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def _connect(self, database: str, pragmas: Sequence[str], **kwargs: Any) -> sqlite3.Connection:
+        """Open a connection for the current thread and register it once it is set up."""
+        conn = sqlite3.connect(
+            database,
+            timeout=self.timeout,
+            check_same_thread=False,  # Closed from the thread calling close()
+            cached_statements=self.cached_statements,
+            **kwargs
+        )
+        try:
+            conn.row_factory = sqlite3.Row
+            for pragma in pragmas:
+                conn.execute(pragma)
+        except Exception:
+            conn.close()
+            raise
+        with self._connections_lock:
+            self._connections.append(conn)
+        self._local.conn = conn
+        return conn
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        """Get the writer connection, opening it on the writer thread on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Transactions are managed explicitly with BEGIN/COMMIT
+            conn = self._connect(
+                self.database_path,
+                ("PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"),
+                isolation_level=None
+            )
+        return conn
+
+    def _reader_connection(self) -> sqlite3.Connection:
+        """Get the read-only connection of a reader thread, opening it on first use."""
+        if self._shared_connection:
+            return self._writer_connection()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(f"file:{self.database_path}?mode=ro", ("PRAGMA query_only=1",), uri=True)
+        return conn
+
+    async def _run_read(self, func: Callable[[sqlite3.Connection], Any]) -> Any:
+        if self._closed:
+            raise RuntimeError("AsyncSQLite is closed")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._reader_executor, lambda: func(self._reader_connection()))
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[Dict[str, Any]]:
+        """Run a query and return its first row.
+
+        Args:
+            sql: SELECT statement
+            params: Statement parameters
+
+        Returns:
+            Optional[Dict[str, Any]]: First row as a dict, or None if there is none
+        """
+        def read(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            row = conn.execute(sql, params).fetchone()
+            return dict(row) if row is not None else None
+        return await self._run_read(read)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """Run a query and return all rows.
+
+        Args:
+            sql: SELECT statement
+            params: Statement parameters
+
+        Returns:
+            List[Dict[str, Any]]: Rows as dicts
+        """
+        def read(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        return await self._run_read(read)
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> SQLiteWriteResult:
+        """Queue a write statement and wait for its group commit.
+
+        Args:
+            sql: INSERT, UPDATE, DELETE or DDL statement
+            params: Statement parameters
+
+        Returns:
+            SQLiteWriteResult: Affected row count, last inserted row id and any
+                rows of a RETURNING clause
+        """
+        results = await self.transaction([(sql, params)])
+        return results[0]
+
+    async def transaction(self, statements: Sequence[Statement]) -> List[SQLiteWriteResult]:
+        """Queue write statements applied atomically and wait for their group commit.
+
+        Args:
+            statements: (sql, params) pairs applied all-or-nothing
+
+        Returns:
+            List[SQLiteWriteResult]: One result per statement
+
+        Raises:
+            sqlite3.Error: If a statement fails; none of the statements are applied
+        """
+        if self._closed:
+            raise RuntimeError("AsyncSQLite is closed")
+        loop = asyncio.get_running_loop()
+        if self._writer_task is None or self._writer_task.done():
+            self._write_queue = asyncio.Queue()
+            self._writer_task = loop.create_task(self._run_writer())
+
+        future = loop.create_future()
+        self._write_queue.put_nowait((list(statements), future))
+        return await future
+
+    async def _run_writer(self) -> None:
+        """Collect queued write units and commit them in groups."""
+        loop = asyncio.get_running_loop()
+        queue = self._write_queue
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = loop.time() + self.commit_interval
+            while len(batch) < self.max_batch_size:
+                try:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        item = queue.get_nowait()
+                    else:
+                        item = await asyncio.wait_for(queue.get(), remaining)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            try:
+                outcomes = await loop.run_in_executor(
+                    self._writer_executor, self._commit_group, [units for units, _ in batch]
+                )
+            except Exception as e:
+                outcomes = [e] * len(batch)
+
+            for (_, future), outcome in zip(batch, outcomes):
+                if future.done():
+                    continue
+                if isinstance(outcome, Exception):
+                    future.set_exception(outcome)
+                else:
+                    future.set_result(outcome)
+            if stop:
+                return
+
+    def _commit_group(self, units: List[List[Statement]]) -> List[Any]:
+        """Apply write units in one transaction, each in its own savepoint (writer thread)."""
+        conn = self._writer_connection()
+        outcomes: List[Any] = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statements in units:
+                conn.execute("SAVEPOINT write_unit")
+                try:
+                    results = []
+                    for sql, params in statements:
+                        cursor = conn.execute(sql, params)
+                        # RETURNING rows must be fetched before rowcount is final
+                        rows = [dict(row) for row in cursor.fetchall()] if cursor.description else []
+                        results.append(SQLiteWriteResult(cursor.rowcount, cursor.lastrowid, rows))
+                    conn.execute("RELEASE write_unit")
+                    outcomes.append(results)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write_unit")
+                    conn.execute("RELEASE write_unit")
+                    outcomes.append(e)
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        logger.debug("Committed %d SQLite write units in one transaction", len(units))
+        return outcomes
+
+    async def close(self) -> None:
+        """Commit pending writes, stop the writer and close all connections."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer_task is not None and not self._writer_task.done():
+            self._write_queue.put_nowait(None)
+            await self._writer_task
+
+        self._writer_executor.shutdown(wait=True)
+        if self._reader_executor is not self._writer_executor:
+            self._reader_executor.shutdown(wait=True)
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
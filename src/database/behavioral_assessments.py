@@ -0,0 +1,137 @@
+"""
+Bucketed behavioral assessment storage for the YABOT system.
+
+Behavioral assessments used to be appended to the user document without bound.
+They are now stored in the ``behavioral_assessment_buckets`` collection, one
+document per user per day holding up to BUCKET_MAX_ASSESSMENTS assessments, and
+indexed by user and bucket start. The user document only embeds the most
+recent RECENT_ASSESSMENT_WINDOW summaries, capped with ``$slice``, together with
+a running ``behavioral_assessment_count``.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.database.async_mongo import AsyncMongoDatabase
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+BEHAVIORAL_ASSESSMENT_BUCKETS = "behavioral_assessment_buckets"
+BUCKET_MAX_ASSESSMENTS = 100
+RECENT_ASSESSMENT_WINDOW = 20
+
+BEHAVIORAL_ASSESSMENT_BUCKET_INDEXES = [
+    {"keys": [("user_id", 1), ("bucket_start", -1)], "name": "user_bucket_start"},
+]
+
+
+def bucket_start_for(timestamp: datetime) -> datetime:
+    """Return the start of the daily bucket holding an assessment made at ``timestamp``.
+
+    Args:
+        timestamp (datetime): Assessment timestamp
+
+    Returns:
+        datetime: Midnight of the same day
+    """
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def embedded_assessment_summary(assessment: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the summary of an assessment embedded in the user document.
+
+    Args:
+        assessment (Dict[str, Any]): Full assessment record
+
+    Returns:
+        Dict[str, Any]: Fields consumed by Lucien's voice profile
+    """
+    return {
+        "assessment_id": assessment.get("assessment_id"),
+        "timestamp": assessment.get("timestamp"),
+        "behavior_observed": assessment.get("behavior_observed", ""),
+        "lucien_evaluation": assessment.get("lucien_evaluation", assessment.get("lucien_evaluation_notes", "")),
+        "sophistication_impact": assessment.get("sophistication_impact", 0.0),
+        "worthiness_impact": assessment.get("worthiness_impact", 0.0),
+        "archetype_confirmation": assessment.get("archetype_confirmation"),
+        "diana_protection_factor": assessment.get("diana_protection_factor", 0.0)
+    }
+
+
+class BehavioralAssessmentStore:
+    """Reads and writes behavioral assessments in daily per-user buckets."""
+
+    def __init__(self, db: AsyncMongoDatabase):
+        """Initialize the store.
+
+        Args:
+            db (AsyncMongoDatabase): Async MongoDB database
+        """
+        self.collection = db[BEHAVIORAL_ASSESSMENT_BUCKETS]
+
+    async def add(self, user_id: str, assessment: Dict[str, Any]) -> None:
+        """Append an assessment to the user's open bucket for its day, creating one if needed.
+
+        Args:
+            user_id (str): User ID
+            assessment (Dict[str, Any]): Assessment record with a datetime ``timestamp``
+        """
+        timestamp = assessment["timestamp"]
+        await self.collection.update_one(
+            {
+                "user_id": user_id,
+                "bucket_start": bucket_start_for(timestamp),
+                "count": {"$lt": BUCKET_MAX_ASSESSMENTS}
+            },
+            {
+                "$push": {"assessments": assessment},
+                "$inc": {"count": 1},
+                "$min": {"first_timestamp": timestamp},
+                "$max": {"last_timestamp": timestamp}
+            },
+            upsert=True
+        )
+
+    async def find(
+        self,
+        user_id: str,
+        since: Optional[datetime] = None,
+        assessment_context: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Query a user's assessments, newest first, filtering on the server.
+
+        Args:
+            user_id (str): User ID
+            since (Optional[datetime]): Only assessments at or after this time
+            assessment_context (Optional[str]): Only assessments made in this context
+            limit (Optional[int]): Maximum number of assessments
+
+        Returns:
+            List[Dict[str, Any]]: Matching assessments
+        """
+        bucket_match: Dict[str, Any] = {"user_id": user_id}
+        assessment_match: Dict[str, Any] = {}
+        if since is not None:
+            bucket_match["bucket_start"] = {"$gte": bucket_start_for(since)}
+            bucket_match["last_timestamp"] = {"$gte": since}
+            assessment_match["timestamp"] = {"$gte": since}
+        if assessment_context is not None:
+            bucket_match["assessments.assessment_context"] = assessment_context
+            assessment_match["assessment_context"] = assessment_context
+
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": bucket_match},
+            {"$sort": {"bucket_start": -1}},
+            {"$unwind": "$assessments"},
+            {"$replaceRoot": {"newRoot": "$assessments"}},
+        ]
+        if assessment_match:
+            pipeline.append({"$match": assessment_match})
+        pipeline.append({"$sort": {"timestamp": -1}})
+        if limit:
+            pipeline.append({"$limit": limit})
+
+        return await self.collection.aggregate(pipeline).to_list(None)
@@ -0,0 +1,371 @@
+"""
+Declarative MongoDB index catalogue for the YABOT system.
+
+INDEX_CATALOGUE lists, per collection, every index the application relies on,
+and REGISTERED_QUERIES lists the query shapes issued by the services and
+modules with representative values. Every registered query must be answered
+from an index: ``find_collection_scans`` runs ``explain()`` on each of them and
+reports the ones whose winning plan scans the whole collection.
+
+``ensure_indexes`` creates the catalogue idempotently: indexes that already
+exist, under their catalogue name or with the same keys, are left untouched and
+nothing is ever dropped. The DatabaseManager runs it in the background at startup.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from pymongo.database import Database
+
+from src.database.behavioral_assessments import (
+    BEHAVIORAL_ASSESSMENT_BUCKET_INDEXES, BEHAVIORAL_ASSESSMENT_BUCKETS
+)
+from src.events.outbox import OUTBOX_COLLECTION
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+INDEX_CATALOGUE: Dict[str, List[Dict[str, Any]]] = {
+    "users": [
+        {"keys": [("user_id", 1)], "name": "user_id", "unique": True},
+        {"keys": [("current_state.narrative_progress.current_fragment", 1)], "name": "current_fragment"},
+        {"keys": [("preferences.language", 1)], "name": "language"},
+        {"keys": [("created_at", 1)], "name": "created_at"},
+        {"keys": [("updated_at", 1)], "name": "updated_at"},
+    ],
+    "narrative_fragments": [
+        {"keys": [("fragment_id", 1)], "name": "fragment_id", "unique": True},
+        {"keys": [("vip_required", 1), ("published", 1)], "name": "vip_published"},
+        {"keys": [("metadata.tags", 1)], "name": "tags"},
+        {"keys": [("created_at", 1)], "name": "created_at"},
+    ],
+    "narrative_templates": [
+        {"keys": [("template_id", 1), ("category", 1), ("active", 1)], "name": "template_category_active"},
+    ],
+    "items": [
+        {"keys": [("item_id", 1)], "name": "item_id", "unique": True},
+        {"keys": [("available_in_store", 1), ("category", 1), ("price", 1)], "name": "store_category_price"},
+        {"keys": [("category", 1), ("rarity", 1)], "name": "category_rarity"},
+        {"keys": [("rarity", 1)], "name": "rarity"},
+    ],
+    "user_items": [
+        {"keys": [("user_id", 1), ("item_id", 1)], "name": "user_item"},
+        {"keys": [("user_id", 1), ("category", 1), ("equipped", 1)], "name": "user_category_equipped"},
+        {"keys": [("user_id", 1), ("equipped", 1)], "name": "user_equipped"},
+    ],
+    "missions": [
+        {"keys": [("mission_id", 1)], "name": "mission_id", "unique": True},
+        {"keys": [("user_id", 1), ("created_at", -1)], "name": "user_created"},
+        {"keys": [("user_id", 1), ("status", 1), ("created_at", -1)], "name": "user_status_created"},
+        {
+            "keys": [("user_id", 1), ("type", 1), ("status", 1), ("completed_at", -1)],
+            "name": "user_type_status_completed"
+        },
+        {"keys": [("status", 1), ("expires_at", 1)], "name": "status_expires"},
+    ],
+    "user_achievements": [
+        {"keys": [("user_id", 1), ("achievement_id", 1)], "name": "user_achievement", "unique": True},
+        {"keys": [("user_id", 1), ("completed", 1)], "name": "user_completed"},
+        {"keys": [("user_id", 1), ("completed_at", -1)], "name": "user_completed_at"},
+    ],
+    "trivias": [
+        {"keys": [("trivia_id", 1)], "name": "trivia_id", "unique": True},
+        {"keys": [("status", 1), ("start_time", -1)], "name": "status_start"},
+    ],
+    "auctions": [
+        {"keys": [("auction_id", 1)], "name": "auction_id", "unique": True},
+        {"keys": [("status", 1), ("end_time", 1)], "name": "status_end"},
+    ],
+    "besitos_transactions": [
+        {"keys": [("transaction_id", 1)], "name": "transaction_id", "unique": True},
+        {"keys": [("user_id", 1), ("created_at", -1)], "name": "user_created"},
+    ],
+    "lucien_messages": [
+        {"keys": [("message_id", 1)], "name": "message_id", "unique": True},
+        {"keys": [("user_id", 1), ("created_at", -1)], "name": "user_created"},
+        {"keys": [("user_id", 1), ("status", 1), ("created_at", -1)], "name": "user_status_created"},
+        {"keys": [("status", 1), ("scheduled_time", 1)], "name": "status_scheduled"},
+    ],
+    "emotional_interactions": [
+        {"keys": [("user_id", 1), ("created_at", -1)], "name": "user_created"},
+    ],
+    "menu_behavioral_assessments": [
+        {"keys": [("user_id", 1), ("timestamp", -1)], "name": "user_timestamp"},
+    ],
+    "audit_logs": [
+        {"keys": [("user_id", 1), ("timestamp", -1)], "name": "user_timestamp"},
+        {"keys": [("action", 1), ("timestamp", -1)], "name": "action_timestamp"},
+        {"keys": [("resource_type", 1), ("timestamp", -1)], "name": "resource_timestamp"},
+        {"keys": [("timestamp", -1)], "name": "timestamp"},
+    ],
+    BEHAVIORAL_ASSESSMENT_BUCKETS: BEHAVIORAL_ASSESSMENT_BUCKET_INDEXES,
+    OUTBOX_COLLECTION: [
+        {"keys": [("available_at", 1)], "name": "available_at"},
+    ],
+}
+
+
+_ACTIVE_MISSION = {"$in": ["available", "in_progress"]}
+_SAMPLE_TIME = datetime(2026, 1, 1)
+
+REGISTERED_QUERIES: List[Dict[str, Any]] = [
+    {"name": "users.by_user_id", "collection": "users", "filter": {"user_id": "u1"}},
+    {"name": "fragments.by_id", "collection": "narrative_fragments", "filter": {"fragment_id": "f1"}},
+    {
+        "name": "fragments.published_by_vip",
+        "collection": "narrative_fragments",
+        "filter": {"vip_required": False, "published": True}
+    },
+    {
+        "name": "templates.active_by_id",
+        "collection": "narrative_templates",
+        "filter": {"template_id": "t1", "category": "lucien_message", "active": True}
+    },
+    {"name": "items.by_id", "collection": "items", "filter": {"item_id": "i1"}},
+    {
+        "name": "items.store_menu",
+        "collection": "items",
+        "filter": {"available_in_store": True, "category": "cosmetic"},
+        "sort": [("price", 1)]
+    },
+    {"name": "items.by_rarity", "collection": "items", "filter": {"rarity": "rare"}},
+    {"name": "user_items.by_item", "collection": "user_items", "filter": {"user_id": "u1", "item_id": "i1"}},
+    {"name": "user_items.inventory", "collection": "user_items", "filter": {"user_id": "u1"}},
+    {
+        "name": "user_items.equipped_in_category",
+        "collection": "user_items",
+        "filter": {"user_id": "u1", "category": "cosmetic", "equipped": True}
+    },
+    {"name": "user_items.equipped", "collection": "user_items", "filter": {"user_id": "u1", "equipped": True}},
+    {
+        "name": "missions.by_id_for_user",
+        "collection": "missions",
+        "filter": {"mission_id": "m1", "user_id": "u1", "status": _ACTIVE_MISSION}
+    },
+    {
+        "name": "missions.by_user",
+        "collection": "missions",
+        "filter": {"user_id": "u1"},
+        "sort": [("created_at", -1)]
+    },
+    {
+        "name": "missions.by_user_status",
+        "collection": "missions",
+        "filter": {"user_id": "u1", "status": "available"},
+        "sort": [("created_at", -1)]
+    },
+    {
+        "name": "missions.active_by_type",
+        "collection": "missions",
+        "filter": {"user_id": "u1", "type": "daily", "status": _ACTIVE_MISSION}
+    },
+    {
+        "name": "missions.active_by_objective",
+        "collection": "missions",
+        "filter": {"user_id": "u1", "status": _ACTIVE_MISSION, "objectives.objective_id": "react_content"}
+    },
+    {
+        "name": "missions.recently_completed",
+        "collection": "missions",
+        "filter": {"user_id": "u1", "type": "daily", "status": "completed", "completed_at": {"$gte": _SAMPLE_TIME}}
+    },
+    {
+        "name": "missions.expired",
+        "collection": "missions",
+        "filter": {"status": _ACTIVE_MISSION, "expires_at": {"$lt": _SAMPLE_TIME}}
+    },
+    {
+        "name": "user_achievements.by_achievement",
+        "collection": "user_achievements",
+        "filter": {"user_id": "u1", "achievement_id": "a1"}
+    },
+    {
+        "name": "user_achievements.by_user",
+        "collection": "user_achievements",
+        "filter": {"user_id": "u1"},
+        "sort": [("completed_at", -1)]
+    },
+    {
+        "name": "user_achievements.completed",
+        "collection": "user_achievements",
+        "filter": {"user_id": "u1", "completed": True}
+    },
+    {"name": "trivias.by_id", "collection": "trivias", "filter": {"trivia_id": "t1"}},
+    {
+        "name": "trivias.active",
+        "collection": "trivias",
+        "filter": {"status": "active"},
+        "sort": [("start_time", -1)]
+    },
+    {"name": "auctions.by_id", "collection": "auctions", "filter": {"auction_id": "a1"}},
+    {
+        "name": "auctions.active",
+        "collection": "auctions",
+        "filter": {"status": "active"},
+        "sort": [("end_time", 1)]
+    },
+    {
+        "name": "besitos_transactions.history",
+        "collection": "besitos_transactions",
+        "filter": {"user_id": "u1"},
+        "sort": [("created_at", -1)]
+    },
+    {"name": "lucien_messages.by_id", "collection": "lucien_messages", "filter": {"message_id": "m1"}},
+    {
+        "name": "lucien_messages.by_user",
+        "collection": "lucien_messages",
+        "filter": {"user_id": "u1"},
+        "sort": [("created_at", -1)]
+    },
+    {
+        "name": "lucien_messages.by_user_status",
+        "collection": "lucien_messages",
+        "filter": {"user_id": "u1", "status": "delivered"},
+        "sort": [("created_at", -1)]
+    },
+    {
+        "name": "lucien_messages.due",
+        "collection": "lucien_messages",
+        "filter": {"status": "pending", "scheduled_time": {"$lte": _SAMPLE_TIME}},
+        "sort": [("scheduled_time", 1)]
+    },
+    {
+        "name": "emotional_interactions.recent",
+        "collection": "emotional_interactions",
+        "filter": {"user_id": "u1"},
+        "sort": [("created_at", -1)]
+    },
+    {
+        "name": "menu_behavioral_assessments.recent",
+        "collection": "menu_behavioral_assessments",
+        "filter": {"user_id": "u1"},
+        "sort": [("timestamp", -1)]
+    },
+    {
+        "name": "audit_logs.by_user",
+        "collection": "audit_logs",
+        "filter": {"user_id": "u1", "timestamp": {"$gte": _SAMPLE_TIME}},
+        "sort": [("timestamp", -1)]
+    },
+    {
+        "name": "audit_logs.by_action",
+        "collection": "audit_logs",
+        "filter": {"action": "user_login"},
+        "sort": [("timestamp", -1)]
+    },
+    {
+        "name": "audit_logs.by_resource_type",
+        "collection": "audit_logs",
+        "filter": {"resource_type": "subscription"},
+        "sort": [("timestamp", -1)]
+    },
+    {
+        "name": "audit_logs.expired",
+        "collection": "audit_logs",
+        "filter": {"timestamp": {"$lt": _SAMPLE_TIME}}
+    },
+    {
+        "name": "behavioral_assessment_buckets.open_bucket",
+        "collection": BEHAVIORAL_ASSESSMENT_BUCKETS,
+        "filter": {"user_id": "u1", "bucket_start": _SAMPLE_TIME, "count": {"$lt": 100}}
+    },
+    {
+        "name": "behavioral_assessment_buckets.since",
+        "collection": BEHAVIORAL_ASSESSMENT_BUCKETS,
+        "filter": {"user_id": "u1", "bucket_start": {"$gte": _SAMPLE_TIME}},
+        "sort": [("bucket_start", -1)]
+    },
+    {
+        "name": "event_outbox.due",
+        "collection": OUTBOX_COLLECTION,
+        "filter": {"available_at": {"$lte": _SAMPLE_TIME}},
+        "sort": [("available_at", 1)]
+    },
+]
+
+
+def _normalize_keys(keys: Any) -> Tuple[Tuple[str, Any], ...]:
+    """Normalize index keys to a tuple of (field, direction) pairs."""
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in keys
+    )
+
+
+def ensure_indexes(db: Database, catalogue: Dict[str, List[Dict[str, Any]]] = INDEX_CATALOGUE) -> Dict[str, List[str]]:
+    """Create the catalogue indexes that do not exist yet.
+
+    Args:
+        db (Database): MongoDB database instance
+        catalogue (Dict[str, List[Dict[str, Any]]]): Index specs per collection
+
+    Returns:
+        Dict[str, List[str]]: Names of the indexes created, per collection
+    """
+    created: Dict[str, List[str]] = {}
+    for collection_name, index_specs in catalogue.items():
+        collection = db[collection_name]
+        existing = collection.index_information()
+        existing_keys = {_normalize_keys(info["key"]) for info in existing.values()}
+
+        for index_spec in index_specs:
+            keys = _normalize_keys(index_spec["keys"])
+            if keys in existing_keys:
+                continue
+            if index_spec["name"] in existing:
+                logger.warning(
+                    "Index %s on %s exists with different keys, not replacing it",
+                    index_spec["name"], collection_name
+                )
+                continue
+            try:
+                collection.create_index(**index_spec)
+                created.setdefault(collection_name, []).append(index_spec["name"])
+            except Exception as e:
+                logger.warning("Failed to create index %s on %s: %s", index_spec["name"], collection_name, str(e))
+
+    if created:
+        logger.info("Created MongoDB indexes: %s", created)
+    return created
+
+
+def winning_plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Collect the stage names of a query plan and its input stages.
+
+    Args:
+        plan (Dict[str, Any]): Query plan node, e.g. ``queryPlanner.winningPlan``
+
+    Returns:
+        List[str]: Stage names, outermost first
+    """
+    stages = [plan["stage"]] if "stage" in plan else []
+    # Slot-based engine plans wrap the classic plan in queryPlan
+    if "queryPlan" in plan:
+        stages.extend(winning_plan_stages(plan["queryPlan"]))
+    if "inputStage" in plan:
+        stages.extend(winning_plan_stages(plan["inputStage"]))
+    for input_stage in plan.get("inputStages", []):
+        stages.extend(winning_plan_stages(input_stage))
+    return stages
+
+
+def find_collection_scans(db: Database, queries: List[Dict[str, Any]] = REGISTERED_QUERIES) -> List[str]:
+    """Explain registered queries and report those answered by a collection scan.
+
+    Args:
+        db (Database): MongoDB database holding the catalogue indexes
+        queries (List[Dict[str, Any]]): Registered query shapes
+
+    Returns:
+        List[str]: Names of the queries whose winning plan contains COLLSCAN
+    """
+    scans = []
+    for query in queries:
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        if "COLLSCAN" in winning_plan_stages(plan):
+            scans.append(query["name"])
+    return scans
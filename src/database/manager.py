@@ -14,6 +14,12 @@ from typing import Any, Dict, Optional, Callable, Awaitable
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 from src.config.manager import ConfigManager
+from src.database.async_mongo import (
+    AsyncMongoClient, AsyncMongoDatabase, DEFAULT_OPERATION_TIMEOUT, create_mongo_executor
+)
+from src.database.async_sqlite import AsyncSQLite
+from src.database.indexes import ensure_indexes
+from src.database.profiler import DatabaseProfiler, database_profiler
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -22,16 +28,42 @@ logger = get_logger(__name__)
 class DatabaseManager:
     """Unified database manager for MongoDB and SQLite connections."""
     
-    def __init__(self, config_manager: Optional[ConfigManager] = None):
+    def __init__(
+        self,
+        config_manager: Optional[ConfigManager] = None,
+        mongo_max_pool_size: int = 32,
+        mongo_operation_timeout: Optional[float] = DEFAULT_OPERATION_TIMEOUT,
+        sqlite_reader_count: int = 4,
+        sqlite_commit_interval: float = 0.005,
+        profiler: Optional[DatabaseProfiler] = None
+    ):
         """Initialize the database manager.
         
         Args:
             config_manager (ConfigManager, optional): Configuration manager instance
+            mongo_max_pool_size (int): MongoDB connections, and worker threads of the
+                async MongoDB handle, so concurrent coroutines never wait on a socket
+                while holding a thread
+            mongo_operation_timeout (float, optional): Timeout in seconds for each
+                operation issued through the async MongoDB handle
+            sqlite_reader_count (int): Read-only SQLite connections of the async handle
+            sqlite_commit_interval (float): Seconds the async SQLite writer gathers
+                writes before committing them together
+            profiler (DatabaseProfiler, optional): Profiler receiving every MongoDB
+                command and async SQLite statement, the process-wide one by default
         """
         self.config_manager = config_manager or ConfigManager()
+        self.mongo_max_pool_size = mongo_max_pool_size
+        self.mongo_operation_timeout = mongo_operation_timeout
         self._mongo_client: Optional[MongoClient] = None
+        self._async_mongo_client: Optional[AsyncMongoClient] = None
+        self._mongo_executor = None
+        self.sqlite_reader_count = sqlite_reader_count
+        self.sqlite_commit_interval = sqlite_commit_interval
         self._sqlite_conn: Optional[sqlite3.Connection] = None
+        self._async_sqlite: Optional[AsyncSQLite] = None
         self._mongo_db_name: Optional[str] = None
+        self.profiler = profiler or database_profiler
         self._is_connected = False
         
         logger.info("DatabaseManager initialized")
@@ -111,8 +143,9 @@ class DatabaseManager:
                     uri,
                     connectTimeoutMS=5000,
                     serverSelectionTimeoutMS=5000,
-                    maxPoolSize=50,
-                    minPoolSize=5
+                    maxPoolSize=self.mongo_max_pool_size,
+                    minPoolSize=min(5, self.mongo_max_pool_size),
+                    event_listeners=[self.profiler.mongo_listener()]
                 )
                 
                 # Test connection
@@ -169,6 +202,13 @@ class DatabaseManager:
             # Test connection
             self._sqlite_conn.execute("SELECT 1")
             
+            # Async handle; its connections are opened on first use
+            self._async_sqlite = self.profiler.wrap_sqlite(AsyncSQLite(
+                database_path,
+                reader_count=self.sqlite_reader_count,
+                commit_interval=self.sqlite_commit_interval
+            ))
+            
             logger.info("Successfully connected to SQLite database")
             return True
             
@@ -190,6 +230,36 @@ class DatabaseManager:
         
         return self._mongo_client[self._mongo_db_name]
     
+    def get_async_mongo_db(self) -> AsyncMongoDatabase:
+        """Get an awaitable MongoDB database handle.
+        
+        Operations on the returned database, its collections and cursors run on
+        a thread pool of ``mongo_max_pool_size`` workers under
+        ``mongo_operation_timeout``, so they never block the event loop.
+        
+        Returns:
+            AsyncMongoDatabase: Async MongoDB database instance
+            
+        Raises:
+            ValueError: If MongoDB is not connected
+        """
+        if not self._mongo_client or not self._mongo_db_name:
+            raise ValueError("MongoDB is not connected")
+        
+        return self._get_async_mongo_client()[self._mongo_db_name]
+    
+    def _get_async_mongo_client(self) -> AsyncMongoClient:
+        """Get the async wrapper of the current MongoDB client, creating it on first use."""
+        if self._async_mongo_client is None or self._async_mongo_client.delegate is not self._mongo_client:
+            if self._mongo_executor is None:
+                self._mongo_executor = create_mongo_executor(self.mongo_max_pool_size)
+            self._async_mongo_client = AsyncMongoClient(
+                self._mongo_client,
+                self._mongo_executor,
+                self.mongo_operation_timeout
+            )
+        return self._async_mongo_client
+    
     def get_sqlite_conn(self) -> sqlite3.Connection:
         """Get SQLite database connection.
         
@@ -204,6 +274,24 @@ class DatabaseManager:
         
         return self._sqlite_conn
     
+    def get_async_sqlite(self) -> AsyncSQLite:
+        """Get the async SQLite handle.
+        
+        Reads run on a pool of read-only connections and writes are group
+        committed by a single writer, all off the event loop. Statements are
+        reported to the profiler.
+        
+        Returns:
+            AsyncSQLite: Async SQLite handle
+            
+        Raises:
+            ValueError: If SQLite is not connected
+        """
+        if not self._sqlite_conn or not self._async_sqlite:
+            raise ValueError("SQLite is not connected")
+        
+        return self._async_sqlite
+    
     async def health_check(self) -> Dict[str, bool]:
         """Check the health of all database connections.
         
@@ -220,7 +308,7 @@ class DatabaseManager:
         # Check MongoDB health
         if self._mongo_client:
             try:
-                self._mongo_client.admin.command('ping')
+                await self._get_async_mongo_client().admin.command('ping')
                 health_status["mongodb"] = True
             except Exception as e:
                 logger.warning("MongoDB health check failed: %s", str(e))
@@ -248,7 +336,19 @@ class DatabaseManager:
             except Exception as e:
                 logger.error("Error closing MongoDB connection: %s", str(e))
         
-        # Close SQLite connection
+        if self._mongo_executor is not None:
+            self._mongo_executor.shutdown(wait=False)
+            self._mongo_executor = None
+            self._async_mongo_client = None
+        
+        # Close SQLite connections, committing queued writes first
+        if self._async_sqlite:
+            try:
+                await self._async_sqlite.close()
+            except Exception as e:
+                logger.error("Error closing async SQLite handle: %s", str(e))
+            self._async_sqlite = None
+        
         if self._sqlite_conn:
             try:
                 self._sqlite_conn.close()
@@ -396,6 +496,35 @@ class DatabaseManager:
 
         logger.info("Offline database recovery monitor started")
 
+    def start_index_sync(self) -> Optional[asyncio.Task]:
+        """Create missing indexes of the index catalogue in the background.
+        
+        Startup does not wait for index builds. The sync only creates indexes that
+        do not exist yet, so it is safe to run on every start.
+        
+        Returns:
+            Optional[asyncio.Task]: The sync task, or None if MongoDB is not connected
+        """
+        if not self._mongo_client or not self._mongo_db_name:
+            return None
+        
+        task = asyncio.create_task(self._sync_indexes())
+        self._register_background_task(task, "MongoDB index sync")
+        return task
+    
+    async def _sync_indexes(self) -> None:
+        """Run the index catalogue sync on the MongoDB worker threads."""
+        try:
+            database = self.get_mongo_db()
+            self._get_async_mongo_client()
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._mongo_executor, ensure_indexes, database)
+            logger.info("MongoDB index catalogue synced")
+        except Exception as e:
+            logger.error("Error syncing MongoDB index catalogue: %s", str(e))
+        finally:
+            self._unregister_background_task(asyncio.current_task())
+
     def _register_background_task(self, task: asyncio.Task, task_name: str) -> None:
         """Register background task with the main application for proper shutdown."""
         try:
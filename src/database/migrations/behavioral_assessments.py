@@ -0,0 +1,168 @@
+"""
+MongoDB migration moving behavioral assessment history into buckets.
+
+Before this migration every behavioral assessment was appended to
+``lucien_interaction_context.behavioral_assessment_history`` in the user
+document. This module creates the ``behavioral_assessment_buckets`` collection
+and its indexes, copies each user's embedded history into daily buckets and
+trims the embedded array to the recent window. It can be run repeatedly:
+assessments already present in the buckets are not copied twice.
+"""
+
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, List
+
+from pymongo.database import Database
+
+from src.database.behavioral_assessments import (
+    BEHAVIORAL_ASSESSMENT_BUCKET_INDEXES, BEHAVIORAL_ASSESSMENT_BUCKETS,
+    BUCKET_MAX_ASSESSMENTS, RECENT_ASSESSMENT_WINDOW, bucket_start_for
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+MIGRATED_FLAG = "lucien_interaction_context.behavioral_assessments_bucketed"
+
+
+class BehavioralAssessmentMigration:
+    """Handles MongoDB migration of embedded behavioral assessment history."""
+
+    def __init__(self, db: Database):
+        """Initialize the behavioral assessment migration handler.
+
+        Args:
+            db (Database): MongoDB database instance
+        """
+        self.db = db
+        logger.info("BehavioralAssessmentMigration initialized")
+
+    def setup_collection(self) -> bool:
+        """Create the bucket collection indexes.
+
+        Returns:
+            bool: True if setup was successful, False otherwise
+        """
+        try:
+            collection = self.db[BEHAVIORAL_ASSESSMENT_BUCKETS]
+            for index_spec in BEHAVIORAL_ASSESSMENT_BUCKET_INDEXES:
+                collection.create_index(**index_spec)
+            logger.info("Behavioral assessment bucket indexes created")
+            return True
+
+        except Exception as e:
+            logger.error("Error setting up behavioral assessment buckets: %s", str(e))
+            return False
+
+    def migrate_existing_users(self, batch_size: int = 100) -> bool:
+        """Move embedded assessment histories of all unmigrated users into buckets.
+
+        Args:
+            batch_size (int): Users fetched per cursor batch
+
+        Returns:
+            bool: True if migration was successful, False otherwise
+        """
+        try:
+            logger.info("Migrating embedded behavioral assessment history to buckets")
+
+            users_collection = self.db["users"]
+            cursor = users_collection.find(
+                {
+                    "lucien_interaction_context": {"$exists": True},
+                    MIGRATED_FLAG: {"$ne": True}
+                },
+                {"user_id": 1, "lucien_interaction_context.behavioral_assessment_history": 1}
+            ).batch_size(batch_size)
+
+            migrated = 0
+            for user_document in cursor:
+                history = user_document["lucien_interaction_context"].get("behavioral_assessment_history") or []
+                self._migrate_user(user_document["user_id"], history)
+                migrated += 1
+
+            logger.info("Migrated behavioral assessment history of %d users", migrated)
+            return True
+
+        except Exception as e:
+            logger.error("Error migrating behavioral assessment history: %s", str(e))
+            return False
+
+    def _migrate_user(self, user_id: str, history: List[Dict[str, Any]]) -> None:
+        """Copy one user's embedded history into buckets and trim the embedded window."""
+        buckets = self.db[BEHAVIORAL_ASSESSMENT_BUCKETS]
+
+        # Assessments recorded after the application was upgraded are already bucketed
+        existing_ids = set(buckets.distinct("assessments.assessment_id", {"user_id": user_id}))
+        pending = [
+            {**assessment, "timestamp": self._parse_timestamp(assessment.get("timestamp"))}
+            for assessment in history
+            if assessment.get("assessment_id") not in existing_ids
+        ]
+        pending.sort(key=lambda assessment: assessment["timestamp"])
+
+        documents = []
+        for bucket_start, day in groupby(pending, key=lambda a: bucket_start_for(a["timestamp"])):
+            day = list(day)
+            for offset in range(0, len(day), BUCKET_MAX_ASSESSMENTS):
+                chunk = day[offset:offset + BUCKET_MAX_ASSESSMENTS]
+                documents.append({
+                    "user_id": user_id,
+                    "bucket_start": bucket_start,
+                    "assessments": chunk,
+                    # Historical buckets are closed so new assessments open fresh ones
+                    "count": BUCKET_MAX_ASSESSMENTS,
+                    "first_timestamp": chunk[0]["timestamp"],
+                    "last_timestamp": chunk[-1]["timestamp"]
+                })
+        if documents:
+            buckets.insert_many(documents, ordered=True)
+
+        totals = list(buckets.aggregate([
+            {"$match": {"user_id": user_id}},
+            {"$group": {"_id": None, "total": {"$sum": {"$size": "$assessments"}}}}
+        ]))
+        total = totals[0]["total"] if totals else 0
+        self.db["users"].update_one(
+            {"user_id": user_id},
+            {
+                "$push": {
+                    "lucien_interaction_context.behavioral_assessment_history": {
+                        "$each": [],
+                        "$slice": -RECENT_ASSESSMENT_WINDOW
+                    }
+                },
+                "$set": {
+                    "lucien_interaction_context.behavioral_assessment_count": total,
+                    MIGRATED_FLAG: True
+                }
+            }
+        )
+
+    @staticmethod
+    def _parse_timestamp(value: Any) -> datetime:
+        """Normalize an embedded timestamp to a datetime."""
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return datetime.utcnow()
+
+
+# Convenience function for easy migration
+def migrate_behavioral_assessment_history(db: Database) -> bool:
+    """Convenience function to set up the bucket collection and migrate existing users.
+
+    Args:
+        db (Database): MongoDB database instance
+
+    Returns:
+        bool: True if migration was successful, False otherwise
+    """
+    migration_handler = BehavioralAssessmentMigration(db)
+    return migration_handler.setup_collection() and migration_handler.migrate_existing_users()
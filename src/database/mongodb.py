@@ -7,6 +7,7 @@ This module provides access methods for MongoDB collections as required by the f
 from typing import Any, Dict, Optional
 from pymongo.database import Database
 from pymongo.collection import Collection
+from src.database.indexes import ensure_indexes
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,11 +20,24 @@ class MongoDBHandler:
         """Initialize the MongoDB handler.
         
         Args:
-            database (Database): MongoDB database instance
+            database (Database): MongoDB database instance, either a pymongo Database
+                or an AsyncMongoDatabase for handlers used from coroutines
         """
         self._db = database
         logger.info("MongoDBHandler initialized")
     
+    def get_collection(self, name: str) -> Collection:
+        """Get a collection by name.
+        
+        Args:
+            name (str): Collection name
+            
+        Returns:
+            Collection: MongoDB collection
+        """
+        logger.debug("Accessing %s collection", name)
+        return self._db[name]
+    
     def get_users_collection(self) -> Collection:
         """Get the Users collection for user dynamic state management.
         
@@ -141,10 +155,20 @@ class MongoDBHandler:
         logger.debug("Accessing NarrativeTemplates collection")
         return self._db["narrative_templates"]
     
+    def get_audit_logs_collection(self) -> Collection:
+        """Get the AuditLogs collection.
+        
+        Returns:
+            Collection: MongoDB collection for audit logs
+        """
+        logger.debug("Accessing AuditLogs collection")
+        return self._db["audit_logs"]
+    
     async def initialize_collections(self) -> bool:
         """Initialize and verify MongoDB collections.
 
-        Creates indexes and validates schema compatibility for all required collections.
+        Creates the indexes of the index catalogue and applies schema validation
+        rules to the collections that define them.
 
         Returns:
             bool: True if all collections were initialized successfully, False otherwise
@@ -152,22 +176,13 @@ class MongoDBHandler:
         try:
             logger.info("Initializing MongoDB collections")
 
-            # Initialize Users collection
-            users_collection = self.get_users_collection()
-            await self._initialize_users_collection(users_collection)
-
-            # Initialize NarrativeFragments collection
-            narrative_collection = self.get_narrative_fragments_collection()
-            await self._initialize_narrative_fragments_collection(narrative_collection)
+            # Create missing catalogue indexes
+            ensure_indexes(self._db)
 
-            # Initialize Items collection
-            items_collection = self.get_items_collection()
-            await self._initialize_items_collection(items_collection)
-
-            # Initialize gamification collections
+            # Apply gamification validation rules
             await self._initialize_gamification_collections()
 
-            # Initialize narrative collections
+            # Apply narrative validation rules
             await self._initialize_narrative_collections()
 
             logger.info("All MongoDB collections initialized successfully")
@@ -176,58 +191,9 @@ class MongoDBHandler:
         except Exception as e:
             logger.error("Error initializing MongoDB collections: %s", str(e))
             return False
-    
-    async def _initialize_users_collection(self, collection: Collection) -> None:
-        """Initialize the Users collection with required indexes.
-        
-        Args:
-            collection (Collection): Users collection
-        """
-        logger.debug("Initializing Users collection indexes")
-        
-        # Create indexes for common query patterns
-        collection.create_index("user_id", unique=True)
-        collection.create_index("current_state.narrative_progress.current_fragment")
-        collection.create_index("preferences.language")
-        collection.create_index("created_at")
-        collection.create_index("updated_at")
-        
-        logger.debug("Users collection indexes created")
-    
-    async def _initialize_narrative_fragments_collection(self, collection: Collection) -> None:
-        """Initialize the NarrativeFragments collection with required indexes.
-        
-        Args:
-            collection (Collection): NarrativeFragments collection
-        """
-        logger.debug("Initializing NarrativeFragments collection indexes")
-        
-        # Create indexes for common query patterns
-        collection.create_index("fragment_id", unique=True)
-        collection.create_index("metadata.tags")
-        collection.create_index("metadata.vip_required")
-        collection.create_index("created_at")
-        
-        logger.debug("NarrativeFragments collection indexes created")
-    
-    async def _initialize_items_collection(self, collection: Collection) -> None:
-        """Initialize the Items collection with required indexes.
-        
-        Args:
-            collection (Collection): Items collection
-        """
-        logger.debug("Initializing Items collection indexes")
-        
-        # Create indexes for common query patterns
-        collection.create_index("item_id", unique=True)
-        collection.create_index("type")
-        collection.create_index("metadata.value")
-        collection.create_index("created_at")
-        
-        logger.debug("Items collection indexes created")
 
     async def _initialize_gamification_collections(self) -> None:
-        """Initialize all gamification collections with indexes and validation rules."""
+        """Apply validation rules to all gamification collections."""
         logger.info("Initializing gamification collections")
 
         # Import schema definitions
@@ -240,17 +206,6 @@ class MongoDBHandler:
         for collection_name, schema_config in schemas.items():
             logger.debug("Initializing %s collection", collection_name)
 
-            # Get collection reference
-            collection = self._db[collection_name]
-
-            # Create indexes
-            for index_spec in schema_config["indexes"]:
-                try:
-                    collection.create_index(**index_spec)
-                except Exception as e:
-                    logger.warning("Failed to create index %s on %s: %s",
-                                 index_spec, collection_name, str(e))
-
             # Apply validation rules (MongoDB 3.6+)
             try:
                 self._db.command("collMod", collection_name, **schema_config["validator"])
@@ -262,27 +217,11 @@ class MongoDBHandler:
         logger.info("All gamification collections initialized successfully")
 
     async def _initialize_narrative_collections(self) -> None:
-        """Initialize narrative collections with indexes and validation rules."""
+        """Apply validation rules to narrative collections."""
         logger.info("Initializing narrative collections")
 
         # Import schema definitions
-        from src.database.schemas.narrative import NARRATIVE_INDEXES, NARRATIVE_COLLECTION_SCHEMAS
-
-        # Initialize Lucien messages collection
-        lucien_collection = self.get_lucien_messages_collection()
-        for index_spec in NARRATIVE_INDEXES.get("lucien_messages", []):
-            try:
-                lucien_collection.create_index([(key, value) for key, value in index_spec.items()])
-            except Exception as e:
-                logger.warning("Failed to create index %s on lucien_messages: %s", index_spec, str(e))
-
-        # Initialize narrative templates collection
-        templates_collection = self.get_narrative_templates_collection()
-        for index_spec in NARRATIVE_INDEXES.get("narrative_templates", []):
-            try:
-                templates_collection.create_index([(key, value) for key, value in index_spec.items()])
-            except Exception as e:
-                logger.warning("Failed to create index %s on narrative_templates: %s", index_spec, str(e))
+        from src.database.schemas.narrative import NARRATIVE_COLLECTION_SCHEMAS
 
         # Apply validation schemas if available
         for collection_name, schema in NARRATIVE_COLLECTION_SCHEMAS.items():
@@ -292,4 +231,4 @@ class MongoDBHandler:
                 except Exception as e:
                     logger.warning("Failed to apply validation to %s: %s", collection_name, str(e))
 
-        logger.info("Narrative collections initialized successfully")
\ No newline at end of file
+        logger.info("Narrative collections initialized successfully")
@@ -0,0 +1,353 @@
+"""
+Database command profiler for the YABOT system.
+
+A pymongo ``CommandListener`` and a wrapper around the async SQLite handle
+report every database command to a DatabaseProfiler. The profiler keeps a
+latency histogram per backend and command, logs commands slower than a
+threshold and attributes each command to the profile scopes active in the
+current context. Every Telegram update runs in a scope, and so can any operation
+worth watching (see ``profiled``). A scope that issues more commands than the
+command budget is logged as a likely N+1 pattern together with its most
+frequent commands.
+
+Async MongoDB calls run on worker threads inside a copy of the calling
+context, so their commands are attributed to the scope of the coroutine that
+issued them.
+"""
+
+import functools
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_SLOW_COMMAND_MS = 100.0
+DEFAULT_COMMAND_BUDGET = 25
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_SQL_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE)\s+[\"`\[]?(\w+)", re.IGNORECASE)
+
+
+class LatencyHistogram:
+    """Cumulative latency distribution of one kind of command."""
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms: float) -> None:
+        """Add one command duration.
+
+        Args:
+            duration_ms (float): Command duration in milliseconds
+        """
+        index = 0
+        while index < len(LATENCY_BUCKETS_MS) and duration_ms > LATENCY_BUCKETS_MS[index]:
+            index += 1
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the histogram as a plain dictionary.
+
+        Returns:
+            Dict[str, Any]: Count, total, mean and maximum in ms, and counts per bucket
+        """
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.bucket_counts))
+        }
+
+
+class ProfileScope:
+    """Database commands issued while an update or operation was running."""
+
+    def __init__(self, name: str, parent: Optional["ProfileScope"] = None):
+        """Initialize a scope.
+
+        Args:
+            name (str): Update or operation name
+            parent (Optional[ProfileScope]): Enclosing scope, which also counts these commands
+        """
+        self.name = name
+        self.parent = parent
+        self.command_count = 0
+        self.duration_ms = 0.0
+        self.commands: Counter = Counter()
+
+    def top_commands(self, limit: int = 3) -> List[Tuple[str, int]]:
+        """Return the most frequent commands of the scope.
+
+        Args:
+            limit (int): Number of commands
+
+        Returns:
+            List[Tuple[str, int]]: Command labels and their counts
+        """
+        return self.commands.most_common(limit)
+
+
+_current_scope: ContextVar[Optional[ProfileScope]] = ContextVar("database_profile_scope", default=None)
+
+
+def current_profile_scope() -> Optional[ProfileScope]:
+    """Return the innermost profile scope of the current context, if any."""
+    return _current_scope.get()
+
+
+class DatabaseProfiler:
+    """Collects database command latencies and per-scope command counts."""
+
+    def __init__(
+        self,
+        slow_command_ms: float = DEFAULT_SLOW_COMMAND_MS,
+        command_budget: int = DEFAULT_COMMAND_BUDGET
+    ):
+        """Initialize the profiler.
+
+        Args:
+            slow_command_ms (float): Commands slower than this are logged
+            command_budget (int): Commands a scope may issue before it is flagged
+        """
+        self.slow_command_ms = slow_command_ms
+        self.command_budget = command_budget
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.budget_violations: Counter = Counter()
+        # Commands are reported from the event loop and from MongoDB worker threads
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        backend: str,
+        command: str,
+        target: Optional[str],
+        duration_ms: float,
+        failed: bool = False
+    ) -> None:
+        """Record one database command.
+
+        Args:
+            backend (str): "mongo" or "sqlite"
+            command (str): Command name, e.g. "find" or "SELECT"
+            target (Optional[str]): Collection or table name
+            duration_ms (float): Command duration in milliseconds
+            failed (bool): Whether the command failed
+        """
+        label = f"{backend}.{command} {target}" if target else f"{backend}.{command}"
+        scope = _current_scope.get()
+        with self._lock:
+            self.histograms.setdefault(f"{backend}.{command}", LatencyHistogram()).observe(duration_ms)
+            while scope is not None:
+                scope.command_count += 1
+                scope.duration_ms += duration_ms
+                scope.commands[label] += 1
+                scope = scope.parent
+
+        if duration_ms >= self.slow_command_ms:
+            current = _current_scope.get()
+            logger.warning(
+                "Slow database command %s took %.1f ms%s in %s",
+                label, duration_ms, " and failed" if failed else "",
+                current.name if current else "no scope"
+            )
+
+    @asynccontextmanager
+    async def scope(self, name: str) -> AsyncIterator[ProfileScope]:
+        """Attribute the database commands issued inside the block to ``name``.
+
+        Scopes nest: commands also count towards every enclosing scope. When the
+        block ends with more commands than the budget, the scope is logged.
+
+        Args:
+            name (str): Update or operation name
+
+        Yields:
+            ProfileScope: The scope collecting the commands
+        """
+        profile_scope = ProfileScope(name, _current_scope.get())
+        token = _current_scope.set(profile_scope)
+        try:
+            yield profile_scope
+        finally:
+            _current_scope.reset(token)
+            if profile_scope.command_count > self.command_budget:
+                with self._lock:
+                    self.budget_violations[name] += 1
+                logger.warning(
+                    "Possible N+1 pattern: %s issued %d database commands (budget %d, %.1f ms); top commands: %s",
+                    name, profile_scope.command_count, self.command_budget,
+                    profile_scope.duration_ms, profile_scope.top_commands()
+                )
+
+    def profiled(self, name: Optional[str] = None) -> Callable:
+        """Decorate a coroutine function so each call runs in its own scope.
+
+        Args:
+            name (Optional[str]): Scope name, defaults to the function's qualified name
+
+        Returns:
+            Callable: Decorator
+        """
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            scope_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                async with self.scope(scope_name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return latency histograms and budget violations collected so far.
+
+        Returns:
+            Dict[str, Any]: Histograms per command and violation counts per scope name
+        """
+        with self._lock:
+            return {
+                "histograms": {key: histogram.to_dict() for key, histogram in self.histograms.items()},
+                "budget_violations": dict(self.budget_violations),
+                "slow_command_ms": self.slow_command_ms,
+                "command_budget": self.command_budget
+            }
+
+    def reset(self) -> None:
+        """Drop all collected histograms and violation counts."""
+        with self._lock:
+            self.histograms.clear()
+            self.budget_violations.clear()
+
+    def mongo_listener(self) -> "MongoCommandProfiler":
+        """Create a pymongo command listener reporting to this profiler."""
+        return MongoCommandProfiler(self)
+
+    def wrap_sqlite(self, async_sqlite: Any) -> "ProfiledAsyncSQLite":
+        """Wrap an async SQLite handle so its statements report to this profiler."""
+        return ProfiledAsyncSQLite(async_sqlite, self)
+
+
+class MongoCommandProfiler(monitoring.CommandListener):
+    """pymongo command listener reporting command latencies to a DatabaseProfiler."""
+
+    def __init__(self, profiler: DatabaseProfiler):
+        """Initialize the listener.
+
+        Args:
+            profiler (DatabaseProfiler): Profiler receiving the commands
+        """
+        self.profiler = profiler
+        # Targets of in-flight commands, keyed by connection and request
+        self._targets: Dict[Tuple[Any, int], Optional[str]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        """Remember the collection a command targets."""
+        target = event.command.get(event.command_name)
+        self._targets[(event.connection_id, event.request_id)] = target if isinstance(target, str) else None
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        """Record a completed command."""
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        """Record a failed command."""
+        self._finish(event, failed=True)
+
+    def _finish(self, event: Any, failed: bool) -> None:
+        target = self._targets.pop((event.connection_id, event.request_id), None)
+        self.profiler.record("mongo", event.command_name, target, event.duration_micros / 1000, failed)
+
+
+class ProfiledAsyncSQLite:
+    """Async SQLite handle wrapper reporting statement latencies to a DatabaseProfiler.
+
+    Latencies are measured around the awaited call, so writes include the time
+    spent waiting for their group commit.
+    """
+
+    def __init__(self, async_sqlite: Any, profiler: DatabaseProfiler):
+        """Initialize the wrapper.
+
+        Args:
+            async_sqlite: Wrapped AsyncSQLite handle
+            profiler (DatabaseProfiler): Profiler receiving the statements
+        """
+        self.delegate = async_sqlite
+        self.profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.delegate, name)
+
+    async def _timed(self, command: str, target: Optional[str], call: Awaitable[Any]) -> Any:
+        """Await a call and record its duration."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await call
+            failed = False
+            return result
+        finally:
+            self.profiler.record("sqlite", command, target, (time.perf_counter() - start) * 1000, failed)
+
+    @staticmethod
+    def _describe(sql: str) -> Tuple[str, Optional[str]]:
+        """Return the statement keyword and the table it targets."""
+        words = sql.split(None, 1)
+        table = _SQL_TABLE.search(sql)
+        return (words[0].upper() if words else "UNKNOWN"), (table.group(1) if table else None)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        """Profiled AsyncSQLite.fetchone."""
+        return await self._timed(*self._describe(sql), self.delegate.fetchone(sql, params))
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        """Profiled AsyncSQLite.fetchall."""
+        return await self._timed(*self._describe(sql), self.delegate.fetchall(sql, params))
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        """Profiled AsyncSQLite.execute."""
+        return await self._timed(*self._describe(sql), self.delegate.execute(sql, params))
+
+    async def transaction(self, statements: Sequence[Tuple[str, Sequence[Any]]]) -> Any:
+        """Profiled AsyncSQLite.transaction, recorded as one command."""
+        return await self._timed("TRANSACTION", None, self.delegate.transaction(statements))
+
+
+# Process-wide profiler used by the DatabaseManager and the update middleware
+database_profiler = DatabaseProfiler()
+
+
+def profiled(name: Optional[str] = None) -> Callable:
+    """Decorate a coroutine function to run in its own scope of ``database_profiler``."""
+    return database_profiler.profiled(name)
+
+
+async def database_profile_middleware(
+    handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+    event: Any,
+    data: Dict[str, Any]
+) -> Any:
+    """Aiogram outer middleware attributing the commands of each update to its own scope."""
+    async with database_profiler.scope(f"update.{getattr(event, 'event_type', 'unknown')}"):
+        return await handler(event, data)
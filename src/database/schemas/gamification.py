@@ -273,10 +273,12 @@ class GamificationCollections:
 
     @staticmethod
     def get_collection_schemas() -> Dict[str, Dict[str, Any]]:
-        """Get collection schemas with validation rules and indexes.
+        """Get collection schemas with validation rules.
+
+        Indexes are declared in the index catalogue (src.database.indexes).
 
         Returns:
-            Dict containing collection schemas with validation and indexing rules.
+            Dict containing collection schemas with validation rules.
         """
         return {
             "besitos_transactions": {
@@ -296,16 +298,7 @@ class GamificationCollections:
                             "source": {"bsonType": "string"}
                         }
                     }
-                },
-                "indexes": [
-                    {"key": {"transaction_id": 1}, "unique": True},
-                    {"key": {"user_id": 1, "created_at": -1}},  # Compound index for user queries
-                    {"key": {"user_id": 1, "status": 1}},
-                    {"key": {"user_id": 1, "type": 1, "created_at": -1}},
-                    {"key": {"status": 1}},
-                    {"key": {"created_at": -1}},
-                    {"key": {"reference_id": 1}}
-                ]
+                }
             },
 
             "missions": {
@@ -321,16 +314,7 @@ class GamificationCollections:
                             "status": {"enum": ["available", "in_progress", "completed", "expired", "locked"]}
                         }
                     }
-                },
-                "indexes": [
-                    {"key": {"mission_id": 1}, "unique": True},
-                    {"key": {"user_id": 1, "status": 1}},
-                    {"key": {"user_id": 1, "type": 1}},
-                    {"key": {"user_id": 1, "created_at": -1}},
-                    {"key": {"type": 1, "status": 1}},
-                    {"key": {"expires_at": 1}},
-                    {"key": {"status": 1, "created_at": -1}}
-                ]
+                }
             },
 
             "user_items": {
@@ -348,16 +332,7 @@ class GamificationCollections:
                             "quantity": {"bsonType": "int", "minimum": 0}
                         }
                     }
-                },
-                "indexes": [
-                    {"key": {"user_item_id": 1}, "unique": True},
-                    {"key": {"user_id": 1, "category": 1}},
-                    {"key": {"user_id": 1, "item_id": 1}},
-                    {"key": {"user_id": 1, "equipped": 1}},
-                    {"key": {"user_id": 1, "acquired_at": -1}},
-                    {"key": {"item_id": 1}},
-                    {"key": {"rarity": 1, "category": 1}}
-                ]
+                }
             },
 
             "auctions": {
@@ -374,16 +349,7 @@ class GamificationCollections:
                             "status": {"enum": ["active", "completed", "cancelled", "expired"]}
                         }
                     }
-                },
-                "indexes": [
-                    {"key": {"auction_id": 1}, "unique": True},
-                    {"key": {"status": 1, "end_time": 1}},
-                    {"key": {"seller_id": 1, "status": 1}},
-                    {"key": {"item_id": 1, "status": 1}},
-                    {"key": {"status": 1, "current_price": 1}},
-                    {"key": {"end_time": 1}},
-                    {"key": {"created_at": -1}}
-                ]
+                }
             },
 
             "trivias": {
@@ -398,14 +364,7 @@ class GamificationCollections:
                             "questions": {"bsonType": "array", "minItems": 1}
                         }
                     }
-                },
-                "indexes": [
-                    {"key": {"trivia_id": 1}, "unique": True},
-                    {"key": {"status": 1, "start_time": -1}},
-                    {"key": {"status": 1, "end_time": 1}},
-                    {"key": {"participants.user_id": 1}},
-                    {"key": {"created_at": -1}}
-                ]
+                }
             },
 
             "user_achievements": {
@@ -423,16 +382,7 @@ class GamificationCollections:
                             "completed": {"bsonType": "bool"}
                         }
                     }
-                },
-                "indexes": [
-                    {"key": {"user_achievement_id": 1}, "unique": True},
-                    {"key": {"user_id": 1, "completed": 1}},
-                    {"key": {"user_id": 1, "type": 1}},
-                    {"key": {"user_id": 1, "tier": 1}},
-                    {"key": {"achievement_id": 1}},
-                    {"key": {"completed": 1, "completed_at": -1}},
-                    {"key": {"user_id": 1, "created_at": -1}}
-                ]
+                }
             }
         }
 
@@ -135,51 +135,6 @@ class NarrativeTemplate(CoreBaseModel):
     version: str = Field("1.0", description="Template version")
 
 
-# Collection indexes for optimal performance
-NARRATIVE_INDEXES = {
-    "narrative_fragments": [
-        {"fragment_id": 1},  # Primary key index
-        {"vip_required": 1, "published": 1},  # VIP and published content queries
-        {"metadata.tags": 1},  # Tag-based searches
-        {"created_at": -1},  # Recent content queries
-        {"published_at": -1, "published": 1},  # Published content by date
-        {"metadata.difficulty": 1, "vip_required": 1}  # Difficulty and VIP filtering
-    ],
-    "narrative_hints": [
-        {"hint_id": 1},  # Primary key index
-        {"fragment_id": 1},  # Hints for specific fragments
-        {"vip_required": 1, "active": 1},  # VIP and active hints
-        {"created_at": -1}  # Recent hints
-    ],
-    "narrative_progress": [
-        {"user_id": 1},  # Primary key index
-        {"user_id": 1, "active": 1},  # Active user progress
-        {"current_fragment": 1},  # Users on specific fragments
-        {"completion_percentage": -1},  # Progress leaderboard
-        {"last_updated": -1}  # Recent activity
-    ],
-    "user_choice_logs": [
-        {"user_id": 1, "timestamp": -1},  # User choice history
-        {"fragment_id": 1, "timestamp": -1},  # Fragment choice analytics
-        {"choice_id": 1},  # Choice popularity analytics
-        {"session_id": 1},  # Session-based analysis
-        {"timestamp": -1}  # Chronological analysis
-    ],
-    "lucien_messages": [
-        {"user_id": 1, "status": 1},  # User messages by status
-        {"scheduled_time": 1, "status": 1},  # Scheduled messages
-        {"trigger_event": 1, "created_at": -1},  # Messages by trigger
-        {"status": 1, "created_at": -1},  # Message queue processing
-        {"message_id": 1}  # Primary key index
-    ],
-    "narrative_templates": [
-        {"template_id": 1},  # Primary key index
-        {"category": 1, "active": 1},  # Templates by category
-        {"name": 1},  # Template name searches
-        {"created_at": -1}  # Recent templates
-    ]
-}
-
 # Collection validation schemas for MongoDB
 NARRATIVE_COLLECTION_SCHEMAS = {
     "narrative_fragments": {
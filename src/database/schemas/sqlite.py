@@ -86,7 +86,8 @@ class SQLiteSchemas:
             "CREATE INDEX IF NOT EXISTS idx_subscriptions_user_id ON subscriptions(user_id)",
             "CREATE INDEX IF NOT EXISTS idx_subscriptions_plan_type ON subscriptions(plan_type)",
             "CREATE INDEX IF NOT EXISTS idx_subscriptions_status ON subscriptions(status)",
-            "CREATE INDEX IF NOT EXISTS idx_subscriptions_dates ON subscriptions(start_date, end_date)"
+            "CREATE INDEX IF NOT EXISTS idx_subscriptions_dates ON subscriptions(start_date, end_date)",
+            "CREATE INDEX IF NOT EXISTS idx_subscriptions_status_end_date ON subscriptions(status, end_date)"
         ]
     
     @classmethod
@@ -123,6 +123,7 @@ class SQLiteHandler:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_plan_type ON subscriptions(plan_type)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_status ON subscriptions(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_dates ON subscriptions(start_date, end_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_subscriptions_status_end_date ON subscriptions(status, end_date)")
         
         self._conn.commit()
         logger.debug("Subscriptions table initialized")
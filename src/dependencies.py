@@ -1,13 +1,18 @@
 # src/dependencies.py
 
 from functools import lru_cache
+from typing import Optional
+
 from aiogram import Bot
+from fastapi import Depends
 import redis.asyncio as redis
 from pymongo import MongoClient
 
 from src.config.manager import ConfigManager
+from src.database.async_mongo import AsyncMongoClient, DEFAULT_OPERATION_TIMEOUT, create_mongo_executor
 from src.database.mongodb import MongoDBHandler
 from src.events.bus import EventBus
+from src.events.outbox import EventOutbox
 from src.modules.narrative.fragment_manager import NarrativeFragmentManager
 from src.modules.gamification.mission_manager import MissionManager
 from src.modules.admin.access_control import AccessControl
@@ -27,9 +32,11 @@ def get_config_manager() -> ConfigManager:
 @lru_cache()
 def get_mongodb_handler() -> MongoDBHandler:
     config = get_config_manager().get_database_config()
-    client = MongoClient(config.mongodb_uri)
-    db = client[config.mongodb_database]
-    return MongoDBHandler(db)
+    max_pool_size = 32
+    client = MongoClient(config.mongodb_uri, maxPoolSize=max_pool_size)
+    # Modules await their collection calls, so hand them the async wrapper
+    async_client = AsyncMongoClient(client, create_mongo_executor(max_pool_size), DEFAULT_OPERATION_TIMEOUT)
+    return MongoDBHandler(async_client[config.mongodb_database])
 
 @lru_cache()
 def get_event_bus() -> EventBus:
@@ -54,10 +61,14 @@ def get_access_control() -> AccessControl:
     subscription_manager = SubscriptionManager(get_mongodb_handler()._db, get_event_bus())
     return AccessControl(bot, subscription_manager)
 
-def get_besitos_wallet() -> BesitosWallet:
+def get_event_outbox() -> Optional[EventOutbox]:
+    # BotApplication overrides this with its own outbox when it registers the API endpoints
+    return None
+
+def get_besitos_wallet(outbox: Optional[EventOutbox] = Depends(get_event_outbox)) -> BesitosWallet:
     mongodb_handler = get_mongodb_handler()
     event_bus = get_event_bus()
-    return BesitosWallet(mongodb_handler, event_bus)
+    return BesitosWallet(mongodb_handler, event_bus, outbox)
 
 async def get_emotional_intelligence_service():
     """Get emotional intelligence service instance."""
@@ -43,7 +43,17 @@ EVENT_BUS_CONFIG = {
     "retry_delay": 1.0,  # seconds
     "queue_max_size": 1000,
     "batch_size": 10,
-    "flush_interval": 5.0  # seconds
+    "flush_interval": 5.0,  # seconds
+    "publish_batch_window": 0.0,  # seconds, > 0 enables pipelined micro-batch publishing
+    "persistence_dir": "event_log/local_queue",  # segment log for events queued while Redis is down
+    "retry_persistence_dir": "event_log/retry_queue",  # segment log for the retry queue
+    "idempotency_backend": "memory",  # "redis" shares processed event IDs between workers
+    "idempotency_ttl": 3600,  # seconds a processed event ID is remembered
+    "processor_shards": 8,  # event processor workers, events are routed by user ID
+    "processor_shard_queue_size": 1000,  # per-worker queue bound before producers wait
+    "dead_letter_path": "event_log/dead_letter.db",  # SQLite file of the event processor DLQ
+    "dead_letter_max_size": 100000,  # oldest failed events are dropped beyond this
+    "dead_letter_page_size": 100  # entries loaded per page when retrying the DLQ
 }
 
 
@@ -0,0 +1,152 @@
+"""
+Micro-batch publisher for the YABOT event bus.
+
+This module coalesces events published within a short window into a single Redis
+pipeline, so a burst of publishes costs one network round trip instead of one per
+event. Each caller still gets its own result once the batch is acknowledged.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Set, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BatchConfig:
+    """Configuration for micro-batch publishing."""
+    max_batch_size: int = 50
+    max_delay: float = 0.002  # seconds to wait for more events before flushing
+
+
+PendingPublish = Tuple[str, str, asyncio.Future]
+
+
+class BatchPublisher:
+    """Collects published events and sends them to Redis in pipelined batches."""
+
+    def __init__(
+        self,
+        config: BatchConfig,
+        pipeline_factory: Callable[[], Any],
+        stage_command: Callable[[Any, str, str], None]
+    ):
+        """Initialize the batch publisher.
+
+        Args:
+            config (BatchConfig): Batching configuration
+            pipeline_factory (Callable): Returns a new non-transactional Redis pipeline
+            stage_command (Callable): Adds the publish command of one event to a pipeline
+        """
+        self.config = config
+        self._pipeline_factory = pipeline_factory
+        self._stage_command = stage_command
+        self._pending: List[PendingPublish] = []
+        self._timer_task: Optional[asyncio.Task] = None
+        # Full batches sent in their own tasks, so cancelling a publisher cannot stop a send
+        self._send_tasks: Set[asyncio.Task] = set()
+        self._metrics = {
+            "events_submitted": 0,
+            "batches_sent": 0,
+            "batch_failures": 0,
+            "largest_batch": 0
+        }
+
+    async def submit(self, event_name: str, serialized_payload: str) -> bool:
+        """Queue an event for the next batch and wait for its acknowledgement.
+
+        Args:
+            event_name (str): Name of the event
+            serialized_payload (str): JSON serialized event payload
+
+        Returns:
+            bool: True if Redis accepted the event, False otherwise
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((event_name, serialized_payload, future))
+        self._metrics["events_submitted"] += 1
+
+        if len(self._pending) >= self.config.max_batch_size:
+            # Batch is full, send it right away
+            self._cancel_timer()
+            send_task = asyncio.create_task(self._send(self._take_pending()))
+            self._send_tasks.add(send_task)
+            send_task.add_done_callback(self._send_tasks.discard)
+        elif self._timer_task is None:
+            self._timer_task = asyncio.create_task(self._flush_after_delay())
+
+        return await future
+
+    async def flush(self) -> None:
+        """Send every pending event immediately and wait for the batches in flight."""
+        self._cancel_timer()
+        if self._pending:
+            await self._send(self._take_pending())
+        if self._send_tasks:
+            await asyncio.gather(*self._send_tasks, return_exceptions=True)
+
+    async def _flush_after_delay(self) -> None:
+        """Send the pending batch once the coalescing window elapsed."""
+        try:
+            await asyncio.sleep(self.config.max_delay)
+        except asyncio.CancelledError:
+            return
+        self._timer_task = None
+        if self._pending:
+            await self._send(self._take_pending())
+
+    def _cancel_timer(self) -> None:
+        """Cancel the pending window timer, if any."""
+        if self._timer_task is not None:
+            self._timer_task.cancel()
+            self._timer_task = None
+
+    def _take_pending(self) -> List[PendingPublish]:
+        """Detach the current batch from the pending list."""
+        batch, self._pending = self._pending, []
+        return batch
+
+    async def _send(self, batch: List[PendingPublish]) -> None:
+        """Send a batch in one pipeline and resolve the callers' futures.
+
+        Args:
+            batch (List[PendingPublish]): Events to send with their futures
+        """
+        try:
+            try:
+                pipeline = self._pipeline_factory()
+                for event_name, serialized_payload, _ in batch:
+                    self._stage_command(pipeline, event_name, serialized_payload)
+                results = await pipeline.execute(raise_on_error=False)
+            except Exception as e:
+                logger.warning("Batch publish of %d events failed: %s", len(batch), str(e))
+                self._metrics["batch_failures"] += 1
+                results = [e] * len(batch)
+
+            self._metrics["batches_sent"] += 1
+            self._metrics["largest_batch"] = max(self._metrics["largest_batch"], len(batch))
+
+            for (event_name, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    logger.warning("Redis rejected batched event %s: %s", event_name, str(result))
+                    future.set_result(False)
+                else:
+                    future.set_result(True)
+        finally:
+            # A cancelled send must not leave the publishers of its batch waiting forever
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(False)
+
+    def get_stats(self) -> dict:
+        """Get batching statistics.
+
+        Returns:
+            dict: Batch counters and the number of events waiting to be sent
+        """
+        return {**self._metrics, "pending": len(self._pending)}
@@ -2,20 +2,27 @@
 Event bus implementation for the YABOT system.
 
 This module provides the event bus functionality with Redis Pub/Sub and local fallback queue
-as required by the fase1 specification.
+as required by the fase1 specification. An optional Redis Streams transport lets several
+worker processes share the handlers of a consumer group.
 """
 
 import asyncio
+import heapq
 import json
 import logging
+import os
 import pickle
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Callable, Awaitable
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Callable, Awaitable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from redis import asyncio as aioredis
+from src.events.batching import BatchConfig, BatchPublisher
 from src.events.models import BaseEvent
+from src.events.segment_log import SegmentLog
+from src.events.streams import RedisStreamTransport, StreamConfig
 from src.utils.logger import get_logger
 from src.config.manager import ConfigManager
 
@@ -44,6 +51,34 @@ class EventRetryInfo:
     next_retry_time: Optional[datetime] = None
     error_messages: List[str] = field(default_factory=list)
 
+    def to_record(self) -> Dict[str, Any]:
+        """Convert the retry information to a JSON serializable record."""
+        return {
+            "event_id": self.event_id,
+            "event_name": self.event_name,
+            "payload": self.payload,
+            "attempt_count": self.attempt_count,
+            "first_attempt_time": self.first_attempt_time.isoformat(),
+            "last_attempt_time": self.last_attempt_time.isoformat(),
+            "next_retry_time": self.next_retry_time.isoformat() if self.next_retry_time else None,
+            "error_messages": self.error_messages
+        }
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> 'EventRetryInfo':
+        """Rebuild retry information from a persisted record."""
+        next_retry_time = record.get("next_retry_time")
+        return cls(
+            event_id=record["event_id"],
+            event_name=record["event_name"],
+            payload=record["payload"],
+            attempt_count=record.get("attempt_count", 0),
+            first_attempt_time=datetime.fromisoformat(record["first_attempt_time"]),
+            last_attempt_time=datetime.fromisoformat(record["last_attempt_time"]),
+            next_retry_time=datetime.fromisoformat(next_retry_time) if next_retry_time else None,
+            error_messages=record.get("error_messages", [])
+        )
+
 
 class EventBusError(Exception):
     """Base exception for event bus operations."""
@@ -268,23 +303,50 @@ class EventSubscriptionManagerError(EventBusError):
 class EventBus:
     """Event bus implementation with Redis Pub/Sub, local fallback queue, and retry mechanism."""
 
-    def __init__(self, config_manager: Optional[ConfigManager] = None, retry_policy: Optional[RetryPolicy] = None):
+    def __init__(
+        self,
+        config_manager: Optional[ConfigManager] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        stream_config: Optional[StreamConfig] = None,
+        batch_config: Optional[BatchConfig] = None
+    ):
         """Initialize the event bus.
 
         Args:
             config_manager (ConfigManager, optional): Configuration manager instance
             retry_policy (RetryPolicy, optional): Retry policy configuration
+            stream_config (StreamConfig, optional): Enables the Redis Streams transport
+            batch_config (BatchConfig, optional): Enables pipelined micro-batch publishing
         """
         self.config_manager = config_manager or ConfigManager()
         self.retry_policy = retry_policy or RetryPolicy()
+        self.stream_config = stream_config
+        self.batch_config = batch_config
         self._redis_client: Optional[aioredis.Redis] = None
+        self._stream_transport: Optional[RedisStreamTransport] = None
+        self._batch_publisher: Optional[BatchPublisher] = None
         self._is_connected = False
-        self._local_queue: List[Dict[str, Any]] = []
+        self._local_queue: Deque[Dict[str, Any]] = deque()
         self._retry_queue: Dict[str, EventRetryInfo] = {}
+        # Min-heap of (next_retry_time, sequence, event_id); entries whose time no
+        # longer matches the retry queue are stale and skipped when popped
+        self._retry_heap: List[Tuple[datetime, int, str]] = []
+        self._retry_heap_seq: int = 0
+        self._retry_batch_limit: int = 500
         self._subscribers: Dict[str, List[Callable[[Dict[str, Any]], Awaitable[None]]]] = {}
         self._max_queue_size: int = 1000
+        # Events dropped from the full local queue; the log cursor is advanced past
+        # the last of them on the next sync so they are not replayed after a restart
+        self._dropped_events: int = 0
+        self._dropped_seq: Optional[int] = None
+        # Legacy pickle files, migrated into the segment logs on first load
         self._persistence_file: str = "event_queue.pkl"
         self._retry_persistence_file: str = "event_retry_queue.pkl"
+        self._persistence_dir: str = os.path.join("event_log", "local_queue")
+        self._retry_persistence_dir: str = os.path.join("event_log", "retry_queue")
+        self._queue_log: Optional[SegmentLog] = None
+        self._retry_log: Optional[SegmentLog] = None
+        self._retry_compaction_threshold: int = 1000
         self._flush_interval: float = 5.0
         self._retry_check_interval: float = 2.0
         self._flush_task: Optional[asyncio.Task] = None
@@ -293,6 +355,9 @@ class EventBus:
         # Create subscription manager
         self.subscription_manager = EventSubscriptionManager(self)
 
+        if self.batch_config is not None:
+            self._create_batch_publisher()
+
         logger.info("EventBus initialized with retry policy: max_retries=%d, initial_delay=%.1fs",
                    self.retry_policy.max_retries, self.retry_policy.initial_delay)
     
@@ -336,6 +401,14 @@ class EventBus:
                     
                     self._is_connected = True
                     logger.info("Successfully connected to Redis")
+
+                    # Start consuming subscribed streams when the Streams transport is enabled
+                    if self.stream_config is None and getattr(redis_config, "event_transport", None) == "streams":
+                        self.stream_config = StreamConfig(
+                            consumer_group=redis_config.stream_consumer_group
+                        )
+                    if self.stream_config is not None:
+                        await self._start_stream_transport()
                     
                     # Start flush task to process local queue
                     self._start_flush_task()
@@ -382,55 +455,303 @@ class EventBus:
             from src.events import EVENT_BUS_CONFIG
             self._max_queue_size = EVENT_BUS_CONFIG.get("queue_max_size", 1000)
             self._persistence_file = EVENT_BUS_CONFIG.get("persistence_file", "event_queue.pkl")
+            self._persistence_dir = EVENT_BUS_CONFIG.get("persistence_dir", self._persistence_dir)
+            self._retry_persistence_dir = EVENT_BUS_CONFIG.get(
+                "retry_persistence_dir", self._retry_persistence_dir
+            )
             self._flush_interval = EVENT_BUS_CONFIG.get("flush_interval", 5.0)
+
+            batch_window = EVENT_BUS_CONFIG.get("publish_batch_window", 0.0)
+            if self.batch_config is None and batch_window > 0:
+                self.batch_config = BatchConfig(
+                    max_batch_size=EVENT_BUS_CONFIG.get("batch_size", 10),
+                    max_delay=batch_window
+                )
+                self._create_batch_publisher()
         except ImportError:
             # Use defaults if config is not available
             pass
     
-    def _load_persisted_events(self) -> None:
-        """Load persisted events from file."""
+    def _get_queue_log(self) -> SegmentLog:
+        """Open the local queue segment log on first use."""
+        if self._queue_log is None:
+            self._queue_log = SegmentLog(self._persistence_dir)
+        return self._queue_log
+
+    def _get_retry_log(self) -> SegmentLog:
+        """Open the retry queue segment log on first use."""
+        if self._retry_log is None:
+            self._retry_log = SegmentLog(self._retry_persistence_dir)
+        return self._retry_log
+
+    def _load_legacy_pickle(self, path: str) -> Any:
+        """Load and remove a pickle file written by earlier versions.
+
+        Args:
+            path (str): Path of the legacy pickle file
+
+        Returns:
+            Any: The unpickled object, or None if there is no file
+        """
         try:
-            with open(self._persistence_file, 'rb') as f:
-                self._local_queue = pickle.load(f)
-            logger.info("Loaded %d events from persistence file", len(self._local_queue))
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
         except FileNotFoundError:
-            logger.debug("No persistence file found, starting with empty queue")
-            self._local_queue = []
+            return None
+        except Exception as e:
+            logger.warning("Error loading legacy persistence file %s: %s", path, str(e))
+            return None
+
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning("Could not remove legacy persistence file %s: %s", path, str(e))
+        return data
+
+    def _load_persisted_events(self) -> None:
+        """Load unacknowledged events from the local queue log."""
+        self._local_queue = deque()
+        try:
+            log = self._get_queue_log()
+
+            legacy_events = self._load_legacy_pickle(self._persistence_file)
+            for queued_event in legacy_events or []:
+                log.append(queued_event)
+
+            for seq, queued_event in log.replay():
+                queued_event["seq"] = seq
+                self._local_queue.append(queued_event)
+            logger.info("Loaded %d events from persistence log", len(self._local_queue))
         except Exception as e:
             logger.warning("Error loading persisted events: %s", str(e))
-            self._local_queue = []
-    
+            self._local_queue = deque()
+
+    def _persist_event(self, queued_event: Dict[str, Any]) -> None:
+        """Append a queued event to the local queue log.
+
+        Args:
+            queued_event (Dict[str, Any]): Event entry added to the local queue
+        """
+        try:
+            queued_event["seq"] = self._get_queue_log().append(queued_event)
+        except Exception as e:
+            logger.warning("Error persisting event: %s", str(e))
+
     def _persist_events(self) -> None:
-        """Persist events to file."""
+        """Acknowledge events that left the local queue and sync the log."""
         try:
-            with open(self._persistence_file, 'wb') as f:
-                pickle.dump(self._local_queue, f)
-            logger.debug("Persisted %d events to file", len(self._local_queue))
+            log = self._get_queue_log()
+            if not self._local_queue:
+                log.commit(log.last_seq)
+            elif "seq" in self._local_queue[0]:
+                log.commit(self._local_queue[0]["seq"] - 1)
+            log.sync()
+            logger.debug("Persisted local queue cursor, %d events pending", len(self._local_queue))
         except Exception as e:
             logger.warning("Error persisting events: %s", str(e))
 
     def _load_persisted_retry_queue(self) -> None:
-        """Load persisted retry queue from file."""
+        """Rebuild the retry queue from the retry log."""
+        self._retry_queue = {}
         try:
-            with open(self._retry_persistence_file, 'rb') as f:
-                self._retry_queue = pickle.load(f)
-            logger.info("Loaded %d events from retry persistence file", len(self._retry_queue))
-        except FileNotFoundError:
-            logger.debug("No retry persistence file found, starting with empty retry queue")
-            self._retry_queue = {}
+            log = self._get_retry_log()
+
+            legacy_queue = self._load_legacy_pickle(self._retry_persistence_file)
+            for retry_info in (legacy_queue or {}).values():
+                log.append({"op": "put", "retry": retry_info.to_record()})
+
+            for _, record in log.replay():
+                if record["op"] == "put":
+                    retry_info = EventRetryInfo.from_record(record["retry"])
+                    self._retry_queue[retry_info.event_id] = retry_info
+                else:
+                    self._retry_queue.pop(record["event_id"], None)
+            logger.info("Loaded %d events from retry persistence log", len(self._retry_queue))
         except Exception as e:
             logger.warning("Error loading persisted retry queue: %s", str(e))
             self._retry_queue = {}
 
+        self._rebuild_retry_heap()
+
+    def _rebuild_retry_heap(self) -> None:
+        """Rebuild the retry schedule from the retry queue."""
+        self._retry_heap = []
+        for retry_info in self._retry_queue.values():
+            if retry_info.next_retry_time is not None:
+                self._retry_heap_seq += 1
+                self._retry_heap.append(
+                    (retry_info.next_retry_time, self._retry_heap_seq, retry_info.event_id)
+                )
+        heapq.heapify(self._retry_heap)
+
+    def _schedule_retry(self, retry_info: EventRetryInfo) -> None:
+        """Add a retry entry to the deadline-ordered schedule.
+
+        Args:
+            retry_info (EventRetryInfo): Retry entry with its next retry time set
+        """
+        self._retry_heap_seq += 1
+        heapq.heappush(
+            self._retry_heap,
+            (retry_info.next_retry_time, self._retry_heap_seq, retry_info.event_id)
+        )
+
+    def _pop_due_retries(self, current_time: datetime) -> List[EventRetryInfo]:
+        """Pop the retry entries whose next retry time has passed.
+
+        Args:
+            current_time (datetime): Current UTC time
+
+        Returns:
+            List[EventRetryInfo]: Due retry entries, earliest first
+        """
+        due: List[EventRetryInfo] = []
+        while (self._retry_heap and self._retry_heap[0][0] <= current_time and
+               len(due) < self._retry_batch_limit):
+            retry_time, _, event_id = heapq.heappop(self._retry_heap)
+            retry_info = self._retry_queue.get(event_id)
+            # Skip entries removed or rescheduled since they were pushed
+            if retry_info is None or retry_info.next_retry_time != retry_time:
+                continue
+            if retry_info.attempt_count <= self.retry_policy.max_retries:
+                due.append(retry_info)
+        return due
+
+    def _persist_retry_update(self, retry_info: EventRetryInfo) -> None:
+        """Append the current state of a retry entry to the retry log.
+
+        Args:
+            retry_info (EventRetryInfo): Retry entry that was added or updated
+        """
+        try:
+            self._get_retry_log().append({"op": "put", "retry": retry_info.to_record()})
+        except Exception as e:
+            logger.warning("Error persisting retry entry: %s", str(e))
+
+    def _persist_retry_removal(self, event_id: str) -> None:
+        """Append the removal of a retry entry to the retry log.
+
+        Args:
+            event_id (str): ID of the event removed from the retry queue
+        """
+        try:
+            self._get_retry_log().append({"op": "delete", "event_id": event_id})
+        except Exception as e:
+            logger.warning("Error persisting retry removal: %s", str(e))
+
     def _persist_retry_queue(self) -> None:
-        """Persist retry queue to file."""
+        """Sync the retry log, compacting it once superseded records dominate."""
         try:
-            with open(self._retry_persistence_file, 'wb') as f:
-                pickle.dump(self._retry_queue, f)
-            logger.debug("Persisted %d retry events to file", len(self._retry_queue))
+            log = self._get_retry_log()
+            live_count = len(self._retry_queue)
+            if log.pending_count > max(self._retry_compaction_threshold, 2 * live_count):
+                # Write a snapshot of the live entries to a fresh segment and
+                # acknowledge everything before it so older segments are deleted
+                snapshot_start = log.last_seq
+                log.roll()
+                for retry_info in self._retry_queue.values():
+                    log.append({"op": "put", "retry": retry_info.to_record()})
+                log.commit(snapshot_start)
+            log.sync()
+            logger.debug("Persisted retry log, %d retry events pending", live_count)
         except Exception as e:
             logger.warning("Error persisting retry queue: %s", str(e))
-    
+
+    def _sync_persistence_logs(self) -> None:
+        """Flush records appended since the last batched fsync and acknowledge dropped events."""
+        if self._dropped_seq is not None and self._queue_log is not None:
+            try:
+                self._queue_log.commit(self._dropped_seq)
+                self._dropped_seq = None
+            except Exception as e:
+                logger.warning("Error acknowledging dropped events: %s", str(e))
+        for log in (self._queue_log, self._retry_log):
+            if log is not None:
+                try:
+                    log.sync()
+                except Exception as e:
+                    logger.warning("Error syncing persistence log: %s", str(e))
+
+    def _close_persistence_logs(self) -> None:
+        """Sync and close the segment logs."""
+        for log in (self._queue_log, self._retry_log):
+            if log is not None:
+                try:
+                    log.close()
+                except Exception as e:
+                    logger.warning("Error closing persistence log: %s", str(e))
+
+    def _create_batch_publisher(self) -> None:
+        """Create the micro-batch publisher used by _publish_to_redis."""
+        self._batch_publisher = BatchPublisher(
+            self.batch_config,
+            lambda: self._redis_client.pipeline(transaction=False),
+            self._stage_publish
+        )
+        logger.info(
+            "Micro-batch publishing enabled: max_batch_size=%d, max_delay=%.3fs",
+            self.batch_config.max_batch_size,
+            self.batch_config.max_delay
+        )
+
+    async def _start_stream_transport(self) -> None:
+        """Create the Redis Streams transport and consume every subscribed event."""
+        if self._stream_transport is None:
+            self._stream_transport = RedisStreamTransport(
+                self._redis_client,
+                self.stream_config,
+                self._dispatch_to_subscribers,
+                self._handle_stream_delivery_exhausted
+            )
+
+        for event_name in list(self._subscribers):
+            await self._stream_transport.add_stream(event_name)
+
+        consumer_task = self._stream_transport.start()
+        self._register_background_task(consumer_task, "EventBus stream consumer")
+        logger.info("Redis Streams transport enabled for group %s", self.stream_config.consumer_group)
+
+    async def _dispatch_to_subscribers(self, event_name: str, payload: Dict[str, Any]) -> bool:
+        """Deliver an event received from Redis to the local subscribers.
+
+        Args:
+            event_name (str): Name of the received event
+            payload (Dict[str, Any]): Event payload
+
+        Returns:
+            bool: True if every handler succeeded, False otherwise
+        """
+        success = True
+        for handler in list(self._subscribers.get(event_name, [])):
+            try:
+                await handler(payload)
+            except Exception as e:
+                logger.error("Handler for event %s failed: %s", event_name, str(e))
+                success = False
+        return success
+
+    async def _handle_stream_delivery_exhausted(
+        self, event_name: str, payload: Dict[str, Any], deliveries: int
+    ) -> None:
+        """Report a stream entry that kept failing in every consumer.
+
+        Args:
+            event_name (str): Name of the event
+            payload (Dict[str, Any]): Event payload
+            deliveries (int): Number of times the entry was delivered
+        """
+        current_time = datetime.utcnow()
+        retry_info = EventRetryInfo(
+            event_id=payload.get("event_id", str(uuid.uuid4())),
+            event_name=event_name,
+            payload=payload,
+            attempt_count=deliveries,
+            first_attempt_time=current_time,
+            last_attempt_time=current_time,
+            error_messages=["Handler failed on every stream delivery"]
+        )
+        await self._publish_retry_failure_event(retry_info)
+
     def _start_flush_task(self) -> None:
         """Start the periodic flush task."""
         if self._flush_task is None or self._flush_task.done():
@@ -461,6 +782,7 @@ class EventBus:
                 await asyncio.sleep(self._flush_interval)
                 if self._is_connected:
                     await self._process_local_queue()
+                self._sync_persistence_logs()
             except asyncio.CancelledError:
                 logger.info("Flush task cancelled")
                 break
@@ -507,7 +829,8 @@ class EventBus:
                     success = await self._publish_to_redis(event_name, payload)
                     if success:
                         # Remove from retry queue if it was there
-                        self._retry_queue.pop(event_id, None)
+                        if self._retry_queue.pop(event_id, None) is not None:
+                            self._persist_retry_removal(event_id)
                         return True
                     else:
                         # Add to retry queue
@@ -547,8 +870,12 @@ class EventBus:
             # Serialize payload
             serialized_payload = json.dumps(serializable_payload)
 
+            # Coalesce with concurrent publishes into one pipeline when batching is enabled
+            if self._batch_publisher is not None:
+                return await self._batch_publisher.submit(event_name, serialized_payload)
+
             # Publish to Redis
-            await self._redis_client.publish(event_name, serialized_payload)
+            await self._send_to_redis(event_name, serialized_payload)
             logger.debug("Event published to Redis: %s", event_name)
             return True
 
@@ -556,6 +883,31 @@ class EventBus:
             logger.warning("Redis publish failed: %s", str(e))
             return False
 
+    async def _send_to_redis(self, event_name: str, serialized_payload: str) -> None:
+        """Send a serialized event through the active Redis transport.
+
+        Args:
+            event_name (str): Name of the event
+            serialized_payload (str): JSON serialized event payload
+        """
+        if self._stream_transport is not None:
+            await self._stream_transport.publish(event_name, serialized_payload)
+        else:
+            await self._redis_client.publish(event_name, serialized_payload)
+
+    def _stage_publish(self, pipeline: Any, event_name: str, serialized_payload: str) -> None:
+        """Add the publish command of an event to a Redis pipeline.
+
+        Args:
+            pipeline: Redis pipeline collecting the commands of a batch
+            event_name (str): Name of the event
+            serialized_payload (str): JSON serialized event payload
+        """
+        if self._stream_transport is not None:
+            self._stream_transport.stage_publish(pipeline, event_name, serialized_payload)
+        else:
+            pipeline.publish(event_name, serialized_payload)
+
     async def _add_to_retry_queue(self, event_id: str, event_name: str, payload: Dict[str, Any], error_msg: str) -> None:
         """Add event to retry queue with exponential backoff.
 
@@ -590,6 +942,7 @@ class EventBus:
         if retry_info.attempt_count <= self.retry_policy.max_retries:
             delay = self._calculate_retry_delay(retry_info.attempt_count)
             retry_info.next_retry_time = current_time + timedelta(seconds=delay)
+            self._schedule_retry(retry_info)
             logger.debug("Event %s scheduled for retry %d in %.1f seconds",
                         event_id, retry_info.attempt_count, delay)
         else:
@@ -599,9 +952,11 @@ class EventBus:
             await self._publish_retry_failure_event(retry_info)
             # Remove from retry queue
             del self._retry_queue[event_id]
+            self._persist_retry_removal(event_id)
+            return
 
-        # Persist retry queue
-        self._persist_retry_queue()
+        # Persist the updated retry entry
+        self._persist_retry_update(retry_info)
 
     def _calculate_retry_delay(self, attempt_count: int) -> float:
         """Calculate retry delay with exponential backoff and jitter.
@@ -700,7 +1055,10 @@ class EventBus:
             # Check queue size
             if len(self._local_queue) >= self._max_queue_size:
                 logger.warning("Local queue is full, dropping oldest event")
-                self._local_queue.pop(0)  # Remove oldest event
+                dropped_event = self._local_queue.popleft()  # Remove oldest event
+                self._dropped_events += 1
+                if "seq" in dropped_event:
+                    self._dropped_seq = dropped_event["seq"]
             
             # Add event to queue
             queued_event = {
@@ -708,11 +1066,10 @@ class EventBus:
                 "payload": payload,
                 "timestamp": time.time()
             }
+            # Append the event to the persistence log (O(1), fsync is batched)
+            self._persist_event(queued_event)
             self._local_queue.append(queued_event)
             
-            # Persist queue to file
-            self._persist_events()
-            
             logger.debug("Event queued locally: %s", event_name)
             return True
             
@@ -734,7 +1091,7 @@ class EventBus:
         while self._local_queue and self._is_connected:
             try:
                 # Get event from queue
-                queued_event = self._local_queue.pop(0)
+                queued_event = self._local_queue.popleft()
                 event_name = queued_event["event_name"]
                 payload = queued_event["payload"]
                 
@@ -745,14 +1102,14 @@ class EventBus:
                 serialized_payload = json.dumps(serializable_payload)
                 
                 # Publish to Redis
-                await self._redis_client.publish(event_name, serialized_payload)
+                await self._send_to_redis(event_name, serialized_payload)
                 processed_count += 1
                 
             except Exception as e:
                 logger.warning("Failed to process queued event: %s", str(e))
                 failed_count += 1
                 # Put the event back at the beginning of the queue
-                self._local_queue.insert(0, queued_event)
+                self._local_queue.appendleft(queued_event)
                 break  # Stop processing if we encounter an error
         
         if processed_count > 0:
@@ -764,38 +1121,30 @@ class EventBus:
             logger.warning("Failed to process %d events from local queue", failed_count)
 
     async def _process_retry_queue(self) -> None:
-        """Process events in the retry queue that are ready for retry."""
+        """Republish the retry entries that are due, in one pipelined batch."""
         if not self._retry_queue or not self._is_connected or not self._redis_client:
             return
 
-        current_time = datetime.utcnow()
-        ready_events = []
-
-        # Find events ready for retry
-        for event_id, retry_info in self._retry_queue.items():
-            if (retry_info.next_retry_time and
-                retry_info.next_retry_time <= current_time and
-                retry_info.attempt_count <= self.retry_policy.max_retries):
-                ready_events.append(event_id)
-
-        if not ready_events:
+        due_events = self._pop_due_retries(datetime.utcnow())
+        if not due_events:
             return
 
-        logger.debug("Processing %d events from retry queue", len(ready_events))
+        logger.debug("Processing %d events from retry queue", len(due_events))
 
         processed_count = 0
         failed_count = 0
 
-        for event_id in ready_events:
-            try:
-                retry_info = self._retry_queue[event_id]
-
-                # Try to publish the event
-                success = await self._publish_to_redis(retry_info.event_name, retry_info.payload)
+        results = await self._publish_batch_to_redis(
+            [(retry_info.event_name, retry_info.payload) for retry_info in due_events]
+        )
 
+        for retry_info, success in zip(due_events, results):
+            event_id = retry_info.event_id
+            try:
                 if success:
                     # Remove from retry queue on success
                     del self._retry_queue[event_id]
+                    self._persist_retry_removal(event_id)
                     processed_count += 1
                     logger.debug("Retry successful for event %s after %d attempts",
                                event_id, retry_info.attempt_count)
@@ -813,14 +1162,35 @@ class EventBus:
                 logger.warning("Error processing retry for event %s: %s", event_id, str(e))
                 failed_count += 1
 
+        # Sync (and if needed compact) the retry log once per cycle
+        self._persist_retry_queue()
+
         if processed_count > 0:
             logger.info("Successfully retried %d events", processed_count)
-            # Persist the updated retry queue
-            self._persist_retry_queue()
 
         if failed_count > 0:
             logger.warning("Failed to retry %d events", failed_count)
-    
+
+    async def _publish_batch_to_redis(self, events: List[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        """Publish several events to Redis in a single pipeline round trip.
+
+        Args:
+            events (List[Tuple[str, Dict[str, Any]]]): Event names and payloads
+
+        Returns:
+            List[bool]: Whether each event was accepted by Redis
+        """
+        try:
+            pipeline = self._redis_client.pipeline(transaction=False)
+            for event_name, payload in events:
+                serialized_payload = json.dumps(self._make_json_serializable(payload))
+                self._stage_publish(pipeline, event_name, serialized_payload)
+            results = await pipeline.execute(raise_on_error=False)
+            return [not isinstance(result, Exception) for result in results]
+        except Exception as e:
+            logger.warning("Pipelined publish of %d events failed: %s", len(events), str(e))
+            return [False] * len(events)
+
     async def subscribe(self, event_name: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> bool:
         """Subscribe to an event.
         
@@ -839,11 +1209,10 @@ class EventBus:
                 self._subscribers[event_name] = []
             self._subscribers[event_name].append(handler)
             
-            # If we have a Redis connection, subscribe to the channel
-            if self._is_connected and self._redis_client:
-                # In a real implementation, we would set up a Redis subscription
-                # For now, we'll just log that we're subscribed
-                logger.debug("Subscribed to event: %s", event_name)
+            # With the Streams transport, join the consumer group of the event stream
+            if self._is_connected and self._stream_transport is not None:
+                await self._stream_transport.add_stream(event_name)
+                logger.debug("Subscribed to event stream: %s", event_name)
             
             return True
             
@@ -862,6 +1231,7 @@ class EventBus:
         health_status = {
             "connected": self._is_connected,
             "local_queue_size": len(self._local_queue),
+            "local_queue_dropped": self._dropped_events,
             "retry_queue_size": len(self._retry_queue),
             "subscribers_count": sum(len(handlers) for handlers in self._subscribers.values()),
             "retry_policy": {
@@ -869,8 +1239,14 @@ class EventBus:
                 "initial_delay": self.retry_policy.initial_delay,
                 "max_delay": self.retry_policy.max_delay,
                 "backoff_multiplier": self.retry_policy.backoff_multiplier
-            }
+            },
+            "transport": "streams" if self._stream_transport is not None else "pubsub"
         }
+
+        if self._stream_transport is not None:
+            health_status["streams"] = self._stream_transport.get_stats()
+        if self._batch_publisher is not None:
+            health_status["batching"] = self._batch_publisher.get_stats()
         
         # Check Redis connection if connected
         if self._is_connected and self._redis_client:
@@ -910,6 +1286,20 @@ class EventBus:
             except Exception as e:
                 logger.warning(f"Error during retry task cancellation: {e}")
 
+        # Send any events still waiting in the current batch
+        if self._batch_publisher is not None and self._redis_client:
+            try:
+                await self._batch_publisher.flush()
+            except Exception as e:
+                logger.warning("Error flushing batched events: %s", str(e))
+
+        # Stop the stream consumer before closing its connection
+        if self._stream_transport is not None:
+            consumer_task = self._stream_transport.consumer_task
+            if consumer_task is not None:
+                self._unregister_background_task(consumer_task)
+            await self._stream_transport.stop()
+
         # Close Redis connection
         if self._redis_client:
             try:
@@ -921,6 +1311,7 @@ class EventBus:
         # Persist any remaining events
         self._persist_events()
         self._persist_retry_queue()
+        self._close_persistence_logs()
 
         self._is_connected = False
         logger.info("Event bus connections closed")
@@ -942,6 +1333,24 @@ class EventBus:
             bool: True if connected to Redis, False otherwise
         """
         return self._is_connected
+    
+    @property
+    def is_batching(self) -> bool:
+        """Check if publishes are coalesced into micro-batches.
+        
+        Returns:
+            bool: True if micro-batch publishing is enabled, False otherwise
+        """
+        return self._batch_publisher is not None
+    
+    @property
+    def redis_client(self) -> Optional[aioredis.Redis]:
+        """Get the Redis client used by the event bus.
+        
+        Returns:
+            Optional[aioredis.Redis]: Redis client, or None if not connected
+        """
+        return self._redis_client
 
 
 class EventSubscriptionManager:
@@ -1142,17 +1551,21 @@ class EventSubscriptionManager:
 # Convenience function for easy usage
 async def create_event_bus(
     config_manager: Optional[ConfigManager] = None,
-    retry_policy: Optional[RetryPolicy] = None
+    retry_policy: Optional[RetryPolicy] = None,
+    stream_config: Optional[StreamConfig] = None,
+    batch_config: Optional[BatchConfig] = None
 ) -> EventBus:
     """Create and connect an event bus instance.
 
     Args:
         config_manager (ConfigManager, optional): Configuration manager instance
         retry_policy (RetryPolicy, optional): Retry policy configuration
+        stream_config (StreamConfig, optional): Enables the Redis Streams transport
+        batch_config (BatchConfig, optional): Enables pipelined micro-batch publishing
 
     Returns:
         EventBus: Connected event bus instance
     """
-    event_bus = EventBus(config_manager, retry_policy)
+    event_bus = EventBus(config_manager, retry_policy, stream_config, batch_config)
     await event_bus.connect()
     return event_bus
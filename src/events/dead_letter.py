@@ -0,0 +1,307 @@
+"""
+Persistent dead letter queue for the YABOT event processor.
+
+Events that failed processing are stored in a local SQLite database instead of
+process memory, so the queue survives restarts and a flood of failures does not
+grow the process. Entries are indexed by event type, failure time, attempt count
+and next retry time, and retries read due entries one page at a time.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Columns kept outside of the JSON document so they can be indexed and updated
+_RETRY_FIELDS = ("retry_count", "last_retry_timestamp")
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS dead_letters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_id TEXT,
+        event_type TEXT NOT NULL,
+        failed_at REAL NOT NULL,
+        retry_count INTEGER NOT NULL DEFAULT 0,
+        last_retry_timestamp REAL NOT NULL DEFAULT 0,
+        next_retry_at REAL NOT NULL DEFAULT 0,
+        data TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_dead_letters_event_type ON dead_letters(event_type)",
+    "CREATE INDEX IF NOT EXISTS idx_dead_letters_failed_at ON dead_letters(failed_at)",
+    "CREATE INDEX IF NOT EXISTS idx_dead_letters_retry_count ON dead_letters(retry_count)",
+    "CREATE INDEX IF NOT EXISTS idx_dead_letters_next_retry ON dead_letters(next_retry_at, id)"
+]
+
+_COLUMNS = "id, retry_count, last_retry_timestamp, next_retry_at, data"
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values json does not handle natively."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _as_epoch(value: Any) -> float:
+    """Convert a timestamp stored in an entry to seconds since the epoch."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return time.time()
+
+
+class DeadLetterStore:
+    """SQLite backed dead letter queue with list-like access for callers."""
+
+    def __init__(self, path: str = ":memory:", retry_delay: Optional[Callable[[int], float]] = None):
+        """Open (or create) the dead letter store.
+
+        Args:
+            path (str): SQLite database file, or ``":memory:"`` for a transient store
+            retry_delay (Callable, optional): Returns the delay in seconds before the
+                next retry of an entry given its retry count
+        """
+        self.path = path
+        self._retry_delay = retry_delay or (lambda retry_count: 0.0)
+
+        if path != ":memory:":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+        # Cached so the hot add path does not count rows
+        self._count: int = self._conn.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+
+    def _next_retry_at(self, retry_count: int, last_retry_timestamp: float) -> float:
+        return last_retry_timestamp + self._retry_delay(retry_count)
+
+    def _row_to_entry(self, row: Tuple) -> Dict[str, Any]:
+        dlq_id, retry_count, last_retry_timestamp, next_retry_at, data = row
+        entry = json.loads(data)
+        entry["retry_count"] = retry_count
+        entry["last_retry_timestamp"] = last_retry_timestamp
+        entry["next_retry_at"] = next_retry_at
+        entry["dlq_id"] = dlq_id
+        return entry
+
+    def add(self, entry: Dict[str, Any]) -> int:
+        """Store a failed event.
+
+        Args:
+            entry (Dict[str, Any]): Dead letter entry with ``event`` and ``error`` keys
+
+        Returns:
+            int: ID of the stored entry
+        """
+        event = entry.get("event") or {}
+        retry_count = int(entry.get("retry_count", 0))
+        last_retry_timestamp = float(entry.get("last_retry_timestamp", 0))
+        data = {key: value for key, value in entry.items() if key not in _RETRY_FIELDS}
+
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO dead_letters "
+                "(event_id, event_type, failed_at, retry_count, last_retry_timestamp, next_retry_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    event.get("event_id"),
+                    event.get("event_type", "unknown"),
+                    _as_epoch(entry.get("timestamp")),
+                    retry_count,
+                    last_retry_timestamp,
+                    self._next_retry_at(retry_count, last_retry_timestamp),
+                    json.dumps(data, default=_json_default)
+                )
+            )
+        self._count += 1
+        return cursor.lastrowid
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Store a failed event (list-compatible alias of :meth:`add`).
+
+        Args:
+            entry (Dict[str, Any]): Dead letter entry
+        """
+        self.add(entry)
+
+    def due_entries(
+        self,
+        now: float,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get one page of entries whose next retry time has passed.
+
+        Args:
+            now (float): Current time in seconds since the epoch
+            limit (int): Maximum number of entries returned
+            after (Tuple[float, int], optional): ``(next_retry_at, dlq_id)`` of the
+                last entry of the previous page
+
+        Returns:
+            List[Dict[str, Any]]: Due entries ordered by next retry time
+        """
+        if after is None:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM dead_letters WHERE next_retry_at <= ? "
+                "ORDER BY next_retry_at, id LIMIT ?",
+                (now, limit)
+            ).fetchall()
+        else:
+            last_retry_at, last_id = after
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM dead_letters WHERE next_retry_at <= ? "
+                "AND (next_retry_at > ? OR (next_retry_at = ? AND id > ?)) "
+                "ORDER BY next_retry_at, id LIMIT ?",
+                (now, last_retry_at, last_retry_at, last_id, limit)
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def update_retries(self, updates: List[Tuple[int, int, float]]) -> None:
+        """Record retry attempts in one transaction.
+
+        Args:
+            updates (List[Tuple[int, int, float]]): ``(dlq_id, retry_count,
+                last_retry_timestamp)`` of each retried entry
+        """
+        if not updates:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE dead_letters SET retry_count = ?, last_retry_timestamp = ?, next_retry_at = ? "
+                "WHERE id = ?",
+                [
+                    (retry_count, last_retry, self._next_retry_at(retry_count, last_retry), dlq_id)
+                    for dlq_id, retry_count, last_retry in updates
+                ]
+            )
+
+    def remove_many(self, dlq_ids: List[int]) -> int:
+        """Delete entries in one transaction.
+
+        Args:
+            dlq_ids (List[int]): IDs of the entries to delete
+
+        Returns:
+            int: Number of deleted entries
+        """
+        if not dlq_ids:
+            return 0
+        with self._conn:
+            cursor = self._conn.executemany(
+                "DELETE FROM dead_letters WHERE id = ?", [(dlq_id,) for dlq_id in dlq_ids]
+            )
+        self._count -= cursor.rowcount
+        return cursor.rowcount
+
+    def evict_oldest(self, count: int = 1) -> int:
+        """Delete the oldest entries.
+
+        Args:
+            count (int): Number of entries to delete
+
+        Returns:
+            int: Number of deleted entries
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM dead_letters WHERE id IN "
+                "(SELECT id FROM dead_letters ORDER BY id LIMIT ?)",
+                (count,)
+            )
+        self._count -= cursor.rowcount
+        return cursor.rowcount
+
+    def query(
+        self,
+        event_type: Optional[str] = None,
+        failed_before: Optional[float] = None,
+        min_retry_count: Optional[int] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Find entries using the indexed columns.
+
+        Args:
+            event_type (str, optional): Only entries of this event type
+            failed_before (float, optional): Only entries that failed before this time
+            min_retry_count (int, optional): Only entries retried at least this often
+            limit (int): Maximum number of entries returned
+            offset (int): Number of matching entries to skip
+
+        Returns:
+            List[Dict[str, Any]]: Matching entries, oldest first
+        """
+        conditions = []
+        params: List[Any] = []
+        if event_type is not None:
+            conditions.append("event_type = ?")
+            params.append(event_type)
+        if failed_before is not None:
+            conditions.append("failed_at < ?")
+            params.append(failed_before)
+        if min_retry_count is not None:
+            conditions.append("retry_count >= ?")
+            params.append(min_retry_count)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+
+        rows = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM dead_letters {where}ORDER BY id LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every entry, oldest first, one page at a time."""
+        last_id = 0
+        while True:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM dead_letters WHERE id > ? ORDER BY id LIMIT 100",
+                (last_id,)
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_entry(row)
+            last_id = rows[-1][0]
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += self._count
+        row = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM dead_letters ORDER BY id LIMIT 1 OFFSET ?", (index,)
+        ).fetchone()
+        if index < 0 or row is None:
+            raise IndexError("dead letter index out of range")
+        return self._row_to_entry(row)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
@@ -0,0 +1,246 @@
+"""
+Idempotency stores for the YABOT event processor.
+
+This module tracks the IDs of events that were already processed so redelivered
+events can be skipped. The in-memory store keeps IDs in insertion order with a
+fixed TTL, so expiry and size eviction only ever look at the oldest entry. The
+Redis store uses ``SET NX EX`` so the processed IDs are shared between workers.
+
+The processor claims an event before handling it: the claim records the ID in
+the same step that checks it, so two workers receiving the same event cannot
+both process it. A claim is released when processing fails, so the event can be
+retried.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProcessedEventStore:
+    """In-memory TTL ring of processed event IDs with O(1) operations."""
+
+    def __init__(self, ttl: int = 3600, max_size: int = 10000):
+        """Initialize the store.
+
+        Args:
+            ttl (int): Seconds an event ID is remembered
+            max_size (int): Maximum number of event IDs kept
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        # event_id -> expiry time; every entry has the same TTL, so insertion
+        # order is also expiry order
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def _expire(self, now: float) -> int:
+        """Drop expired IDs from the head of the ring.
+
+        Args:
+            now (float): Current monotonic time
+
+        Returns:
+            int: Number of expired IDs removed
+        """
+        removed = 0
+        while self._entries:
+            event_id, expires_at = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[event_id]
+            removed += 1
+        return removed
+
+    def contains(self, event_id: str) -> bool:
+        """Check whether an event ID was processed and has not expired.
+
+        Args:
+            event_id (str): Event ID to check
+
+        Returns:
+            bool: True if the event was already processed
+        """
+        now = time.monotonic()
+        self._expire(now)
+        expires_at = self._entries.get(event_id)
+        return expires_at is not None and expires_at > now
+
+    def add(self, event_id: str) -> bool:
+        """Record an event ID as processed.
+
+        Args:
+            event_id (str): Event ID to record
+
+        Returns:
+            bool: True if the ID was newly recorded, False if it was already present
+        """
+        now = time.monotonic()
+        self._expire(now)
+        if event_id in self._entries:
+            return False
+
+        while len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+
+        self._entries[event_id] = now + self.ttl
+        return True
+
+    def discard(self, event_id: str) -> None:
+        """Forget an event ID.
+
+        Args:
+            event_id (str): Event ID to forget
+        """
+        self._entries.pop(event_id, None)
+
+    async def is_processed(self, event_id: str) -> bool:
+        """Check whether an event ID was processed.
+
+        Args:
+            event_id (str): Event ID to check
+
+        Returns:
+            bool: True if the event was already processed
+        """
+        return self.contains(event_id)
+
+    async def mark_processed(self, event_id: str) -> bool:
+        """Record an event ID as processed.
+
+        Args:
+            event_id (str): Event ID to record
+
+        Returns:
+            bool: True if the ID was newly recorded, False if it was already present
+        """
+        return self.add(event_id)
+
+    async def claim(self, event_id: str) -> bool:
+        """Claim an event ID for processing.
+
+        Args:
+            event_id (str): Event ID to claim
+
+        Returns:
+            bool: True if the caller should process the event, False if it was already claimed
+        """
+        return self.add(event_id)
+
+    async def release(self, event_id: str) -> None:
+        """Release the claim on an event ID whose processing failed.
+
+        Args:
+            event_id (str): Event ID to release
+        """
+        self.discard(event_id)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisProcessedEventStore:
+    """Processed event IDs shared between workers through Redis ``SET NX EX``.
+
+    A local ring in front of Redis answers repeated checks for IDs this worker
+    already saw without a round trip.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        ttl: int = 3600,
+        key_prefix: str = "yabot:processed:",
+        local_cache: Optional[ProcessedEventStore] = None
+    ):
+        """Initialize the store.
+
+        Args:
+            redis_client: Async Redis client
+            ttl (int): Seconds an event ID is remembered
+            key_prefix (str): Prefix of the Redis keys
+            local_cache (ProcessedEventStore, optional): Local ring used in front of Redis
+        """
+        self._redis_client = redis_client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._local = local_cache if local_cache is not None else ProcessedEventStore(ttl=ttl)
+
+    def _key(self, event_id: str) -> str:
+        return f"{self.key_prefix}{event_id}"
+
+    async def is_processed(self, event_id: str) -> bool:
+        """Check whether any worker processed an event ID.
+
+        Args:
+            event_id (str): Event ID to check
+
+        Returns:
+            bool: True if the event was already processed
+        """
+        if self._local.contains(event_id):
+            return True
+        try:
+            if await self._redis_client.exists(self._key(event_id)):
+                self._local.add(event_id)
+                return True
+        except Exception as e:
+            logger.warning("Error checking processed event %s in Redis: %s", event_id, str(e))
+        return False
+
+    async def mark_processed(self, event_id: str) -> bool:
+        """Record an event ID as processed for every worker.
+
+        Args:
+            event_id (str): Event ID to record
+
+        Returns:
+            bool: True if the ID was newly recorded, False if another worker had recorded it
+        """
+        self._local.add(event_id)
+        try:
+            created = await self._redis_client.set(self._key(event_id), 1, nx=True, ex=self.ttl)
+            return bool(created)
+        except Exception as e:
+            logger.warning("Error recording processed event %s in Redis: %s", event_id, str(e))
+            return True
+
+    async def claim(self, event_id: str) -> bool:
+        """Claim an event ID for processing with a single ``SET NX EX``.
+
+        Args:
+            event_id (str): Event ID to claim
+
+        Returns:
+            bool: True if the caller should process the event, False if a worker already claimed it
+        """
+        if self._local.contains(event_id):
+            return False
+        try:
+            claimed = bool(await self._redis_client.set(self._key(event_id), 1, nx=True, ex=self.ttl))
+        except Exception as e:
+            # Fall back to this worker's ring rather than dropping the event
+            logger.warning("Error claiming event %s in Redis: %s", event_id, str(e))
+            claimed = True
+        # Another worker's claim may still be released, so only remember our own
+        if claimed:
+            self._local.add(event_id)
+        return claimed
+
+    async def release(self, event_id: str) -> None:
+        """Release the claim on an event ID whose processing failed.
+
+        Args:
+            event_id (str): Event ID to release
+        """
+        self._local.discard(event_id)
+        try:
+            await self._redis_client.delete(self._key(event_id))
+        except Exception as e:
+            logger.warning("Error releasing event %s in Redis: %s", event_id, str(e))
+
+    def __len__(self) -> int:
+        return len(self._local)
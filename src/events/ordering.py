@@ -7,10 +7,11 @@ It implements the requirements from requirement 3.2 of the fase1 specification.
 """
 
 import asyncio
+import heapq
+import itertools
 import time
-from collections import defaultdict
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 
 from src.events.models import BaseEvent
 from src.utils.logger import get_logger
@@ -23,25 +24,52 @@ class EventOrderingError(Exception):
     pass
 
 
+class _UserBuffer:
+    """Buffered events of one user, kept in a heap ordered by event timestamp."""
+    
+    __slots__ = ("heap", "lock", "last_active")
+    
+    def __init__(self):
+        self.heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self.lock = asyncio.Lock()
+        self.last_active = time.monotonic()
+
+
 class EventOrderingBuffer:
     """Event ordering buffer that ensures events are processed in the correct order."""
     
-    def __init__(self, max_buffer_size: int = 1000, max_buffer_time: float = 300.0):
+    def __init__(
+        self,
+        max_buffer_size: int = 1000,
+        max_buffer_time: float = 300.0,
+        flush_interval: float = 1.0,
+        idle_timeout: float = 300.0
+    ):
         """Initialize the event ordering buffer.
         
         Args:
             max_buffer_size (int): Maximum number of events to buffer per user
             max_buffer_time (float): Maximum time in seconds to buffer events
+            flush_interval (float): Seconds between runs of the flush loop
+            idle_timeout (float): Seconds after which the empty buffer of an inactive
+                user is dropped together with its lock
         """
         self.max_buffer_size = max_buffer_size
         self.max_buffer_time = max_buffer_time
-        self._buffer: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        self._processing_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.flush_interval = flush_interval
+        self.idle_timeout = idle_timeout
+        # Least recently active users first, so idle users are evicted from the front
+        self._buffers: "OrderedDict[str, _UserBuffer]" = OrderedDict()
+        # (deadline, user_id) of buffers whose oldest event must be released
+        self._deadlines: List[Tuple[float, str]] = []
+        self._sequence = itertools.count()
+        self._flush_task: Optional[asyncio.Task] = None
         self._metrics = {
             "events_buffered": 0,
             "events_processed": 0,
             "events_dropped": 0,
-            "buffer_flushes": 0
+            "buffer_flushes": 0,
+            "users_evicted": 0
         }
         
         logger.info(
@@ -50,6 +78,40 @@ class EventOrderingBuffer:
             max_buffer_time
         )
     
+    def _get_user_buffer(self, user_id: str) -> _UserBuffer:
+        """Get (or create) the buffer of a user and mark the user as active.
+        
+        Args:
+            user_id (str): User ID
+            
+        Returns:
+            _UserBuffer: Buffer of the user
+        """
+        user_buffer = self._buffers.get(user_id)
+        if user_buffer is None:
+            user_buffer = _UserBuffer()
+            self._buffers[user_id] = user_buffer
+        else:
+            self._buffers.move_to_end(user_id)
+            user_buffer.last_active = time.monotonic()
+        return user_buffer
+    
+    def _schedule_deadline(self, user_id: str, user_buffer: _UserBuffer) -> None:
+        """Schedule the flush loop to release the oldest buffered event of a user.
+        
+        Args:
+            user_id (str): User ID
+            user_buffer (_UserBuffer): Buffer of the user
+        """
+        if user_buffer.heap:
+            added_time = user_buffer.heap[0][2]["added_time"]
+            heapq.heappush(self._deadlines, (added_time + self.max_buffer_time, user_id))
+    
+    def _ensure_flush_loop(self) -> None:
+        """Start the flush loop if it is not running."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
     async def add_event(self, event: BaseEvent, processor_func) -> bool:
         """Add an event to the ordering buffer.
         
@@ -72,78 +134,71 @@ class EventOrderingBuffer:
                 "added_time": time.time()
             }
             
+            user_buffer = self._get_user_buffer(user_id)
+            
             # Check buffer size for this user
-            if len(self._buffer[user_id]) >= self.max_buffer_size:
+            if len(user_buffer.heap) >= self.max_buffer_size:
                 logger.warning(
                     "Buffer for user %s is full, dropping oldest event", 
                     user_id
                 )
-                self._buffer[user_id].pop(0)
+                heapq.heappop(user_buffer.heap)
                 self._metrics["events_dropped"] += 1
             
-            self._buffer[user_id].append(event_entry)
+            heapq.heappush(
+                user_buffer.heap,
+                (event_entry["timestamp"], next(self._sequence), event_entry)
+            )
             self._metrics["events_buffered"] += 1
             
-            # Sort events by timestamp
-            self._buffer[user_id].sort(key=lambda x: x["timestamp"])
-            
             logger.debug(
                 "Event added to buffer for user %s. Buffer size: %d", 
                 user_id, 
-                len(self._buffer[user_id])
+                len(user_buffer.heap)
             )
             
             # Process events for this user
             await self._process_user_events(user_id)
             
+            self._ensure_flush_loop()
             return True
             
         except Exception as e:
             logger.error("Error adding event to buffer: %s", str(e))
             return False
     
-    async def _process_user_events(self, user_id: str) -> None:
+    async def _process_user_events(self, user_id: str, force_head: bool = True) -> None:
         """Process buffered events for a specific user in chronological order.
         
+        The oldest event is processed right away (unless ``force_head`` is False),
+        followed by every event that has been buffered longer than max_buffer_time.
+        A failing event stays at the head of the buffer so later events of the user
+        are not processed before it.
+        
         Args:
             user_id (str): User ID to process events for
+            force_head (bool): Process the oldest event even if it is not due yet
         """
+        user_buffer = self._buffers.get(user_id)
+        if user_buffer is None:
+            return
+        
         # Use a lock to prevent concurrent processing for the same user
-        async with self._processing_locks[user_id]:
+        async with user_buffer.lock:
             try:
-                if not self._buffer[user_id]:
-                    return
-                
-                current_time = time.time()
-                events_to_process = []
-                remaining_events = []
-                
-                # Separate events that should be processed now from those that should remain buffered
-                for event_entry in self._buffer[user_id]:
-                    # Process events that are either:
-                    # 1. Older than max_buffer_time
-                    # 2. The oldest event and we need to make progress
-                    if (current_time - event_entry["added_time"] > self.max_buffer_time or 
-                        len(events_to_process) == 0):
-                        events_to_process.append(event_entry)
-                    else:
-                        remaining_events.append(event_entry)
-                
-                if not events_to_process:
+                heap = user_buffer.heap
+                if not heap:
                     return
                 
-                logger.debug(
-                    "Processing %d events for user %s", 
-                    len(events_to_process), 
-                    user_id
-                )
+                cutoff = time.time() - self.max_buffer_time
+                processed = 0
                 
-                # Process events in chronological order
-                for event_entry in events_to_process:
+                while heap and ((force_head and processed == 0) or heap[0][2]["added_time"] < cutoff):
+                    # Pop before awaiting: add_event may push an earlier event meanwhile
+                    head = heapq.heappop(heap)
+                    event_entry = head[2]
+                    event = event_entry["event"]
                     try:
-                        event = event_entry["event"]
-                        processor_func = event_entry["processor_func"]
-                        
                         logger.debug(
                             "Processing event for user %s: %s (type: %s)", 
                             user_id, 
@@ -152,32 +207,85 @@ class EventOrderingBuffer:
                         )
                         
                         # Process the event
-                        await processor_func(event)
+                        await event_entry["processor_func"](event)
                         self._metrics["events_processed"] += 1
                         
                     except Exception as e:
                         logger.error(
                             "Error processing event %s for user %s: %s", 
-                            event_entry["event"].event_id, 
+                            event.event_id, 
                             user_id, 
                             str(e)
                         )
-                        # Keep the event in the buffer for retry
-                        remaining_events.append(event_entry)
+                        # Put the event back in the buffer for retry
+                        heapq.heappush(heap, head)
+                        break
+                    
+                    processed += 1
                 
-                # Update buffer with remaining events
-                self._buffer[user_id] = remaining_events
+                self._schedule_deadline(user_id, user_buffer)
                 self._metrics["buffer_flushes"] += 1
                 
                 logger.debug(
                     "Finished processing events for user %s. Remaining in buffer: %d", 
                     user_id, 
-                    len(self._buffer[user_id])
+                    len(heap)
                 )
                 
             except Exception as e:
                 logger.error("Error processing user events for user %s: %s", user_id, str(e))
     
+    async def _flush_loop(self) -> None:
+        """Release overdue events of every user and evict idle users."""
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self._flush_due_buffers()
+                self._evict_idle_users()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Error in event ordering flush loop: %s", str(e))
+    
+    async def _flush_due_buffers(self) -> int:
+        """Process the buffers whose oldest event exceeded max_buffer_time.
+        
+        Returns:
+            int: Number of user buffers processed
+        """
+        now = time.time()
+        due_users = set()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            due_users.add(heapq.heappop(self._deadlines)[1])
+        
+        for user_id in due_users:
+            await self._process_user_events(user_id, force_head=False)
+        return len(due_users)
+    
+    def _evict_idle_users(self) -> int:
+        """Drop the empty buffers and locks of users that have been idle.
+        
+        Returns:
+            int: Number of evicted users
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        for _ in range(len(self._buffers)):
+            user_id, user_buffer = next(iter(self._buffers.items()))
+            if user_buffer.last_active > cutoff:
+                break
+            if user_buffer.heap or user_buffer.lock.locked():
+                # Still in use, look at it again after the other idle users
+                self._buffers.move_to_end(user_id)
+                continue
+            del self._buffers[user_id]
+            evicted += 1
+        
+        if evicted:
+            self._metrics["users_evicted"] += evicted
+            logger.debug("Evicted %d idle user buffers", evicted)
+        return evicted
+    
     def _should_process_before(self, event_type_a: str, event_type_b: str) -> bool:
         """Determine if event_type_a should be processed before event_type_b.
         
@@ -212,13 +320,14 @@ class EventOrderingBuffer:
         """
         logger.debug("Force flushing buffer for user %s", user_id)
         
-        if user_id in self._buffer:
+        user_buffer = self._buffers.get(user_id)
+        if user_buffer is not None:
             # Process all remaining events without time constraints
-            events_to_process = self._buffer[user_id]
-            self._buffer[user_id] = []
+            heap, user_buffer.heap = user_buffer.heap, []
             
-            async with self._processing_locks[user_id]:
-                for event_entry in events_to_process:
+            async with user_buffer.lock:
+                while heap:
+                    event_entry = heapq.heappop(heap)[2]
                     try:
                         event = event_entry["event"]
                         processor_func = event_entry["processor_func"]
@@ -247,7 +356,7 @@ class EventOrderingBuffer:
         """Force flush all buffered events for all users."""
         logger.info("Force flushing all buffers")
         
-        user_ids = list(self._buffer.keys())
+        user_ids = [user_id for user_id, user_buffer in self._buffers.items() if user_buffer.heap]
         for user_id in user_ids:
             await self.flush_user_buffer(user_id)
         
@@ -262,7 +371,8 @@ class EventOrderingBuffer:
         Returns:
             int: Number of events in the buffer for this user
         """
-        return len(self._buffer.get(user_id, []))
+        user_buffer = self._buffers.get(user_id)
+        return len(user_buffer.heap) if user_buffer else 0
     
     def get_metrics(self) -> Dict[str, int]:
         """Get buffer metrics.
@@ -270,18 +380,26 @@ class EventOrderingBuffer:
         Returns:
             Dict[str, int]: Buffer metrics
         """
-        return self._metrics.copy()
+        return {**self._metrics, "users_tracked": len(self._buffers)}
     
     async def close(self) -> None:
         """Close the event ordering buffer and flush all events."""
         logger.info("Closing event ordering buffer")
         
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        self._flush_task = None
+        
         # Force flush all buffers
         await self.flush_all_buffers()
         
         # Clear buffers
-        self._buffer.clear()
-        self._processing_locks.clear()
+        self._buffers.clear()
+        self._deadlines.clear()
         
         logger.info("Event ordering buffer closed")
 
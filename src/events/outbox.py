@@ -0,0 +1,298 @@
+"""
+Transactional event outbox for the YABOT system.
+
+Instead of publishing to the event bus after a database write, a flow inserts
+its events into the ``event_outbox`` collection in the same MongoDB transaction
+as the state change. Either both are committed or neither is, so an event can
+no longer be lost when the process dies between the write and the publish, and
+the handler does not wait on Redis.
+
+An OutboxRelay drains the collection in the background: it reads due records
+in batches, publishes them to the event bus concurrently (so they share the
+bus's pipelined micro-batches when enabled) and deletes the published ones with
+a single command. Records that fail to publish are retried after a delay.
+Delivery is at least once; records keep the event ID they were written with,
+so consumers deduplicate redeliveries through their idempotency store.
+"""
+
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+OUTBOX_COLLECTION = "event_outbox"
+
+DEFAULT_RELAY_BATCH_SIZE = 100
+DEFAULT_RELAY_POLL_INTERVAL = 1.0  # seconds between polls when no commit wakes the relay
+DEFAULT_RELAY_RETRY_DELAY = 5.0  # seconds before a record that failed to publish is retried
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON fallback for values found in event payloads."""
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def outbox_record(event_name: str, payload: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build the outbox document of one event.
+
+    The payload gets its event ID and timestamp here, like EventBus.publish would
+    add them, so every relay attempt publishes the same event. The event ID is the
+    document ID, which makes re-inserting a record a duplicate key error.
+
+    Args:
+        event_name (str): Name of the event
+        payload (Dict[str, Any]): Event payload
+        now (Optional[datetime]): Creation time, defaults to the current UTC time
+
+    Returns:
+        Dict[str, Any]: Outbox document
+    """
+    now = now or datetime.utcnow()
+    payload = dict(payload)
+    payload.setdefault("event_id", str(uuid.uuid4()))
+    payload.setdefault("timestamp", now.timestamp())
+    return {
+        "_id": payload["event_id"],
+        "event_name": event_name,
+        # Stored as JSON, which is what subscribers receive from Redis anyway
+        "payload": json.dumps(payload, default=_encode_value),
+        "created_at": now,
+        "available_at": now,
+        "attempts": 0
+    }
+
+
+class EventOutbox:
+    """Writes events to the outbox collection inside MongoDB transactions."""
+
+    def __init__(self, database: Any, collection_name: str = OUTBOX_COLLECTION):
+        """Initialize the outbox.
+
+        Args:
+            database: AsyncMongoDatabase holding the outbox collection
+            collection_name (str): Name of the outbox collection
+        """
+        self.database = database
+        self.collection_name = collection_name
+        # Set after a commit so the relay does not wait for its next poll
+        self._committed = asyncio.Event()
+
+    @property
+    def collection(self) -> Any:
+        """Async outbox collection."""
+        return self.database[self.collection_name]
+
+    async def add(self, event_name: str, payload: Dict[str, Any], session: Any = None) -> str:
+        """Insert one event.
+
+        Args:
+            event_name (str): Name of the event
+            payload (Dict[str, Any]): Event payload
+            session: Session of the transaction writing the state change
+
+        Returns:
+            str: Event ID
+        """
+        event_ids = await self.add_many([(event_name, payload)], session=session)
+        return event_ids[0]
+
+    async def add_many(self, events: Sequence[Tuple[str, Dict[str, Any]]], session: Any = None) -> List[str]:
+        """Insert several events with one command.
+
+        Without a session the records are committed right away and the relay is
+        woken; inside a transaction, call ``notify`` once it has committed.
+
+        Args:
+            events (Sequence[Tuple[str, Dict[str, Any]]]): Event names and payloads
+            session: Session of the transaction writing the state change
+
+        Returns:
+            List[str]: Event IDs in the order of ``events``
+        """
+        if not events:
+            return []
+        now = datetime.utcnow()
+        records = [outbox_record(event_name, payload, now) for event_name, payload in events]
+        if len(records) == 1:
+            await self.collection.insert_one(records[0], session=session)
+        else:
+            await self.collection.insert_many(records, ordered=True, session=session)
+        if session is None:
+            self.notify()
+        return [record["_id"] for record in records]
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Any]:
+        """Run the block in a MongoDB transaction and wake the relay after it commits.
+
+        Yields:
+            AsyncClientSession: Session to pass to the state writes and to ``add``
+        """
+        async with await self.database.client.start_session() as session:
+            async with session.start_transaction():
+                yield session
+        self.notify()
+
+    def notify(self) -> None:
+        """Tell the relay that new records were committed."""
+        self._committed.set()
+
+    async def wait_for_commit(self, timeout: float) -> None:
+        """Wait until records are committed or the timeout elapses.
+
+        Args:
+            timeout (float): Maximum wait in seconds
+        """
+        try:
+            await asyncio.wait_for(self._committed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._committed.clear()
+
+
+class OutboxRelay:
+    """Background task publishing outbox records to the event bus."""
+
+    def __init__(
+        self,
+        outbox: EventOutbox,
+        event_bus: Any,
+        batch_size: int = DEFAULT_RELAY_BATCH_SIZE,
+        poll_interval: float = DEFAULT_RELAY_POLL_INTERVAL,
+        retry_delay: float = DEFAULT_RELAY_RETRY_DELAY
+    ):
+        """Initialize the relay.
+
+        Args:
+            outbox (EventOutbox): Outbox to drain
+            event_bus: Event bus the records are published to
+            batch_size (int): Records read and published per round
+            poll_interval (float): Seconds between polls when no commit wakes the relay
+            retry_delay (float): Seconds before a failed record is retried
+        """
+        self.outbox = outbox
+        self.event_bus = event_bus
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"published": 0, "failed": 0, "batches": 0}
+
+    async def relay_once(self) -> int:
+        """Publish one batch of due records.
+
+        Returns:
+            int: Number of records published
+        """
+        now = datetime.utcnow()
+        cursor = self.outbox.collection.find({"available_at": {"$lte": now}})
+        records = await cursor.sort("available_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not records:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._publish(record) for record in records), return_exceptions=True
+        )
+        published = [record["_id"] for record, result in zip(records, results) if result is True]
+        failed = [record["_id"] for record, result in zip(records, results) if result is not True]
+
+        if published:
+            await self.outbox.collection.delete_many({"_id": {"$in": published}})
+        if failed:
+            await self.outbox.collection.update_many(
+                {"_id": {"$in": failed}},
+                {"$set": {"available_at": now + timedelta(seconds=self.retry_delay)}, "$inc": {"attempts": 1}}
+            )
+            logger.warning("Failed to relay %d outbox events, retrying in %.1fs", len(failed), self.retry_delay)
+
+        self._stats["published"] += len(published)
+        self._stats["failed"] += len(failed)
+        self._stats["batches"] += 1
+        return len(published)
+
+    async def _publish(self, record: Dict[str, Any]) -> bool:
+        """Publish one record to the event bus."""
+        return bool(await self.event_bus.publish(record["event_name"], json.loads(record["payload"])))
+
+    async def drain(self) -> int:
+        """Publish due records until a batch comes back short.
+
+        Returns:
+            int: Number of records published
+        """
+        total = 0
+        while True:
+            published = await self.relay_once()
+            total += published
+            if published < self.batch_size:
+                return total
+
+    def start(self) -> asyncio.Task:
+        """Start the relay loop.
+
+        Returns:
+            asyncio.Task: The relay task
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            self._register_background_task(self._task, "Event outbox relay")
+            logger.info("Event outbox relay started")
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the relay loop, then publish what is already due."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.drain()
+        except Exception as e:
+            logger.warning("Could not drain event outbox on shutdown: %s", str(e))
+        logger.info("Event outbox relay stopped")
+
+    async def _run(self) -> None:
+        """Relay batches whenever records are committed, and at least every poll interval."""
+        while True:
+            try:
+                await self.drain()
+                await self.outbox.wait_for_commit(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error relaying event outbox: %s", str(e))
+                await asyncio.sleep(self.poll_interval)
+
+    def _register_background_task(self, task: asyncio.Task, task_name: str) -> None:
+        """Register background task with the main application for proper shutdown."""
+        try:
+            # Import here to avoid circular imports
+            from src.main import register_background_task
+            register_background_task(task, task_name)
+        except ImportError:
+            logger.warning(f"Could not register background task {task_name} - main module not available")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return relay counters.
+
+        Returns:
+            Dict[str, int]: Published and failed records and batches relayed
+        """
+        return dict(self._stats)
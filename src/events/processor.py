@@ -9,9 +9,13 @@ import asyncio
 import json
 import logging
 import time
-from typing import Dict, Any, List, Optional, Callable, Awaitable
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Union
+from src.events import EVENT_BUS_CONFIG
 from src.events.bus import EventBus
+from src.events.dead_letter import DeadLetterStore
+from src.events.idempotency import ProcessedEventStore, RedisProcessedEventStore
 from src.events.models import BaseEvent, EVENT_MODELS, create_event
+from src.events.sharding import ShardConfig, ShardedWorkerPool
 from src.utils.logger import get_logger
 from src.config.manager import ConfigManager
 
@@ -31,29 +35,63 @@ class EventProcessingError(EventProcessorError):
 class EventProcessor:
     """Event processor for handling subscription-related events."""
     
-    def __init__(self, event_bus: EventBus, config_manager: Optional[ConfigManager] = None):
+    def __init__(
+        self,
+        event_bus: EventBus,
+        config_manager: Optional[ConfigManager] = None,
+        idempotency_store: Optional[Union[ProcessedEventStore, RedisProcessedEventStore]] = None,
+        dead_letter_store: Optional[DeadLetterStore] = None
+    ):
         """Initialize the event processor.
         
         Args:
             event_bus (EventBus): Event bus instance for publishing/subscribing to events
             config_manager (ConfigManager, optional): Configuration manager instance
+            idempotency_store (optional): Store of processed event IDs; defaults to an
+                in-memory store, or a Redis store when the ``idempotency_backend``
+                setting is ``"redis"``
+            dead_letter_store (DeadLetterStore, optional): Store of failed events;
+                defaults to the SQLite file set by ``dead_letter_path``
         """
         self.event_bus = event_bus
         self.config_manager = config_manager or ConfigManager()
         self._handlers: Dict[str, List[Callable[[BaseEvent], Awaitable[None]]]] = {}
+        # Event types delivered by the event bus through handle_bus_event
+        self._subscribed_event_types: set = set()
+        self._is_attached = False
         self._is_processing = False
         self._processing_task: Optional[asyncio.Task] = None
-        self._dead_letter_queue: List[Dict[str, Any]] = []
-        self._max_dead_letter_queue_size: int = 1000
+        if dead_letter_store is None:
+            dead_letter_store = DeadLetterStore(
+                EVENT_BUS_CONFIG.get("dead_letter_path", "event_log/dead_letter.db"),
+                retry_delay=self._calculate_retry_delay
+            )
+        self._dead_letter_queue = dead_letter_store
+        self._max_dead_letter_queue_size: int = EVENT_BUS_CONFIG.get("dead_letter_max_size", 100000)
+        self._dead_letter_page_size: int = EVENT_BUS_CONFIG.get("dead_letter_page_size", 100)
         
         # For idempotent processing - track processed events
-        self._processed_events: Dict[str, float] = {}  # event_id -> timestamp
         self._processed_events_max_size: int = 10000  # Max size of processed events cache
-        self._processed_events_ttl: int = 3600  # 1 hour TTL for processed events
+        self._processed_events_ttl: int = EVENT_BUS_CONFIG.get("idempotency_ttl", 3600)
+        if idempotency_store is None:
+            idempotency_store = ProcessedEventStore(
+                ttl=self._processed_events_ttl,
+                max_size=self._processed_events_max_size
+            )
+        self._processed_events = idempotency_store
         
         # For graceful shutdown - track currently processing events
         self._currently_processing_events: set = set()
         
+        # Workers sharded by user ID: concurrent across users, ordered per user
+        self._worker_pool = ShardedWorkerPool(
+            ShardConfig(
+                num_shards=EVENT_BUS_CONFIG.get("processor_shards", 8),
+                queue_size=EVENT_BUS_CONFIG.get("processor_shard_queue_size", 1000)
+            ),
+            self._dispatch_event
+        )
+        
         # Processing metrics
         self._metrics = {
             "events_processed": 0,
@@ -79,6 +117,17 @@ class EventProcessor:
                 logger.warning("Event processing is already running")
                 return True
             
+            # Share processed event IDs between workers when configured
+            if (EVENT_BUS_CONFIG.get("idempotency_backend") == "redis" and
+                    isinstance(self._processed_events, ProcessedEventStore) and
+                    self.event_bus.is_connected and self.event_bus.redis_client is not None):
+                self._processed_events = RedisProcessedEventStore(
+                    self.event_bus.redis_client,
+                    ttl=self._processed_events_ttl,
+                    local_cache=self._processed_events
+                )
+                logger.info("Using Redis for processed event tracking")
+            
             # Register default handlers for subscription-related events
             await self._register_default_handlers()
             
@@ -101,6 +150,9 @@ class EventProcessor:
         try:
             self._is_processing = False
             
+            # Let the workers finish the events already queued
+            await self._worker_pool.stop(timeout=10.0)
+            
             # Cancel processing task if running
             if self._processing_task and not self._processing_task.done():
                 self._processing_task.cancel()
@@ -159,6 +211,10 @@ class EventProcessor:
                 self._handlers[event_type] = []
             self._handlers[event_type].append(handler)
             
+            # Once attached, handlers of new event types are fed by the event bus too
+            if self._is_attached:
+                await self._subscribe_to_bus(event_type)
+            
             logger.debug("Handler registered for event type: %s", event_type)
             return True
             
@@ -166,6 +222,93 @@ class EventProcessor:
             logger.error("Error registering handler for event type %s: %s", event_type, str(e))
             return False
     
+    async def attach(self) -> bool:
+        """Subscribe to the event bus for every event type with a handler.
+        
+        Events received from the bus go through ``handle_bus_event`` to the worker
+        of their user. Handlers registered afterwards are subscribed as well, and
+        attaching again only subscribes event types not subscribed yet.
+        
+        Returns:
+            bool: True if every event type was subscribed, False otherwise
+        """
+        self._is_attached = True
+        subscribed = [
+            await self._subscribe_to_bus(event_type)
+            for event_type in list(self._handlers)
+        ]
+        return all(subscribed)
+    
+    async def _subscribe_to_bus(self, event_type: str) -> bool:
+        """Subscribe ``handle_bus_event`` to an event type once.
+        
+        Args:
+            event_type (str): Type of event to receive from the event bus
+            
+        Returns:
+            bool: True if the event type is subscribed, False otherwise
+        """
+        if event_type in self._subscribed_event_types:
+            return True
+        if not await self.event_bus.subscribe(event_type, self.handle_bus_event):
+            logger.error("Could not subscribe event processor to %s events", event_type)
+            return False
+        self._subscribed_event_types.add(event_type)
+        return True
+    
+    async def process_event(self, event: BaseEvent) -> None:
+        """Process an event on the worker of its user.
+        
+        Events of the same user are handled in the order they are submitted. While
+        the worker of that user is full this waits, slowing the producer down.
+        When processing is not started the event is handled inline.
+        
+        Args:
+            event (BaseEvent): Event to process
+        """
+        if self._is_processing:
+            # Workers are started with the first event
+            self._worker_pool.start()
+            await self._worker_pool.submit(event.user_id, event)
+        else:
+            await self._dispatch_event(event)
+    
+    async def handle_bus_event(self, payload: Dict[str, Any]) -> None:
+        """Event bus subscriber feeding events to the processor.
+        
+        Returns only once the handlers of the event ran on the worker of its user,
+        and raises when they failed, so the event bus acknowledges a stream entry
+        only after it was handled and leaves failed entries pending for redelivery.
+        
+        Args:
+            payload (Dict[str, Any]): Event payload received from the event bus
+        """
+        event_type = payload.get("event_type", "unknown")
+        try:
+            event_class = EVENT_MODELS.get(event_type, BaseEvent)
+            event = event_class(**payload)
+        except Exception as e:
+            logger.error("Invalid %s event received from event bus: %s", event_type, str(e))
+            return
+        if self._is_processing:
+            self._worker_pool.start()
+            await self._worker_pool.run(event.user_id, event)
+        else:
+            await self._dispatch_event(event)
+    
+    async def _dispatch_event(self, event: BaseEvent) -> None:
+        """Run the registered handlers of an event.
+        
+        Args:
+            event (BaseEvent): Event to dispatch
+        """
+        handlers = self._handlers.get(event.event_type)
+        if not handlers:
+            logger.debug("No handler registered for event type: %s", event.event_type)
+            return
+        for handler in handlers:
+            await handler(event)
+    
     async def _handle_subscription_updated(self, event: BaseEvent) -> None:
         """Handle subscription updated events.
         
@@ -178,8 +321,8 @@ class EventProcessor:
         self._currently_processing_events.add(event.event_id)
         
         try:
-            # Check if event has already been processed (idempotent processing)
-            if self._is_event_processed(event):
+            # Claim the event so it is processed once across redeliveries and workers
+            if not await self._claim_event(event):
                 logger.debug("Event already processed, skipping: %s", event.event_id)
                 self._currently_processing_events.discard(event.event_id)
                 return
@@ -189,9 +332,6 @@ class EventProcessor:
                 # Process subscription update
                 await self._process_subscription_update(event)
                 
-                # Mark event as processed
-                self._mark_event_processed(event)
-                
                 # Update metrics
                 processing_time = time.time() - start_time
                 self._metrics["events_processed"] += 1
@@ -206,6 +346,7 @@ class EventProcessor:
                 self._metrics["events_failed"] += 1
                 self._add_processing_time(processing_time)
                 logger.error("Error handling subscription updated event: %s", str(e))
+                await self._release_event(event)
                 await self._handle_processing_failure(event, e)
         finally:
             # Remove from currently processing events
@@ -223,8 +364,8 @@ class EventProcessor:
         self._currently_processing_events.add(event.event_id)
         
         try:
-            # Check if event has already been processed (idempotent processing)
-            if self._is_event_processed(event):
+            # Claim the event so it is processed once across redeliveries and workers
+            if not await self._claim_event(event):
                 logger.debug("Event already processed, skipping: %s", event.event_id)
                 self._currently_processing_events.discard(event.event_id)
                 return
@@ -234,9 +375,6 @@ class EventProcessor:
                 # Process user registration
                 await self._process_user_registration(event)
                 
-                # Mark event as processed
-                self._mark_event_processed(event)
-                
                 # Update metrics
                 processing_time = time.time() - start_time
                 self._metrics["events_processed"] += 1
@@ -251,6 +389,7 @@ class EventProcessor:
                 self._metrics["events_failed"] += 1
                 self._add_processing_time(processing_time)
                 logger.error("Error handling user registered event: %s", str(e))
+                await self._release_event(event)
                 await self._handle_processing_failure(event, e)
         finally:
             # Remove from currently processing events
@@ -268,8 +407,8 @@ class EventProcessor:
         self._currently_processing_events.add(event.event_id)
         
         try:
-            # Check if event has already been processed (idempotent processing)
-            if self._is_event_processed(event):
+            # Claim the event so it is processed once across redeliveries and workers
+            if not await self._claim_event(event):
                 logger.debug("Event already processed, skipping: %s", event.event_id)
                 self._currently_processing_events.discard(event.event_id)
                 return
@@ -279,9 +418,6 @@ class EventProcessor:
                 # Process user deletion
                 await self._process_user_deletion(event)
                 
-                # Mark event as processed
-                self._mark_event_processed(event)
-                
                 # Update metrics
                 processing_time = time.time() - start_time
                 self._metrics["events_processed"] += 1
@@ -296,6 +432,7 @@ class EventProcessor:
                 self._metrics["events_failed"] += 1
                 self._add_processing_time(processing_time)
                 logger.error("Error handling user deleted event: %s", str(e))
+                await self._release_event(event)
                 await self._handle_processing_failure(event, e)
         finally:
             # Remove from currently processing events
@@ -313,8 +450,8 @@ class EventProcessor:
         self._currently_processing_events.add(event.event_id)
         
         try:
-            # Check if event has already been processed (idempotent processing)
-            if self._is_event_processed(event):
+            # Claim the event so it is processed once across redeliveries and workers
+            if not await self._claim_event(event):
                 logger.debug("Event already processed, skipping: %s", event.event_id)
                 self._currently_processing_events.discard(event.event_id)
                 return
@@ -324,9 +461,6 @@ class EventProcessor:
                 # Process besitos award
                 await self._process_besitos_award(event)
                 
-                # Mark event as processed
-                self._mark_event_processed(event)
-                
                 # Update metrics
                 processing_time = time.time() - start_time
                 self._metrics["events_processed"] += 1
@@ -341,6 +475,7 @@ class EventProcessor:
                 self._metrics["events_failed"] += 1
                 self._add_processing_time(processing_time)
                 logger.error("Error handling besitos awarded event: %s", str(e))
+                await self._release_event(event)
                 await self._handle_processing_failure(event, e)
         finally:
             # Remove from currently processing events
@@ -358,8 +493,8 @@ class EventProcessor:
         self._currently_processing_events.add(event.event_id)
         
         try:
-            # Check if event has already been processed (idempotent processing)
-            if self._is_event_processed(event):
+            # Claim the event so it is processed once across redeliveries and workers
+            if not await self._claim_event(event):
                 logger.debug("Event already processed, skipping: %s", event.event_id)
                 self._currently_processing_events.discard(event.event_id)
                 return
@@ -369,9 +504,6 @@ class EventProcessor:
                 # Process VIP access grant
                 await self._process_vip_access_grant(event)
                 
-                # Mark event as processed
-                self._mark_event_processed(event)
-                
                 # Update metrics
                 processing_time = time.time() - start_time
                 self._metrics["events_processed"] += 1
@@ -386,6 +518,7 @@ class EventProcessor:
                 self._metrics["events_failed"] += 1
                 self._add_processing_time(processing_time)
                 logger.error("Error handling VIP access granted event: %s", str(e))
+                await self._release_event(event)
                 await self._handle_processing_failure(event, e)
         finally:
             # Remove from currently processing events
@@ -528,9 +661,10 @@ class EventProcessor:
         
         try:
             # Check queue size
-            if len(self._dead_letter_queue) >= self._max_dead_letter_queue_size:
+            overflow = len(self._dead_letter_queue) - self._max_dead_letter_queue_size + 1
+            if overflow > 0:
                 logger.warning("Dead letter queue is full, dropping oldest event")
-                self._dead_letter_queue.pop(0)  # Remove oldest event
+                self._dead_letter_queue.evict_oldest(overflow)
             
             # Add event to queue
             dead_letter_entry = {
@@ -566,10 +700,14 @@ class EventProcessor:
         return max(1, delay + jitter)
     
     async def retry_dead_letter_queue(self) -> None:
-        """Retry processing events in the dead letter queue with exponential backoff."""
+        """Retry processing events in the dead letter queue with exponential backoff.
+        
+        Due entries are read from the store one page at a time, so the size of the
+        backlog does not affect memory use.
+        """
         logger.info("Retrying dead letter queue processing")
         
-        if not self._dead_letter_queue:
+        if not len(self._dead_letter_queue):
             logger.debug("Dead letter queue is empty")
             return
         
@@ -579,88 +717,89 @@ class EventProcessor:
         processed_count = 0
         failed_count = 0
         current_time = time.time()
+        after = None
         
-        # Create a copy of the queue to iterate over, as we'll be modifying the original
-        dlq_copy = self._dead_letter_queue.copy()
-        events_to_remove = []
-        
-        for dead_letter_entry in dlq_copy:
-            try:
-                # Check if enough time has passed for retry
+        while True:
+            page = self._dead_letter_queue.due_entries(
+                current_time, self._dead_letter_page_size, after=after
+            )
+            if not page:
+                break
+            after = (page[-1]["next_retry_at"], page[-1]["dlq_id"])
+            
+            events_to_remove = []
+            retry_updates = []
+            
+            for dead_letter_entry in page:
+                dlq_id = dead_letter_entry["dlq_id"]
                 retry_count = dead_letter_entry.get("retry_count", 0)
-                last_retry = dead_letter_entry.get("last_retry_timestamp", 0)
-                retry_delay = self._calculate_retry_delay(retry_count)
-                
-                if current_time - last_retry < retry_delay:
-                    # Not time to retry yet, skip this event
-                    continue
-                
-                # Get event data
-                event_data = dead_letter_entry["event"]
-                event_type = event_data.get("event_type", "unknown")
-                
-                # Recreate event object
-                event_class = EVENT_MODELS.get(event_type, BaseEvent)
-                event = event_class(**event_data)
-                
-                # Check if we should retry this event (max 5 attempts)
-                if retry_count >= 5:
-                    logger.warning(
-                        "Event has exceeded maximum retry attempts, keeping in dead letter queue: %s",
-                        event.event_id
-                    )
-                    # Update retry timestamp but keep in queue
-                    dead_letter_entry["last_retry_timestamp"] = current_time
-                    failed_count += 1
-                    continue
-                
-                # Try to process the event again
-                if event_type in self._handlers:
-                    success = False
-                    for handler in self._handlers[event_type]:
-                        try:
-                            start_time = time.time()
-                            await handler(event)
-                            processing_time = time.time() - start_time
-                            self._metrics["events_processed"] += 1
-                            self._metrics["events_retried"] += 1
-                            self._add_processing_time(processing_time)
-                            success = True
-                            processed_count += 1
-                            # Mark for removal from DLQ
-                            events_to_remove.append(dead_letter_entry)
-                            logger.info("Successfully retried event: %s", event.event_id)
-                            break  # Success, move to next event
-                        except Exception as e:
-                            processing_time = time.time() - start_time
-                            self._add_processing_time(processing_time)
-                            logger.warning(
-                                "Failed to retry event processing: %s - %s",
-                                event.event_id,
-                                str(e)
-                            )
-                            break
+                try:
+                    # Get event data
+                    event_data = dead_letter_entry["event"]
+                    event_type = event_data.get("event_type", "unknown")
+                    
+                    # Recreate event object
+                    event_class = EVENT_MODELS.get(event_type, BaseEvent)
+                    event = event_class(**event_data)
                     
-                    if not success:
-                        # Increment retry count and update timestamp
-                        dead_letter_entry["retry_count"] = retry_count + 1
-                        dead_letter_entry["last_retry_timestamp"] = current_time
+                    # Check if we should retry this event (max 5 attempts)
+                    if retry_count >= 5:
+                        logger.warning(
+                            "Event has exceeded maximum retry attempts, keeping in dead letter queue: %s",
+                            event.event_id
+                        )
+                        # Update retry timestamp but keep in queue
+                        retry_updates.append((dlq_id, retry_count, current_time))
                         failed_count += 1
-                else:
-                    logger.warning("No handler found for event type: %s", event_type)
-                    # For unknown event types, we'll keep them in the queue
-                    dead_letter_entry["retry_count"] = retry_count + 1
-                    dead_letter_entry["last_retry_timestamp"] = current_time
-                    failed_count += 1
+                        continue
                     
-            except Exception as e:
-                logger.error("Error processing dead letter queue: %s", str(e))
-                failed_count += 1
-        
-        # Remove successfully processed events from the original queue
-        for entry in events_to_remove:
-            if entry in self._dead_letter_queue:
-                self._dead_letter_queue.remove(entry)
+                    # Try to process the event again
+                    if event_type in self._handlers:
+                        success = False
+                        for handler in self._handlers[event_type]:
+                            try:
+                                start_time = time.time()
+                                await handler(event)
+                                processing_time = time.time() - start_time
+                                self._metrics["events_processed"] += 1
+                                self._metrics["events_retried"] += 1
+                                self._add_processing_time(processing_time)
+                                success = True
+                                processed_count += 1
+                                # Mark for removal from DLQ
+                                events_to_remove.append(dlq_id)
+                                logger.info("Successfully retried event: %s", event.event_id)
+                                break  # Success, move to next event
+                            except Exception as e:
+                                processing_time = time.time() - start_time
+                                self._add_processing_time(processing_time)
+                                logger.warning(
+                                    "Failed to retry event processing: %s - %s",
+                                    event.event_id,
+                                    str(e)
+                                )
+                                break
+                        
+                        if not success:
+                            # Increment retry count and update timestamp
+                            retry_updates.append((dlq_id, retry_count + 1, current_time))
+                            failed_count += 1
+                    else:
+                        logger.warning("No handler found for event type: %s", event_type)
+                        # For unknown event types, we'll keep them in the queue
+                        retry_updates.append((dlq_id, retry_count + 1, current_time))
+                        failed_count += 1
+                        
+                except Exception as e:
+                    logger.error("Error processing dead letter queue: %s", str(e))
+                    failed_count += 1
+            
+            # Apply the outcome of the page in one write each
+            self._dead_letter_queue.remove_many(events_to_remove)
+            self._dead_letter_queue.update_retries(retry_updates)
+            
+            if len(page) < self._dead_letter_page_size:
+                break
         
         # Update metrics
         self._metrics["dlq_size"] = len(self._dead_letter_queue)
@@ -672,52 +811,29 @@ class EventProcessor:
                 failed_count
             )
     
-    def _cleanup_expired_processed_events(self) -> None:
-        """Clean up expired entries from the processed events cache."""
-        current_time = time.time()
-        expired_keys = [
-            event_id for event_id, timestamp in self._processed_events.items()
-            if current_time - timestamp > self._processed_events_ttl
-        ]
+    async def _claim_event(self, event: BaseEvent) -> bool:
+        """Claim an event for processing (for idempotent processing).
         
-        for event_id in expired_keys:
-            del self._processed_events[event_id]
-        
-        logger.debug("Cleaned up %d expired processed events", len(expired_keys))
-    
-    def _is_event_processed(self, event: BaseEvent) -> bool:
-        """Check if an event has already been processed (for idempotent processing).
+        Checking and recording the event ID is one store operation, so
+        concurrent deliveries of the same event cannot both be processed.
         
         Args:
-            event (BaseEvent): Event to check
+            event (BaseEvent): Event to claim
             
         Returns:
-            bool: True if event has been processed, False otherwise
+            bool: True if the event should be processed, False if it was already claimed
         """
-        # Clean up expired entries first
-        self._cleanup_expired_processed_events()
-        
-        # Check if event has been processed
-        return event.event_id in self._processed_events
+        return await self._processed_events.claim(event.event_id)
     
-    def _mark_event_processed(self, event: BaseEvent) -> None:
-        """Mark an event as processed (for idempotent processing).
+    async def _release_event(self, event: BaseEvent) -> None:
+        """Release the claim on an event whose processing failed, so it can be retried.
         
         Args:
-            event (BaseEvent): Event to mark as processed
+            event (BaseEvent): Event to release
         """
-        # Clean up expired entries first to maintain cache size
-        self._cleanup_expired_processed_events()
-        
-        # If cache is at max size, remove oldest entry
-        if len(self._processed_events) >= self._processed_events_max_size:
-            oldest_key = min(self._processed_events.keys(), key=lambda k: self._processed_events[k])
-            del self._processed_events[oldest_key]
-        
-        # Mark event as processed
-        self._processed_events[event.event_id] = time.time()
+        await self._processed_events.release(event.event_id)
         
-        logger.debug("Marked event as processed: %s", event.event_id)
+        logger.debug("Released claim on event: %s", event.event_id)
     
     def _add_processing_time(self, processing_time: float) -> None:
         """Add processing time to metrics.
@@ -750,6 +866,8 @@ class EventProcessor:
             "dead_letter_queue_size": len(self._dead_letter_queue),
             "event_bus_connected": self.event_bus.is_connected if self.event_bus else False,
             "processed_events_cache_size": len(self._processed_events),
+            "queued_events": self._worker_pool.queued_count,
+            "shards": self._worker_pool.get_stats(),
             "metrics": {
                 "events_processed": self._metrics["events_processed"],
                 "events_failed": self._metrics["events_failed"],
@@ -780,7 +898,7 @@ class EventProcessor:
 
 # Convenience function for easy usage
 async def create_event_processor(event_bus: EventBus, config_manager: Optional[ConfigManager] = None) -> EventProcessor:
-    """Create and start an event processor instance.
+    """Create and start an event processor instance subscribed to the event bus.
     
     Args:
         event_bus (EventBus): Event bus instance
@@ -791,4 +909,5 @@ async def create_event_processor(event_bus: EventBus, config_manager: Optional[C
     """
     event_processor = EventProcessor(event_bus, config_manager)
     await event_processor.start_processing()
+    await event_processor.attach()
     return event_processor
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Append-only segment log for the YABOT event bus.
+
+This module provides the on-disk persistence used by the event bus while Redis is
+unavailable. Records are appended as JSON lines to fixed-size segment files, fsync
+is batched, a replay cursor marks what was acknowledged, and segments that only
+hold acknowledged records are deleted.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SEGMENT_SUFFIX = ".log"
+CURSOR_FILE = "cursor"
+
+
+class SegmentLogError(Exception):
+    """Exception raised when the segment log cannot be read or written."""
+    pass
+
+
+@dataclass
+class SegmentLogConfig:
+    """Configuration for a segment log."""
+    segment_max_records: int = 10000
+    fsync_batch_size: int = 256
+    fsync_interval: float = 1.0  # seconds
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values json does not handle natively."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, set):
+        return list(obj)
+    return str(obj)
+
+
+class SegmentLog:
+    """Segmented append-only log with a replay cursor and compaction."""
+
+    def __init__(self, directory: str, config: Optional[SegmentLogConfig] = None):
+        """Open (or create) a segment log.
+
+        Args:
+            directory (str): Directory holding the segment files
+            config (SegmentLogConfig, optional): Log configuration
+        """
+        self.directory = directory
+        self.config = config or SegmentLogConfig()
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._segments: List[int] = self._list_segments()  # first sequence of each segment
+        self._cursor: int = self._read_cursor()
+        self._next_seq: int = self._scan_next_seq()
+        self._active_records: int = 0
+        self._active_file = None
+        self._unsynced: int = 0
+        self._last_sync: float = time.monotonic()
+
+        # Drop segments acknowledged before the last shutdown
+        self.compact()
+
+    def _segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, f"{first_seq:020d}{SEGMENT_SUFFIX}")
+
+    def _list_segments(self) -> List[int]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SEGMENT_SUFFIX):
+                try:
+                    segments.append(int(name[:-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    logger.warning("Ignoring unexpected file in segment log: %s", name)
+        return sorted(segments)
+
+    def _read_cursor(self) -> int:
+        try:
+            with open(os.path.join(self.directory, CURSOR_FILE), "r") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError as e:
+            raise SegmentLogError(f"Corrupted cursor in {self.directory}: {e}")
+
+    def _scan_next_seq(self) -> int:
+        """Find the sequence following the last record on disk."""
+        if not self._segments:
+            return self._cursor + 1
+        last_seq = self._segments[-1] - 1
+        for seq, _ in self._read_segment(self._segments[-1]):
+            last_seq = seq
+        return max(last_seq, self._cursor) + 1
+
+    def _read_segment(self, first_seq: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield the records of one segment, stopping at a torn last line."""
+        with open(self._segment_path(first_seq), "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping torn record at end of segment %d", first_seq)
+                    break
+                yield entry["seq"], entry["data"]
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Append a record to the log.
+
+        Args:
+            record (Dict[str, Any]): JSON serializable record
+
+        Returns:
+            int: Sequence number assigned to the record
+        """
+        if self._active_file is None or self._active_records >= self.config.segment_max_records:
+            self._open_new_segment()
+
+        seq = self._next_seq
+        line = json.dumps({"seq": seq, "data": record}, default=_json_default)
+        self._active_file.write(line.encode("utf-8") + b"\n")
+        self._active_file.flush()
+        self._next_seq += 1
+        self._active_records += 1
+        self._unsynced += 1
+
+        if (self._unsynced >= self.config.fsync_batch_size or
+                time.monotonic() - self._last_sync >= self.config.fsync_interval):
+            self.sync()
+        return seq
+
+    def _open_new_segment(self) -> None:
+        """Start writing to a new segment file."""
+        if self._active_file is not None:
+            self.sync()
+            self._active_file.close()
+        self._active_file = open(self._segment_path(self._next_seq), "ab")
+        if not self._segments or self._segments[-1] != self._next_seq:
+            self._segments.append(self._next_seq)
+        self._active_records = 0
+
+    def roll(self) -> None:
+        """Close the active segment so the next append starts a new one."""
+        if self._active_file is not None:
+            self.sync()
+            self._active_file.close()
+            self._active_file = None
+
+    def sync(self) -> None:
+        """Flush appended records to stable storage."""
+        if self._active_file is not None and self._unsynced:
+            self._active_file.flush()
+            os.fsync(self._active_file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def replay(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield every record that was not acknowledged yet.
+
+        Yields:
+            Tuple[int, Dict[str, Any]]: Sequence number and record
+        """
+        if self._active_file is not None:
+            self._active_file.flush()
+        for first_seq in list(self._segments):
+            for seq, record in self._read_segment(first_seq):
+                if seq > self._cursor:
+                    yield seq, record
+
+    def commit(self, seq: int) -> None:
+        """Acknowledge every record up to a sequence number and compact the log.
+
+        Args:
+            seq (int): Last acknowledged sequence number
+        """
+        if seq <= self._cursor:
+            return
+        self._cursor = min(seq, self._next_seq - 1)
+
+        cursor_path = os.path.join(self.directory, CURSOR_FILE)
+        tmp_path = cursor_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(self._cursor))
+        os.replace(tmp_path, cursor_path)
+
+        self.compact()
+
+    def compact(self) -> int:
+        """Delete segments holding only acknowledged records.
+
+        Returns:
+            int: Number of deleted segments
+        """
+        removed = 0
+        # A segment is fully acknowledged when the next one starts at or below cursor + 1
+        while len(self._segments) > 1 and self._segments[1] <= self._cursor + 1:
+            os.remove(self._segment_path(self._segments.pop(0)))
+            removed += 1
+
+        # The last segment can go too once it is closed and fully acknowledged
+        if (self._segments and self._active_file is None and
+                self._next_seq - 1 <= self._cursor):
+            os.remove(self._segment_path(self._segments.pop(0)))
+            removed += 1
+
+        if removed:
+            logger.debug("Compacted %d segments in %s", removed, self.directory)
+        return removed
+
+    @property
+    def cursor(self) -> int:
+        """Get the last acknowledged sequence number."""
+        return self._cursor
+
+    @property
+    def last_seq(self) -> int:
+        """Get the sequence number of the last appended record."""
+        return self._next_seq - 1
+
+    @property
+    def pending_count(self) -> int:
+        """Get the number of records appended after the cursor."""
+        return self._next_seq - 1 - self._cursor
+
+    @property
+    def segment_count(self) -> int:
+        """Get the number of segment files on disk."""
+        return len(self._segments)
+
+    def close(self) -> None:
+        """Sync and close the active segment, then drop acknowledged segments."""
+        self.roll()
+        self.compact()
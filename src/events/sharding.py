@@ -0,0 +1,205 @@
+"""
+Keyed worker pool for the YABOT event processor.
+
+Events are routed to a fixed number of asyncio workers by hashing a key (the
+user ID), so events of different users run concurrently while the events of one
+user are handled strictly in order by the same worker. Each worker has a bounded
+queue, and submitting to a full queue waits, which pushes back on producers.
+"""
+
+import asyncio
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ShardConfig:
+    """Configuration for the keyed worker pool."""
+    num_shards: int = 8
+    queue_size: int = 1000  # per-shard queue bound, producers wait when full
+
+
+class ShardedWorkerPool:
+    """Fixed set of workers, each consuming the items of its shard in order."""
+
+    def __init__(self, config: ShardConfig, handler: Callable[[Any], Awaitable[None]]):
+        """Initialize the worker pool.
+
+        Args:
+            config (ShardConfig): Worker pool configuration
+            handler (Callable): Coroutine handling one item
+        """
+        self.config = config
+        self._handler = handler
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._metrics: List[Dict[str, float]] = [
+            {
+                "processed": 0,
+                "failed": 0,
+                "max_depth": 0,
+                "last_lag_ms": 0.0,
+                "max_lag_ms": 0.0
+            }
+            for _ in range(config.num_shards)
+        ]
+
+    def shard_for(self, key: Optional[str]) -> int:
+        """Get the shard handling a key.
+
+        Args:
+            key (str, optional): Routing key, such as a user ID
+
+        Returns:
+            int: Index of the shard
+        """
+        if key is None:
+            return 0
+        return zlib.crc32(str(key).encode("utf-8")) % self.config.num_shards
+
+    def start(self) -> None:
+        """Start the workers."""
+        if self._workers:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.config.queue_size) for _ in range(self.config.num_shards)]
+        self._workers = [
+            asyncio.create_task(self._worker_loop(shard)) for shard in range(self.config.num_shards)
+        ]
+        logger.info("Started %d event processing workers", self.config.num_shards)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let the workers drain their queues, then stop them.
+
+        Args:
+            timeout (float): Seconds to wait for the queues to drain
+        """
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Timed out draining event workers, %d events not processed", self.queued_count
+            )
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queues = []
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the workers are running."""
+        return bool(self._workers)
+
+    @property
+    def queued_count(self) -> int:
+        """Get the number of items waiting in all shards."""
+        return sum(queue.qsize() for queue in self._queues)
+
+    async def submit(self, key: Optional[str], item: Any) -> int:
+        """Queue an item on the shard of its key, waiting while the shard is full.
+
+        Args:
+            key (str, optional): Routing key, such as a user ID
+            item: Item passed to the handler
+
+        Returns:
+            int: Index of the shard the item was queued on
+        """
+        return await self._enqueue(key, item, None)
+
+    async def run(self, key: Optional[str], item: Any) -> None:
+        """Queue an item on the shard of its key and wait until it is handled.
+
+        Args:
+            key (str, optional): Routing key, such as a user ID
+            item: Item passed to the handler
+
+        Raises:
+            Exception: The error raised by the handler for the item
+        """
+        done = asyncio.get_running_loop().create_future()
+        await self._enqueue(key, item, done)
+        await done
+
+    async def _enqueue(self, key: Optional[str], item: Any, done: Optional[asyncio.Future]) -> int:
+        """Queue an item with the future to resolve once it is handled.
+
+        Args:
+            key (str, optional): Routing key, such as a user ID
+            item: Item passed to the handler
+            done (asyncio.Future, optional): Future resolved with the outcome of the handler
+
+        Returns:
+            int: Index of the shard the item was queued on
+        """
+        if not self._workers:
+            raise RuntimeError("Worker pool is not running")
+
+        shard = self.shard_for(key)
+        queue = self._queues[shard]
+        await queue.put((time.monotonic(), item, done))
+
+        metrics = self._metrics[shard]
+        metrics["max_depth"] = max(metrics["max_depth"], queue.qsize())
+        return shard
+
+    async def _worker_loop(self, shard: int) -> None:
+        """Handle the items of one shard in order.
+
+        Args:
+            shard (int): Index of the shard
+        """
+        queue = self._queues[shard]
+        metrics = self._metrics[shard]
+        while True:
+            enqueued_at, item, done = await queue.get()
+            lag_ms = (time.monotonic() - enqueued_at) * 1000
+            metrics["last_lag_ms"] = lag_ms
+            metrics["max_lag_ms"] = max(metrics["max_lag_ms"], lag_ms)
+            try:
+                await self._handler(item)
+                metrics["processed"] += 1
+                if done is not None and not done.done():
+                    done.set_result(None)
+            except asyncio.CancelledError:
+                if done is not None and not done.done():
+                    done.cancel()
+                raise
+            except Exception as e:
+                metrics["failed"] += 1
+                logger.error("Error in event worker %d: %s", shard, str(e))
+                if done is not None and not done.done():
+                    done.set_exception(e)
+            finally:
+                queue.task_done()
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        """Get per-shard queue depth and lag statistics.
+
+        Returns:
+            List[Dict[str, Any]]: Statistics of each shard
+        """
+        stats = []
+        for shard, metrics in enumerate(self._metrics):
+            depth = self._queues[shard].qsize() if self._queues else 0
+            stats.append({
+                "shard": shard,
+                "depth": depth,
+                "max_depth": metrics["max_depth"],
+                "processed": metrics["processed"],
+                "failed": metrics["failed"],
+                "last_lag_ms": round(metrics["last_lag_ms"], 2),
+                "max_lag_ms": round(metrics["max_lag_ms"], 2)
+            })
+        return stats
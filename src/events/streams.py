@@ -0,0 +1,379 @@
+"""
+Redis Streams transport for the YABOT event bus.
+
+This module provides a consumer-group based transport so that published events
+are durable in Redis and can be shared between several worker processes. Events
+are appended with XADD, consumed with XREADGROUP, acknowledged with XACK once
+every local handler succeeded, and reclaimed from idle consumers with XCLAIM.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from redis.exceptions import ResponseError
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _default_consumer_name() -> str:
+    """Build a consumer name that is unique per worker process."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass
+class StreamConfig:
+    """Configuration for the Redis Streams transport."""
+    stream_prefix: str = "yabot:events:"
+    consumer_group: str = "yabot"
+    consumer_name: str = field(default_factory=_default_consumer_name)
+    max_stream_length: int = 100000
+    read_count: int = 50
+    block_ms: int = 1000
+    claim_min_idle_ms: int = 30000
+    claim_interval: float = 15.0
+    max_deliveries: int = 5
+
+
+StreamDispatcher = Callable[[str, Dict[str, Any]], Awaitable[bool]]
+StreamExhaustedHandler = Callable[[str, Dict[str, Any], int], Awaitable[None]]
+
+
+class RedisStreamTransport:
+    """Publishes events to Redis Streams and consumes them through a consumer group."""
+
+    def __init__(
+        self,
+        redis_client: Any,
+        config: StreamConfig,
+        dispatcher: StreamDispatcher,
+        on_exhausted: Optional[StreamExhaustedHandler] = None
+    ):
+        """Initialize the stream transport.
+
+        Args:
+            redis_client: Async Redis client used for stream commands
+            config (StreamConfig): Stream transport configuration
+            dispatcher (Callable): Coroutine delivering an event to local handlers,
+                returning True when every handler succeeded
+            on_exhausted (Callable, optional): Coroutine called when an entry
+                exceeded the maximum number of deliveries
+        """
+        self._redis_client = redis_client
+        self.config = config
+        self._dispatcher = dispatcher
+        self._on_exhausted = on_exhausted
+        self._streams: Dict[str, str] = {}  # stream key -> event name
+        self._groups_ready: Set[str] = set()
+        self._consumer_task: Optional[asyncio.Task] = None
+        self._last_claim_time: float = 0.0
+        self._metrics = {
+            "published": 0,
+            "delivered": 0,
+            "acknowledged": 0,
+            "failed": 0,
+            "reclaimed": 0,
+            "dead_lettered": 0
+        }
+
+    def stream_key(self, event_name: str) -> str:
+        """Get the Redis stream key for an event name.
+
+        Args:
+            event_name (str): Name of the event
+
+        Returns:
+            str: Redis key of the stream holding the event
+        """
+        return f"{self.config.stream_prefix}{event_name}"
+
+    async def publish(self, event_name: str, serialized_payload: str) -> str:
+        """Append an event to its stream.
+
+        Args:
+            event_name (str): Name of the event
+            serialized_payload (str): JSON serialized event payload
+
+        Returns:
+            str: ID of the new stream entry
+        """
+        entry_id = await self._redis_client.xadd(
+            self.stream_key(event_name),
+            {"event_name": event_name, "payload": serialized_payload},
+            maxlen=self.config.max_stream_length,
+            approximate=True
+        )
+        self._metrics["published"] += 1
+        return entry_id
+
+    def stage_publish(self, pipeline: Any, event_name: str, serialized_payload: str) -> None:
+        """Add the XADD of an event to a Redis pipeline.
+
+        Args:
+            pipeline: Redis pipeline collecting the commands of a batch
+            event_name (str): Name of the event
+            serialized_payload (str): JSON serialized event payload
+        """
+        pipeline.xadd(
+            self.stream_key(event_name),
+            {"event_name": event_name, "payload": serialized_payload},
+            maxlen=self.config.max_stream_length,
+            approximate=True
+        )
+        self._metrics["published"] += 1
+
+    async def add_stream(self, event_name: str) -> None:
+        """Start consuming the stream of an event type.
+
+        Args:
+            event_name (str): Name of the event to consume
+        """
+        key = self.stream_key(event_name)
+        if key in self._streams:
+            return
+        self._streams[key] = event_name
+        await self._ensure_group(key)
+        logger.debug("Consuming stream %s as %s", key, self.config.consumer_name)
+
+    async def _ensure_group(self, key: str) -> None:
+        """Create the consumer group for a stream if it does not exist yet.
+
+        Args:
+            key (str): Redis stream key
+        """
+        if key in self._groups_ready:
+            return
+        try:
+            await self._redis_client.xgroup_create(
+                key, self.config.consumer_group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._groups_ready.add(key)
+
+    def start(self) -> asyncio.Task:
+        """Start the consumer loop.
+
+        Returns:
+            asyncio.Task: The running consumer task
+        """
+        if self._consumer_task is None or self._consumer_task.done():
+            self._consumer_task = asyncio.create_task(self._consume_loop())
+            logger.info(
+                "Started stream consumer %s in group %s",
+                self.config.consumer_name,
+                self.config.consumer_group
+            )
+        return self._consumer_task
+
+    async def stop(self) -> None:
+        """Stop the consumer loop."""
+        if self._consumer_task and not self._consumer_task.done():
+            self._consumer_task.cancel()
+            try:
+                await asyncio.wait_for(self._consumer_task, timeout=2.0)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                logger.debug("Stream consumer cancelled/timed out during shutdown")
+        self._consumer_task = None
+
+    @property
+    def consumer_task(self) -> Optional[asyncio.Task]:
+        """Get the running consumer task, if any."""
+        return self._consumer_task
+
+    async def _consume_loop(self) -> None:
+        """Read new entries from the subscribed streams and dispatch them."""
+        while True:
+            try:
+                if not self._streams:
+                    await asyncio.sleep(self.config.block_ms / 1000)
+                    continue
+
+                if time.monotonic() - self._last_claim_time >= self.config.claim_interval:
+                    await self.reclaim_pending()
+
+                await self.read_once()
+
+            except asyncio.CancelledError:
+                logger.info("Stream consumer cancelled")
+                break
+            except Exception as e:
+                logger.error("Error in stream consumer loop: %s", str(e))
+                await asyncio.sleep(1.0)
+
+    async def read_once(self) -> int:
+        """Read and dispatch one batch of new entries.
+
+        Returns:
+            int: Number of entries handled
+        """
+        for key in list(self._streams):
+            await self._ensure_group(key)
+
+        response = await self._redis_client.xreadgroup(
+            self.config.consumer_group,
+            self.config.consumer_name,
+            {key: ">" for key in self._streams},
+            count=self.config.read_count,
+            block=self.config.block_ms
+        )
+
+        handled = 0
+        for stream, entries in response or []:
+            key = self._decode(stream)
+            for entry_id, fields in entries:
+                await self._handle_entry(key, entry_id, fields)
+                handled += 1
+        return handled
+
+    async def reclaim_pending(self) -> int:
+        """Claim entries left pending by idle consumers and retry them.
+
+        Entries that were already delivered ``max_deliveries`` times are
+        acknowledged and handed to the exhausted callback instead.
+
+        Returns:
+            int: Number of entries reclaimed and dispatched
+        """
+        self._last_claim_time = time.monotonic()
+        reclaimed = 0
+
+        for key in list(self._streams):
+            pending = await self._redis_client.xpending_range(
+                key,
+                self.config.consumer_group,
+                min="-",
+                max="+",
+                count=self.config.read_count,
+                idle=self.config.claim_min_idle_ms
+            )
+            if not pending:
+                continue
+
+            delivery_counts: Dict[str, int] = {}
+            for info in pending:
+                delivery_counts[self._decode(info["message_id"])] = info["times_delivered"]
+
+            claimed = await self._redis_client.xclaim(
+                key,
+                self.config.consumer_group,
+                self.config.consumer_name,
+                self.config.claim_min_idle_ms,
+                list(delivery_counts)
+            )
+
+            for entry_id, fields in claimed or []:
+                if fields is None:
+                    # Entry was trimmed from the stream while pending
+                    await self._redis_client.xack(key, self.config.consumer_group, entry_id)
+                    continue
+                deliveries = delivery_counts.get(self._decode(entry_id), 0)
+                if deliveries >= self.config.max_deliveries:
+                    await self._dead_letter(key, entry_id, fields, deliveries)
+                    continue
+                self._metrics["reclaimed"] += 1
+                await self._handle_entry(key, entry_id, fields)
+                reclaimed += 1
+
+        if reclaimed:
+            logger.info("Reclaimed %d pending stream entries", reclaimed)
+        return reclaimed
+
+    async def _handle_entry(self, key: str, entry_id: Any, fields: Dict[Any, Any]) -> bool:
+        """Dispatch one stream entry and acknowledge it on success.
+
+        Args:
+            key (str): Redis stream key
+            entry_id: Stream entry ID
+            fields (Dict): Raw stream entry fields
+
+        Returns:
+            bool: True if the entry was acknowledged, False otherwise
+        """
+        event_name, payload = self._decode_entry(key, fields)
+        self._metrics["delivered"] += 1
+
+        try:
+            success = await self._dispatcher(event_name, payload)
+        except Exception as e:
+            logger.error("Error dispatching stream entry %s: %s", self._decode(entry_id), str(e))
+            success = False
+
+        if not success:
+            # Leave the entry pending so it is reclaimed later
+            self._metrics["failed"] += 1
+            return False
+
+        await self._redis_client.xack(key, self.config.consumer_group, entry_id)
+        self._metrics["acknowledged"] += 1
+        return True
+
+    async def _dead_letter(self, key: str, entry_id: Any, fields: Dict[Any, Any], deliveries: int) -> None:
+        """Stop redelivering an entry that keeps failing.
+
+        Args:
+            key (str): Redis stream key
+            entry_id: Stream entry ID
+            fields (Dict): Raw stream entry fields
+            deliveries (int): Number of times the entry was delivered
+        """
+        event_name, payload = self._decode_entry(key, fields)
+        logger.error(
+            "Stream entry %s for event %s exceeded %d deliveries, giving up",
+            self._decode(entry_id), event_name, self.config.max_deliveries
+        )
+        await self._redis_client.xack(key, self.config.consumer_group, entry_id)
+        self._metrics["dead_lettered"] += 1
+
+        if self._on_exhausted:
+            try:
+                await self._on_exhausted(event_name, payload, deliveries)
+            except Exception as e:
+                logger.error("Error handling exhausted stream entry: %s", str(e))
+
+    def _decode_entry(self, key: str, fields: Dict[Any, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Decode the event name and payload of a stream entry.
+
+        Args:
+            key (str): Redis stream key
+            fields (Dict): Raw stream entry fields
+
+        Returns:
+            Tuple[str, Dict[str, Any]]: Event name and payload
+        """
+        decoded = {self._decode(k): self._decode(v) for k, v in fields.items()}
+        event_name = decoded.get("event_name") or self._streams.get(key, key)
+        try:
+            payload = json.loads(decoded.get("payload") or "{}")
+        except (TypeError, ValueError):
+            logger.warning("Invalid payload in stream %s", key)
+            payload = {}
+        return event_name, payload
+
+    @staticmethod
+    def _decode(value: Any) -> Any:
+        """Decode bytes returned by Redis into strings."""
+        if isinstance(value, bytes):
+            return value.decode("utf-8")
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transport statistics.
+
+        Returns:
+            Dict[str, Any]: Transport metrics and consumer information
+        """
+        return {
+            "consumer_group": self.config.consumer_group,
+            "consumer_name": self.config.consumer_name,
+            "streams": sorted(self._streams.values()),
+            "consumer_running": bool(self._consumer_task and not self._consumer_task.done()),
+            **self._metrics
+        }
@@ -3,9 +3,10 @@
 Processes and dispatches callback queries from inline keyboards.
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Callable, Awaitable
+from typing import Any, Dict, List, Optional, Callable, Awaitable, Set
 
 from src.ui.message_manager import MessageManager
 from src.ui.menu_factory import MenuFactory, Menu
@@ -14,6 +15,44 @@ from src.events.models import create_event
 
 logger = logging.getLogger(__name__)
 
+# Publishes still in flight; holding them keeps their tasks from being garbage collected
+_pending_publishes: Set[asyncio.Task] = set()
+
+
+async def _publish_event(event_bus: Optional[EventBus], event_name: str, **fields: Any) -> None:
+    """Publish a callback event.
+
+    With micro-batching enabled the event is handed to the bus in the background,
+    so the events of one callback go out in the same batch instead of each waiting
+    out the batch window in turn. Otherwise the publish is awaited.
+    """
+    if event_bus is None:
+        return
+    try:
+        event = create_event(event_name, **fields)
+        if not event_bus.is_batching:
+            await event_bus.publish(event_name, event.dict())
+            return
+        task = asyncio.ensure_future(event_bus.publish(event_name, event.dict()))
+    except Exception as e:
+        logger.error(f"Failed to publish {event_name} event: {e}")
+        return
+    _pending_publishes.add(task)
+    task.add_done_callback(lambda done: _publish_done(event_name, done))
+
+
+def _publish_done(event_name: str, task: asyncio.Task) -> None:
+    """Forget a finished publish and log its failure."""
+    _pending_publishes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Failed to publish {event_name} event: {task.exception()}")
+
+
+async def wait_for_pending_publishes() -> None:
+    """Wait for the callback events still being published in the background."""
+    if _pending_publishes:
+        await asyncio.gather(*_pending_publishes, return_exceptions=True)
+
 # --- Data Models (as per design document) ---
 
 @dataclass
@@ -56,18 +95,14 @@ class ActionDispatcher:
     ) -> CallbackActionResult:
         """Looks up and executes the handler for a given action type."""
         # Publish event for menu interaction
-        if self.event_bus:
-            try:
-                event = create_event(
-                    "menu_interaction",
-                    action_type=action_type,
-                    action_data=action_data,
-                    user_id=user_context.get("user_id"),
-                    user_context=user_context
-                )
-                await self.event_bus.publish("menu_interaction", event.dict())
-            except Exception as e:
-                logger.error(f"Failed to publish menu interaction event: {e}")
+        await _publish_event(
+            self.event_bus,
+            "menu_interaction",
+            action_type=action_type,
+            action_data=action_data,
+            user_id=user_context.get("user_id"),
+            user_context=user_context
+        )
 
         handler = self._action_handlers.get(action_type)
         if handler:
@@ -75,20 +110,16 @@ class ActionDispatcher:
             result = await handler(action_data, user_context)
             
             # Publish event for action completion
-            if self.event_bus:
-                try:
-                    event = create_event(
-                        "action_completed",
-                        action_type=action_type,
-                        action_data=action_data,
-                        user_id=user_context.get("user_id"),
-                        user_context=user_context,
-                        success=result.success,
-                        response_message=result.response_message
-                    )
-                    await self.event_bus.publish("action_completed", event.dict())
-                except Exception as e:
-                    logger.error(f"Failed to publish action completed event: {e}")
+            await _publish_event(
+                self.event_bus,
+                "action_completed",
+                action_type=action_type,
+                action_data=action_data,
+                user_id=user_context.get("user_id"),
+                user_context=user_context,
+                success=result.success,
+                response_message=result.response_message
+            )
             
             return result
         else:
@@ -99,18 +130,14 @@ class ActionDispatcher:
             )
             
             # Publish event for unsupported action
-            if self.event_bus:
-                try:
-                    event = create_event(
-                        "unsupported_action",
-                        action_type=action_type,
-                        action_data=action_data,
-                        user_id=user_context.get("user_id"),
-                        user_context=user_context
-                    )
-                    await self.event_bus.publish("unsupported_action", event.dict())
-                except Exception as e:
-                    logger.error(f"Failed to publish unsupported action event: {e}")
+            await _publish_event(
+                self.event_bus,
+                "unsupported_action",
+                action_type=action_type,
+                action_data=action_data,
+                user_id=user_context.get("user_id"),
+                user_context=user_context
+            )
             
             return result
 
@@ -163,18 +190,14 @@ class CallbackProcessor:
         Process the incoming callback data and return an action result.
         """
         # Publish event for callback received
-        if self.event_bus:
-            try:
-                event = create_event(
-                    "callback_received",
-                    callback_data=callback_data,
-                    user_id=user_context.get("user_id"),
-                    chat_id=chat_id,
-                    user_context=user_context
-                )
-                await self.event_bus.publish("callback_received", event.dict())
-            except Exception as e:
-                logger.error(f"Failed to publish callback received event: {e}")
+        await _publish_event(
+            self.event_bus,
+            "callback_received",
+            callback_data=callback_data,
+            user_id=user_context.get("user_id"),
+            chat_id=chat_id,
+            user_context=user_context
+        )
 
         if not self.validate_callback_data(callback_data):
             logger.warning(f"Invalid callback data received: {callback_data}")
@@ -190,18 +213,14 @@ class CallbackProcessor:
             result = CallbackActionResult(success=False, response_message="Invalid action.")
 
             # Publish event for invalid callback
-            if self.event_bus:
-                try:
-                    event = create_event(
-                        "invalid_callback",
-                        callback_data=callback_data,
-                        user_id=user_context.get("user_id"),
-                        chat_id=chat_id,
-                        user_context=user_context
-                    )
-                    await self.event_bus.publish("invalid_callback", event.dict())
-                except Exception as e:
-                    logger.error(f"Failed to publish invalid callback event: {e}")
+            await _publish_event(
+                self.event_bus,
+                "invalid_callback",
+                callback_data=callback_data,
+                user_id=user_context.get("user_id"),
+                chat_id=chat_id,
+                user_context=user_context
+            )
 
             return result
 
@@ -215,18 +234,14 @@ class CallbackProcessor:
             )
             
             # Publish event for worthiness explanation
-            if self.event_bus:
-                try:
-                    event = create_event(
-                        "worthiness_explanation_requested",
-                        callback_data=callback_data,
-                        user_id=user_context.get("user_id"),
-                        chat_id=chat_id,
-                        user_context=user_context
-                    )
-                    await self.event_bus.publish("worthiness_explanation_requested", event.dict())
-                except Exception as e:
-                    logger.error(f"Failed to publish worthiness explanation event: {e}")
+            await _publish_event(
+                self.event_bus,
+                "worthiness_explanation_requested",
+                callback_data=callback_data,
+                user_id=user_context.get("user_id"),
+                chat_id=chat_id,
+                user_context=user_context
+            )
             
             return result
 
@@ -238,18 +253,14 @@ class CallbackProcessor:
             result = CallbackActionResult(success=True, new_menu=new_menu)
 
             # Publish event for menu navigation
-            if self.event_bus:
-                try:
-                    event = create_event(
-                        "menu_navigation",
-                        menu_id=menu_id,
-                        user_id=user_context.get("user_id"),
-                        chat_id=chat_id,
-                        user_context=user_context
-                    )
-                    await self.event_bus.publish("menu_navigation", event.dict())
-                except Exception as e:
-                    logger.error(f"Failed to publish menu navigation event: {e}")
+            await _publish_event(
+                self.event_bus,
+                "menu_navigation",
+                menu_id=menu_id,
+                user_id=user_context.get("user_id"),
+                chat_id=chat_id,
+                user_context=user_context
+            )
 
             return result
         else:
@@ -265,20 +276,16 @@ class CallbackProcessor:
             )
             
             # Publish event for action processed
-            if self.event_bus:
-                try:
-                    event = create_event(
-                        "callback_processed",
-                        action_type=action_type,
-                        action_data=action_data_str,
-                        user_id=user_context.get("user_id"),
-                        chat_id=chat_id,
-                        user_context=user_context,
-                        success=result.success
-                    )
-                    await self.event_bus.publish("callback_processed", event.dict())
-                except Exception as e:
-                    logger.error(f"Failed to publish callback processed event: {e}")
+            await _publish_event(
+                self.event_bus,
+                "callback_processed",
+                action_type=action_type,
+                action_data=action_data_str,
+                user_id=user_context.get("user_id"),
+                chat_id=chat_id,
+                user_context=user_context,
+                success=result.success
+            )
             
             # Perform cleanup after an action is dispatched
             await self.cleanup_after_callback(chat_id)
@@ -305,15 +312,11 @@ class CallbackProcessor:
         This might involve deleting temporary notification messages.
         """
         # Publish event for cleanup started
-        if self.event_bus:
-            try:
-                event = create_event(
-                    "cleanup_started",
-                    chat_id=chat_id
-                )
-                await self.event_bus.publish("cleanup_started", event.dict())
-            except Exception as e:
-                logger.error(f"Failed to publish cleanup started event: {e}")
+        await _publish_event(
+            self.event_bus,
+            "cleanup_started",
+            chat_id=chat_id
+        )
 
         # This is a placeholder; the exact logic might differ.
         # For now, we can assume it cleans up messages of type 'notification'.
@@ -322,15 +325,11 @@ class CallbackProcessor:
         # so this can be reserved for special cases.
         
         # Publish event for cleanup completed
-        if self.event_bus:
-            try:
-                event = create_event(
-                    "cleanup_completed",
-                    chat_id=chat_id
-                )
-                await self.event_bus.publish("cleanup_completed", event.dict())
-            except Exception as e:
-                logger.error(f"Failed to publish cleanup completed event: {e}")
+        await _publish_event(
+            self.event_bus,
+            "cleanup_completed",
+            chat_id=chat_id
+        )
 
     async def _handle_daily_gift_action(self, action_data: str, user_context: Dict[str, Any]) -> CallbackActionResult:
         """Handle daily gift related actions."""
@@ -93,6 +93,9 @@ class MenuSystemCoordinator:
             # Initialize performance monitoring
             await self.performance_monitor.reset_metrics()
 
+            # Drop cached menus of users whose data changes
+            await self.menu_factory.menu_cache.attach(self.event_bus)
+
             # Start background services
             self.message_manager.start_periodic_cleanup()
 
@@ -328,9 +331,8 @@ class MenuSystemCoordinator:
             await asyncio.sleep(delay)
 
             # Get all tracked messages for this chat
-            pattern = f"msg_track:{chat_id}:*"
             if hasattr(self.message_manager, 'cache') and self.message_manager.cache:
-                keys = await self.message_manager.cache.get_keys_by_pattern(pattern)
+                keys = await self.message_manager.cache.get_keys_by_tag(self.message_manager._get_chat_tag(chat_id))
 
                 for key in keys:
                     try:
@@ -295,7 +295,7 @@ class CommandHandler(BaseHandler):
         # If we have database context, create or update user
         if self.user_service:
             try:
-                user_context = await self.user_service.get_user_context(user_id)
+                user_context = await self.user_service.get_user_context(user_id, fields="menu")
                 logger.info("Existing user context retrieved: %s", user_id)
                 
                 # Update last login time
@@ -103,7 +103,7 @@ class BehavioralAnalysisEngine:
         """
         logger.debug(f"Detecting archetype patterns for user {user_id}")
         try:
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             interactions_collection = db["emotional_interactions"]
 
             # Fetch the last 50 interactions for the user, sorted by time.
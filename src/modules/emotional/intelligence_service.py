@@ -125,7 +125,7 @@ class EmotionalIntelligenceService:
         logger.debug(f"Generating personalized content for user {user_id}")
         try:
             # 1. Retrieve user's emotional signature and current state
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             users_collection = db["users"]
 
             user_doc = await users_collection.find_one({"user_id": user_id})
@@ -263,7 +263,7 @@ class EmotionalIntelligenceService:
         logger.debug(f"Updating emotional journey for user {user_id}")
         try:
             # 1. Get current user context using UserService pattern
-            user_context = await self.user_service.get_user_context(user_id)
+            user_context = await self.user_service.get_user_context(user_id, fields="narrative")
             if not user_context:
                 logger.warning(f"User {user_id} not found, cannot update emotional journey")
                 return None
@@ -34,7 +34,7 @@ class EmotionalMemoryService:
         """
         self.database_manager = database_manager
         self.event_bus = event_bus
-        self.collection = self.database_manager.get_mongo_db()["memory_fragments"]
+        self.collection = self.database_manager.get_async_mongo_db()["memory_fragments"]
         logger.info("EmotionalMemoryService initialized")
 
     async def record_significant_moment(
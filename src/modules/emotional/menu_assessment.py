@@ -114,7 +114,7 @@ class MenuBehavioralAssessmentHandler:
         """
         try:
             # Get recent menu interaction history
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             menu_interactions_collection = db["menu_behavioral_assessments"]
 
             # Look at last 20 interactions to detect patterns
@@ -497,7 +497,7 @@ class MenuBehavioralAssessmentHandler:
             assessment (Dict[str, Any]): Behavioral assessment data.
         """
         try:
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             menu_assessments_collection = db["menu_behavioral_assessments"]
 
             # Store the assessment
@@ -557,7 +557,7 @@ class MenuBehavioralAssessmentHandler:
             Optional[Archetype]: Detected archetype based on menu behavior.
         """
         try:
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             menu_assessments_collection = db["menu_behavioral_assessments"]
 
             # Get last 30 menu assessments
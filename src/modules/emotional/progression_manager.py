@@ -54,7 +54,7 @@ class NarrativeProgressionManager:
             ProgressionAssessment: An object detailing if the user is ready to progress.
         """
         logger.debug(f"Evaluating level readiness for user {user_id}")
-        user_context = await self.user_service.get_user_context(user_id)
+        user_context = await self.user_service.get_user_context(user_id, fields="narrative")
         if not user_context:
             return ProgressionAssessment(is_ready=False, reason="User not found.")
 
@@ -15,11 +15,13 @@ from pymongo.client_session import ClientSession
 from pymongo.errors import PyMongoError
 
 from src.database.mongodb import MongoDBHandler
+from src.database.profiler import profiled
 from src.database.schemas.gamification import (
     UserAchievement, AchievementType, AchievementTier, AchievementProgress,
     AchievementUnlockedEvent
 )
 from src.events.bus import EventBus
+from src.events.outbox import EventOutbox
 from src.utils.logger import get_logger
 from src.ui.lucien_voice_generator import (
     LucienVoiceProfile,
@@ -75,15 +77,18 @@ class AchievementSystem:
     the system SHALL trigger database events and publish badge_unlocked events.
     """
 
-    def __init__(self, mongodb_handler: MongoDBHandler, event_bus: EventBus):
+    def __init__(self, mongodb_handler: MongoDBHandler, event_bus: EventBus,
+                 outbox: Optional[EventOutbox] = None):
         """Initialize the achievement system.
 
         Args:
             mongodb_handler: MongoDB handler for database operations
             event_bus: Event bus for publishing achievement events
+            outbox: Transactional outbox for the events of besitos rewards
         """
         self.mongodb_handler = mongodb_handler
         self.event_bus = event_bus
+        self.outbox = outbox
         self.user_achievements_collection: Collection = mongodb_handler.get_user_achievements_collection()
         self.users_collection: Collection = mongodb_handler.get_users_collection()
 
@@ -275,6 +280,7 @@ class AchievementSystem:
             logger.error("Error initializing achievement system: %s", str(e))
             return False
 
+    @profiled()
     async def check_achievements(self, user_id: str, action: str) -> List[Achievement]:
         """Check for achievement unlocks based on user action.
 
@@ -624,7 +630,7 @@ class AchievementSystem:
                 # Import besitos wallet to award reward
                 from src.modules.gamification.besitos_wallet import create_besitos_wallet
 
-                besitos_wallet = await create_besitos_wallet(self.mongodb_handler, self.event_bus)
+                besitos_wallet = await create_besitos_wallet(self.mongodb_handler, self.event_bus, self.outbox)
                 await besitos_wallet.add_besitos(
                     user_id=user_id,
                     amount=achievement_def.reward_besitos,
@@ -792,16 +798,18 @@ class AchievementSystem:
 
 
 # Factory function for dependency injection consistency with other modules
-async def create_achievement_system(mongodb_handler: MongoDBHandler, event_bus: EventBus) -> AchievementSystem:
+async def create_achievement_system(mongodb_handler: MongoDBHandler, event_bus: EventBus,
+                                    outbox: Optional[EventOutbox] = None) -> AchievementSystem:
     """Factory function to create an AchievementSystem instance.
 
     Args:
         mongodb_handler: MongoDB handler instance
         event_bus: Event bus instance
+        outbox: Transactional outbox for the events of besitos rewards
 
     Returns:
         AchievementSystem: Initialized achievement system instance
     """
-    achievement_system = AchievementSystem(mongodb_handler, event_bus)
+    achievement_system = AchievementSystem(mongodb_handler, event_bus, outbox)
     await achievement_system.initialize()
     return achievement_system
\ No newline at end of file
@@ -20,6 +20,7 @@ from src.database.schemas.gamification import (
 )
 from src.events.bus import EventBus
 from src.events.models import BesitosAwardedEvent, BesitosSpentEvent, create_event
+from src.events.outbox import EventOutbox
 from src.utils.logger import get_logger
 from src.ui.lucien_voice_generator import (
     LucienVoiceProfile,
@@ -64,23 +65,32 @@ class BesitosWallet:
 
     This class implements atomic besitos transactions using MongoDB sessions
     and publishes appropriate events to the event bus for integration with
-    the rest of the YABOT system. Enhanced with Lucien's sophisticated 
+    the rest of the YABOT system. With a transactional outbox, the events are
+    written in the same transaction as the balance change and relayed to the
+    event bus in the background. Enhanced with Lucien's sophisticated 
     transaction handling as per ux-enhanced specification.
     """
 
-    def __init__(self, mongodb_handler: MongoDBHandler, event_bus: EventBus):
+    def __init__(self, mongodb_handler: MongoDBHandler, event_bus: EventBus,
+                 outbox: Optional[EventOutbox] = None):
         """Initialize the besitos wallet.
 
         Args:
             mongodb_handler: MongoDB handler for database operations
             event_bus: Event bus for publishing transaction events
+            outbox: Optional transactional outbox for the transaction events
         """
         self.mongodb_handler = mongodb_handler
         self.event_bus = event_bus
+        self.outbox = outbox
         self.users_collection: Collection = mongodb_handler.get_users_collection()
         self.transactions_collection: Collection = mongodb_handler.get_besitos_transactions_collection()
 
-        logger.info("BesitosWallet initialized")
+        if outbox is None:
+            logger.warning("BesitosWallet initialized without an event outbox, transaction events "
+                           "are published after commit and lost if publishing fails")
+        else:
+            logger.info("BesitosWallet initialized")
 
     async def _generate_lucien_transaction_message(self, user_id: str, amount: int, 
                                                  transaction_type: TransactionType, 
@@ -240,6 +250,12 @@ class BesitosWallet:
                         session=session
                     )
 
+                    # Record the besitos_awarded event with the balance change (requirement 2.1)
+                    if self.outbox is not None:
+                        await self.outbox.add("besitos_awarded", self._besitos_added_event(
+                            user_id, transaction_id, amount, reason, source, balance_after
+                        ), session=session)
+
                     # Transaction completed successfully
                     transaction = Transaction(
                         transaction_id=transaction_id,
@@ -254,9 +270,12 @@ class BesitosWallet:
                            amount, user_id, balance_before, balance_after)
 
                 # Publish besitos_added event (requirement 2.1)
-                await self._publish_besitos_added_event(
-                    user_id, transaction_id, amount, reason, source, balance_after
-                )
+                if self.outbox is not None:
+                    self.outbox.notify()
+                else:
+                    await self._publish_besitos_added_event(
+                        user_id, transaction_id, amount, reason, source, balance_after
+                    )
 
                 return transaction
 
@@ -365,6 +384,12 @@ class BesitosWallet:
                         session=session
                     )
 
+                    # Record the besitos_spent event with the balance change (requirement 2.2)
+                    if self.outbox is not None:
+                        await self.outbox.add("besitos_spent", self._besitos_spent_event(
+                            user_id, transaction_id, amount, reason, item_id, balance_after
+                        ), session=session)
+
                     # Transaction completed successfully
                     transaction = Transaction(
                         transaction_id=transaction_id,
@@ -379,9 +404,12 @@ class BesitosWallet:
                            amount, user_id, balance_before, balance_after)
 
                 # Publish besitos_spent event (requirement 2.2)
-                await self._publish_besitos_spent_event(
-                    user_id, transaction_id, amount, reason, item_id, balance_after
-                )
+                if self.outbox is not None:
+                    self.outbox.notify()
+                else:
+                    await self._publish_besitos_spent_event(
+                        user_id, transaction_id, amount, reason, item_id, balance_after
+                    )
 
                 return transaction
 
@@ -558,6 +586,56 @@ class BesitosWallet:
             logger.error("Database error getting transaction history for user %s: %s", user_id, str(e))
             raise BesitosWalletError(f"Failed to get transaction history: {str(e)}")
 
+    def _besitos_added_event(self, user_id: str, transaction_id: str, amount: int,
+                             reason: str, source: str, balance_after: int) -> Dict[str, Any]:
+        """Build the besitos_awarded event payload.
+
+        Args:
+            user_id: User ID
+            transaction_id: Transaction ID
+            amount: Amount added
+            reason: Reason for adding
+            source: Source of besitos
+            balance_after: User balance after transaction
+
+        Returns:
+            Dict[str, Any]: Event payload
+        """
+        return create_event(
+            "besitos_awarded",
+            user_id=user_id,
+            amount=amount,
+            reason=reason,
+            source=source,
+            balance_after=balance_after,
+            transaction_id=transaction_id
+        ).dict()
+
+    def _besitos_spent_event(self, user_id: str, transaction_id: str, amount: int,
+                             reason: str, item_id: Optional[str], balance_after: int) -> Dict[str, Any]:
+        """Build the besitos_spent event payload.
+
+        Args:
+            user_id: User ID
+            transaction_id: Transaction ID
+            amount: Amount spent
+            reason: Reason for spending
+            item_id: Optional item ID
+            balance_after: User balance after transaction
+
+        Returns:
+            Dict[str, Any]: Event payload
+        """
+        return create_event(
+            "besitos_spent",
+            user_id=user_id,
+            amount=amount,
+            reason=reason,
+            item_id=item_id,
+            balance_after=balance_after,
+            transaction_id=transaction_id
+        ).dict()
+
     async def _publish_besitos_added_event(self, user_id: str, transaction_id: str,
                                           amount: int, reason: str, source: str,
                                           balance_after: int) -> None:
@@ -572,17 +650,11 @@ class BesitosWallet:
             balance_after: User balance after transaction
         """
         try:
-            event = create_event(
-                "besitos_awarded",
-                user_id=user_id,
-                amount=amount,
-                reason=reason,
-                source=source,
-                balance_after=balance_after,
-                transaction_id=transaction_id
+            event = self._besitos_added_event(
+                user_id, transaction_id, amount, reason, source, balance_after
             )
 
-            await self.event_bus.publish("besitos_awarded", event.dict())
+            await self.event_bus.publish("besitos_awarded", event)
             logger.debug("Published besitos_awarded event for user %s", user_id)
 
         except Exception as e:
@@ -603,17 +675,11 @@ class BesitosWallet:
             balance_after: User balance after transaction
         """
         try:
-            event = create_event(
-                "besitos_spent",
-                user_id=user_id,
-                amount=amount,
-                reason=reason,
-                item_id=item_id,
-                balance_after=balance_after,
-                transaction_id=transaction_id
+            event = self._besitos_spent_event(
+                user_id, transaction_id, amount, reason, item_id, balance_after
             )
 
-            await self.event_bus.publish("besitos_spent", event.dict())
+            await self.event_bus.publish("besitos_spent", event)
             logger.debug("Published besitos_spent event for user %s", user_id)
 
         except Exception as e:
@@ -622,14 +688,16 @@ class BesitosWallet:
 
 
 # Factory function for dependency injection consistency with other modules
-async def create_besitos_wallet(mongodb_handler: MongoDBHandler, event_bus: EventBus) -> BesitosWallet:
+async def create_besitos_wallet(mongodb_handler: MongoDBHandler, event_bus: EventBus,
+                                outbox: Optional[EventOutbox] = None) -> BesitosWallet:
     """Factory function to create a BesitosWallet instance.
 
     Args:
         mongodb_handler: MongoDB handler instance
         event_bus: Event bus instance
+        outbox: Optional transactional outbox for the transaction events
 
     Returns:
         BesitosWallet: Initialized besitos wallet instance
     """
-    return BesitosWallet(mongodb_handler, event_bus)
\ No newline at end of file
+    return BesitosWallet(mongodb_handler, event_bus, outbox)
\ No newline at end of file
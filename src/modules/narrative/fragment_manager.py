@@ -88,7 +88,7 @@ class NarrativeFragmentManager:
             collection = self.mongodb_handler.get_narrative_fragments_collection()
 
             # Query for the fragment
-            fragment_data = collection.find_one({"fragment_id": fragment_id})
+            fragment_data = await collection.find_one({"fragment_id": fragment_id})
 
             if not fragment_data:
                 logger.warning("Fragment not found: %s", fragment_id)
@@ -137,7 +137,7 @@ class NarrativeFragmentManager:
             users_collection = self.mongodb_handler.get_users_collection()
 
             # Query for user progress
-            user_data = users_collection.find_one(
+            user_data = await users_collection.find_one(
                 {"user_id": user_id},
                 {"current_state.narrative_progress": 1}
             )
@@ -288,7 +288,7 @@ class NarrativeFragmentManager:
             ).limit(limit)
 
             fragments = []
-            for fragment_data in cursor:
+            async for fragment_data in cursor:
                 fragment_data.pop("_id", None)
                 fragments.append(fragment_data)
 
@@ -326,7 +326,7 @@ class NarrativeFragmentManager:
             cursor = collection.find(query)
 
             fragments = []
-            for fragment_data in cursor:
+            async for fragment_data in cursor:
                 fragment_data.pop("_id", None)
 
                 # Add completion status
@@ -397,7 +397,7 @@ class NarrativeFragmentManager:
         try:
             # Get the target fragment to check its unlock conditions
             collection = self.mongodb_handler.get_narrative_fragments_collection()
-            fragment_data = collection.find_one({"fragment_id": fragment_id})
+            fragment_data = await collection.find_one({"fragment_id": fragment_id})
 
             if not fragment_data:
                 raise ProgressionValidationError(f"Target fragment not found: {fragment_id}")
@@ -449,7 +449,7 @@ class NarrativeFragmentManager:
             users_collection = self.mongodb_handler.get_users_collection()
 
             # Update or insert user progress
-            result = users_collection.update_one(
+            result = await users_collection.update_one(
                 {"user_id": user_id},
                 {
                     "$set": {
@@ -479,7 +479,7 @@ class NarrativeFragmentManager:
         """
         try:
             collection = self.mongodb_handler.get_narrative_fragments_collection()
-            fragment_data = collection.find_one({"fragment_id": fragment_id})
+            fragment_data = await collection.find_one({"fragment_id": fragment_id})
 
             if fragment_data:
                 # Check if fragment is marked as a checkpoint
@@ -581,7 +581,7 @@ class NarrativeFragmentManager:
         try:
             # Test MongoDB connection
             collection = self.mongodb_handler.get_narrative_fragments_collection()
-            collection.find_one({}, {"_id": 1})
+            await collection.find_one({}, {"_id": 1})
 
         except Exception as e:
             logger.warning("MongoDB health check failed: %s", str(e))
@@ -3,22 +3,34 @@ SubscriptionService for the YABOT system.
 
 This module provides subscription management operations for the YABOT system,
 implementing the requirements specified in fase1 specification section 1.2 and 3.1.
+
+Subscription statuses are read through a SubscriptionStatusCache. Expired
+subscriptions are not updated on the read path; a periodic sweep marks them
+expired in bulk.
 """
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import uuid
 
 from src.database.manager import DatabaseManager
 from src.events.bus import EventBus
 from src.events.models import create_event
+from src.services.subscription_cache import SubscriptionStatusCache, subscription_status_cache
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+DEFAULT_EXPIRY_SWEEP_INTERVAL = 300  # seconds between expiry sweeps
+
+SUBSCRIPTION_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_subscriptions_status_end_date ON subscriptions(status, end_date)",
+)
+
+
 class SubscriptionServiceError(Exception):
     """Base exception for subscription service operations."""
     pass
@@ -32,15 +44,20 @@ class SubscriptionNotFoundError(SubscriptionServiceError):
 class SubscriptionService:
     """Service for managing user subscriptions and premium features."""
     
-    def __init__(self, database_manager: DatabaseManager, event_bus: EventBus):
+    def __init__(self, database_manager: DatabaseManager, event_bus: EventBus,
+                 status_cache: Optional[SubscriptionStatusCache] = None):
         """Initialize the subscription service.
         
         Args:
             database_manager (DatabaseManager): Database manager instance
             event_bus (EventBus): Event bus instance
+            status_cache (SubscriptionStatusCache, optional): Cache for subscription statuses,
+                a private in-process cache by default
         """
         self.database_manager = database_manager
         self.event_bus = event_bus
+        self.status_cache = status_cache or SubscriptionStatusCache()
+        self._expiry_sweep_task: Optional[asyncio.Task] = None
         logger.info("SubscriptionService initialized")
     
     async def create_subscription(self, user_id: str, plan_type: str, 
@@ -76,13 +93,15 @@ class SubscriptionService:
         
         try:
             # Create subscription in SQLite
-            subscription_data = self._create_subscription_in_db(
+            subscription_data = await self._create_subscription_in_db(
                 user_id, plan_type, status, start_date, end_date
             )
             
             if not subscription_data:
                 raise SubscriptionServiceError("Failed to create subscription in database")
             
+            await self.status_cache.invalidate(user_id)
+            
             # Publish subscription_updated event
             try:
                 event = create_event(
@@ -104,8 +123,8 @@ class SubscriptionService:
             logger.error("Error creating subscription: %s", str(e))
             raise SubscriptionServiceError(f"Failed to create subscription: {str(e)}")
     
-    def _create_subscription_in_db(self, user_id: str, plan_type: str, status: str,
-                                 start_date: datetime, end_date: Optional[datetime]) -> Optional[Dict[str, Any]]:
+    async def _create_subscription_in_db(self, user_id: str, plan_type: str, status: str,
+                                       start_date: datetime, end_date: Optional[datetime]) -> Optional[Dict[str, Any]]:
         """Create subscription in SQLite database.
         
         Args:
@@ -119,11 +138,10 @@ class SubscriptionService:
             Optional[Dict[str, Any]]: Created subscription data or None if failed
         """
         try:
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
+            sqlite = self.database_manager.get_async_sqlite()
             
-            # Create subscriptions table if it doesn't exist
-            cursor.execute("""
+            # Create the table if needed and insert the subscription in one group-committed unit
+            results = await sqlite.transaction([("""
                 CREATE TABLE IF NOT EXISTS subscriptions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     user_id TEXT NOT NULL,
@@ -135,10 +153,7 @@ class SubscriptionService:
                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (user_id) REFERENCES user_profiles(user_id)
                 )
-            """)
-            
-            # Insert subscription
-            cursor.execute("""
+            """, ())] + [(index_sql, ()) for index_sql in SUBSCRIPTION_INDEXES] + [("""
                 INSERT INTO subscriptions (
                     user_id, plan_type, status, start_date, end_date
                 ) VALUES (?, ?, ?, ?, ?)
@@ -148,18 +163,13 @@ class SubscriptionService:
                 status,
                 start_date.isoformat(),
                 end_date.isoformat() if end_date else None
-            ))
-            
-            conn.commit()
+            ))])
             
             # Get the created subscription
-            subscription_id = cursor.lastrowid
-            cursor.execute("SELECT * FROM subscriptions WHERE id = ?", (subscription_id,))
-            row = cursor.fetchone()
+            subscription_id = results[-1].lastrowid
+            subscription = await sqlite.fetchone("SELECT * FROM subscriptions WHERE id = ?", (subscription_id,))
             
-            if row:
-                columns = [description[0] for description in cursor.description]
-                subscription = dict(zip(columns, row))
+            if subscription:
                 logger.debug("Created subscription in SQLite for user: %s", user_id)
                 return subscription
             
@@ -185,7 +195,7 @@ class SubscriptionService:
         logger.debug("Retrieving subscription for user: %s", user_id)
         
         try:
-            subscription = self._get_subscription_from_db(user_id)
+            subscription = await self._get_subscription_from_db(user_id)
             
             if subscription is None:
                 raise SubscriptionNotFoundError(f"Subscription not found for user: {user_id}")
@@ -199,7 +209,7 @@ class SubscriptionService:
             logger.error("Error retrieving subscription: %s", str(e))
             raise SubscriptionServiceError(f"Failed to retrieve subscription: {str(e)}")
     
-    def _get_subscription_from_db(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_subscription_from_db(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get subscription from SQLite database.
         
         Args:
@@ -207,25 +217,20 @@ class SubscriptionService:
             
         Returns:
             Optional[Dict[str, Any]]: Subscription data or None if not found
-        """
-        try:
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
             
-            cursor.execute("SELECT * FROM subscriptions WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                columns = [description[0] for description in cursor.description]
-                subscription = dict(zip(columns, row))
-                logger.debug("Retrieved subscription from SQLite for user: %s", user_id)
-                return subscription
-            
-            return None
-            
-        except Exception as e:
-            logger.error("Error retrieving subscription from SQLite: %s", str(e))
-            return None
+        Raises:
+            Exception: If the read fails, so a failed read is never taken for a
+                missing subscription
+        """
+        sqlite = self.database_manager.get_async_sqlite()
+        
+        subscription = await sqlite.fetchone("SELECT * FROM subscriptions WHERE user_id = ?", (user_id,))
+        
+        if subscription:
+            logger.debug("Retrieved subscription from SQLite for user: %s", user_id)
+            return subscription
+        
+        return None
     
     async def update_subscription(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """Update subscription data for a user.
@@ -249,27 +254,20 @@ class SubscriptionService:
                 return True
             
             # Update subscription in database
-            success = self._update_subscription_in_db(user_id, filtered_updates)
+            success = await self._update_subscription_in_db(user_id, filtered_updates)
             
             if success:
                 logger.info("Successfully updated subscription for user: %s", user_id)
+                await self.status_cache.invalidate(user_id)
                 
-                # Publish subscription_updated event
+                # Publish subscription_updated event with the current subscription data
                 try:
-                    # Get current subscription data for the event
-                    subscription = self._get_subscription_from_db(user_id)
-                    if subscription:
-                        event = create_event(
-                            "subscription_updated",
-                            user_id=user_id,
-                            plan_type=subscription.get("plan_type"),
-                            status=subscription.get("status"),
-                            start_date=datetime.fromisoformat(subscription.get("start_date")),
-                            end_date=datetime.fromisoformat(subscription.get("end_date")) if subscription.get("end_date") else None
-                        )
-                        await self.event_bus.publish("subscription_updated", event.dict())
+                    subscription = await self._get_subscription_from_db(user_id)
                 except Exception as e:
-                    logger.warning("Failed to publish subscription_updated event: %s", str(e))
+                    logger.warning("Could not read updated subscription for its event: %s", str(e))
+                    subscription = None
+                if subscription:
+                    await self._publish_subscription_updated(subscription)
             
             else:
                 logger.warning("No changes made to subscription for user: %s", user_id)
@@ -280,7 +278,26 @@ class SubscriptionService:
             logger.error("Error updating subscription: %s", str(e))
             return False
     
-    def _update_subscription_in_db(self, user_id: str, updates: Dict[str, Any]) -> bool:
+    async def _publish_subscription_updated(self, subscription: Dict[str, Any]) -> None:
+        """Publish a subscription_updated event for a subscription row.
+        
+        Args:
+            subscription (Dict[str, Any]): Subscription row
+        """
+        try:
+            event = create_event(
+                "subscription_updated",
+                user_id=subscription.get("user_id"),
+                plan_type=subscription.get("plan_type"),
+                status=subscription.get("status"),
+                start_date=datetime.fromisoformat(subscription.get("start_date")),
+                end_date=datetime.fromisoformat(subscription.get("end_date")) if subscription.get("end_date") else None
+            )
+            await self.event_bus.publish("subscription_updated", event.dict())
+        except Exception as e:
+            logger.warning("Failed to publish subscription_updated event: %s", str(e))
+    
+    async def _update_subscription_in_db(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """Update subscription in SQLite database.
         
         Args:
@@ -291,8 +308,7 @@ class SubscriptionService:
             bool: True if successful, False otherwise
         """
         try:
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
+            sqlite = self.database_manager.get_async_sqlite()
             
             # Build SET clause dynamically
             set_clauses = []
@@ -317,14 +333,12 @@ class SubscriptionService:
             set_clause = ", ".join(set_clauses)
             
             # Update subscription
-            cursor.execute(
+            result = await sqlite.execute(
                 f"UPDATE subscriptions SET {set_clause} WHERE user_id = ?",
                 values
             )
             
-            conn.commit()
-            
-            success = cursor.rowcount > 0
+            success = result.rowcount > 0
             logger.debug("Updated subscription in SQLite for user: %s", user_id)
             return success
             
@@ -361,6 +375,10 @@ class SubscriptionService:
     async def check_subscription_status(self, user_id: str) -> Dict[str, Any]:
         """Check if a user has an active subscription.
         
+        Statuses are served from the status cache when possible. The read path
+        never writes: a subscription past its end date is reported as expired and
+        left for the expiry sweep to update.
+        
         Args:
             user_id (str): User ID
             
@@ -372,22 +390,37 @@ class SubscriptionService:
         """
         logger.debug("Checking subscription status for user: %s", user_id)
         
+        cached = await self.status_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
+        status_info = await self._load_subscription_status(user_id)
+        await self.status_cache.set(user_id, status_info)
+        return status_info
+    
+    async def _load_subscription_status(self, user_id: str) -> Dict[str, Any]:
+        """Read a user's subscription status from the database.
+        
+        Args:
+            user_id (str): User ID
+            
+        Returns:
+            Dict[str, Any]: Subscription status information
+            
+        Raises:
+            SubscriptionServiceError: If operation fails
+        """
         try:
             subscription = await self.get_subscription(user_id)
             
-            # Check if subscription is active
-            is_active = subscription.get("status") == "active"
-            
             # Check if subscription is expired (if end_date is set)
             is_expired = False
             end_date_str = subscription.get("end_date")
             if end_date_str:
-                end_date = datetime.fromisoformat(end_date_str)
-                is_expired = end_date < datetime.utcnow()
-                if is_expired and subscription.get("status") == "active":
-                    # Update status to expired
-                    await self.update_subscription(user_id, {"status": "expired"})
-                    is_active = False
+                is_expired = datetime.fromisoformat(end_date_str) < datetime.utcnow()
+            
+            # Check if subscription is active
+            is_active = subscription.get("status") == "active" and not is_expired
             
             status_info = {
                 "user_id": user_id,
@@ -419,6 +452,78 @@ class SubscriptionService:
             logger.error("Error checking subscription status: %s", str(e))
             raise SubscriptionServiceError(f"Failed to check subscription status: {str(e)}")
     
+    async def expire_subscriptions(self, now: Optional[datetime] = None) -> List[str]:
+        """Mark every active subscription past its end date as expired.
+        
+        One bulk update returning the rows it changed, instead of a write per status
+        check. Only those rows are reported: the statuses of their users are
+        invalidated and a subscription_updated event is published for each of them.
+        
+        Args:
+            now (datetime, optional): Expiry cutoff, defaults to the current UTC time
+            
+        Returns:
+            List[str]: IDs of the users whose subscriptions expired
+        """
+        cutoff = (now or datetime.utcnow()).isoformat()
+        sqlite = self.database_manager.get_async_sqlite()
+        
+        result = await sqlite.execute(
+            "UPDATE subscriptions SET status = 'expired', updated_at = ? "
+            "WHERE status = 'active' AND end_date < ? RETURNING *",
+            (datetime.utcnow().isoformat(), cutoff)
+        )
+        expired = result.rows
+        if not expired:
+            return []
+        
+        for subscription in expired:
+            await self.status_cache.invalidate(subscription["user_id"])
+            await self._publish_subscription_updated(subscription)
+        
+        logger.info("Expired %d subscriptions", len(expired))
+        return [subscription["user_id"] for subscription in expired]
+    
+    def start_expiry_sweep(self, interval: float = DEFAULT_EXPIRY_SWEEP_INTERVAL) -> asyncio.Task:
+        """Run ``expire_subscriptions`` periodically in the background.
+        
+        Args:
+            interval (float): Seconds between sweeps
+            
+        Returns:
+            asyncio.Task: The sweep task
+        """
+        if self._expiry_sweep_task is None or self._expiry_sweep_task.done():
+            self._expiry_sweep_task = asyncio.create_task(self._expiry_sweep_loop(interval))
+            try:
+                # Import here to avoid circular imports
+                from src.main import register_background_task
+                register_background_task(self._expiry_sweep_task, "Subscription expiry sweep")
+            except ImportError:
+                logger.warning("Could not register subscription expiry sweep - main module not available")
+        return self._expiry_sweep_task
+    
+    async def stop_expiry_sweep(self) -> None:
+        """Stop the background expiry sweep."""
+        if self._expiry_sweep_task is not None:
+            self._expiry_sweep_task.cancel()
+            try:
+                await self._expiry_sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._expiry_sweep_task = None
+    
+    async def _expiry_sweep_loop(self, interval: float) -> None:
+        """Sweep expired subscriptions every ``interval`` seconds."""
+        while True:
+            try:
+                await self.expire_subscriptions()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error sweeping expired subscriptions: %s", str(e))
+            await asyncio.sleep(interval)
+    
     async def validate_vip_access(self, user_id: str) -> bool:
         """Validate if a user has VIP access based on their subscription.
         
@@ -459,6 +564,9 @@ async def create_subscription_service(database_manager: DatabaseManager,
                                    event_bus: EventBus) -> SubscriptionService:
     """Create and initialize a subscription service instance.
     
+    The service uses the process-wide status cache, which is subscribed to the
+    event bus's subscription_updated events on first use.
+    
     Args:
         database_manager (DatabaseManager): Database manager instance
         event_bus (EventBus): Event bus instance
@@ -466,5 +574,6 @@ async def create_subscription_service(database_manager: DatabaseManager,
     Returns:
         SubscriptionService: Initialized subscription service instance
     """
-    subscription_service = SubscriptionService(database_manager, event_bus)
+    await subscription_status_cache.attach(event_bus)
+    subscription_service = SubscriptionService(database_manager, event_bus, subscription_status_cache)
     return subscription_service
@@ -0,0 +1,172 @@
+"""
+Subscription status cache for the YABOT system.
+
+VIP checks run for fragments, menus and the store on nearly every update, so
+SubscriptionService reads subscription statuses through this cache instead of
+querying SQLite each time. Statuses live in a bounded in-process LRU backed by
+Redis, which lets worker processes share loaded entries.
+
+Entries are invalidated by ``subscription_updated`` events, which every
+subscription write publishes, and expire after a TTL. An active subscription's
+entry never outlives its ``end_date``, so a status cannot stay active past its
+expiry while it waits for the next expiry sweep.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_STATUS_TTL = 300  # seconds
+DEFAULT_STATUS_CACHE_SIZE = 10000
+
+_REDIS_KEY_PREFIX = "subscription_status:"
+
+
+def _seconds_until_end(status: Dict[str, Any]) -> Optional[float]:
+    """Seconds until an active subscription ends, or None if it has no end date."""
+    end_date = status.get("end_date")
+    if not status.get("is_active") or not end_date:
+        return None
+    return (datetime.fromisoformat(end_date) - datetime.utcnow()).total_seconds()
+
+
+class SubscriptionStatusCache:
+    """Read-through cache of subscription statuses keyed by user ID."""
+
+    def __init__(
+        self,
+        cache_manager: Any = None,
+        ttl: int = DEFAULT_STATUS_TTL,
+        max_size: int = DEFAULT_STATUS_CACHE_SIZE
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_manager: CacheManager backing the in-process entries with Redis, optional
+            ttl (int): Seconds a status is cached
+            max_size (int): Maximum number of statuses kept in process
+        """
+        self.cache_manager = cache_manager
+        self.ttl = ttl
+        self.max_size = max_size
+        # user_id -> (monotonic expiry time, status); least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._subscribed_buses: set = set()
+        self._stats = {"hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+    def _entry_ttl(self, status: Dict[str, Any]) -> float:
+        """TTL of a status, cut short at the end of an active subscription."""
+        remaining = _seconds_until_end(status)
+        return self.ttl if remaining is None else max(0.0, min(self.ttl, remaining))
+
+    def _remember(self, user_id: str, status: Dict[str, Any], ttl: float) -> None:
+        """Store a status in the in-process LRU."""
+        self._entries[user_id] = (time.monotonic() + ttl, status)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return a cached status.
+
+        Args:
+            user_id (str): User ID
+
+        Returns:
+            Optional[Dict[str, Any]]: Copy of the status, or None on a miss
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, status = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self._stats["hits"] += 1
+                return dict(status)
+            del self._entries[user_id]
+
+        if self.cache_manager is not None:
+            cached = await self.cache_manager.get_value(_REDIS_KEY_PREFIX + user_id)
+            if cached:
+                status = json.loads(cached)
+                ttl = self._entry_ttl(status)
+                if ttl > 0:
+                    self._remember(user_id, status, ttl)
+                    self._stats["redis_hits"] += 1
+                    return dict(status)
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, user_id: str, status: Dict[str, Any]) -> None:
+        """Cache a status just loaded from the database.
+
+        Args:
+            user_id (str): User ID
+            status (Dict[str, Any]): Subscription status information
+        """
+        ttl = self._entry_ttl(status)
+        if ttl <= 0:
+            return
+        self._remember(user_id, dict(status), ttl)
+        if self.cache_manager is not None and ttl >= 1:
+            await self.cache_manager.set_value(_REDIS_KEY_PREFIX + user_id, status, ttl=int(ttl))
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a user's status from the process and from Redis.
+
+        Args:
+            user_id (str): User ID
+        """
+        self._entries.pop(user_id, None)
+        self._stats["invalidations"] += 1
+        if self.cache_manager is not None:
+            await self.cache_manager.delete_key(_REDIS_KEY_PREFIX + user_id)
+
+    async def handle_subscription_updated(self, payload: Dict[str, Any]) -> None:
+        """Event handler invalidating the status of the user in a subscription_updated event.
+
+        Args:
+            payload (Dict[str, Any]): Event payload
+        """
+        user_id = payload.get("user_id")
+        if user_id:
+            await self.invalidate(str(user_id))
+
+    async def attach(self, event_bus: Any, cache_manager: Any = None) -> None:
+        """Subscribe to subscription_updated events and optionally set the Redis backing.
+
+        Attaching to the same event bus again is a no-op.
+
+        Args:
+            event_bus: Event bus delivering subscription_updated events
+            cache_manager: CacheManager to back the cache with, optional
+        """
+        if cache_manager is not None:
+            self.cache_manager = cache_manager
+        if event_bus is None or id(event_bus) in self._subscribed_buses:
+            return
+        if await event_bus.subscribe("subscription_updated", self.handle_subscription_updated):
+            self._subscribed_buses.add(id(event_bus))
+
+    def clear(self) -> None:
+        """Drop every in-process entry."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return cache counters.
+
+        Returns:
+            Dict[str, int]: Hits, Redis hits, misses, invalidations and current size
+        """
+        return {**self._stats, "size": len(self._entries)}
+
+
+# Process-wide cache shared by the SubscriptionService instances of the application
+subscription_status_cache = SubscriptionStatusCache()
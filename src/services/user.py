@@ -7,15 +7,20 @@ implementing the requirements specified in fase1 specification section 1.3.
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple, Union
 from datetime import datetime, timedelta
 import uuid
 
 from src.database.manager import DatabaseManager
+from src.database.behavioral_assessments import (
+    BehavioralAssessmentStore, RECENT_ASSESSMENT_WINDOW, embedded_assessment_summary
+)
 from src.events.bus import EventBus
 from src.events.models import create_event
+from src.events.outbox import EventOutbox
 from src.utils.logger import get_logger
 from src.utils.cache_manager import CacheManager
+from src.services.user_scope import current_identity_map
 from src.ui.lucien_voice_generator import (
     LucienVoiceProfile, InteractionHistory, WorthinessProgression,
     BehavioralAssessment, RelationshipLevel, FormalityLevel,
@@ -25,6 +30,62 @@ from src.ui.lucien_voice_generator import (
 logger = get_logger(__name__)
 
 
+# Named field projections of the MongoDB user state for the hot read paths.
+# "user_id" is always included so an existing user never projects to an empty document.
+_MENU_STATE_FIELDS = (
+    "current_state.menu_context",
+    "current_state.navigation_path",
+    "current_state.session_data",
+    "preferences",
+    "emotional_journey.current_level",
+    "besitos",
+    "updated_at",
+)
+
+USER_STATE_PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    "wallet": ("user_id", "besitos"),
+    "menu": ("user_id",) + _MENU_STATE_FIELDS + (
+        "lucien_interaction_context.worthiness_progression.current_worthiness_score",
+        "lucien_interaction_context.user_archetype_assessment.detected_archetype",
+        "lucien_interaction_context.relationship_with_lucien",
+        "lucien_interaction_context.sophistication_level",
+        "lucien_interaction_context.diana_encounters_earned",
+        "lucien_interaction_context.last_diana_encounter",
+    ),
+    "menu_enhanced": ("user_id",) + _MENU_STATE_FIELDS + ("lucien_interaction_context",),
+    "narrative": ("user_id", "emotional_journey", "current_state.narrative_progress"),
+}
+
+StateFields = Optional[Union[str, Sequence[str]]]
+
+
+def resolve_state_fields(fields: StateFields) -> Optional[Tuple[str, ...]]:
+    """Resolve a projection profile name or field list to MongoDB field paths.
+
+    Args:
+        fields: Name in USER_STATE_PROJECTIONS, a sequence of dotted field paths,
+            or None for the whole document
+
+    Returns:
+        Optional[Tuple[str, ...]]: Field paths including "user_id", without paths nested
+            in another requested path (MongoDB rejects such collisions), or None
+
+    Raises:
+        ValueError: If a projection profile name is unknown
+    """
+    if fields is None:
+        return None
+    if isinstance(fields, str):
+        if fields not in USER_STATE_PROJECTIONS:
+            raise ValueError(f"Unknown user state projection: {fields}")
+        fields = USER_STATE_PROJECTIONS[fields]
+    paths = {"user_id", *fields}
+    return tuple(sorted(
+        path for path in paths
+        if not any(path.startswith(other + ".") for other in paths)
+    ))
+
+
 class UserServiceError(Exception):
     """Base exception for user service operations."""
     pass
@@ -43,17 +104,26 @@ class UserNotFoundError(UserServiceError):
 class UserService:
     """Service for unified user operations across MongoDB and SQLite databases."""
     
-    def __init__(self, database_manager: DatabaseManager, event_bus: EventBus, cache_manager: Optional[CacheManager] = None):
+    def __init__(
+        self,
+        database_manager: DatabaseManager,
+        event_bus: EventBus,
+        cache_manager: Optional[CacheManager] = None,
+        outbox: Optional[EventOutbox] = None
+    ):
         """Initialize the user service.
 
         Args:
             database_manager (DatabaseManager): Database manager instance
             event_bus (EventBus): Event bus instance
             cache_manager (CacheManager, optional): Cache manager instance
+            outbox (EventOutbox, optional): Transactional outbox for the events of state
+                changes. Without one, events are published right after the write.
         """
         self.database_manager = database_manager
         self.event_bus = event_bus
         self.cache_manager = cache_manager or CacheManager()
+        self.outbox = outbox
         logger.info("UserService initialized")
     
     async def create_user(self, telegram_user: Dict[str, Any]) -> Dict[str, Any]:
@@ -75,16 +145,31 @@ class UserService:
         
         # Start transaction-like behavior
         try:
+            events = self._state_event(
+                "user_registered",
+                user_id=user_id,
+                telegram_user_id=telegram_user.get("id"),
+                username=telegram_user.get("username"),
+                first_name=telegram_user.get("first_name"),
+                last_name=telegram_user.get("last_name"),
+                language_code=telegram_user.get("language_code")
+            )
+            
             # Create user in SQLite (user profiles)
-            sqlite_success = self._create_user_profile(user_id, telegram_user, timestamp)
+            sqlite_success = await self._create_user_profile(user_id, telegram_user, timestamp)
             if not sqlite_success:
                 raise UserCreationError("Failed to create user profile in SQLite")
             
-            # Create user in MongoDB (user state)
-            mongo_success = self._create_user_state(user_id, timestamp)
+            # Create user in MongoDB (user state), with the user_registered event when using the outbox
+            mongo_success = await self._create_user_state(user_id, timestamp, events)
             if not mongo_success:
                 raise UserCreationError("Failed to create user state in MongoDB")
             
+            # A lookup earlier in this update may have cached the user as missing
+            identity_map = current_identity_map()
+            if identity_map is not None:
+                identity_map.discard(user_id)
+            
             # Prepare user context
             user_context = {
                 "user_id": user_id,
@@ -93,20 +178,8 @@ class UserService:
                 "updated_at": timestamp.isoformat()
             }
             
-            # Publish user_registered event
-            try:
-                event = create_event(
-                    "user_registered",
-                    user_id=user_id,
-                    telegram_user_id=telegram_user.get("id"),
-                    username=telegram_user.get("username"),
-                    first_name=telegram_user.get("first_name"),
-                    last_name=telegram_user.get("last_name"),
-                    language_code=telegram_user.get("language_code")
-                )
-                await self.event_bus.publish("user_registered", event.dict())
-            except Exception as e:
-                logger.warning("Failed to publish user_registered event: %s", str(e))
+            if self.outbox is None:
+                await self._publish_events(events)
             
             logger.info("Successfully created user: %s", user_id)
             return user_context
@@ -117,8 +190,8 @@ class UserService:
             await self._rollback_user_creation(user_id)
             raise UserCreationError(f"Failed to create user: {str(e)}")
     
-    def _create_user_profile(self, user_id: str, telegram_user: Dict[str, Any], 
-                           timestamp: datetime) -> bool:
+    async def _create_user_profile(self, user_id: str, telegram_user: Dict[str, Any], 
+                                 timestamp: datetime) -> bool:
         """Create user profile in SQLite database.
         
         Args:
@@ -135,11 +208,10 @@ class UserService:
             return False
             
         try:
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
+            sqlite = self.database_manager.get_async_sqlite()
             
-            # Create user profile table if it doesn't exist
-            cursor.execute("""
+            # Create the table if needed and insert the profile in one group-committed unit
+            await sqlite.transaction([("""
                 CREATE TABLE IF NOT EXISTS user_profiles (
                     user_id TEXT PRIMARY KEY,
                     telegram_user_id INTEGER UNIQUE NOT NULL,
@@ -151,10 +223,7 @@ class UserService:
                     last_login DATETIME,
                     is_active BOOLEAN DEFAULT 1
                 )
-            """)
-            
-            # Insert user profile
-            cursor.execute("""
+            """, ()), ("""
                 INSERT INTO user_profiles (
                     user_id, telegram_user_id, username, first_name, last_name, 
                     language_code, registration_date, last_login, is_active
@@ -169,9 +238,8 @@ class UserService:
                 timestamp.isoformat(),
                 timestamp.isoformat(),
                 1
-            ))
+            ))])
             
-            conn.commit()
             logger.debug("Created user profile in SQLite for user: %s", user_id)
             return True
             
@@ -179,18 +247,25 @@ class UserService:
             logger.error("Error creating user profile in SQLite: %s", str(e))
             return False
     
-    def _create_user_state(self, user_id: str, timestamp: datetime) -> bool:
+    async def _create_user_state(
+        self,
+        user_id: str,
+        timestamp: datetime,
+        events: Sequence[Tuple[str, Dict[str, Any]]] = ()
+    ) -> bool:
         """Create user state in MongoDB database.
         
         Args:
             user_id (str): User ID
             timestamp (datetime): Creation timestamp
+            events: Event names and payloads inserted into the outbox in the same
+                transaction as the user document; ignored without an outbox
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             users_collection = db["users"]
             
             # Create user document
@@ -216,7 +291,12 @@ class UserService:
                 "updated_at": timestamp.isoformat()
             }
             
-            result = users_collection.insert_one(user_document)
+            if self.outbox is not None and events:
+                async with self.outbox.transaction() as session:
+                    result = await users_collection.insert_one(user_document, session=session)
+                    await self.outbox.add_many(events, session=session)
+            else:
+                result = await users_collection.insert_one(user_document)
             logger.debug("Created user state in MongoDB for user: %s", user_id)
             return result.acknowledged
             
@@ -232,33 +312,37 @@ class UserService:
         """
         logger.info("Rolling back user creation for user: %s", user_id)
         
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            identity_map.discard(user_id)
+        
         try:
             # Delete from SQLite
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM user_profiles WHERE user_id = ?", (user_id,))
-            conn.commit()
+            sqlite = self.database_manager.get_async_sqlite()
+            await sqlite.execute("DELETE FROM user_profiles WHERE user_id = ?", (user_id,))
             logger.debug("Rolled back user profile in SQLite for user: %s", user_id)
         except Exception as e:
             logger.warning("Failed to rollback user profile in SQLite: %s", str(e))
         
         try:
             # Delete from MongoDB
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             users_collection = db["users"]
-            result = users_collection.delete_one({"user_id": user_id})
+            result = await users_collection.delete_one({"user_id": user_id})
             logger.debug("Rolled back user state in MongoDB for user: %s", user_id)
         except Exception as e:
             logger.warning("Failed to rollback user state in MongoDB: %s", str(e))
     
-    async def get_user_context(self, user_id: str) -> Dict[str, Any]:
-        """Retrieve complete user context from both databases.
+    async def get_user_context(self, user_id: str, fields: StateFields = None) -> Dict[str, Any]:
+        """Retrieve user context from both databases.
 
         Args:
             user_id (str): User ID
+            fields: State fields the caller needs, as a USER_STATE_PROJECTIONS profile
+                name or a list of dotted paths. None loads the whole state document.
 
         Returns:
-            Dict[str, Any]: Complete user context
+            Dict[str, Any]: User context with the profile and the (projected) state
 
         Raises:
             UserNotFoundError: If user is not found
@@ -267,12 +351,12 @@ class UserService:
 
         try:
             # Get user profile from SQLite
-            profile = self._get_user_profile(user_id)
+            profile = await self._get_user_profile(user_id)
             if not profile:
                 raise UserNotFoundError(f"User profile not found for user: {user_id}")
 
             # Get user state from MongoDB
-            state = self._get_user_state(user_id)
+            state = await self._get_user_state(user_id, fields)
             if state is None:
                 raise UserNotFoundError(f"User state not found for user: {user_id}")
 
@@ -331,7 +415,7 @@ class UserService:
             logger.error("Error getting or creating user context: %s", str(e))
             raise UserServiceError(f"Failed to get or create user context: {str(e)}")
     
-    def _get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user profile from SQLite database.
         
         Args:
@@ -341,51 +425,161 @@ class UserService:
             Optional[Dict[str, Any]]: User profile or None if not found
         """
         try:
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM user_profiles WHERE user_id = ?", (user_id,))
-            row = cursor.fetchone()
-            
-            if row:
-                columns = [description[0] for description in cursor.description]
-                profile = dict(zip(columns, row))
-                logger.debug("Retrieved user profile from SQLite for user: %s", user_id)
-                return profile
-            
-            return None
+            identity_map = current_identity_map()
+            if identity_map is not None:
+                return await identity_map.load_profile(user_id, lambda: self._read_user_profile(user_id))
+            return await self._read_user_profile(user_id)
             
         except Exception as e:
             logger.error("Error retrieving user profile from SQLite: %s", str(e))
             return None
+
+    async def _read_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Read user profile from SQLite, bypassing the update's identity map."""
+        sqlite = self.database_manager.get_async_sqlite()
+        
+        profile = await sqlite.fetchone("SELECT * FROM user_profiles WHERE user_id = ?", (user_id,))
+        
+        if profile:
+            logger.debug("Retrieved user profile from SQLite for user: %s", user_id)
+            return profile
+        
+        return None
     
-    def _get_user_state(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def _get_user_state(self, user_id: str, fields: StateFields = None) -> Optional[Dict[str, Any]]:
         """Get user state from MongoDB database.
         
         Args:
             user_id (str): User ID
+            fields: Projection profile name or field paths, None for the whole document
             
         Returns:
             Optional[Dict[str, Any]]: User state or None if not found
         """
+        paths = resolve_state_fields(fields)
         try:
-            db = self.database_manager.get_mongo_db()
-            users_collection = db["users"]
-            
-            user_document = users_collection.find_one({"user_id": user_id})
-            
-            if user_document:
-                # Remove MongoDB-specific fields
-                user_document.pop("_id", None)
-                logger.debug("Retrieved user state from MongoDB for user: %s", user_id)
-                return user_document
-            
-            return None
+            identity_map = current_identity_map()
+            if identity_map is not None:
+                return await identity_map.load_state(
+                    user_id, lambda missing: self._read_user_state(user_id, missing), paths
+                )
+            return await self._read_user_state(user_id, paths)
             
         except Exception as e:
             logger.error("Error retrieving user state from MongoDB: %s", str(e))
             return None
+
+    async def _read_user_state(self, user_id: str, paths: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+        """Read user state from MongoDB, bypassing the update's identity map."""
+        db = self.database_manager.get_async_mongo_db()
+        users_collection = db["users"]
+        
+        if paths is None:
+            user_document = await users_collection.find_one({"user_id": user_id})
+        else:
+            projection = {"_id": 0, **{path: 1 for path in paths}}
+            user_document = await users_collection.find_one({"user_id": user_id}, projection)
+        
+        if user_document:
+            # Remove MongoDB-specific fields
+            user_document.pop("_id", None)
+            logger.debug("Retrieved user state from MongoDB for user: %s", user_id)
+            return user_document
+        
+        return None
     
+    async def _write_user_state(
+        self,
+        user_id: str,
+        update: Dict[str, Any],
+        events: Sequence[Tuple[str, Dict[str, Any]]] = ()
+    ) -> bool:
+        """Apply an update to a user document in MongoDB.
+
+        Inside an update scope the write is buffered and folded with the other
+        writes for the user into one update, committed when the update finishes;
+        its events wait with it and are only emitted if the commit matches the
+        user's document. With an outbox, the events of the change are committed
+        in the same transaction as the write.
+
+        Args:
+            user_id (str): User ID
+            update (Dict[str, Any]): Update with ``$set``, ``$inc`` and ``$push`` operators
+            events: Event names and payloads emitted if the document is modified
+
+        Returns:
+            bool: True if the document was modified or the write was buffered
+        """
+        users_collection = self.database_manager.get_async_mongo_db()["users"]
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            await identity_map.stage_state_update(
+                user_id, update, users_collection, events, self.outbox, self._publish_events
+            )
+            return True
+
+        if self.outbox is not None and events:
+            async with self.outbox.transaction() as session:
+                result = await users_collection.update_one({"user_id": user_id}, update, session=session)
+                if result.modified_count > 0:
+                    await self.outbox.add_many(events, session=session)
+            return result.modified_count > 0
+
+        result = await users_collection.update_one({"user_id": user_id}, update)
+        if result.modified_count > 0:
+            await self._emit_events(events)
+        return result.modified_count > 0
+
+    async def _emit_events(self, events: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+        """Hand the events of a state change to the outbox, or publish them without one.
+
+        Inside an update scope, outbox events are committed together with the
+        update's buffered state writes.
+
+        Args:
+            events: Event names and payloads
+        """
+        if not events:
+            return
+        if self.outbox is None:
+            await self._publish_events(events)
+            return
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            for event_name, payload in events:
+                identity_map.stage_event(event_name, payload, self.outbox)
+        else:
+            await self.outbox.add_many(events)
+
+    def _state_event(self, event_type: str, **fields: Any) -> List[Tuple[str, Dict[str, Any]]]:
+        """Build the event of a state change for ``_write_user_state``.
+
+        Args:
+            event_type (str): Event type
+            **fields: Event fields
+
+        Returns:
+            List[Tuple[str, Dict[str, Any]]]: The event name and payload, or an empty
+                list if the event does not validate, which must not fail the write
+        """
+        try:
+            return [(event_type, create_event(event_type, **fields).dict())]
+        except Exception as e:
+            logger.warning("Failed to create %s event: %s", event_type, str(e))
+            return []
+
+    async def _publish_events(self, events: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+        """Publish events directly on the event bus, logging failures.
+
+        Args:
+            events: Event names and payloads
+        """
+        for event_name, payload in events:
+            try:
+                await self.event_bus.publish(event_name, payload)
+            except Exception as e:
+                logger.warning("Failed to publish %s event: %s", event_name, str(e))
+
     async def update_user_state(self, user_id: str, state_updates: Dict[str, Any]) -> bool:
         """Update user dynamic state in MongoDB.
         
@@ -399,32 +593,19 @@ class UserService:
         logger.debug("Updating user state for user: %s", user_id)
         
         try:
-            db = self.database_manager.get_mongo_db()
-            users_collection = db["users"]
-            
             # Add timestamp to updates
             state_updates["updated_at"] = datetime.utcnow().isoformat()
             
-            # Update user document
-            result = users_collection.update_one(
-                {"user_id": user_id},
-                {"$set": state_updates}
+            # Update user document and emit the user_updated event for the state change
+            events = self._state_event(
+                "user_updated",
+                user_id=user_id,
+                update_type="state",
+                updated_fields=state_updates
             )
-            
-            success = result.modified_count > 0
+            success = await self._write_user_state(user_id, {"$set": state_updates}, events)
             if success:
                 logger.info("Successfully updated user state for user: %s", user_id)
-                # Publish user_updated event for state changes
-                try:
-                    event = create_event(
-                        "user_updated",
-                        user_id=user_id,
-                        update_type="state",
-                        updated_fields=state_updates
-                    )
-                    await self.event_bus.publish("user_updated", event.dict())
-                except Exception as e:
-                    logger.warning("Failed to publish user_updated event for state change: %s", str(e))
             else:
                 logger.warning("No changes made to user state for user: %s", user_id)
             
@@ -451,8 +632,7 @@ class UserService:
                 logger.warning("No profile updates provided for user: %s", user_id)
                 return True
             
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
+            sqlite = self.database_manager.get_async_sqlite()
             
             # Build SET clause dynamically
             set_clause = ", ".join([f"{key} = ?" for key in profile_updates.keys()])
@@ -460,16 +640,18 @@ class UserService:
             values.append(user_id)  # For WHERE clause
             
             # Update user profile
-            cursor.execute(
+            last_login = datetime.utcnow().isoformat()
+            result = await sqlite.execute(
                 f"UPDATE user_profiles SET {set_clause}, last_login = ? WHERE user_id = ?",
-                values + [datetime.utcnow().isoformat(), user_id]
+                values + [last_login, user_id]
             )
             
-            conn.commit()
-            
-            success = cursor.rowcount > 0
+            success = result.rowcount > 0
             if success:
                 logger.info("Successfully updated user profile for user: %s", user_id)
+                identity_map = current_identity_map()
+                if identity_map is not None:
+                    identity_map.merge_profile(user_id, {**profile_updates, "last_login": last_login})
                 # Publish user_updated event for profile changes
                 try:
                     event = create_event(
@@ -504,23 +686,28 @@ class UserService:
         
         try:
             # Get user data before deletion for event metadata
-            user_profile = self._get_user_profile(user_id)
-            user_state = self._get_user_state(user_id)
+            user_profile = await self._get_user_profile(user_id)
+            user_state = await self._get_user_state(user_id)
             
             # Delete from SQLite
-            sqlite_success = self._delete_user_profile(user_id)
+            sqlite_success = await self._delete_user_profile(user_id)
             if not sqlite_success:
                 logger.error("Failed to delete user profile from SQLite for user: %s", user_id)
                 return False
             
             # Delete from MongoDB
-            mongo_success = self._delete_user_state(user_id)
+            mongo_success = await self._delete_user_state(user_id)
             if not mongo_success:
                 logger.error("Failed to delete user state from MongoDB for user: %s", user_id)
                 # Try to rollback SQLite deletion
                 self._restore_user_profile(user_id)
                 return False
             
+            identity_map = current_identity_map()
+            if identity_map is not None:
+                identity_map.put_profile(user_id, None)
+                identity_map.put_state(user_id, None)
+            
             # Publish user_deleted event
             try:
                 event = create_event(
@@ -543,7 +730,7 @@ class UserService:
             logger.error("Error deleting user: %s", str(e))
             return False
     
-    def _delete_user_profile(self, user_id: str) -> bool:
+    async def _delete_user_profile(self, user_id: str) -> bool:
         """Delete user profile from SQLite database.
         
         Args:
@@ -553,13 +740,11 @@ class UserService:
             bool: True if successful, False otherwise
         """
         try:
-            conn = self.database_manager.get_sqlite_conn()
-            cursor = conn.cursor()
+            sqlite = self.database_manager.get_async_sqlite()
             
-            cursor.execute("DELETE FROM user_profiles WHERE user_id = ?", (user_id,))
-            conn.commit()
+            result = await sqlite.execute("DELETE FROM user_profiles WHERE user_id = ?", (user_id,))
             
-            success = cursor.rowcount > 0
+            success = result.rowcount > 0
             logger.debug("Deleted user profile from SQLite for user: %s", user_id)
             return success
             
@@ -567,7 +752,7 @@ class UserService:
             logger.error("Error deleting user profile from SQLite: %s", str(e))
             return False
     
-    def _delete_user_state(self, user_id: str) -> bool:
+    async def _delete_user_state(self, user_id: str) -> bool:
         """Delete user state from MongoDB database.
         
         Args:
@@ -577,10 +762,10 @@ class UserService:
             bool: True if successful, False otherwise
         """
         try:
-            db = self.database_manager.get_mongo_db()
+            db = self.database_manager.get_async_mongo_db()
             users_collection = db["users"]
             
-            result = users_collection.delete_one({"user_id": user_id})
+            result = await users_collection.delete_one({"user_id": user_id})
             success = result.deleted_count > 0
             
             logger.debug("Deleted user state from MongoDB for user: %s", user_id)
@@ -608,7 +793,7 @@ class UserService:
         """Get the number of besitos a user has"""
         try:
             # Get user state from MongoDB which may contain besitos
-            state = self._get_user_state(user_id)
+            state = await self._get_user_state(user_id, "wallet")
             if state:
                 # Check if besitos field exists in the user's state
                 return state.get('besitos', 0)
@@ -620,28 +805,21 @@ class UserService:
     async def award_besitos(self, user_id: str, amount: int) -> None:
         """Award besitos to a user"""
         try:
-            db = self.database_manager.get_mongo_db()
-            users_collection = db["users"]
-            
+            events = self._state_event(
+                "besitos_awarded",
+                user_id=user_id,
+                amount=amount,
+                new_balance=(await self.get_user_besitos(user_id)) + amount
+            )
             # Update user's besitos using $inc to increment atomically
-            result = users_collection.update_one(
-                {"user_id": user_id},
-                {"$inc": {"besitos": amount}, "$set": {"updated_at": datetime.utcnow().isoformat()}}
+            updated = await self._write_user_state(
+                user_id,
+                {"$inc": {"besitos": amount}, "$set": {"updated_at": datetime.utcnow().isoformat()}},
+                events
             )
             
-            if result.modified_count > 0:
+            if updated:
                 logger.info("Awarded %d besitos to user: %s", amount, user_id)
-                # Publish besitos_awarded event
-                try:
-                    event = create_event(
-                        "besitos_awarded",
-                        user_id=user_id,
-                        amount=amount,
-                        new_balance=(await self.get_user_besitos(user_id))
-                    )
-                    await self.event_bus.publish("besitos_awarded", event.dict())
-                except Exception as e:
-                    logger.warning("Failed to publish besitos_awarded event: %s", str(e))
             else:
                 logger.warning("No user found to award besitos: %s", user_id)
         except Exception as e:
@@ -654,28 +832,21 @@ class UserService:
             if current_besitos < amount:
                 raise UserServiceError(f"Insufficient besitos: {current_besitos} < {amount}")
             
-            db = self.database_manager.get_mongo_db()
-            users_collection = db["users"]
-            
+            events = self._state_event(
+                "besitos_spent",
+                user_id=user_id,
+                amount=amount,
+                new_balance=current_besitos - amount
+            )
             # Update user's besitos using $inc to decrement atomically
-            result = users_collection.update_one(
-                {"user_id": user_id},
-                {"$inc": {"besitos": -amount}, "$set": {"updated_at": datetime.utcnow().isoformat()}}
+            updated = await self._write_user_state(
+                user_id,
+                {"$inc": {"besitos": -amount}, "$set": {"updated_at": datetime.utcnow().isoformat()}},
+                events
             )
             
-            if result.modified_count > 0:
+            if updated:
                 logger.info("Deducted %d besitos from user: %s", amount, user_id)
-                # Publish besitos_spent event
-                try:
-                    event = create_event(
-                        "besitos_spent",
-                        user_id=user_id,
-                        amount=amount,
-                        new_balance=(await self.get_user_besitos(user_id))
-                    )
-                    await self.event_bus.publish("besitos_spent", event.dict())
-                except Exception as e:
-                    logger.warning("Failed to publish besitos_spent event: %s", str(e))
             else:
                 logger.warning("No user found to deduct besitos: %s", user_id)
         except Exception as e:
@@ -723,11 +894,8 @@ class UserService:
         logger.debug("Updating emotional signature for user: %s", user_id)
 
         try:
-            db = self.database_manager.get_mongo_db()
-            users_collection = db["users"]
-
             # Get current emotional signature for comparison
-            current_user = users_collection.find_one({"user_id": user_id})
+            current_user = await self._get_user_state(user_id, ["emotional_signature"])
             if not current_user:
                 logger.warning("User not found for emotional signature update: %s", user_id)
                 return False
@@ -752,49 +920,33 @@ class UserService:
             if not current_signature:
                 signature_updates["emotional_signature.created_at"] = timestamp
 
-            # Update user document
-            result = users_collection.update_one(
-                {"user_id": user_id},
-                {"$set": signature_updates}
+            # emotional_signature_updated for cross-module coordination, and
+            # user_updated for general state changes
+            events = self._state_event(
+                "emotional_signature_updated",
+                user_id=user_id,
+                archetype=signature_data.get("archetype"),
+                authenticity_score=signature_data.get("authenticity_score", 0.0),
+                signature_strength=signature_data.get("signature_strength", 0.0),
+                previous_archetype=previous_archetype,
+                metadata={
+                    "vulnerability_level": signature_data.get("vulnerability_level", 0.0),
+                    "response_patterns": signature_data.get("response_patterns", {}),
+                    "analysis_timestamp": timestamp.isoformat(),
+                    "signature_change": previous_archetype != signature_data.get("archetype")
+                }
+            )
+            events += self._state_event(
+                "user_updated",
+                user_id=user_id,
+                update_type="emotional_signature",
+                updated_fields={"emotional_signature": signature_data}
             )
 
-            success = result.modified_count > 0
+            # Update user document
+            success = await self._write_user_state(user_id, {"$set": signature_updates}, events)
             if success:
                 logger.info("Successfully updated emotional signature for user: %s", user_id)
-
-                # Publish emotional_signature_updated event for cross-module coordination
-                try:
-                    event = create_event(
-                        "emotional_signature_updated",
-                        user_id=user_id,
-                        archetype=signature_data.get("archetype"),
-                        authenticity_score=signature_data.get("authenticity_score", 0.0),
-                        signature_strength=signature_data.get("signature_strength", 0.0),
-                        previous_archetype=previous_archetype,
-                        metadata={
-                            "vulnerability_level": signature_data.get("vulnerability_level", 0.0),
-                            "response_patterns": signature_data.get("response_patterns", {}),
-                            "analysis_timestamp": timestamp.isoformat(),
-                            "signature_change": previous_archetype != signature_data.get("archetype")
-                        }
-                    )
-                    await self.event_bus.publish("emotional_signature_updated", event.dict())
-                    logger.debug("Published emotional_signature_updated event for user: %s", user_id)
-                except Exception as e:
-                    logger.warning("Failed to publish emotional_signature_updated event: %s", str(e))
-
-                # Publish user_updated event for general state changes
-                try:
-                    event = create_event(
-                        "user_updated",
-                        user_id=user_id,
-                        update_type="emotional_signature",
-                        updated_fields={"emotional_signature": signature_data}
-                    )
-                    await self.event_bus.publish("user_updated", event.dict())
-                except Exception as e:
-                    logger.warning("Failed to publish user_updated event for emotional signature: %s", str(e))
-
             else:
                 logger.warning("No changes made to emotional signature for user: %s", user_id)
 
@@ -833,7 +985,7 @@ class UserService:
 
         try:
             # Get user context using existing pattern
-            user_context = await self.get_user_context(user_id)
+            user_context = await self.get_user_context(user_id, fields="narrative")
             if not user_context:
                 logger.warning("User context not found for emotional journey state: %s", user_id)
                 return None
@@ -1107,7 +1259,8 @@ class UserService:
                 - interaction_tone: Current interaction tone
                 - diana_encounters_earned: Number of earned Diana encounters
                 - last_diana_encounter: Timestamp of last Diana encounter
-                - behavioral_assessment_history: History of behavioral assessments
+                - behavioral_assessment_history: Most recent behavioral assessments
+                - behavioral_assessment_count: Total number of behavioral assessments
                 - worthiness_progression: User worthiness development data
                 - sophistication_level: Current sophistication assessment
                 Or None if user not found or no interaction context exists
@@ -1144,6 +1297,7 @@ class UserService:
                     "last_diana_encounter": None,
                     "next_diana_opportunity": None,
                     "behavioral_assessment_history": [],
+                    "behavioral_assessment_count": 0,
                     "worthiness_progression": {
                         "current_worthiness_score": 0.0,
                         "character_assessments": [],
@@ -1264,17 +1418,13 @@ class UserService:
             if "behavioral_assessment" in context_updates:
                 assessment_data = context_updates["behavioral_assessment"]
                 behavioral_history = current_context.get("behavioral_assessment_history", [])
-                behavioral_history.append({
+                behavioral_history.append(embedded_assessment_summary({
+                    **assessment_data,
                     "assessment_id": assessment_data.get("assessment_id", str(uuid.uuid4())),
-                    "timestamp": timestamp,
-                    "behavior_observed": assessment_data.get("behavior_observed", ""),
-                    "lucien_evaluation": assessment_data.get("lucien_evaluation", ""),
-                    "sophistication_impact": assessment_data.get("sophistication_impact", 0.0),
-                    "worthiness_impact": assessment_data.get("worthiness_impact", 0.0),
-                    "archetype_confirmation": assessment_data.get("archetype_confirmation"),
-                    "diana_protection_factor": assessment_data.get("diana_protection_factor", 0.0)
-                })
-                current_context["behavioral_assessment_history"] = behavioral_history
+                    "timestamp": timestamp
+                }))
+                # Only a recent window is embedded; add_behavioral_assessment keeps the full history
+                current_context["behavioral_assessment_history"] = behavioral_history[-RECENT_ASSESSMENT_WINDOW:]
 
             # Update worthiness progression
             if "worthiness_update" in context_updates:
@@ -1997,7 +2147,9 @@ class UserService:
                 "session_context": {
                     "session_id": assessment_data.get("session_id"),
                     "interaction_sequence": assessment_data.get("interaction_sequence", 1),
-                    "previous_assessments_count": len(lucien_context.get("behavioral_assessment_history", [])),
+                    "previous_assessments_count": lucien_context.get(
+                        "behavioral_assessment_count", len(lucien_context.get("behavioral_assessment_history", []))
+                    ),
                     "relationship_level_at_time": lucien_context.get("relationship_with_lucien"),
                     "evaluation_level_at_time": lucien_context.get("current_evaluation_level", 1)
                 },
@@ -2009,9 +2161,8 @@ class UserService:
                 }
             }
 
-            # Update Lucien interaction context with new assessment
+            # Update Lucien interaction context; the assessment itself is recorded below
             context_updates = {
-                "behavioral_assessment": assessment_record,
                 "interaction_metadata": {
                     "assessment_added": True,
                     "sophistication_demonstrated": len(assessment_data.get("sophistication_indicators", [])) > 0,
@@ -2035,6 +2186,7 @@ class UserService:
             success = await self.update_lucien_interaction_context(user_id, context_updates)
 
             if success:
+                await self._record_behavioral_assessment(user_id, assessment_record)
                 logger.info("Successfully added behavioral assessment for user: %s", user_id)
 
                 # Publish behavioral assessment event for cross-module coordination
@@ -2055,8 +2207,8 @@ class UserService:
                             "evaluation_level": lucien_context.get("current_evaluation_level", 1)
                         }
                     )
-                    await self.event_bus.publish("behavioral_assessment_added", event.dict())
-                    logger.debug("Published behavioral_assessment_added event for user: %s", user_id)
+                    await self._emit_events([("behavioral_assessment_added", event.dict())])
+                    logger.debug("Emitted behavioral_assessment_added event for user: %s", user_id)
                 except Exception as e:
                     logger.warning("Failed to publish behavioral_assessment_added event: %s", str(e))
 
@@ -2069,16 +2221,43 @@ class UserService:
             logger.error("Error adding behavioral assessment for user %s: %s", user_id, str(e))
             raise UserServiceError(f"Failed to add behavioral assessment: {str(e)}")
 
-    async def get_behavioral_assessment_history(self, user_id: str, limit: Optional[int] = 50, assessment_context: Optional[str] = None) -> List[Dict[str, Any]]:
+    async def _record_behavioral_assessment(self, user_id: str, assessment_record: Dict[str, Any]) -> None:
+        """Store an assessment in its bucket and embed its summary in the capped recent window.
+
+        Args:
+            user_id (str): User ID
+            assessment_record (Dict[str, Any]): Full assessment record
+        """
+        db = self.database_manager.get_async_mongo_db()
+        await BehavioralAssessmentStore(db).add(user_id, assessment_record)
+        await self._write_user_state(user_id, {
+            "$push": {
+                "lucien_interaction_context.behavioral_assessment_history": {
+                    "$each": [embedded_assessment_summary(assessment_record)],
+                    "$slice": -RECENT_ASSESSMENT_WINDOW
+                }
+            },
+            "$inc": {"lucien_interaction_context.behavioral_assessment_count": 1}
+        })
+
+    async def get_behavioral_assessment_history(
+        self,
+        user_id: str,
+        limit: Optional[int] = 50,
+        assessment_context: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
         """Retrieve user's behavioral assessment history with filtering options.
 
         This method provides access to the complete behavioral assessment tracking history
-        that supports Lucien's evaluation system and Diana encounter management.
+        that supports Lucien's evaluation system and Diana encounter management. Filtering,
+        sorting and the limit are applied by MongoDB on the bucketed assessment collection.
 
         Args:
             user_id (str): User ID
             limit (Optional[int]): Maximum number of assessments to return (default: 50)
             assessment_context (Optional[str]): Filter by specific assessment context
+            since (Optional[datetime]): Only return assessments made at or after this time
 
         Returns:
             List[Dict[str, Any]]: List of behavioral assessments sorted by timestamp (newest first)
@@ -2095,32 +2274,11 @@ class UserService:
         logger.debug("Retrieving behavioral assessment history for user: %s", user_id)
 
         try:
-            # Get Lucien interaction context which contains assessment history
-            lucien_context = await self.get_lucien_interaction_context(user_id)
-            if lucien_context is None:
-                logger.warning("No Lucien interaction context found for assessment history: %s", user_id)
-                return []
-
-            # Extract assessment history
-            assessment_history = lucien_context.get("behavioral_assessment_history", [])
-
-            # Filter by context if specified
-            if assessment_context:
-                assessment_history = [
-                    assessment for assessment in assessment_history
-                    if assessment.get("assessment_context") == assessment_context
-                ]
-
-            # Sort by timestamp (newest first)
-            assessment_history.sort(
-                key=lambda x: x.get("timestamp", datetime.min),
-                reverse=True
+            store = BehavioralAssessmentStore(self.database_manager.get_async_mongo_db())
+            assessment_history = await store.find(
+                user_id, since=since, assessment_context=assessment_context, limit=limit
             )
 
-            # Apply limit
-            if limit:
-                assessment_history = assessment_history[:limit]
-
             logger.debug("Retrieved %d behavioral assessments for user: %s", len(assessment_history), user_id)
             return assessment_history
 
@@ -2159,65 +2317,13 @@ class UserService:
         logger.debug("Retrieving menu context for user: %s", user_id)
 
         try:
-            # Get complete user context
-            user_context = await self.get_user_context(user_id)
+            # Get the user context fields needed for menus
+            user_context = await self.get_user_context(user_id, fields="menu")
             if not user_context:
                 logger.warning("No user context found for menu context retrieval: %s", user_id)
                 return self._get_default_menu_context()
 
-            # Extract user state
-            user_state = user_context.get("state", {})
-            
-            # Get current menu context from user state
-            menu_context = user_state.get("current_state", {}).get("menu_context", "main_menu")
-            
-            # Get navigation path
-            navigation_path = user_state.get("current_state", {}).get("navigation_path", [])
-            
-            # Get session data
-            session_data = user_state.get("current_state", {}).get("session_data", {})
-            
-            # Get user profile for role information
-            user_profile = user_context.get("profile", {})
-            
-            # Get emotional journey for narrative level
-            emotional_journey = user_state.get("emotional_journey", {})
-            
-            # Get Lucien interaction context for worthiness score
-            lucien_context = user_state.get("lucien_interaction_context", {})
-            worthiness_progression = lucien_context.get("worthiness_progression", {})
-            
-            # Get besitos balance
-            besitos_balance = user_state.get("besitos", 0)
-            
-            # Get archetype from Lucien context
-            archetype_assessment = lucien_context.get("user_archetype_assessment", {})
-            
-            # Get relationship level and other Lucien context data
-            relationship_level = lucien_context.get("relationship_with_lucien", "formal_examiner")
-            sophistication_level = lucien_context.get("sophistication_level", {})
-            diana_encounters_earned = lucien_context.get("diana_encounters_earned", 0)
-            last_diana_encounter = lucien_context.get("last_diana_encounter")
-            
-            # Compile comprehensive menu context
-            compiled_context = {
-                "user_id": user_id,
-                "current_menu_id": menu_context,
-                "navigation_path": navigation_path,
-                "menu_preferences": user_state.get("preferences", {}),
-                "session_data": session_data,
-                "role": user_profile.get("role", "free_user"),
-                "has_vip": user_profile.get("has_vip", False),
-                "narrative_level": emotional_journey.get("current_level", 1),
-                "worthiness_score": worthiness_progression.get("current_worthiness_score", 0.0),
-                "besitos_balance": besitos_balance,
-                "archetype": archetype_assessment.get("detected_archetype"),
-                "relationship_level": relationship_level,
-                "sophistication_score": sophistication_level.get("current_score", 0.0),
-                "diana_encounters_earned": diana_encounters_earned,
-                "last_diana_encounter": last_diana_encounter,
-                "updated_at": user_state.get("updated_at")
-            }
+            compiled_context = self._compile_menu_context(user_id, user_context)
 
             logger.debug("Successfully retrieved menu context for user: %s", user_id)
             return compiled_context
@@ -2227,6 +2333,70 @@ class UserService:
             # Return default context as fallback
             return self._get_default_menu_context()
 
+    def _compile_menu_context(self, user_id: str, user_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the menu context from a user context loaded with at least the "menu" projection.
+
+        Args:
+            user_id (str): User ID
+            user_context (Dict[str, Any]): User context from get_user_context
+
+        Returns:
+            Dict[str, Any]: Menu context as returned by get_user_menu_context
+        """
+        # Extract user state
+        user_state = user_context.get("state", {})
+        
+        # Get current menu context from user state
+        menu_context = user_state.get("current_state", {}).get("menu_context", "main_menu")
+        
+        # Get navigation path
+        navigation_path = user_state.get("current_state", {}).get("navigation_path", [])
+        
+        # Get session data
+        session_data = user_state.get("current_state", {}).get("session_data", {})
+        
+        # Get user profile for role information
+        user_profile = user_context.get("profile", {})
+        
+        # Get emotional journey for narrative level
+        emotional_journey = user_state.get("emotional_journey", {})
+        
+        # Get Lucien interaction context for worthiness score
+        lucien_context = user_state.get("lucien_interaction_context", {})
+        worthiness_progression = lucien_context.get("worthiness_progression", {})
+        
+        # Get besitos balance
+        besitos_balance = user_state.get("besitos", 0)
+        
+        # Get archetype from Lucien context
+        archetype_assessment = lucien_context.get("user_archetype_assessment", {})
+        
+        # Get relationship level and other Lucien context data
+        relationship_level = lucien_context.get("relationship_with_lucien", "formal_examiner")
+        sophistication_level = lucien_context.get("sophistication_level", {})
+        diana_encounters_earned = lucien_context.get("diana_encounters_earned", 0)
+        last_diana_encounter = lucien_context.get("last_diana_encounter")
+        
+        # Compile comprehensive menu context
+        return {
+            "user_id": user_id,
+            "current_menu_id": menu_context,
+            "navigation_path": navigation_path,
+            "menu_preferences": user_state.get("preferences", {}),
+            "session_data": session_data,
+            "role": user_profile.get("role", "free_user"),
+            "has_vip": user_profile.get("has_vip", False),
+            "narrative_level": emotional_journey.get("current_level", 1),
+            "worthiness_score": worthiness_progression.get("current_worthiness_score", 0.0),
+            "besitos_balance": besitos_balance,
+            "archetype": archetype_assessment.get("detected_archetype"),
+            "relationship_level": relationship_level,
+            "sophistication_score": sophistication_level.get("current_score", 0.0),
+            "diana_encounters_earned": diana_encounters_earned,
+            "last_diana_encounter": last_diana_encounter,
+            "updated_at": user_state.get("updated_at")
+        }
+
     async def get_enhanced_user_menu_context(self, user_id: str) -> Dict[str, Any]:
         """Retrieve enhanced user menu context with more detailed information for sophisticated menu generation.
 
@@ -2242,14 +2412,14 @@ class UserService:
         logger.debug("Retrieving enhanced menu context for user: %s", user_id)
 
         try:
-            # Get basic menu context
-            menu_context = await self.get_user_menu_context(user_id)
-            
-            # Get complete user context for additional details
-            user_context = await self.get_user_context(user_id)
+            # One read covers both the basic menu context and the Lucien details
+            user_context = await self.get_user_context(user_id, fields="menu_enhanced")
             if not user_context:
                 logger.warning("No user context found for enhanced menu context retrieval: %s", user_id)
-                return menu_context
+                return await self.get_user_menu_context(user_id)
+
+            # Get basic menu context
+            menu_context = self._compile_menu_context(user_id, user_context)
 
             # Extract user state
             user_state = user_context.get("state", {})
@@ -2274,7 +2444,9 @@ class UserService:
             enhanced_context = {
                 **menu_context,
                 "interaction_history": interaction_history,
-                "behavioral_assessment_count": len(behavioral_assessment_history),
+                "behavioral_assessment_count": lucien_context.get(
+                    "behavioral_assessment_count", len(behavioral_assessment_history)
+                ),
                 "recent_behavioral_assessments": behavioral_assessment_history[-5:] if behavioral_assessment_history else [],
                 "worthiness_progression": worthiness_progression,
                 "sophistication_level": sophistication_level,
@@ -2546,15 +2718,11 @@ class UserService:
         logger.debug("Analyzing behavioral patterns for user: %s over %d days", user_id, analysis_window_days)
 
         try:
-            # Get recent assessment history
-            all_assessments = await self.get_behavioral_assessment_history(user_id, limit=200)
-
-            # Filter assessments within the analysis window
+            # Get the assessments within the analysis window
             cutoff_date = datetime.utcnow() - timedelta(days=analysis_window_days)
-            recent_assessments = [
-                assessment for assessment in all_assessments
-                if assessment.get("timestamp", datetime.min) >= cutoff_date
-            ]
+            recent_assessments = await self.get_behavioral_assessment_history(
+                user_id, limit=200, since=cutoff_date
+            )
 
             if not recent_assessments:
                 logger.warning("No recent assessments found for behavioral pattern analysis: %s", user_id)
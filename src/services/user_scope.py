@@ -0,0 +1,580 @@
+"""
+Request-scoped user identity map for the YABOT system.
+
+While a Telegram update is being handled, UserService reads every user
+profile (SQLite) and user state (MongoDB) at most once and serves repeated
+reads from this map. The map is carried in a contextvar and discarded when the
+update finishes, so nothing outlives the update it was loaded for.
+
+MongoDB user state writes made during the update are buffered: all ``$set``,
+``$inc`` and ``$push`` operations for one user are folded into a single update
+document, applied to the cached state right away so later reads in the same
+update see them, and committed when the update finishes. Pending updates for
+several users are committed with one ``bulk_write``. Profile writes go to
+SQLite immediately and are merged into the cached profile.
+
+Events of a buffered state write are held with the user's pending update and
+only emitted for users whose commit matched a document. With the transactional
+outbox they are committed in the same MongoDB transaction as the buffered
+state writes, so the state change and its events are persisted together;
+without one they are published once the writes are committed.
+
+States may be loaded partially through field projections. The map remembers
+which field paths of each state it holds and only goes back to MongoDB for a
+read that asks for fields it has not loaded yet.
+"""
+
+import copy
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from pymongo import UpdateOne
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+
+def _get_path(document: Dict[str, Any], path: str) -> Any:
+    """Return the value at a dotted path, or _MISSING."""
+    value: Any = document
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _set_path(document: Dict[str, Any], path: str, value: Any) -> None:
+    """Set the value at a dotted path, creating intermediate documents."""
+    *parents, leaf = path.split(".")
+    target = document
+    for key in parents:
+        child = target.get(key)
+        if not isinstance(child, dict):
+            child = target[key] = {}
+        target = child
+    target[leaf] = value
+
+
+def _delete_path(document: Dict[str, Any], path: str) -> None:
+    """Remove the value at a dotted path, if present."""
+    *parents, leaf = path.split(".")
+    parent = _get_path(document, ".".join(parents)) if parents else document
+    if isinstance(parent, dict):
+        parent.pop(leaf, None)
+
+
+def _related(first: str, second: str) -> bool:
+    """Whether two dotted paths are equal or one is nested in the other."""
+    return first == second or first.startswith(second + ".") or second.startswith(first + ".")
+
+
+def _push_spec(value: Any) -> Tuple[List[Any], Optional[int]]:
+    """Normalize a ``$push`` value to its items and optional ``$slice``."""
+    if isinstance(value, dict) and "$each" in value:
+        return list(value["$each"]), value.get("$slice")
+    return [value], None
+
+
+def _pushed(current: Any, items: List[Any], slice_to: Optional[int]) -> List[Any]:
+    """Return ``current`` with ``items`` appended and ``$slice`` applied."""
+    values = (list(current) if isinstance(current, list) else []) + items
+    if slice_to is None:
+        return values
+    if slice_to < 0:
+        return values[slice_to:] if slice_to else []
+    return values[:slice_to]
+
+
+def apply_update(document: Dict[str, Any], update: Dict[str, Any], loaded: Optional[FrozenSet[str]] = None) -> None:
+    """Apply a MongoDB update document to an in-memory document.
+
+    Args:
+        document (Dict[str, Any]): Document to modify in place
+        update (Dict[str, Any]): Update with ``$set``, ``$inc`` and ``$push`` operators
+        loaded (Optional[FrozenSet[str]]): Field paths the document holds, None for all.
+            ``$inc`` and ``$push`` on paths it does not hold are skipped, because their
+            current value is unknown.
+    """
+    for path, value in update.get("$set", {}).items():
+        _set_path(document, path, copy.deepcopy(value))
+    for path, amount in update.get("$inc", {}).items():
+        if _covers(loaded, path):
+            current = _get_path(document, path)
+            _set_path(document, path, (0 if current is _MISSING else current) + amount)
+    for path, value in update.get("$push", {}).items():
+        if _covers(loaded, path):
+            items, slice_to = _push_spec(copy.deepcopy(value))
+            _set_path(document, path, _pushed(_get_path(document, path), items, slice_to))
+
+
+def _restrict_update(update: Dict[str, Any], paths: Sequence[str]) -> Dict[str, Any]:
+    """Keep only the operations of an update touching the given field paths."""
+    loaded = frozenset(paths)
+    restricted = {
+        operator: {path: value for path, value in fields.items() if _covers(loaded, path)}
+        for operator, fields in update.items()
+    }
+    # A $set of a parent path also replaces the loaded paths below it
+    restricted["$set"] = {
+        path: value for path, value in update.get("$set", {}).items()
+        if any(_related(path, field) for field in loaded)
+    }
+    return restricted
+
+
+class PendingUserUpdate:
+    """``$set``/``$inc``/``$push`` operations for one user folded into one update document."""
+
+    def __init__(self):
+        """Initialize an empty pending update."""
+        self._set: Dict[str, Any] = {}
+        self._inc: Dict[str, Any] = {}
+        self._push: Dict[str, Tuple[List[Any], Optional[int]]] = {}
+
+    def merge(self, update: Dict[str, Any]) -> bool:
+        """Fold an update into the pending one.
+
+        Args:
+            update (Dict[str, Any]): Update with ``$set``, ``$inc`` and ``$push`` operators
+
+        Returns:
+            bool: False if the update cannot be combined with the pending operations,
+                in which case nothing was merged
+        """
+        if set(update) - {"$set", "$inc", "$push"}:
+            return False
+        merged = copy.deepcopy(self)
+        for path, value in update.get("$set", {}).items():
+            if not merged._merge_set(path, copy.deepcopy(value)):
+                return False
+        for path, amount in update.get("$inc", {}).items():
+            if not merged._merge_inc(path, amount):
+                return False
+        for path, value in update.get("$push", {}).items():
+            if not merged._merge_push(path, *_push_spec(copy.deepcopy(value))):
+                return False
+        self.__dict__.update(merged.__dict__)
+        return True
+
+    def _pending_set_ancestor(self, path: str) -> Optional[str]:
+        for pending in self._set:
+            if path == pending or path.startswith(pending + "."):
+                return pending
+        return None
+
+    def _merge_set(self, path: str, value: Any) -> bool:
+        # A $set overwrites earlier operations on the same path or below it
+        for pending in [p for p in self._inc if _related(p, path)]:
+            if not pending.startswith(path):
+                return False
+            del self._inc[pending]
+        for pending in [p for p in self._push if _related(p, path)]:
+            if not pending.startswith(path):
+                return False
+            del self._push[pending]
+        ancestor = self._pending_set_ancestor(path)
+        if ancestor is not None and ancestor != path:
+            if not isinstance(self._set[ancestor], dict):
+                return False
+            _set_path(self._set[ancestor], path[len(ancestor) + 1:], value)
+            return True
+        for pending in [p for p in self._set if p.startswith(path + ".")]:
+            del self._set[pending]
+        self._set[path] = value
+        return True
+
+    def _merge_inc(self, path: str, amount: Any) -> bool:
+        ancestor = self._pending_set_ancestor(path)
+        if ancestor is not None:
+            if ancestor == path:
+                current = self._set[path]
+                if not isinstance(current, (int, float)):
+                    return False
+                self._set[path] = current + amount
+                return True
+            if not isinstance(self._set[ancestor], dict):
+                return False
+            relative = path[len(ancestor) + 1:]
+            current = _get_path(self._set[ancestor], relative)
+            if current is not _MISSING and not isinstance(current, (int, float)):
+                return False
+            _set_path(self._set[ancestor], relative, (0 if current is _MISSING else current) + amount)
+            return True
+        if any(_related(p, path) for p in self._set) or any(_related(p, path) for p in self._push):
+            return False
+        if any(_related(p, path) and p != path for p in self._inc):
+            return False
+        self._inc[path] = self._inc.get(path, 0) + amount
+        return True
+
+    def _merge_push(self, path: str, items: List[Any], slice_to: Optional[int]) -> bool:
+        ancestor = self._pending_set_ancestor(path)
+        if ancestor is not None:
+            if ancestor == path:
+                self._set[path] = _pushed(self._set[path], items, slice_to)
+                return True
+            if not isinstance(self._set[ancestor], dict):
+                return False
+            relative = path[len(ancestor) + 1:]
+            _set_path(self._set[ancestor], relative, _pushed(_get_path(self._set[ancestor], relative), items, slice_to))
+            return True
+        if any(_related(p, path) for p in self._set) or any(_related(p, path) for p in self._inc):
+            return False
+        if any(_related(p, path) and p != path for p in self._push):
+            return False
+        if path in self._push:
+            pending_items, pending_slice = self._push[path]
+            # Trimming twice to the same window equals trimming once at the end
+            if pending_slice is not None and pending_slice != slice_to:
+                return False
+            items = pending_items + items
+        self._push[path] = (items, slice_to)
+        return True
+
+    def to_update(self) -> Dict[str, Any]:
+        """Build the MongoDB update document.
+
+        Returns:
+            Dict[str, Any]: Update combining all merged operations
+        """
+        update: Dict[str, Any] = {}
+        if self._set:
+            update["$set"] = self._set
+        if self._inc:
+            update["$inc"] = self._inc
+        if self._push:
+            update["$push"] = {
+                path: {"$each": items} if slice_to is None else {"$each": items, "$slice": slice_to}
+                for path, (items, slice_to) in self._push.items()
+            }
+        return update
+
+
+def _covers(loaded: Optional[FrozenSet[str]], path: str) -> bool:
+    """Whether loaded field paths (None for the whole document) include ``path``."""
+    if loaded is None:
+        return True
+    return any(path == field or path.startswith(field + ".") for field in loaded)
+
+
+def project_document(document: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Copy the given dotted field paths of a document, like a MongoDB inclusion projection.
+
+    Args:
+        document (Dict[str, Any]): Source document
+        fields (Optional[Sequence[str]]): Field paths to keep, None to copy everything
+
+    Returns:
+        Dict[str, Any]: Projected deep copy of the document
+    """
+    if fields is None:
+        return copy.deepcopy(document)
+    projected: Dict[str, Any] = {}
+    for path in fields:
+        value = _get_path(document, path)
+        if value is not _MISSING:
+            _set_path(projected, path, copy.deepcopy(value))
+    return projected
+
+
+class UserIdentityMap:
+    """Per-update cache of user profiles and user states keyed by user ID.
+
+    A cached value of None records that the user does not exist, so the
+    negative lookup is not repeated either.
+    """
+
+    def __init__(self):
+        """Initialize an empty identity map."""
+        self._profiles: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._states: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Field paths loaded per state; None means the whole document
+        self._state_fields: Dict[str, Optional[FrozenSet[str]]] = {}
+        # Buffered user state writes and the collection they are committed to
+        self._pending: Dict[str, PendingUserUpdate] = {}
+        self._users_collection: Any = None
+        # Events committed to the outbox together with the buffered writes
+        self._events: List[Tuple[str, Dict[str, Any]]] = []
+        self._outbox: Any = None
+        # Events of each user's pending update, emitted only if its commit matches
+        self._user_events: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        self._publisher: Optional[Callable[[Sequence[Tuple[str, Dict[str, Any]]]], Awaitable[None]]] = None
+
+    async def load_profile(
+        self,
+        user_id: str,
+        loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        """Return the user's profile, calling ``loader`` only on the first read.
+
+        Args:
+            user_id (str): User ID
+            loader: Coroutine function reading the profile from SQLite
+
+        Returns:
+            Optional[Dict[str, Any]]: Copy of the profile or None if not found
+        """
+        if user_id not in self._profiles:
+            self._profiles[user_id] = await loader()
+        # Callers own the returned dict, so hand out copies of the cached value
+        return copy.deepcopy(self._profiles[user_id])
+
+    async def load_state(
+        self,
+        user_id: str,
+        loader: Callable[[Optional[Tuple[str, ...]]], Awaitable[Optional[Dict[str, Any]]]],
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Return the user's state, calling ``loader`` only if fields are missing.
+
+        Args:
+            user_id (str): User ID
+            loader: Coroutine function reading the given fields (None for all) from MongoDB
+            fields (Optional[Tuple[str, ...]]): Field paths needed, None for the whole state
+
+        Returns:
+            Optional[Dict[str, Any]]: Copy of the (projected) state or None if not found
+        """
+        if user_id in self._states:
+            state = self._states[user_id]
+            if state is None:
+                return None
+            loaded = self._state_fields[user_id]
+            if loaded is None or fields is not None and all(_covers(loaded, path) for path in fields):
+                return project_document(state, fields)
+
+        document = await loader(fields)
+        pending = self._pending.get(user_id)
+        if document is not None and pending is not None:
+            # The database does not have the buffered writes yet
+            update = pending.to_update()
+            apply_update(document, update if fields is None else _restrict_update(update, fields))
+        state = self._states.get(user_id)
+        if document is None or fields is None or state is None:
+            self._states[user_id] = document
+            self._state_fields[user_id] = None if fields is None else frozenset(fields)
+        else:
+            # Overlay the freshly read paths on the partial state already held
+            for path in fields:
+                value = _get_path(document, path)
+                if value is _MISSING:
+                    _delete_path(state, path)
+                else:
+                    _set_path(state, path, value)
+            self._state_fields[user_id] = self._state_fields[user_id] | frozenset(fields)
+
+        if document is None:
+            return None
+        return project_document(self._states[user_id], fields)
+
+    def put_profile(self, user_id: str, profile: Optional[Dict[str, Any]]) -> None:
+        """Record a profile just written, or None after a deletion."""
+        self._profiles[user_id] = copy.deepcopy(profile)
+
+    def put_state(self, user_id: str, state: Optional[Dict[str, Any]]) -> None:
+        """Record a whole state just written, or None after a deletion."""
+        self._states[user_id] = copy.deepcopy(state)
+        self._state_fields[user_id] = None
+        if state is None:
+            self._pending.pop(user_id, None)
+
+    def merge_profile(self, user_id: str, fields: Dict[str, Any]) -> None:
+        """Apply updated columns to a cached profile, if it is cached."""
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            profile.update(copy.deepcopy(fields))
+
+    async def stage_state_update(
+        self,
+        user_id: str,
+        update: Dict[str, Any],
+        users_collection: Any,
+        events: Sequence[Tuple[str, Dict[str, Any]]] = (),
+        outbox: Any = None,
+        publisher: Optional[Callable[[Sequence[Tuple[str, Dict[str, Any]]]], Awaitable[None]]] = None
+    ) -> None:
+        """Buffer a MongoDB update of a user document until the update scope ends.
+
+        The update is applied to the cached state immediately. If it cannot be
+        folded into the user's pending update, the pending update is committed first.
+
+        Args:
+            user_id (str): User ID
+            update (Dict[str, Any]): Update with ``$set``, ``$inc`` and ``$push`` operators
+            users_collection: Async users collection the update is committed to
+            events: Event names and payloads emitted if the commit matches the user's document
+            outbox: EventOutbox the events are committed to, None to publish them
+            publisher: Coroutine function publishing the events when there is no outbox
+        """
+        self._users_collection = users_collection
+        pending = self._pending.setdefault(user_id, PendingUserUpdate())
+        if not pending.merge(update):
+            await self.flush([user_id])
+            pending = self._pending.setdefault(user_id, PendingUserUpdate())
+            if not pending.merge(update):
+                raise ValueError(f"Unsupported user state update: {update}")
+
+        if events:
+            if outbox is not None:
+                self._outbox = outbox
+            else:
+                self._publisher = publisher
+            self._user_events.setdefault(user_id, []).extend(events)
+
+        state = self._states.get(user_id)
+        if state is not None:
+            apply_update(state, update, self._state_fields[user_id])
+
+    def stage_event(self, event_name: str, payload: Dict[str, Any], outbox: Any) -> None:
+        """Buffer an event until the update scope ends.
+
+        Args:
+            event_name (str): Name of the event
+            payload (Dict[str, Any]): Event payload
+            outbox: EventOutbox the event is committed to
+        """
+        self._outbox = outbox
+        self._events.append((event_name, payload))
+
+    async def flush(self, user_ids: Optional[Sequence[str]] = None) -> None:
+        """Commit buffered user state writes and the events of the matched users.
+
+        A full flush also commits the staged events, in one transaction with the
+        state writes. Flushing selected users leaves the other staged events.
+
+        Args:
+            user_ids (Optional[Sequence[str]]): Users to commit, None for all
+        """
+        selected = list(self._pending) if user_ids is None else [u for u in user_ids if u in self._pending]
+        updates = [(user_id, self._pending.pop(user_id).to_update()) for user_id in selected]
+        updates = [(user_id, update) for user_id, update in updates if update]
+        user_events = {user_id: self._user_events.pop(user_id) for user_id in selected if user_id in self._user_events}
+        events = self._events if user_ids is None else []
+        if self._outbox is None or not events and not user_events:
+            result = await self._write_updates(updates)
+            published = await self._matched_events(updates, result, user_events)
+            if published and self._publisher is not None:
+                await self._publisher(published)
+            return
+
+        if user_ids is None:
+            self._events = []
+        async with self._outbox.transaction() as session:
+            result = await self._write_updates(updates, session=session)
+            events = events + await self._matched_events(updates, result, user_events, session=session)
+            if events:
+                await self._outbox.add_many(events, session=session)
+        logger.debug("Committed %d outbox events", len(events))
+
+    async def _write_updates(self, updates: List[Tuple[str, Dict[str, Any]]], **kwargs: Any) -> Any:
+        """Send folded user updates to MongoDB with as few commands as possible.
+
+        Returns:
+            The UpdateResult or BulkWriteResult, None if there was nothing to write
+        """
+        if not updates:
+            return None
+        if len(updates) == 1:
+            user_id, update = updates[0]
+            result = await self._users_collection.update_one({"user_id": user_id}, update, **kwargs)
+        else:
+            result = await self._users_collection.bulk_write(
+                [UpdateOne({"user_id": user_id}, update) for user_id, update in updates],
+                ordered=False,
+                **kwargs
+            )
+        logger.debug("Committed buffered state writes for %d users", len(updates))
+        return result
+
+    async def _matched_events(
+        self,
+        updates: List[Tuple[str, Dict[str, Any]]],
+        result: Any,
+        user_events: Dict[str, List[Tuple[str, Dict[str, Any]]]],
+        **kwargs: Any
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Collect the events of the users whose committed update matched their document."""
+        user_ids = [user_id for user_id, _ in updates if user_id in user_events]
+        if not user_ids:
+            return []
+        if result.matched_count == len(updates):
+            matched: Set[str] = set(user_ids)
+        elif len(updates) == 1:
+            matched = set()
+        else:
+            # A bulk result only counts the matches, look up which users have a document
+            cursor = self._users_collection.find({"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1}, **kwargs)
+            matched = {document["user_id"] async for document in cursor}
+        return [event for user_id in user_ids if user_id in matched for event in user_events[user_id]]
+
+    def discard(self, user_id: str) -> None:
+        """Forget everything cached and buffered for a user so the next read hits the databases.
+
+        Pending state writes of the user are dropped too, so they cannot be
+        committed on top of the document that replaced the cached one.
+        """
+        self._profiles.pop(user_id, None)
+        self._states.pop(user_id, None)
+        self._state_fields.pop(user_id, None)
+        self._pending.pop(user_id, None)
+        self._user_events.pop(user_id, None)
+
+
+_current_identity_map: ContextVar[Optional[UserIdentityMap]] = ContextVar(
+    "user_identity_map", default=None
+)
+
+
+def current_identity_map() -> Optional[UserIdentityMap]:
+    """Get the identity map of the update being handled.
+
+    Returns:
+        Optional[UserIdentityMap]: Active identity map, or None outside an update scope
+    """
+    return _current_identity_map.get()
+
+
+@asynccontextmanager
+async def user_identity_scope() -> AsyncIterator[UserIdentityMap]:
+    """Open an identity map for the duration of one update.
+
+    Nested scopes reuse the outer map, so wrapping both the dispatcher and the
+    handler pipeline still yields a single map per update. Buffered writes are
+    committed when the outermost scope exits, also if the update failed, since
+    without a scope they would have been written immediately. If that commit
+    fails, its error is raised from the scope.
+
+    Yields:
+        UserIdentityMap: Identity map active inside the scope
+    """
+    identity_map = _current_identity_map.get()
+    if identity_map is not None:
+        yield identity_map
+        return
+
+    identity_map = UserIdentityMap()
+    token = _current_identity_map.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current_identity_map.reset(token)
+        try:
+            await identity_map.flush()
+        except Exception as e:
+            logger.error("Error committing buffered user state writes: %s", str(e))
+            raise
+
+
+async def user_identity_middleware(
+    handler: Callable[[Any, Dict[str, Any]], Awaitable[Any]],
+    event: Any,
+    data: Dict[str, Any]
+) -> Any:
+    """Aiogram outer middleware running each update inside its own identity scope."""
+    async with user_identity_scope():
+        return await handler(event, data)
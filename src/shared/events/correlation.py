@@ -9,15 +9,39 @@ import asyncio
 import json
 import time
 import uuid
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, field
 from enum import Enum
 
 import redis.asyncio as redis
+from redis.exceptions import WatchError
 from src.core.models import BaseModel
 from src.events.models import BaseEvent
 
+# Removes up to ARGV[2] sequences whose expiry score is at most ARGV[1], with their
+# index entries, and takes their indexed status and event count off the counters.
+# Selecting and deleting in one script keeps a sequence refreshed meanwhile and
+# concurrent cleanups from being counted down twice.
+_CLEANUP_SCRIPT = """
+local ids = redis.call('zrangebyscore', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(ids) do
+    local status = redis.call('hget', KEYS[3], id)
+    if status then
+        local events = tonumber(redis.call('hget', KEYS[4], id) or '0')
+        redis.call('hincrby', KEYS[5], status, -1)
+        redis.call('hincrby', KEYS[5], 'sequences', -1)
+        redis.call('hincrby', KEYS[5], 'events', -events)
+    end
+    redis.call('del', ARGV[3] .. id, 'out_of_order:' .. id)
+    redis.call('zrem', KEYS[1], id)
+    redis.call('zrem', KEYS[2], id)
+    redis.call('hdel', KEYS[3], id)
+    redis.call('hdel', KEYS[4], id)
+end
+return #ids
+"""
+
 
 class EventStatus(str, Enum):
     """Event processing status."""
@@ -51,16 +75,26 @@ class EventCorrelationService:
     requirements 4.6, 4.8, and 4.9.
     """
 
-    def __init__(self, redis_client: redis.Redis, correlation_ttl: int = 3600):
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        correlation_ttl: int = 3600,
+        cleanup_batch_size: int = 500,
+        max_update_attempts: int = 100
+    ):
         """
         Initialize the correlation service.
 
         Args:
             redis_client: Redis client for correlation storage
             correlation_ttl: TTL for correlation data in seconds (default 1 hour)
+            cleanup_batch_size: Number of expired sequences removed per round trip
+            max_update_attempts: Attempts of an optimistic sequence update before giving up
         """
         self.redis_client = redis_client
         self.correlation_ttl = correlation_ttl
+        self.cleanup_batch_size = cleanup_batch_size
+        self.max_update_attempts = max_update_attempts
 
         # Redis key patterns following existing conventions
         self.correlation_key = "correlation:{correlation_id}"
@@ -68,6 +102,13 @@ class EventCorrelationService:
         self.event_order_key = "event_order:{correlation_id}"
         self.pending_events_key = "pending_events:{module}"
 
+        # Indexes maintained on every write so cleanup and statistics never scan keys
+        self.expiry_index_key = "correlation_index:expiry"  # zset: correlation_id -> expiry epoch
+        self.created_index_key = "correlation_index:created"  # zset: correlation_id -> creation epoch
+        self.status_index_key = "correlation_index:status"  # hash: correlation_id -> status
+        self.event_count_index_key = "correlation_index:event_count"  # hash: correlation_id -> events
+        self.stats_key = "correlation_index:stats"  # hash: per-status, sequence and event counters
+
     async def generate_correlation_id(self, user_id: Optional[str] = None) -> str:
         """
         Generate a new correlation ID with optional user context.
@@ -119,9 +160,8 @@ class EventCorrelationService:
         await self._store_correlation_sequence(sequence)
         return sequence
 
-    async def _store_correlation_sequence(self, sequence: CorrelationSequence) -> None:
-        """Store correlation sequence in Redis."""
-        key = self.correlation_key.format(correlation_id=sequence.correlation_id)
+    def _serialize_sequence(self, sequence: CorrelationSequence) -> str:
+        """Serialize a correlation sequence for storage."""
         data = {
             "correlation_id": sequence.correlation_id,
             "user_id": sequence.user_id,
@@ -133,12 +173,127 @@ class EventCorrelationService:
             "timeout_at": sequence.timeout_at.isoformat() if sequence.timeout_at else None,
             "metadata": sequence.metadata
         }
+        return json.dumps(data, default=str)
+
+    def _expiry_score(self, sequence: CorrelationSequence) -> float:
+        """Get the time at which a sequence stops counting as stored.
+
+        That is its timeout, or the end of its TTL if it is not refreshed earlier.
+        """
+        expires_at = time.time() + self.correlation_ttl
+        if sequence.timeout_at:
+            expires_at = min(expires_at, sequence.timeout_at.replace(tzinfo=timezone.utc).timestamp())
+        return expires_at
+
+    async def _store_correlation_sequence(self, sequence: CorrelationSequence) -> None:
+        """Store correlation sequence in Redis and update its indexes and counters."""
+        async def replace(pipe: Any, current: Optional[CorrelationSequence]) -> CorrelationSequence:
+            return sequence
+
+        await self._update_sequence(sequence.correlation_id, replace)
+
+    async def _update_sequence(
+        self,
+        correlation_id: str,
+        apply: Callable[[Any, Optional[CorrelationSequence]], Awaitable[Optional[CorrelationSequence]]],
+        watch: Sequence[str] = (),
+        stage_extra: Optional[Callable[[Any], None]] = None
+    ) -> Optional[CorrelationSequence]:
+        """Atomically read, change and write a correlation sequence.
+
+        The sequence key is watched while it is read, and the new sequence, its
+        index entries and its counters are written in one MULTI/EXEC. When another
+        writer changes the sequence in between, EXEC fails and the update is
+        applied again to the fresh value, so concurrent updates are never lost.
+
+        Args:
+            correlation_id: Correlation identifier
+            apply: Coroutine receiving the watched pipeline and the stored sequence
+                (None if missing) and returning the sequence to write, or None to
+                leave it unchanged. It may run reads on the pipeline but must not
+                have other side effects, since it is called again on conflicts.
+            watch: Additional keys read by ``apply``
+            stage_extra: Adds further commands to the transaction
+
+        Returns:
+            The written sequence, or None if nothing was written
+
+        Raises:
+            WatchError: If the sequence kept changing for max_update_attempts attempts
+        """
+        key = self.correlation_key.format(correlation_id=correlation_id)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for attempt in range(self.max_update_attempts):
+                try:
+                    await pipe.watch(key, *watch)
+                    data = await pipe.get(key)
+                    if data:
+                        current = self._deserialize_sequence(data)
+                        previous_status, previous_count = current.status.value, len(current.events)
+                    else:
+                        # The blob may have expired while still being indexed
+                        current = None
+                        previous_status = _decode(await pipe.hget(self.status_index_key, correlation_id))
+                        previous_count = int(await pipe.hget(self.event_count_index_key, correlation_id) or 0)
+
+                    sequence = await apply(pipe, current)
+                    if sequence is None:
+                        await pipe.unwatch()
+                        return None
+
+                    pipe.multi()
+                    self._stage_sequence_write(pipe, sequence, previous_status, previous_count)
+                    if stage_extra is not None:
+                        stage_extra(pipe)
+                    await pipe.execute()
+                    return sequence
+                except WatchError:
+                    if attempt == self.max_update_attempts - 1:
+                        raise
+        return None
+
+    def _stage_sequence_write(
+        self,
+        pipe: Any,
+        sequence: CorrelationSequence,
+        previous_status: Optional[str],
+        previous_count: int
+    ) -> None:
+        """Add the commands storing a sequence and updating its indexes to a pipeline.
 
-        await self.redis_client.setex(
-            key,
+        Args:
+            pipe: Redis pipeline
+            sequence: Sequence being stored
+            previous_status: Status indexed for the sequence, None if it is new
+            previous_count: Number of events indexed for the sequence
+        """
+        correlation_id = sequence.correlation_id
+        status = sequence.status.value
+        event_count = len(sequence.events)
+
+        pipe.setex(
+            self.correlation_key.format(correlation_id=correlation_id),
             self.correlation_ttl,
-            json.dumps(data, default=str)
+            self._serialize_sequence(sequence)
         )
+        pipe.zadd(self.expiry_index_key, {correlation_id: self._expiry_score(sequence)})
+
+        if previous_status is None:
+            pipe.zadd(
+                self.created_index_key,
+                {correlation_id: sequence.created_at.replace(tzinfo=timezone.utc).timestamp()}
+            )
+            pipe.hincrby(self.stats_key, "sequences", 1)
+            pipe.hincrby(self.stats_key, status, 1)
+        elif previous_status != status:
+            pipe.hincrby(self.stats_key, previous_status, -1)
+            pipe.hincrby(self.stats_key, status, 1)
+
+        if previous_status is None or previous_status != status:
+            pipe.hset(self.status_index_key, correlation_id, status)
+        if event_count != previous_count:
+            pipe.hset(self.event_count_index_key, correlation_id, event_count)
+            pipe.hincrby(self.stats_key, "events", event_count - previous_count)
 
     async def get_correlation_sequence(self, correlation_id: str) -> Optional[CorrelationSequence]:
         """
@@ -156,6 +311,10 @@ class EventCorrelationService:
         if not data:
             return None
 
+        return self._deserialize_sequence(data)
+
+    def _deserialize_sequence(self, data: Any) -> CorrelationSequence:
+        """Build a correlation sequence from its stored JSON."""
         sequence_data = json.loads(data)
         return CorrelationSequence(
             correlation_id=sequence_data["correlation_id"],
@@ -186,32 +345,50 @@ class EventCorrelationService:
         Returns:
             True if event was added successfully, False otherwise
         """
-        sequence = await self.get_correlation_sequence(correlation_id)
-        if not sequence:
-            # Create new sequence if it doesn't exist
-            sequence = await self.create_correlation_sequence(correlation_id, event.user_id)
-
-        # Check if sequence is expired or in failed state
-        if sequence.timeout_at and datetime.utcnow() > sequence.timeout_at:
-            sequence.status = EventStatus.TIMEOUT
-            await self._store_correlation_sequence(sequence)
-            return False
+        outcome = {}
+
+        async def append_event(pipe: Any, sequence: Optional[CorrelationSequence]) -> Optional[CorrelationSequence]:
+            outcome.clear()
+            created = sequence is None
+            if created:
+                # Create new sequence if it doesn't exist
+                sequence = CorrelationSequence(
+                    correlation_id=correlation_id,
+                    user_id=event.user_id,
+                    sequence_number=0
+                )
+
+            # Check if sequence is expired or in failed state
+            if sequence.timeout_at and datetime.utcnow() > sequence.timeout_at:
+                if sequence.status == EventStatus.TIMEOUT:
+                    return None
+                sequence.status = EventStatus.TIMEOUT
+                return sequence
+
+            if sequence.status in [EventStatus.FAILED, EventStatus.TIMEOUT]:
+                return None
+
+            # Validate sequence order if expected_sequence is provided
+            if expected_sequence is not None and expected_sequence != sequence.sequence_number + 1:
+                outcome["out_of_order"] = True
+                return sequence if created else None
+
+            # Add event to sequence
+            sequence.events.append(event.event_id)
+            sequence.sequence_number += 1
+            sequence.updated_at = datetime.utcnow()
+            outcome["added"] = True
+            return sequence
 
-        if sequence.status in [EventStatus.FAILED, EventStatus.TIMEOUT]:
-            return False
+        await self._update_sequence(correlation_id, append_event)
 
-        # Validate sequence order if expected_sequence is provided
-        if expected_sequence is not None and expected_sequence != sequence.sequence_number + 1:
+        if outcome.get("out_of_order"):
             # Event out of order - queue for later processing
             await self._queue_out_of_order_event(correlation_id, event, expected_sequence)
             return False
 
-        # Add event to sequence
-        sequence.events.append(event.event_id)
-        sequence.sequence_number += 1
-        sequence.updated_at = datetime.utcnow()
-
-        await self._store_correlation_sequence(sequence)
+        if not outcome.get("added"):
+            return False
 
         # Process any queued events that are now in order
         await self._process_queued_events(correlation_id)
@@ -236,7 +413,7 @@ class EventCorrelationService:
 
         await self.redis_client.zadd(
             queue_key,
-            {json.dumps(event_data): expected_sequence}
+            {json.dumps(event_data, default=str): expected_sequence}
         )
 
         # Set TTL for the queue
@@ -244,39 +421,42 @@ class EventCorrelationService:
 
     async def _process_queued_events(self, correlation_id: str) -> None:
         """Process queued out-of-order events that are now in sequence."""
-        sequence = await self.get_correlation_sequence(correlation_id)
-        if not sequence:
-            return
-
         queue_key = f"out_of_order:{correlation_id}"
-        next_expected = sequence.sequence_number + 1
-
-        # Get events with the next expected sequence number
-        events = await self.redis_client.zrangebyscore(
-            queue_key,
-            next_expected,
-            next_expected,
-            start=0,
-            num=1,
-            withscores=True
-        )
-
-        for event_data, score in events:
-            event_info = json.loads(event_data)
-
-            # Add to sequence
+        consumed = []
+
+        async def append_next(pipe: Any, sequence: Optional[CorrelationSequence]) -> Optional[CorrelationSequence]:
+            consumed.clear()
+            if not sequence:
+                return None
+
+            # Get events with the next expected sequence number
+            next_expected = sequence.sequence_number + 1
+            events = await pipe.zrangebyscore(
+                queue_key,
+                next_expected,
+                next_expected,
+                start=0,
+                num=1
+            )
+            if not events:
+                return None
+
+            event_info = json.loads(events[0])
             sequence.events.append(event_info["event_id"])
             sequence.sequence_number += 1
             sequence.updated_at = datetime.utcnow()
-
-            await self._store_correlation_sequence(sequence)
-
-            # Remove from queue
-            await self.redis_client.zrem(queue_key, event_data)
-
-            # Recursively process more events
-            await self._process_queued_events(correlation_id)
-            break
+            consumed.append(events[0])
+            return sequence
+
+        # Each queued event is moved into the sequence and removed from the
+        # queue in the same transaction
+        while await self._update_sequence(
+            correlation_id,
+            append_next,
+            watch=(queue_key,),
+            stage_extra=lambda pipe: pipe.zrem(queue_key, *consumed)
+        ):
+            pass
 
     async def complete_correlation_sequence(self, correlation_id: str) -> bool:
         """
@@ -288,14 +468,14 @@ class EventCorrelationService:
         Returns:
             True if sequence was completed successfully, False otherwise
         """
-        sequence = await self.get_correlation_sequence(correlation_id)
-        if not sequence:
-            return False
+        async def complete(pipe: Any, sequence: Optional[CorrelationSequence]) -> Optional[CorrelationSequence]:
+            if sequence:
+                sequence.status = EventStatus.COMPLETED
+                sequence.updated_at = datetime.utcnow()
+            return sequence
 
-        sequence.status = EventStatus.COMPLETED
-        sequence.updated_at = datetime.utcnow()
-
-        await self._store_correlation_sequence(sequence)
+        if not await self._update_sequence(correlation_id, complete):
+            return False
 
         # Clean up out-of-order queue
         queue_key = f"out_of_order:{correlation_id}"
@@ -318,16 +498,14 @@ class EventCorrelationService:
         Returns:
             True if sequence was marked as failed, False otherwise
         """
-        sequence = await self.get_correlation_sequence(correlation_id)
-        if not sequence:
-            return False
-
-        sequence.status = EventStatus.FAILED
-        sequence.updated_at = datetime.utcnow()
-        sequence.metadata["error_message"] = error_message
+        async def fail(pipe: Any, sequence: Optional[CorrelationSequence]) -> Optional[CorrelationSequence]:
+            if sequence:
+                sequence.status = EventStatus.FAILED
+                sequence.updated_at = datetime.utcnow()
+                sequence.metadata["error_message"] = error_message
+            return sequence
 
-        await self._store_correlation_sequence(sequence)
-        return True
+        return await self._update_sequence(correlation_id, fail) is not None
 
     async def get_user_active_correlations(self, user_id: str) -> List[CorrelationSequence]:
         """
@@ -368,31 +546,33 @@ class EventCorrelationService:
         """
         Clean up expired correlation sequences.
 
+        Expired sequence IDs are popped from the expiry index in batches, so the
+        cost depends on the number of expired sequences, not on all stored ones.
+        Each batch is selected and removed by one script, so it is atomic with
+        respect to sequence updates and other cleanups.
+
         Returns:
             Number of sequences cleaned up
         """
-        # In production, this would be handled by Redis TTL
-        # This method provides additional cleanup for complex scenarios
-
-        pattern = self.correlation_key.format(correlation_id="*")
-        keys = await self.redis_client.keys(pattern)
         cleaned_count = 0
-
-        current_time = datetime.utcnow()
-
-        for key in keys:
-            data = await self.redis_client.get(key)
-            if data:
-                sequence_data = json.loads(data)
-                timeout_at = sequence_data.get("timeout_at")
-
-                if timeout_at and datetime.fromisoformat(timeout_at) < current_time:
-                    await self.redis_client.delete(key)
-                    # Also clean up related out-of-order queue
-                    correlation_id = sequence_data["correlation_id"]
-                    queue_key = f"out_of_order:{correlation_id}"
-                    await self.redis_client.delete(queue_key)
-                    cleaned_count += 1
+        now = time.time()
+        correlation_key_prefix = self.correlation_key.format(correlation_id="")
+
+        while True:
+            removed = int(await self.redis_client.eval(
+                _CLEANUP_SCRIPT, 5,
+                self.expiry_index_key,
+                self.created_index_key,
+                self.status_index_key,
+                self.event_count_index_key,
+                self.stats_key,
+                now,
+                self.cleanup_batch_size,
+                correlation_key_prefix
+            ))
+            cleaned_count += removed
+            if removed < self.cleanup_batch_size:
+                break
 
         return cleaned_count
 
@@ -400,55 +580,42 @@ class EventCorrelationService:
         """
         Get statistics about correlation sequences.
 
+        Statistics are read from counters kept up to date on every write, in a
+        single round trip.
+
         Returns:
             Dictionary with correlation statistics
         """
-        pattern = self.correlation_key.format(correlation_id="*")
-        keys = await self.redis_client.keys(pattern)
+        pipe = self.redis_client.pipeline(transaction=False)
+        pipe.hgetall(self.stats_key)
+        pipe.zrange(self.created_index_key, 0, 0)
+        pipe.zrange(self.created_index_key, -1, -1)
+        counters, oldest, newest = await pipe.execute()
+
+        counters = {_decode(key): int(value) for key, value in (counters or {}).items()}
+        total_sequences = max(counters.get("sequences", 0), 0)
 
         stats = {
-            "total_sequences": len(keys),
+            "total_sequences": total_sequences,
             "status_counts": {
-                "pending": 0,
-                "processing": 0,
-                "completed": 0,
-                "failed": 0,
-                "timeout": 0
+                status.value: max(counters.get(status.value, 0), 0) for status in EventStatus
             },
             "average_events_per_sequence": 0,
-            "oldest_sequence": None,
-            "newest_sequence": None
+            "oldest_sequence": _decode(oldest[0]) if oldest else None,
+            "newest_sequence": _decode(newest[0]) if newest else None
         }
 
-        if not keys:
-            return stats
-
-        total_events = 0
-        oldest_time = None
-        newest_time = None
+        if total_sequences > 0:
+            stats["average_events_per_sequence"] = counters.get("events", 0) / total_sequences
 
-        for key in keys:
-            data = await self.redis_client.get(key)
-            if data:
-                sequence_data = json.loads(data)
-                status = sequence_data["status"]
-                stats["status_counts"][status] += 1
-
-                total_events += len(sequence_data["events"])
-
-                created_at = datetime.fromisoformat(sequence_data["created_at"])
-                if oldest_time is None or created_at < oldest_time:
-                    oldest_time = created_at
-                    stats["oldest_sequence"] = sequence_data["correlation_id"]
-
-                if newest_time is None or created_at > newest_time:
-                    newest_time = created_at
-                    stats["newest_sequence"] = sequence_data["correlation_id"]
+        return stats
 
-        if len(keys) > 0:
-            stats["average_events_per_sequence"] = total_events / len(keys)
 
-        return stats
+def _decode(value: Any) -> Any:
+    """Decode bytes returned by a Redis client without decode_responses."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
 
 
 # Factory function for easier initialization
@@ -4,6 +4,23 @@ Menu Caching Optimization System for YABOT.
 This module provides advanced caching strategies for menu generation with multi-tier
 optimization, intelligent invalidation, and performance analytics to meet the
 REQ-MENU-006.3 requirement of utilizing existing cache manager for menu optimization.
+
+Cached menus are templates keyed by user tier; per-user values stay in slots that
+are filled in at render time (see ``src.ui.menu_template``). The memory tier keeps
+ready-to-use Menu objects in an LRU bounded by entry count and by a byte budget, so
+memory hits neither deserialize nor allocate.
+
+Entries are invalidated through a reverse index from dependency tags (``role:<role>``,
+``vip:<bool>``, ``menu:<id>``, ``menu_type:<type>`` and explicit dependencies) to
+cache keys, kept in memory and as Redis tag sets. Tier templates are shared, so
+they carry no user tags; only menus caching per-user data list ``user:<id>`` in
+their dependencies. ``attach`` subscribes the optimizer to the user events, which
+invalidate a user's entries when they change one of the user's tier inputs.
+
+``get_or_build`` coalesces concurrent misses: the first miss for a key builds the
+menu and later misses await the same future. With a Redis lock, processes also
+wait for each other's build instead of repeating it. Memory entries are served
+stale for a grace period after they expire while a single refresh rebuilds them.
 """
 
 import asyncio
@@ -11,13 +28,16 @@ import json
 import hashlib
 import time
 import pickle
-from typing import Dict, Any, Optional, List, Set, Union, TYPE_CHECKING
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Awaitable, Callable, Dict, Any, Optional, List, Set, Tuple, Union, TYPE_CHECKING
 from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass, field
 
 from src.utils.cache_manager import CacheManager
 from src.utils.logger import get_logger
+from src.ui.menu_template import TIER_FIELDS, besitos_bracket, menu_tier, slot_values
 
 if TYPE_CHECKING:
     from src.ui.menu_factory import Menu, MenuItem
@@ -25,6 +45,16 @@ if TYPE_CHECKING:
 logger = get_logger(__name__)
 
 
+DEFAULT_MAX_MEMORY_ENTRIES = 1000
+DEFAULT_MAX_MEMORY_BYTES = 16 * 1024 * 1024
+DEFAULT_STALE_TTL = 60  # seconds an expired memory entry is served while it is rebuilt
+DEFAULT_LOCK_TTL = 5.0  # seconds
+LOCK_POLL_INTERVAL = 0.05  # seconds
+
+# Events that may change a user's tier inputs, invalidating the user's entries
+INVALIDATING_EVENTS = ("user_updated", "besitos_awarded", "subscription_updated", "vip_access_granted")
+
+
 class CacheLayer(str, Enum):
     """Cache layers for menu optimization."""
     MEMORY = "memory"
@@ -46,9 +76,8 @@ class CacheMetrics:
     hits: int = 0
     misses: int = 0
     invalidations: int = 0
+    evictions: int = 0
     generation_time_saved: float = 0.0
-    last_accessed: Optional[datetime] = None
-    access_frequency: int = 0
 
     @property
     def hit_rate(self) -> float:
@@ -59,39 +88,60 @@ class CacheMetrics:
 
 @dataclass
 class CacheEntry:
-    """Cache entry with metadata and optimization info."""
-    menu_data: Dict[str, Any]
-    created_at: datetime
-    last_accessed: datetime
+    """Memory cache entry holding a ready-to-use menu template.
+
+    The menu is shared by every hit and must not be modified; ``render_menu``
+    renders copies of it.
+    """
+    menu: 'Menu'
+    expires_at: float
+    size: int = 0
     access_count: int = 0
     generation_time: float = 0.0
     context_hash: str = ""
     dependencies: Set[str] = field(default_factory=set)
     strategy: CacheStrategy = CacheStrategy.MODERATE
-
-    def update_access(self) -> None:
-        """Update access statistics."""
-        self.last_accessed = datetime.utcnow()
-        self.access_count += 1
+    tags: Set[str] = field(default_factory=set)
 
 
 class MenuCacheOptimizer:
     """Advanced menu caching system with multi-tier optimization."""
 
-    def __init__(self, cache_manager: Optional[CacheManager] = None):
+    def __init__(self, cache_manager: Optional[CacheManager] = None,
+                 max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+                 max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+                 stale_ttl: int = DEFAULT_STALE_TTL,
+                 use_redis_lock: bool = False,
+                 lock_ttl: float = DEFAULT_LOCK_TTL):
         """Initialize the Menu Cache Optimizer.
 
         Args:
             cache_manager: Existing cache manager instance to leverage.
+            max_memory_entries: Maximum number of menus in the memory tier.
+            max_memory_bytes: Byte budget of the memory tier, by serialized menu size.
+            stale_ttl: Seconds an expired memory entry is served while it is rebuilt, 0 to disable.
+            use_redis_lock: Whether builds take a Redis lock so processes do not repeat them.
+            lock_ttl: Seconds a build lock is held at most.
         """
         self.cache_manager = cache_manager or CacheManager()
 
-        # Memory cache for ultra-fast access
-        self._memory_cache: Dict[str, CacheEntry] = {}
-        self._cache_metrics: Dict[str, CacheMetrics] = {}
+        # Memory cache for ultra-fast access; least recently used first
+        self._memory_cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._memory_bytes = 0
+
+        # Fixed-size counters, independent of the number of keys seen
+        self._metrics = CacheMetrics()
+        self._layer_hits: Dict[CacheLayer, int] = {layer: 0 for layer in CacheLayer}
 
         # Cache configuration
-        self._max_memory_entries = 1000
+        self._max_memory_entries = max_memory_entries
+        self._max_memory_bytes = max_memory_bytes
+        self._stale_ttl = stale_ttl
+        self._use_redis_lock = use_redis_lock
+        self._lock_ttl = lock_ttl
+
+        # cache key -> build in progress, awaited by every concurrent miss
+        self._inflight: Dict[str, asyncio.Future] = {}
         self._default_ttl = 300  # 5 minutes
         self._memory_cleanup_interval = 60  # 1 minute
 
@@ -103,16 +153,25 @@ class MenuCacheOptimizer:
             CacheStrategy.DYNAMIC: 300,        # 5 minutes (base)
         }
 
-        # Context dependency tracking
-        self._dependency_graph: Dict[str, Set[str]] = {}
+        # Reverse index of memory entries: dependency tag -> cache keys
+        self._dependency_index: Dict[str, Set[str]] = {}
+        self._subscribed_buses: Set[int] = set()
 
         # Performance tracking
         self._performance_stats = {
             "total_requests": 0,
             "cache_hits": 0,
             "generation_time_saved": 0.0,
-            "average_generation_time": 0.0
+            "average_generation_time": 0.0,
+            "per_user_key_hits": 0,
+            "builds": 0,
+            "coalesced_misses": 0,
+            "stale_hits": 0
         }
+        # Keys a cache keyed on per-user slot values would have used, to compare hit rates
+        self._per_user_keys: "OrderedDict[Tuple[Any, ...], None]" = OrderedDict()
+        # (menu_id, tier) -> cache key, so hits skip hashing
+        self._cache_keys: Dict[Tuple[Any, ...], str] = {}
 
         # Background cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -155,11 +214,13 @@ class MenuCacheOptimizer:
         if use_layers is None:
             use_layers = [CacheLayer.MEMORY, CacheLayer.REDIS]
 
-        cache_key = self._generate_cache_key(menu_id, user_context)
+        tier = menu_tier(user_context)
+        cache_key = self._generate_cache_key(menu_id, user_context, tier)
         start_time = time.time()
 
         # Update request statistics
         self._performance_stats["total_requests"] += 1
+        self._track_per_user_key(menu_id, tier, user_context)
 
         try:
             # Try each cache layer in order
@@ -173,7 +234,6 @@ class MenuCacheOptimizer:
                     if layer != CacheLayer.MEMORY:
                         await self._promote_to_memory(cache_key, menu, user_context)
 
-                    logger.debug(f"Cache hit for menu {menu_id} in {layer.value} layer")
                     return menu
 
             # Cache miss
@@ -185,18 +245,111 @@ class MenuCacheOptimizer:
             logger.error(f"Error retrieving cached menu {menu_id}: {e}")
             return None
 
+    async def get_or_build(self, menu_id: str, user_context: Dict[str, Any],
+                           build: Callable[[], Awaitable['Menu']],
+                           strategy: CacheStrategy = CacheStrategy.MODERATE) -> 'Menu':
+        """Return a cached menu, building it on a miss with one build per key.
+
+        Concurrent misses for the same key await the first miss's build. An
+        expired memory entry within its stale grace period is returned at once
+        while one background build refreshes it.
+
+        Args:
+            menu_id: Identifier for the menu.
+            user_context: User context for cache key generation.
+            build: Coroutine function building the menu template.
+            strategy: Caching strategy for the built menu.
+
+        Returns:
+            The cached or built menu.
+        """
+        menu = await self.get_cached_menu(menu_id, user_context)
+        if menu is not None:
+            return menu
+
+        cache_key = self._generate_cache_key(menu_id, user_context)
+        stale_menu = self._get_stale_from_memory(cache_key)
+        if stale_menu is not None:
+            self._performance_stats["stale_hits"] += 1
+            self._start_build(cache_key, menu_id, user_context, build, strategy)
+            return stale_menu
+
+        if cache_key in self._inflight:
+            self._performance_stats["coalesced_misses"] += 1
+        future = self._start_build(cache_key, menu_id, user_context, build, strategy)
+        # A cancelled caller must not cancel the build other callers await
+        return await asyncio.shield(future)
+
+    def _start_build(self, cache_key: str, menu_id: str, user_context: Dict[str, Any],
+                     build: Callable[[], Awaitable['Menu']], strategy: CacheStrategy) -> asyncio.Future:
+        """Return the build in progress for a key, starting one if there is none."""
+        future = self._inflight.get(cache_key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self._build_and_cache(cache_key, menu_id, user_context, build, strategy)
+            )
+            self._inflight[cache_key] = future
+            future.add_done_callback(lambda done: self._finish_build(cache_key, done))
+        return future
+
+    def _finish_build(self, cache_key: str, future: asyncio.Future) -> None:
+        """Forget a finished build and log failures nobody may be awaiting."""
+        if self._inflight.get(cache_key) is future:
+            del self._inflight[cache_key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Building menu for {cache_key} failed: {future.exception()}")
+
+    async def _build_and_cache(self, cache_key: str, menu_id: str, user_context: Dict[str, Any],
+                               build: Callable[[], Awaitable['Menu']], strategy: CacheStrategy) -> 'Menu':
+        """Build a menu and cache it, under a Redis lock if enabled."""
+        lock_key = f"menu_lock:{cache_key}"
+        token = None
+        if self._use_redis_lock and self.cache_manager.is_connected:
+            token = await self.cache_manager.acquire_lock(lock_key, self._lock_ttl)
+            if token is None:
+                # Another process is building the menu, wait for it to reach Redis
+                menu = await self._wait_for_redis(cache_key, user_context)
+                if menu is not None:
+                    return menu
+
+        try:
+            start_time = time.time()
+            menu = await build()
+            self._performance_stats["builds"] += 1
+            await self.cache_menu(
+                menu, user_context, strategy, generation_time=time.time() - start_time, menu_id=menu_id
+            )
+            return menu
+        finally:
+            if token is not None:
+                await self.cache_manager.release_lock(lock_key, token)
+
+    async def _wait_for_redis(self, cache_key: str, user_context: Dict[str, Any]) -> Optional['Menu']:
+        """Poll Redis for a menu another process is building, up to the lock TTL."""
+        deadline = time.monotonic() + self._lock_ttl
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            menu = await self._get_from_redis(cache_key)
+            if menu is not None:
+                await self._promote_to_memory(cache_key, menu, user_context)
+                return menu
+        return None
+
     async def cache_menu(self, menu: 'Menu', user_context: Dict[str, Any],
                         strategy: CacheStrategy = CacheStrategy.MODERATE,
                         generation_time: float = 0.0,
-                        dependencies: Set[str] = None) -> bool:
+                        dependencies: Set[str] = None,
+                        menu_id: Optional[str] = None) -> bool:
         """Cache menu with optimization strategy.
 
         Args:
-            menu: Menu object to cache.
+            menu: Menu template to cache, with its per-user slots unfilled.
             user_context: User context for cache key generation.
             strategy: Caching strategy to use.
             generation_time: Time taken to generate the menu.
-            dependencies: Context dependencies for invalidation.
+            dependencies: Context dependencies for invalidation; ``user:<id>`` for
+                menus caching per-user data.
+            menu_id: ID the menu is looked up by, defaults to ``menu.menu_id``.
 
         Returns:
             True if caching successful, False otherwise.
@@ -205,35 +358,33 @@ class MenuCacheOptimizer:
             logger.warning("Menu object missing menu_id, cannot cache")
             return False
 
-        cache_key = self._generate_cache_key(menu.menu_id, user_context)
-        dependencies = dependencies or set()
+        cache_key = self._generate_cache_key(menu_id or menu.menu_id, user_context)
+        dependencies = set(dependencies or ())
 
         try:
-            # Serialize menu to cacheable format
+            # Serialize menu for Redis and to size the memory entry
             menu_data = await self._serialize_menu(menu)
 
+            # Determine TTL based on strategy and context
+            ttl = self._calculate_dynamic_ttl(strategy, user_context, menu)
+
             # Create cache entry with metadata
             cache_entry = CacheEntry(
-                menu_data=menu_data,
-                created_at=datetime.utcnow(),
-                last_accessed=datetime.utcnow(),
+                menu=menu,
+                expires_at=time.monotonic() + ttl,
+                size=self._estimate_size(menu_data),
                 generation_time=generation_time,
                 context_hash=self._generate_context_hash(user_context),
                 dependencies=dependencies,
-                strategy=strategy
+                strategy=strategy,
+                tags=self._generate_cache_tags(menu, user_context) | dependencies
             )
 
-            # Determine TTL based on strategy and context
-            ttl = self._calculate_dynamic_ttl(strategy, user_context, menu)
-
             # Cache in memory layer
             await self._cache_in_memory(cache_key, cache_entry)
 
-            # Cache in Redis layer
-            await self._cache_in_redis(cache_key, cache_entry, ttl)
-
-            # Update dependency graph
-            self._update_dependency_graph(cache_key, dependencies)
+            # Cache in Redis layer, registering the key in its dependencies' tag sets
+            await self._cache_in_redis(cache_key, menu_data, cache_entry.tags, ttl)
 
             # Update performance statistics
             self._performance_stats["generation_time_saved"] += generation_time
@@ -247,11 +398,11 @@ class MenuCacheOptimizer:
 
     async def invalidate_cache(self, invalidation_key: str,
                              cascade: bool = True) -> int:
-        """Invalidate cached menus based on key pattern.
+        """Invalidate a cached menu by key, and the menus depending on it.
 
         Args:
-            invalidation_key: Key or pattern for invalidation.
-            cascade: Whether to cascade invalidation to dependent entries.
+            invalidation_key: Cache key or dependency tag, such as ``user:<id>``.
+            cascade: Whether to cascade invalidation to entries depending on the key.
 
         Returns:
             Number of entries invalidated.
@@ -259,37 +410,93 @@ class MenuCacheOptimizer:
         invalidated_count = 0
 
         try:
-            # Find matching keys in memory cache
-            memory_keys = [
-                key for key in self._memory_cache.keys()
-                if self._key_matches_pattern(key, invalidation_key)
-            ]
-
-            # Invalidate memory cache entries
-            for key in memory_keys:
-                del self._memory_cache[key]
-                if key in self._cache_metrics:
-                    self._cache_metrics[key].invalidations += 1
-                invalidated_count += 1
-
-            # Invalidate Redis cache entries
-            redis_keys = await self.cache_manager.get_keys_by_pattern(f"*{invalidation_key}*")
-            for key in redis_keys:
-                await self.cache_manager.delete_key(key)
+            # Invalidate the entry stored under the key itself
+            if self._remove_from_memory(invalidation_key) is not None:
+                self._metrics.invalidations += 1
                 invalidated_count += 1
+            if invalidation_key.startswith("menu_opt:"):
+                await self.cache_manager.delete_key(invalidation_key)
 
             # Cascade invalidation to dependent entries
             if cascade:
-                cascade_count = await self._cascade_invalidation(invalidation_key)
-                invalidated_count += cascade_count
+                invalidated_count += await self.invalidate_dependencies([invalidation_key])
 
-            logger.info(f"Invalidated {invalidated_count} cache entries for pattern: {invalidation_key}")
+            logger.info(f"Invalidated {invalidated_count} cache entries for: {invalidation_key}")
             return invalidated_count
 
         except Exception as e:
             logger.error(f"Error during cache invalidation: {e}")
             return 0
 
+    async def invalidate_dependencies(self, dependencies: List[str]) -> int:
+        """Invalidate the menus depending on any of the given dependency tags.
+
+        Affected entries are looked up in the reverse index in memory and in
+        the Redis tag sets, so the cost grows with the number of affected keys.
+
+        Args:
+            dependencies: Dependency tags, such as ``user:<id>`` or ``role:<role>``.
+
+        Returns:
+            Number of cache keys invalidated, counting a key held in memory and in
+            Redis once.
+        """
+        invalidated_keys: Set[str] = set()
+        try:
+            for dependency in dependencies:
+                for key in list(self._dependency_index.get(dependency, ())):
+                    self._remove_from_memory(key)
+                    invalidated_keys.add(key)
+
+            invalidated_keys.update(await self.cache_manager.delete_tagged_keys(dependencies))
+        except Exception as e:
+            logger.error(f"Error invalidating menu dependencies {dependencies}: {e}")
+        self._metrics.invalidations += len(invalidated_keys)
+        return len(invalidated_keys)
+
+    async def handle_user_event(self, payload: Dict[str, Any]) -> None:
+        """Event handler invalidating the menus that depend on the event's user.
+
+        Events leaving the user's tier inputs as they were are ignored: tier
+        templates hold no per-user values, and slots are rendered per request.
+
+        Args:
+            payload: Payload of one of the ``INVALIDATING_EVENTS``.
+        """
+        user_id = payload.get("user_id")
+        if user_id and self._changes_tier(payload):
+            await self.invalidate_dependencies([f"user:{user_id}"])
+
+    @staticmethod
+    def _changes_tier(payload: Dict[str, Any]) -> bool:
+        """Check whether a user event changes any of the user's tier inputs."""
+        updated_fields = payload.get("updated_fields")
+        if updated_fields is not None:
+            return not TIER_FIELDS.isdisjoint(updated_fields)
+        if "balance_after" in payload:
+            balance_after = payload["balance_after"] or 0
+            balance_before = balance_after - (payload.get("amount") or 0)
+            return besitos_bracket(balance_before) != besitos_bracket(balance_after)
+        # Subscription and VIP access events flip the VIP input
+        return True
+
+    async def attach(self, event_bus: Any) -> None:
+        """Subscribe to the events invalidating user menus.
+
+        Attaching to the same event bus again is a no-op.
+
+        Args:
+            event_bus: Event bus delivering the ``INVALIDATING_EVENTS``.
+        """
+        if event_bus is None or id(event_bus) in self._subscribed_buses:
+            return
+        subscribed = [
+            await event_bus.subscribe(event_name, self.handle_user_event)
+            for event_name in INVALIDATING_EVENTS
+        ]
+        if all(subscribed):
+            self._subscribed_buses.add(id(event_bus))
+
     async def warm_cache(self, menu_configs: List[Dict[str, Any]]) -> int:
         """Pre-warm cache with frequently accessed menus.
 
@@ -311,33 +518,26 @@ class MenuCacheOptimizer:
             # For cache warming, we'll use a minimal UserService instance
             # In a real implementation, this would use dependency injection
             menu_factory = MenuFactory()
+            # The factory caches the templates it builds in this optimizer
+            menu_factory.menu_cache = self
 
             for config in menu_configs:
                 try:
                     menu_id = config.get("menu_id")
                     user_contexts = config.get("user_contexts", [])
-                    strategy = CacheStrategy(config.get("strategy", "moderate"))
 
                     for user_context in user_contexts:
-                        # Generate menu
-                        start_time = time.time()
                         # Convert menu_id to MenuType if it's a known type, otherwise use as string
                         from src.ui.menu_config import MenuType
                         try:
                             menu_type = MenuType(menu_id)
                         except ValueError:
                             menu_type = menu_id
-                        
-                        menu = await menu_factory.create_menu(menu_type, user_context)
-                        generation_time = time.time() - start_time
 
+                        # Generating the menu caches its template
+                        menu = await menu_factory.create_menu(menu_type, user_context)
                         if menu:
-                            # Cache the generated menu
-                            cached = await self.cache_menu(
-                                menu, user_context, strategy, generation_time
-                            )
-                            if cached:
-                                warmed_count += 1
+                            warmed_count += 1
 
                 except Exception as e:
                     logger.warning(f"Failed to warm cache for menu config {config}: {e}")
@@ -382,26 +582,34 @@ class MenuCacheOptimizer:
         """
         total_requests = self._performance_stats["total_requests"]
         cache_hits = self._performance_stats["cache_hits"]
+        per_user_key_hits = self._performance_stats["per_user_key_hits"]
 
         return {
             "performance": {
                 "total_requests": total_requests,
                 "cache_hits": cache_hits,
                 "hit_rate": (cache_hits / total_requests * 100) if total_requests > 0 else 0.0,
+                "per_user_key_hit_rate": (per_user_key_hits / total_requests * 100) if total_requests > 0 else 0.0,
                 "total_time_saved": self._performance_stats["generation_time_saved"],
                 "average_generation_time": self._performance_stats["average_generation_time"]
             },
             "memory_cache": {
                 "entries": len(self._memory_cache),
                 "max_entries": self._max_memory_entries,
-                "utilization": len(self._memory_cache) / self._max_memory_entries * 100
+                "utilization": len(self._memory_cache) / self._max_memory_entries * 100,
+                "bytes": self._memory_bytes,
+                "max_bytes": self._max_memory_bytes,
+                "evictions": self._metrics.evictions
+            },
+            "layers": {
+                layer.value: hits for layer, hits in self._layer_hits.items()
             },
             "strategies": {
                 strategy.value: self._get_strategy_stats(strategy)
                 for strategy in CacheStrategy
             },
             "dependencies": {
-                "tracked_dependencies": len(self._dependency_graph),
+                "tracked_dependencies": len(self._dependency_index),
                 "average_dependencies_per_entry": self._calculate_average_dependencies()
             }
         }
@@ -417,11 +625,27 @@ class MenuCacheOptimizer:
 
     async def _get_from_memory(self, cache_key: str) -> Optional['Menu']:
         """Retrieve menu from memory cache."""
-        if cache_key in self._memory_cache:
-            entry = self._memory_cache[cache_key]
-            entry.update_access()
-            return await self._deserialize_menu(entry.menu_data)
-        return None
+        entry = self._memory_cache.get(cache_key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry.expires_at <= now:
+            # Expired entries stay in memory to be served stale by get_or_build
+            if entry.expires_at + self._stale_ttl <= now:
+                self._remove_from_memory(cache_key)
+            return None
+        self._memory_cache.move_to_end(cache_key)
+        entry.access_count += 1
+        return entry.menu
+
+    def _get_stale_from_memory(self, cache_key: str) -> Optional['Menu']:
+        """Retrieve an expired menu still within its stale grace period."""
+        entry = self._memory_cache.get(cache_key)
+        if entry is None or entry.expires_at + self._stale_ttl <= time.monotonic():
+            return None
+        self._memory_cache.move_to_end(cache_key)
+        entry.access_count += 1
+        return entry.menu
 
     async def _get_from_redis(self, cache_key: str) -> Optional['Menu']:
         """Retrieve menu from Redis cache."""
@@ -435,18 +659,50 @@ class MenuCacheOptimizer:
         return None
 
     async def _cache_in_memory(self, cache_key: str, cache_entry: CacheEntry) -> None:
-        """Cache entry in memory with LRU eviction."""
-        # Evict old entries if at capacity
-        if len(self._memory_cache) >= self._max_memory_entries:
-            await self._evict_lru_entries()
+        """Cache entry in memory, evicting least recently used entries over budget."""
+        if cache_entry.size > self._max_memory_bytes:
+            logger.debug(f"Menu {cache_key} exceeds the memory cache budget, not cached in memory")
+            return
 
+        self._remove_from_memory(cache_key)
         self._memory_cache[cache_key] = cache_entry
-
-    async def _cache_in_redis(self, cache_key: str, cache_entry: CacheEntry, ttl: int) -> None:
-        """Cache entry in Redis with TTL."""
+        self._memory_bytes += cache_entry.size
+        for tag in cache_entry.tags:
+            self._dependency_index.setdefault(tag, set()).add(cache_key)
+
+        while (len(self._memory_cache) > self._max_memory_entries
+               or self._memory_bytes > self._max_memory_bytes):
+            self._evict_oldest()
+
+    def _remove_from_memory(self, cache_key: str) -> Optional[CacheEntry]:
+        """Remove an entry from the memory cache, keeping the byte count and index."""
+        entry = self._memory_cache.pop(cache_key, None)
+        if entry is not None:
+            self._forget_entry(cache_key, entry)
+        return entry
+
+    def _evict_oldest(self) -> None:
+        """Evict the least recently used memory entry."""
+        cache_key, entry = self._memory_cache.popitem(last=False)
+        self._forget_entry(cache_key, entry)
+        self._metrics.evictions += 1
+
+    def _forget_entry(self, cache_key: str, entry: CacheEntry) -> None:
+        """Drop a removed entry from the byte count and the dependency index."""
+        self._memory_bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._dependency_index.get(tag)
+            if keys is not None:
+                keys.discard(cache_key)
+                if not keys:
+                    del self._dependency_index[tag]
+
+    async def _cache_in_redis(self, cache_key: str, menu_data: Dict[str, Any],
+                              tags: Set[str], ttl: int) -> None:
+        """Cache serialized menu data in Redis with TTL."""
         try:
-            serialized_data = json.dumps(cache_entry.menu_data, default=str)
-            await self.cache_manager.set_value(cache_key, serialized_data, ttl)
+            # set_value serializes the menu data to JSON
+            await self.cache_manager.set_value(cache_key, menu_data, ttl, tags=tags)
         except Exception as e:
             logger.warning(f"Failed to cache in Redis: {e}")
 
@@ -455,40 +711,67 @@ class MenuCacheOptimizer:
         try:
             menu_data = await self._serialize_menu(menu)
             cache_entry = CacheEntry(
-                menu_data=menu_data,
-                created_at=datetime.utcnow(),
-                last_accessed=datetime.utcnow(),
-                context_hash=self._generate_context_hash(user_context)
+                menu=menu,
+                expires_at=time.monotonic() + self._default_ttl,
+                size=self._estimate_size(menu_data),
+                context_hash=self._generate_context_hash(user_context),
+                tags=self._generate_cache_tags(menu, user_context)
             )
             await self._cache_in_memory(cache_key, cache_entry)
         except Exception as e:
             logger.warning(f"Failed to promote menu to memory cache: {e}")
 
-    def _generate_cache_key(self, menu_id: str, user_context: Dict[str, Any]) -> str:
-        """Generate optimized cache key with context awareness."""
-        # Extract key context elements
-        user_id = user_context.get('user_id', 'anonymous')
-        role = user_context.get('role', 'guest')
-        vip_status = user_context.get('has_vip', False)
-        narrative_level = user_context.get('narrative_level', 0)
-        archetype = user_context.get('user_archetype', 'unknown')
-        worthiness_score = user_context.get('worthiness_score', 0.0)
-
-        # Create context-aware key components
-        context_components = [
-            menu_id,
-            role,
-            str(vip_status),
-            str(narrative_level),
-            archetype,
-            f"{worthiness_score:.1f}"  # Round to 1 decimal for cache efficiency
-        ]
+    @staticmethod
+    def _estimate_size(menu_data: Dict[str, Any]) -> int:
+        """Estimate the memory a cached menu takes by its serialized size."""
+        return len(json.dumps(menu_data, default=str).encode())
+
+    def _generate_cache_key(self, menu_id: str, user_context: Dict[str, Any],
+                            tier: Optional[Tuple[Any, ...]] = None) -> str:
+        """Generate optimized cache key from the menu ID and the user's tier."""
+        # Per-user values are slots in the template, only the tier selects it
+        if tier is None:
+            tier = menu_tier(user_context)
+        cache_key = self._cache_keys.get((menu_id, tier))
+        if cache_key is not None:
+            return cache_key
 
         # Generate hash for compact key
-        key_material = ":".join(context_components)
+        key_material = ":".join([menu_id, *map(str, tier)])
         context_hash = hashlib.blake2b(key_material.encode(), digest_size=16).hexdigest()
+        cache_key = f"menu_opt:{context_hash}"
+
+        if len(self._cache_keys) >= self._max_memory_entries:
+            self._cache_keys.clear()
+        self._cache_keys[(menu_id, tier)] = cache_key
+        return cache_key
 
-        return f"menu_opt:{context_hash}"
+    def _track_per_user_key(self, menu_id: str, tier: Tuple[Any, ...], user_context: Dict[str, Any]) -> None:
+        """Count whether a cache keyed on per-user slot values as well would have hit."""
+        key_material = (menu_id, tier, slot_values(user_context))
+        try:
+            seen = key_material in self._per_user_keys
+        except TypeError:
+            return
+        if seen:
+            self._per_user_keys.move_to_end(key_material)
+            self._performance_stats["per_user_key_hits"] += 1
+            return
+        self._per_user_keys[key_material] = None
+        if len(self._per_user_keys) > self._max_memory_entries:
+            self._per_user_keys.popitem(last=False)
+
+    def _generate_cache_tags(self, menu: 'Menu', user_context: Dict[str, Any]) -> Set[str]:
+        """Generate the dependency tags of a cached menu."""
+        tags = {
+            f"menu:{menu.menu_id}",
+            f"role:{user_context.get('role', 'guest')}",
+            f"vip:{bool(user_context.get('has_vip', False))}"
+        }
+        menu_type = getattr(menu, 'menu_type', None)
+        if menu_type is not None:
+            tags.add(f"menu_type:{getattr(menu_type, 'value', menu_type)}")
+        return tags
 
     def _generate_context_hash(self, user_context: Dict[str, Any]) -> str:
         """Generate hash of user context for dependency tracking."""
@@ -526,27 +809,12 @@ class MenuCacheOptimizer:
     async def _serialize_menu(self, menu: 'Menu') -> Dict[str, Any]:
         """Serialize menu object for caching."""
         try:
-            # Convert menu to serializable format
-            menu_dict = {
-                'menu_id': getattr(menu, 'menu_id', ''),
-                'title': getattr(menu, 'title', ''),
-                'description': getattr(menu, 'description', ''),
-                'items': []
-            }
-
-            # Serialize menu items
-            if hasattr(menu, 'items'):
-                for item in menu.items:
-                    item_dict = {
-                        'text': getattr(item, 'text', ''),
-                        'callback_data': getattr(item, 'callback_data', ''),
-                        'url': getattr(item, 'url', None),
-                        'description': getattr(item, 'description', ''),
-                        'is_enabled': getattr(item, 'is_enabled', True),
-                        'restriction_reason': getattr(item, 'restriction_reason', None)
-                    }
-                    menu_dict['items'].append(item_dict)
-
+            menu_dict = asdict(menu)
+            # Navigation items are added again when the menu is rebuilt
+            menu_dict['items'] = [
+                item for item in menu_dict['items']
+                if not item.get('metadata', {}).get('is_navigation')
+            ]
             return menu_dict
         except Exception as e:
             logger.error(f"Failed to serialize menu: {e}")
@@ -556,29 +824,22 @@ class MenuCacheOptimizer:
         """Deserialize menu data back to Menu object."""
         try:
             from src.ui.menu_factory import Menu, MenuItem
-
-            # Create menu items
-            items = []
-            for item_data in menu_data.get('items', []):
-                item = MenuItem(
-                    text=item_data.get('text', ''),
-                    callback_data=item_data.get('callback_data', ''),
-                    url=item_data.get('url'),
-                    description=item_data.get('description', ''),
-                    is_enabled=item_data.get('is_enabled', True),
-                    restriction_reason=item_data.get('restriction_reason')
-                )
-                items.append(item)
-
-            # Create menu object
-            menu = Menu(
-                menu_id=menu_data.get('menu_id', ''),
-                title=menu_data.get('title', ''),
-                description=menu_data.get('description', ''),
-                items=items
-            )
-
-            return menu
+            from src.ui.menu_config import ActionType, MenuType, UserRole
+
+            def build_item(item_data: Dict[str, Any]) -> 'MenuItem':
+                return MenuItem(**{
+                    **item_data,
+                    'action_type': ActionType(item_data['action_type']),
+                    'required_role': UserRole(item_data['required_role']),
+                    'submenu_items': [build_item(sub_item) for sub_item in item_data.get('submenu_items', [])]
+                })
+
+            return Menu(**{
+                **menu_data,
+                'menu_type': MenuType(menu_data['menu_type']),
+                'required_role': UserRole(menu_data['required_role']),
+                'items': [build_item(item_data) for item_data in menu_data.get('items', [])]
+            })
         except Exception as e:
             logger.error(f"Failed to deserialize menu: {e}")
             return None
@@ -586,69 +847,21 @@ class MenuCacheOptimizer:
     def _update_cache_hit_metrics(self, cache_key: str, layer: CacheLayer, response_time: float) -> None:
         """Update cache hit metrics and statistics."""
         self._performance_stats["cache_hits"] += 1
-
-        if cache_key not in self._cache_metrics:
-            self._cache_metrics[cache_key] = CacheMetrics()
-
-        metrics = self._cache_metrics[cache_key]
-        metrics.hits += 1
-        metrics.last_accessed = datetime.utcnow()
-        metrics.access_frequency += 1
+        self._metrics.hits += 1
+        self._layer_hits[layer] += 1
 
     def _update_cache_miss_metrics(self, cache_key: str) -> None:
         """Update cache miss metrics."""
-        if cache_key not in self._cache_metrics:
-            self._cache_metrics[cache_key] = CacheMetrics()
-
-        self._cache_metrics[cache_key].misses += 1
-
-    def _update_dependency_graph(self, cache_key: str, dependencies: Set[str]) -> None:
-        """Update dependency graph for cascade invalidation."""
-        self._dependency_graph[cache_key] = dependencies
-
-        # Add reverse dependencies
-        for dep in dependencies:
-            if dep not in self._dependency_graph:
-                self._dependency_graph[dep] = set()
-
-    async def _cascade_invalidation(self, invalidation_key: str) -> int:
-        """Cascade invalidation to dependent cache entries."""
-        invalidated_count = 0
-
-        # Find entries that depend on the invalidated key
-        dependent_keys = []
-        for cache_key, dependencies in self._dependency_graph.items():
-            if invalidation_key in dependencies:
-                dependent_keys.append(cache_key)
-
-        # Invalidate dependent entries
-        for key in dependent_keys:
-            if key in self._memory_cache:
-                del self._memory_cache[key]
-                invalidated_count += 1
-
-            await self.cache_manager.delete_key(key)
-
-        return invalidated_count
-
-    def _key_matches_pattern(self, key: str, pattern: str) -> bool:
-        """Check if cache key matches invalidation pattern."""
-        return pattern in key
+        self._metrics.misses += 1
 
     async def _evict_lru_entries(self, count: int = None) -> None:
         """Evict least recently used entries from memory cache."""
         if count is None:
             count = max(1, len(self._memory_cache) // 10)  # Evict 10% by default
 
-        # Sort by last accessed time
-        sorted_entries = sorted(
-            self._memory_cache.items(),
-            key=lambda x: x[1].last_accessed
-        )
-
-        # Evict oldest entries
-        for key, _ in sorted_entries[:count]:
-            del self._memory_cache[key]
+        # Entries are kept in access order, oldest first
+        for _ in range(min(count, len(self._memory_cache))):
+            self._evict_oldest()
 
     def _calculate_overall_performance(self) -> Dict[str, Any]:
         """Calculate overall cache performance metrics."""
@@ -681,11 +894,9 @@ class MenuCacheOptimizer:
 
     def _analyze_hit_rates(self) -> Dict[str, Any]:
         """Analyze cache hit rates by different dimensions."""
-        total_hits = sum(metrics.hits for metrics in self._cache_metrics.values())
-        total_misses = sum(metrics.misses for metrics in self._cache_metrics.values())
-
         return {
-            "overall_hit_rate": (total_hits / (total_hits + total_misses) * 100) if (total_hits + total_misses) > 0 else 0.0,
+            "overall_hit_rate": self._metrics.hit_rate,
+            "layer_hits": {layer.value: hits for layer, hits in self._layer_hits.items()},
             "best_performing_entries": self._get_best_performing_entries(),
             "worst_performing_entries": self._get_worst_performing_entries()
         }
@@ -760,35 +971,35 @@ class MenuCacheOptimizer:
 
     def _calculate_average_dependencies(self) -> float:
         """Calculate average number of dependencies per cache entry."""
-        if not self._dependency_graph:
+        if not self._memory_cache:
             return 0.0
 
-        total_deps = sum(len(deps) for deps in self._dependency_graph.values())
-        return total_deps / len(self._dependency_graph)
+        total_deps = sum(len(entry.tags) for entry in self._memory_cache.values())
+        return total_deps / len(self._memory_cache)
 
     def _get_best_performing_entries(self, limit: int = 5) -> List[Dict[str, Any]]:
-        """Get best performing cache entries by hit rate."""
-        sorted_metrics = sorted(
-            self._cache_metrics.items(),
-            key=lambda x: x[1].hit_rate,
+        """Get the memory cache entries with the most hits."""
+        sorted_entries = sorted(
+            self._memory_cache.items(),
+            key=lambda x: x[1].access_count,
             reverse=True
         )
 
         return [
-            {"key": key, "hit_rate": metrics.hit_rate, "hits": metrics.hits}
-            for key, metrics in sorted_metrics[:limit]
+            {"key": key, "hits": entry.access_count}
+            for key, entry in sorted_entries[:limit]
         ]
 
     def _get_worst_performing_entries(self, limit: int = 5) -> List[Dict[str, Any]]:
-        """Get worst performing cache entries by hit rate."""
-        sorted_metrics = sorted(
-            self._cache_metrics.items(),
-            key=lambda x: x[1].hit_rate
+        """Get the memory cache entries with the fewest hits."""
+        sorted_entries = sorted(
+            self._memory_cache.items(),
+            key=lambda x: x[1].access_count
         )
 
         return [
-            {"key": key, "hit_rate": metrics.hit_rate, "misses": metrics.misses}
-            for key, metrics in sorted_metrics[:limit]
+            {"key": key, "hits": entry.access_count}
+            for key, entry in sorted_entries[:limit]
         ]
 
     async def _start_cleanup_task(self) -> None:
@@ -830,18 +1041,15 @@ class MenuCacheOptimizer:
         """Perform cache maintenance operations."""
         try:
             # Clean up expired entries
-            current_time = datetime.utcnow()
-            expired_keys = []
-
-            for key, entry in self._memory_cache.items():
-                # Simple time-based expiration (could be enhanced with TTL tracking)
-                age = (current_time - entry.created_at).total_seconds()
-                if age > self._strategy_ttl[entry.strategy]:
-                    expired_keys.append(key)
+            current_time = time.monotonic()
+            expired_keys = [
+                key for key, entry in self._memory_cache.items()
+                if entry.expires_at + self._stale_ttl <= current_time
+            ]
 
             # Remove expired entries
             for key in expired_keys:
-                del self._memory_cache[key]
+                self._remove_from_memory(key)
 
             if expired_keys:
                 logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
@@ -856,6 +1064,10 @@ class MenuCacheOptimizer:
     async def close(self) -> None:
         """Close cache system and cleanup resources."""
         try:
+            # Cancel builds in progress, including background refreshes
+            for future in list(self._inflight.values()):
+                future.cancel()
+
             # Cancel and unregister cleanup task
             if self._cleanup_task and not self._cleanup_task.done():
                 self._cleanup_task.cancel()
@@ -872,8 +1084,8 @@ class MenuCacheOptimizer:
 
             # Clear memory cache
             self._memory_cache.clear()
-            self._cache_metrics.clear()
-            self._dependency_graph.clear()
+            self._memory_bytes = 0
+            self._dependency_index.clear()
 
             logger.info("MenuCacheOptimizer closed successfully")
         except Exception as e:
@@ -35,6 +35,9 @@ from src.ui.menu_config import (
 # Import UserService for delegation of complex operations
 from src.services.user import UserService
 
+# Per-user values are slots, filled in when a menu template is rendered
+from src.ui.menu_template import slot, render_menu
+
 logger = logging.getLogger(__name__)
 
 # Telegram Bot API constants
@@ -646,37 +649,34 @@ class MainMenuBuilder(MenuBuilder):
         # Local implementation as fallback
         worthiness_score = user_context.get('worthiness_score', 0.0)
         required_worthiness = 0.6
-        relationship_level = user_context.get('relationship_level', 'formal_examiner')
-        sophistication_score = user_context.get('sophistication_score', 0.0)
-        diana_encounters_earned = user_context.get('diana_encounters_earned', 0)
 
         # Enhanced explanation based on multiple factors
         if worthiness_score < 0.2:
             return (
                 f"<b>El Diván</b> representa un nivel de intimidad y comprensión que debe ganarse "
-                f"a través del desarrollo personal. Sus interacciones actuales (valor: {worthiness_score:.2f}) "
+                f"a través del desarrollo personal. Sus interacciones actuales (valor: {slot('worthiness_score')}) "
                 f"sugieren que está en las etapas iniciales de este viaje de sofisticación. "
                 f"Continúe explorando las experiencias disponibles para construir su perfil."
             )
         elif worthiness_score < 0.4:
             return (
                 f"<b>El Diván</b> está reservado para quienes han demostrado un nivel excepcional "
-                f"de madurez emocional. Su progreso es notable (valor: {worthiness_score:.2f}), "
+                f"de madurez emocional. Su progreso es notable (valor: {slot('worthiness_score')}), "
                 f"pero aún requiere mayor profundidad en su comprensión. "
-                f"Su relación con Lucien actualmente es '{relationship_level}' y su nivel de sofisticación es {sophistication_score:.2f}."
+                f"Su relación con Lucien actualmente es '{slot('relationship_level')}' y su nivel de sofisticación es {slot('sophistication_score')}."
             )
         elif worthiness_score < 0.6:
             return (
-                f"<b>El Diván</b> reconoce su crecimiento (valor: {worthiness_score:.2f}), "
+                f"<b>El Diván</b> reconoce su crecimiento (valor: {slot('worthiness_score')}), "
                 f"pero requiere la membresía VIP para completar su acceso. "
                 f"Su desarrollo personal ya demuestra la sofisticación necesaria para estos privilegios. "
-                f"Ha ganado {diana_encounters_earned} encuentros con Diana hasta ahora."
+                f"Ha ganado {slot('diana_encounters_earned')} encuentros con Diana hasta ahora."
             )
         else:
             return (
-                f"<b>✨ ¡Felicidades! ✨</b> Su perfil (valor: {worthiness_score:.2f}) "
+                f"<b>✨ ¡Felicidades! ✨</b> Su perfil (valor: {slot('worthiness_score')}) "
                 f"demuestra la madurez emocional y sofisticación necesarias para <b>El Diván</b>. "
-                f"Su relación con Lucien es '{relationship_level}' y su nivel de sofisticación es {sophistication_score:.2f}. "
+                f"Su relación con Lucien es '{slot('relationship_level')}' y su nivel de sofisticación es {slot('sophistication_score')}. "
                 f"Para completar su acceso, se requiere membresía VIP."
             )
 
@@ -707,12 +707,9 @@ class MainMenuBuilder(MenuBuilder):
 
     def _generate_store_header(self, user_context: Dict[str, Any]) -> str:
         """Generate Lucien's sophisticated store introduction."""
-        worthiness_score = user_context.get('worthiness_score', 0.0)
-        besitos_balance = user_context.get('besitos_balance', 100)
-
         return (
             f"<b>✨ Cada objeto en esta colección refleja un aspecto de la sofisticación personal. "
-            f"Sus {besitos_balance} besitos y su nivel actual de development determinan "
+            f"Sus {slot('besitos_balance')} besitos y su nivel actual de development determinan "
             f"qué tesoros resonarán con su journey. ✨</b>"
         )
 
@@ -801,7 +798,6 @@ class NarrativeMenuBuilder(MenuBuilder):
             user_context = self._validate_user_context(user_context)
             narrative_level = user_context.get('narrative_level', 0)
             has_vip = user_context.get('has_vip', False)
-            current_fragment = user_context.get('current_fragment', 'start')
             completed_fragments = user_context.get('completed_fragments', [])
             user_id = user_context.get('user_id', 'unknown')
             parent_menu_id = kwargs.get('parent_menu_id', 'main_menu')
@@ -815,7 +811,7 @@ class NarrativeMenuBuilder(MenuBuilder):
                 id="continue_story",
                 text="<b>📖 Continuar Historia</b>",
                 action_type=ActionType.NARRATIVE_ACTION,
-                action_data=f"continue_from:{current_fragment}",
+                action_data=f"continue_from:{slot('current_fragment')}",
                 description="Continúa donde te quedaste",
                 icon="📖"
             ))
@@ -1048,9 +1044,7 @@ class MochilaMenuBuilder(MenuBuilder):
         try:
             user_context = self._validate_user_context(user_context)
             user_id = user_context.get('user_id', 'unknown')
-            besitos = user_context.get('besitos', 0)
             narrative_level = user_context.get('narrative_level', 1)
-            worthiness = user_context.get('worthiness', 0.0)
 
             items = [
                 MenuItem(
@@ -1060,12 +1054,12 @@ class MochilaMenuBuilder(MenuBuilder):
                 ),
                 MenuItem(
                     id="recursos", text="💰 Recursos", action_type=ActionType.CALLBACK,
-                    action_data="show_resources", description=f"Besitos: {besitos}",
+                    action_data="show_resources", description=f"Besitos: {slot('besitos')}",
                     required_role=UserRole.FREE_USER, icon="💰"
                 ),
                 MenuItem(
                     id="progreso", text="📈 Mi Progreso", action_type=ActionType.CALLBACK,
-                    action_data="show_progress", description=f"Nivel: {narrative_level}, Worthiness: {worthiness:.2f}",
+                    action_data="show_progress", description=f"Nivel: {narrative_level}, Worthiness: {slot('worthiness')}",
                     required_role=UserRole.FREE_USER, icon="📈"
                 ),
                 MenuItem(
@@ -1079,7 +1073,7 @@ class MochilaMenuBuilder(MenuBuilder):
                 menu_id="mochila_menu", title="🎒 Mochila",
                 description="Tu inventario personal",
                 menu_type=MenuType.PROFILE, required_role=UserRole.FREE_USER, items=items,
-                header_text=f"<b>🎒 Tu Inventario Personal</b>\n💋 Besitos: {besitos} | ⭐ Nivel: {narrative_level}",
+                header_text=f"<b>🎒 Tu Inventario Personal</b>\n💋 Besitos: {slot('besitos')} | ⭐ Nivel: {narrative_level}",
                 parent_menu_id="main_menu"
             )
 
@@ -1147,7 +1141,6 @@ class TiendaMenuBuilder(MenuBuilder):
         try:
             user_context = self._validate_user_context(user_context)
             user_id = user_context.get('user_id', 'unknown')
-            besitos = user_context.get('besitos', 0)
 
             items = [
                 MenuItem(
@@ -1176,7 +1169,7 @@ class TiendaMenuBuilder(MenuBuilder):
                 menu_id="tienda_menu", title="🏪 Tienda",
                 description="Adquiere tesoros con tus besitos",
                 menu_type=MenuType.STORE, required_role=UserRole.FREE_USER, items=items,
-                header_text=f"<b>🏪 Tienda de Tesoros</b>\n💋 Tus Besitos: {besitos}",
+                header_text=f"<b>🏪 Tienda de Tesoros</b>\n💋 Tus Besitos: {slot('besitos')}",
                 footer_text="<i>Cada compra refleja tu evolución personal</i>",
                 parent_menu_id="main_menu"
             )
@@ -1405,7 +1398,6 @@ class AuctionsMenuBuilder(MenuBuilder):
             user_context = self._validate_user_context(user_context)
             user_id = user_context.get('user_id', 'unknown')
             has_vip = user_context.get('has_vip', False)
-            besitos = user_context.get('besitos', 0)
 
             if not has_vip:
                 return await self._create_vip_required_menu()
@@ -1437,7 +1429,7 @@ class AuctionsMenuBuilder(MenuBuilder):
                 menu_id="auctions_menu", title="💎 Subastas VIP",
                 description="Participa en subastas exclusivas",
                 menu_type=MenuType.GAMIFICATION, required_role=UserRole.FREE_USER, items=items,
-                header_text=f"<b>💎 Casa de Subastas VIP</b>\n💋 Tus Besitos: {besitos}",
+                header_text=f"<b>💎 Casa de Subastas VIP</b>\n💋 Tus Besitos: {slot('besitos')}",
                 footer_text="<i>Solo los tesoros más exclusivos llegan aquí</i>",
                 parent_menu_id="main_menu"
             )
@@ -1508,7 +1500,7 @@ class DivanMenuBuilder(MenuBuilder):
                 menu_id="divan_menu", title="🛋️ Mi Diván",
                 description="Tu espacio íntimo de comprensión profunda",
                 menu_type=MenuType.VIP, required_role=UserRole.FREE_USER, items=items,
-                header_text=f"<b>🛋️ El Diván de la Sophistication</b>\nWorthiness: {worthiness:.2f}/10.0",
+                header_text=f"<b>🛋️ El Diván de la Sophistication</b>\nWorthiness: {slot('worthiness')}/10.0",
                 footer_text="<i>Un privilegio ganado a través de la evolución personal</i>",
                 parent_menu_id="main_menu"
             )
@@ -1532,7 +1524,7 @@ class DivanMenuBuilder(MenuBuilder):
                 )
             ]
         else:
-            message = f"Worthiness insuficiente: {worthiness:.2f}/7.0"
+            message = f"Worthiness insuficiente: {slot('worthiness')}/7.0"
             items = [
                 MenuItem(
                     id="improve_worthiness", text="📈 Mejorar Worthiness", action_type=ActionType.CALLBACK,
@@ -1675,6 +1667,7 @@ class MenuValidationUtils:
 
 
 from src.utils.cache_manager import cache_manager
+from src.ui.menu_cache import MenuCacheOptimizer
 
 
 
@@ -1716,6 +1709,8 @@ class MenuFactory:
 
         self.menu_definitions = self._initialize_menu_definitions()
         self.cache_manager = cache_manager
+        # Menu templates are cached per user tier and rendered for each user
+        self.menu_cache = MenuCacheOptimizer(cache_manager)
         # Initialize cache connection only when running in async context
         # Use a flag to track if we're connected to avoid multiple connection attempts
         self._cache_connected = False
@@ -1729,54 +1724,57 @@ class MenuFactory:
         return menu_system_config.definitions
 
     async def create_menu(self, menu_type: Union[MenuType, str], user_context: Dict[str, Any], **kwargs) -> Menu:
-        """Create menu based on type and user context, with caching."""
+        """Create menu based on type and user context, with caching.
+
+        Menus are cached as templates shared by every user of a tier (see
+        ``src.ui.menu_template``) and rendered with the user's slot values.
+        Builder arguments in ``kwargs`` are not part of the cache key, so menus
+        built with them are not cached.
+        """
+        # Convert string menu_type to MenuType enum if needed
+        if isinstance(menu_type, str):
+            try:
+                menu_type = MenuType(menu_type)
+            except ValueError:
+                logger.warning(f"Invalid menu type '{menu_type}', defaulting to MAIN")
+                menu_type = MenuType.MAIN
+
+        use_cache = not kwargs
+
         # Try to use cache if available and connected
-        try:
-            if not self._cache_connected:
-                await self.cache_manager.connect()
-                self._cache_connected = True
-                logger.info("Cache manager connected successfully")
-            
-            # Convert string menu_type to MenuType enum if needed
-            if isinstance(menu_type, str):
-                try:
-                    menu_type = MenuType(menu_type)
-                except ValueError:
-                    logger.warning(f"Invalid menu type '{menu_type}', defaulting to MAIN")
-                    menu_type = MenuType.MAIN
-            
-            cached_menu = await self.cache_manager.get_menu(menu_type.value, user_context)
-            if cached_menu:
-                return cached_menu
-        except Exception as e:
-            logger.warning(f"Cache operation failed, proceeding without cache: {str(e)}")
-            # Continue without cache if there's an error
+        if use_cache and not self._cache_connected:
+            try:
+                self._cache_connected = await self.menu_cache.initialize()
+            except Exception as e:
+                logger.warning(f"Cache operation failed, proceeding without cache: {str(e)}")
+                # Continue without cache if there's an error
 
-        # Build the menu
-        if menu_type in self.builders:
-            new_menu = await self.builders[menu_type].build_menu(user_context, **kwargs)
+        if use_cache and self._cache_connected:
+            # Concurrent misses for the same template share one build
+            template = await self.menu_cache.get_or_build(
+                menu_type.value, user_context, lambda: self._build_template(menu_type, user_context)
+            )
         else:
-            # Try to get from centralized definitions
-            menu_config = menu_system_config.get_menu_definition(menu_type.value)
-            if menu_config:
-                new_menu = Menu.from_config(menu_config, user_context)
-            else:
-                new_menu = self._create_basic_menu(menu_type, user_context)
+            template = await self._build_template(menu_type, user_context, **kwargs)
 
-        # Try to cache the new menu
-        try:
-            if self._cache_connected:
-                await self.cache_manager.set_menu(new_menu, user_context)
-        except Exception as e:
-            logger.warning(f"Failed to cache menu: {str(e)}")
-            
-        return new_menu
+        return render_menu(template, user_context)
+
+    async def _build_template(self, menu_type: MenuType, user_context: Dict[str, Any], **kwargs) -> Menu:
+        """Build the menu template of a menu type."""
+        if menu_type in self.builders:
+            return await self.builders[menu_type].build_menu(user_context, **kwargs)
+
+        # Try to get from centralized definitions
+        menu_config = menu_system_config.get_menu_definition(menu_type.value)
+        if menu_config:
+            return Menu.from_config(menu_config, user_context)
+        return self._create_basic_menu(menu_type, user_context)
 
     async def create_organic_store_menu(self, user_context: Dict[str, Any]) -> Menu:
         """Create organic unified store menu."""
         main_builder = self.builders[MenuType.STORE]
         if hasattr(main_builder, 'build_organic_store_menu'):
-            return main_builder.build_organic_store_menu(user_context)
+            return render_menu(main_builder.build_organic_store_menu(user_context), user_context)
         else:
             return await self.create_menu(MenuType.STORE, user_context)
 
@@ -1784,19 +1782,19 @@ class MenuFactory:
         """Create menu by specific ID using the appropriate builder."""
         # Check specific builders first
         if menu_id in self.specific_builders:
-            return await self.specific_builders[menu_id].build_menu(user_context)
+            return render_menu(await self.specific_builders[menu_id].build_menu(user_context), user_context)
 
         # Check menu definitions
         if menu_id in self.menu_definitions:
-            return self._create_organic_menu_from_definition(menu_id, user_context)
+            return render_menu(self._create_organic_menu_from_definition(menu_id, user_context), user_context)
 
         # Special cases
         elif menu_id == "organic_store_menu":
             main_builder = self.builders[MenuType.STORE]
             if hasattr(main_builder, 'build_organic_store_menu'):
-                return main_builder.build_organic_store_menu(user_context)
+                return render_menu(main_builder.build_organic_store_menu(user_context), user_context)
             else:
-                return await main_builder.build_menu(user_context)
+                return render_menu(await main_builder.build_menu(user_context), user_context)
 
         return None
 
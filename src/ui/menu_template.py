@@ -0,0 +1,165 @@
+"""
+Menu templates with per-user dynamic slots for YABOT.
+
+Menu builders put per-user values that do not change a menu's structure, such as
+besitos balances, scores or names, into the menu text as slots (``{{besitos}}``)
+instead of formatting them in. The built menu is a template: its structure,
+items and callback data depend only on the user's tier (see ``menu_tier``), so
+one cached template serves every user of that tier. ``render_menu`` fills the
+slots in with the values of the requesting user.
+"""
+
+import copy
+import math
+import re
+from bisect import bisect_right
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.ui.menu_factory import Menu, MenuItem
+
+
+# Slot name (the user context key it is read from) -> (default value, format)
+MENU_SLOTS: Dict[str, Tuple[Any, str]] = {
+    "user_id": ("", "{}"),
+    "first_name": ("", "{}"),
+    "username": ("", "{}"),
+    "besitos": (0, "{}"),
+    "besitos_balance": (100, "{}"),
+    "worthiness": (0.0, "{:.2f}"),
+    "worthiness_score": (0.0, "{:.2f}"),
+    "sophistication_score": (0.0, "{:.2f}"),
+    "relationship_level": ("formal_examiner", "{}"),
+    "diana_encounters_earned": (0, "{}"),
+    "current_fragment": ("start", "{}"),
+}
+
+# Store prices; which items a balance can afford only changes at these points
+BESITOS_PRICE_POINTS = (50, 80, 120, 150, 300)
+
+# User context keys ``menu_tier`` reads; changing any other key never changes a template
+TIER_FIELDS = frozenset({
+    "role", "has_vip", "narrative_level", "user_archetype", "worthiness_score",
+    "worthiness", "besitos_balance", "completed_fragments",
+})
+
+_SLOT_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+_MENU_TEXT_FIELDS = ("title", "description", "header_text", "footer_text")
+_ITEM_TEXT_FIELDS = ("text", "description", "action_data", "lucien_voice_text")
+
+
+def slot(name: str) -> str:
+    """Return the placeholder of a dynamic slot.
+
+    Args:
+        name: Slot name, one of ``MENU_SLOTS``.
+
+    Returns:
+        The placeholder to put in menu text.
+
+    Raises:
+        KeyError: If the slot is not defined.
+    """
+    if name not in MENU_SLOTS:
+        raise KeyError(f"Unknown menu slot: {name}")
+    return f"{{{{{name}}}}}"
+
+
+def _score_tier(score: Any) -> float:
+    """Round a score down to one decimal, so users on both sides of a threshold never share a tier."""
+    try:
+        return math.floor(float(score) * 10) / 10
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def besitos_bracket(balance: Any) -> int:
+    """Return how many store price points a besitos balance reaches."""
+    return bisect_right(BESITOS_PRICE_POINTS, balance or 0)
+
+
+def menu_tier(user_context: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the user context values a menu's structure may depend on.
+
+    Users with the same tier get the same menu template.
+
+    Args:
+        user_context: The user's context dictionary.
+
+    Returns:
+        A tuple of tier components.
+    """
+    return (
+        user_context.get('role', 'guest'),
+        bool(user_context.get('has_vip', False)),
+        user_context.get('narrative_level', 0),
+        user_context.get('user_archetype', 'unknown'),
+        _score_tier(user_context.get('worthiness_score', 0.0)),
+        _score_tier(user_context.get('worthiness', 0.0)),
+        besitos_bracket(user_context.get('besitos_balance', 100)),
+        bool(user_context.get('completed_fragments')),
+    )
+
+
+def slot_values(user_context: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Return the raw values of every slot for a user."""
+    return tuple(map(user_context.get, MENU_SLOTS))
+
+
+def _format_slot(name: str, user_context: Dict[str, Any]) -> Optional[str]:
+    """Format a slot's value for a user, or None for an unknown slot."""
+    spec = MENU_SLOTS.get(name)
+    if spec is None:
+        return None
+    default, value_format = spec
+    value = user_context.get(name)
+    if value is None:
+        value = default
+    try:
+        return value_format.format(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _fill(text: Optional[str], user_context: Dict[str, Any]) -> Optional[str]:
+    """Fill the slots in a text; unknown slots are left as they are."""
+    if not text or "{{" not in text:
+        return text
+
+    def replace(match: "re.Match[str]") -> str:
+        value = _format_slot(match.group(1), user_context)
+        return match.group(0) if value is None else value
+
+    return _SLOT_PATTERN.sub(replace, text)
+
+
+def _render_item(item: 'MenuItem', user_context: Dict[str, Any]) -> 'MenuItem':
+    """Copy a template item with its slots filled in."""
+    rendered = copy.copy(item)
+    for field_name in _ITEM_TEXT_FIELDS:
+        setattr(rendered, field_name, _fill(getattr(item, field_name), user_context))
+    rendered.metadata = dict(item.metadata)
+    rendered.submenu_items = [_render_item(sub_item, user_context) for sub_item in item.submenu_items]
+    return rendered
+
+
+def render_menu(menu: 'Menu', user_context: Dict[str, Any]) -> 'Menu':
+    """Render a menu template for a user.
+
+    The template is not modified, so cached templates can be rendered concurrently.
+
+    Args:
+        menu: The menu template.
+        user_context: The user's context dictionary.
+
+    Returns:
+        A copy of the menu with every slot filled in.
+    """
+    rendered = copy.copy(menu)
+    for field_name in _MENU_TEXT_FIELDS:
+        setattr(rendered, field_name, _fill(getattr(menu, field_name), user_context))
+    rendered.items = [_render_item(item, user_context) for item in menu.items]
+    rendered.context_data = dict(menu.context_data)
+    rendered.navigation_path = list(menu.navigation_path)
+    return rendered
@@ -41,6 +41,9 @@ MESSAGE_TTL_CONFIG = {
     'default': 60,  # Default TTL for other message types
 }
 
+# Cache tag listing every tracked message, used by the periodic cleanup
+MESSAGE_TRACKING_TAG = 'msg_track'
+
 # Telegram API rate limiting configuration
 TELEGRAM_RATE_LIMITS = {
     'messages_per_second': 30,  # Maximum messages per second
@@ -304,8 +307,7 @@ class MessageManager:
             return
 
         logger.debug("Running periodic message cleanup job.")
-        pattern = "msg_track:*:*"
-        keys = await self.cache.get_keys_by_pattern(pattern)
+        keys = await self.cache.get_keys_by_tag(MESSAGE_TRACKING_TAG)
         if not keys:
             return
 
@@ -315,6 +317,8 @@ class MessageManager:
             try:
                 record_data_str = await self.cache.get_value(key)
                 if not record_data_str:
+                    # The record expired or was deleted, drop it from the tag sets
+                    await self._untrack_key(key)
                     continue
                 
                 record_data = json.loads(record_data_str)
@@ -333,6 +337,7 @@ class MessageManager:
                 self._metrics["cache_errors"] += 1
                 # Delete the malformed key to prevent future errors
                 await self.cache.delete_key(key)
+                await self._untrack_key(key)
             except Exception as e:
                 logger.error(f"Unexpected error processing key {key} for periodic cleanup: {e}", exc_info=True)
                 self._metrics["cache_errors"] += 1
@@ -387,9 +392,18 @@ class MessageManager:
         """Generate a unique Redis key for tracking a message."""
         return f"msg_track:{chat_id}:{message_id}"
 
-    def _get_chat_key_pattern(self, chat_id: int) -> str:
-        """Generate the key pattern to find all tracked messages in a chat."""
-        return f"msg_track:{chat_id}:*"
+    def _get_chat_tag(self, chat_id: int) -> str:
+        """Generate the cache tag grouping all tracked messages in a chat."""
+        return f"chat:{chat_id}"
+
+    def _get_tracking_tags(self, chat_id: int) -> list:
+        """Generate the cache tags of a message tracking key."""
+        return [MESSAGE_TRACKING_TAG, self._get_chat_tag(chat_id)]
+
+    async def _untrack_key(self, key: str) -> None:
+        """Remove a message tracking key from its tag sets."""
+        chat_id = key.split(':')[1]  # msg_track:<chat_id>:<message_id>
+        await self.cache.untag_key(key, self._get_tracking_tags(chat_id))
     
     def _get_main_menu_key(self, chat_id: int) -> str:
         """Generate the Redis key for storing the main menu message ID of a chat."""
@@ -437,7 +451,7 @@ class MessageManager:
         # Use a slightly longer Redis TTL to allow for processing time
         redis_ttl = None if ttl == -1 else ttl + 10
 
-        await self.cache.set_value(key, record.__dict__, ttl=redis_ttl)
+        await self.cache.set_value(key, record.__dict__, ttl=redis_ttl, tags=self._get_tracking_tags(chat_id))
         self._metrics["total_messages_tracked"] += 1
         logger.debug(f"Tracking message {message_id} in chat {chat_id} with TTL {ttl}s.")
 
@@ -601,6 +615,7 @@ class MessageManager:
             cache_result = await self.cache.delete_key(key)
             if not cache_result:
                 self._metrics["cache_errors"] += 1
+            await self.cache.untag_key(key, self._get_tracking_tags(chat_id))
 
     async def delete_old_messages(self, chat_id: int, keep_main_menu: bool = True) -> None:
         """
@@ -621,8 +636,7 @@ class MessageManager:
             self._metrics["cache_errors"] += 1
             return
 
-        pattern = self._get_chat_key_pattern(chat_id)
-        keys = await self.cache.get_keys_by_pattern(pattern)
+        keys = await self.cache.get_keys_by_tag(self._get_chat_tag(chat_id))
         
         if not keys:
             logger.debug(f"No tracked messages to clean up for chat {chat_id}.")
@@ -647,6 +661,8 @@ class MessageManager:
             try:
                 record_data_str = await self.cache.get_value(key)
                 if not record_data_str:
+                    # The record expired or was deleted, drop it from the tag sets
+                    await self._untrack_key(key)
                     continue
                 
                 # Pydantic or a proper deserializer would be better here
@@ -661,6 +677,7 @@ class MessageManager:
                 self._metrics["cache_errors"] += 1
                 # Delete the malformed key to prevent future errors
                 await self.cache.delete_key(key)
+                await self._untrack_key(key)
             except Exception as e:
                 logger.error(f"Unexpected error processing key {key} for cleanup: {e}", exc_info=True)
                 self._metrics["cache_errors"] += 1
@@ -5,13 +5,26 @@ Menu Template Caching System for YABOT.
 This module provides a caching mechanism for menu templates to improve performance,
 leveraging Redis as the cache store. It is designed to meet the non-functional
 requirement of <500ms menu generation time.
+
+Entries can be registered in tag sets (e.g. ``user:42``, ``role:vip``,
+``menu_type:main``) when they are written. Invalidation fetches the members of
+the affected tag sets and unlinks them in one pipeline, so its cost grows with
+the number of affected keys instead of scanning the whole keyspace.
+
+Tag sets are sorted sets scored by the expiry time of each member. Every write
+drops the members that expired and moves the set's own expiry to that of its
+longest-lived member, so a tag set only holds live keys and goes away with
+them. Each tagged key also has a reverse set of its tags, which invalidation
+uses to remove deleted keys from every tag set they belong to.
 """
 
 import asyncio
 import json
 import hashlib
 import logging
-from typing import Any, Dict, Optional, TYPE_CHECKING
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
 
 from redis import asyncio as aioredis
 
@@ -22,6 +35,41 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+TAG_KEY_PREFIX = "cache_tag:"
+KEY_TAGS_PREFIX = "cache_key_tags:"
+
+# Deletes a lock only if it still holds the caller's token
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Registers a key in its tag sets and its reverse tag set.
+# KEYS[1]: the key's reverse tag set, KEYS[2..]: the tag sets.
+# ARGV: the key, the current time, the key's expiry time ('+inf' without TTL),
+# the key's TTL ('' without TTL).
+_ADD_TAGS_SCRIPT = """
+redis.call('sadd', KEYS[1], unpack(KEYS, 2))
+if ARGV[4] == '' then
+    redis.call('persist', KEYS[1])
+else
+    redis.call('expire', KEYS[1], ARGV[4])
+end
+for i = 2, #KEYS do
+    redis.call('zremrangebyscore', KEYS[i], '-inf', '(' .. ARGV[2])
+    redis.call('zadd', KEYS[i], ARGV[3], ARGV[1])
+    local last = redis.call('zrange', KEYS[i], -1, -1, 'WITHSCORES')[2]
+    if last == 'inf' then
+        redis.call('persist', KEYS[i])
+    else
+        redis.call('expireat', KEYS[i], math.ceil(tonumber(last)) + 1)
+    end
+end
+return #KEYS - 1
+"""
+
 class CacheError(Exception):
     """Base exception for cache-related errors."""
     pass
@@ -73,6 +121,15 @@ class CacheManager:
             self._is_connected = False
             return False
 
+    @property
+    def is_connected(self) -> bool:
+        """Check if the cache is connected to Redis.
+
+        Returns:
+            True if connected to Redis, False otherwise.
+        """
+        return self._is_connected
+
     async def close(self) -> None:
         """Close the Redis connection."""
         if self._redis_client:
@@ -125,6 +182,26 @@ class CacheManager:
             logger.error(f"Error getting menu from cache: {e}", exc_info=True)
             return None
 
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        """Generate the Redis key of a tag set."""
+        return f"{TAG_KEY_PREFIX}{tag}"
+
+    @staticmethod
+    def _key_tags_key(key: str) -> str:
+        """Generate the Redis key of the reverse set listing a key's tag sets."""
+        return f"{KEY_TAGS_PREFIX}{key}"
+
+    def _add_tags(self, pipe: Any, key: str, tags: Iterable[str], ttl: Optional[int]) -> None:
+        """Queue the registration of a key in its tag sets on a pipeline."""
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl else "+inf"
+        pipe.eval(_ADD_TAGS_SCRIPT, len(tag_keys) + 1, self._key_tags_key(key), *tag_keys,
+                  key, now, expires_at, ttl or "")
+
     async def set_menu(self, menu: 'Menu', user_context: Dict[str, Any], ttl: int = 300) -> None:
         """Cache a menu.
 
@@ -145,8 +222,12 @@ class CacheManager:
             menu_dict['items'] = [item.__dict__ for item in menu.items]
             
             serialized_data = json.dumps(menu_dict, default=str)
+            tags = [f"menu:{menu.menu_id}", f"role:{user_context.get('role', 'guest')}"]
             
-            await self._redis_client.set(cache_key, serialized_data, ex=ttl)
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(cache_key, serialized_data, ex=ttl)
+                self._add_tags(pipe, cache_key, tags, ttl)
+                await pipe.execute()
             logger.debug(f"Cached menu with key: {cache_key}")
         except Exception as e:
             logger.error(f"Error setting menu in cache: {e}", exc_info=True)
@@ -168,19 +249,27 @@ class CacheManager:
             logger.error(f"Error getting value from cache for key '{key}': {e}", exc_info=True)
             return None
 
-    async def set_value(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+    async def set_value(self, key: str, value: Any, ttl: Optional[int] = None,
+                        tags: Optional[Iterable[str]] = None) -> None:
         """Set a value in the cache.
 
         Args:
             key: The key to set.
             value: The value to store (will be JSON serialized).
             ttl: Time-to-live in seconds.
+            tags: Tag sets to register the key in, written in the same round trip.
         """
         if not self._is_connected or not self._redis_client:
             return
         try:
             serialized_value = json.dumps(value, default=str)
-            await self._redis_client.set(key, serialized_value, ex=ttl)
+            if not tags:
+                await self._redis_client.set(key, serialized_value, ex=ttl)
+                return
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(key, serialized_value, ex=ttl)
+                self._add_tags(pipe, key, tags, ttl)
+                await pipe.execute()
         except Exception as e:
             logger.error(f"Error setting value in cache for key '{key}': {e}", exc_info=True)
 
@@ -197,9 +286,144 @@ class CacheManager:
         except Exception as e:
             logger.error(f"Error deleting key from cache: {key}: {e}", exc_info=True)
 
+    async def get_keys_by_tag(self, tag: str) -> List[str]:
+        """Get the unexpired keys registered in a tag set.
+
+        Keys deleted without being untagged may still be listed.
+
+        Args:
+            tag: The tag to look up.
+
+        Returns:
+            A list of tagged keys.
+        """
+        if not self._is_connected or not self._redis_client:
+            return []
+        try:
+            return list(await self._redis_client.zrangebyscore(self._tag_key(tag), time.time(), "+inf"))
+        except Exception as e:
+            logger.error(f"Error getting keys by tag '{tag}': {e}", exc_info=True)
+            return []
+
+    async def untag_key(self, key: str, tags: Iterable[str]) -> None:
+        """Remove a key from tag sets, e.g. after deleting it.
+
+        Args:
+            key: The key to remove.
+            tags: The tag sets to remove it from.
+        """
+        if not self._is_connected or not self._redis_client:
+            return
+        try:
+            tags = list(tags)
+            if not tags:
+                return
+            tag_keys = [self._tag_key(tag) for tag in tags]
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.zrem(tag_key, key)
+                pipe.srem(self._key_tags_key(key), *tag_keys)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Error untagging key '{key}': {e}", exc_info=True)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every key registered in the given tag sets, and the tag sets.
+
+        Args:
+            tags: The tags to invalidate.
+
+        Returns:
+            The number of cached keys deleted.
+        """
+        return len(await self.delete_tagged_keys(tags))
+
+    async def delete_tagged_keys(self, tags: Iterable[str]) -> List[str]:
+        """Delete every key registered in the given tag sets, and the tag sets.
+
+        Deleted keys are also removed from the other tag sets they are registered in.
+
+        Args:
+            tags: The tags to invalidate.
+
+        Returns:
+            The cached keys deleted.
+        """
+        if not self._is_connected or not self._redis_client:
+            return []
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return []
+        try:
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.zrange(tag_key, 0, -1)
+                members = await pipe.execute()
+            keys = list(set().union(*members))
+
+            if keys:
+                async with self._redis_client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.smembers(self._key_tags_key(key))
+                    key_tags = await pipe.execute()
+
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                if keys:
+                    # One UNLINK per key tells which of them still existed
+                    for key in keys:
+                        pipe.unlink(key)
+                    invalidated = set(tag_keys)
+                    for key, other_tag_keys in zip(keys, key_tags):
+                        for tag_key in set(other_tag_keys) - invalidated:
+                            pipe.zrem(tag_key, key)
+                    pipe.unlink(*map(self._key_tags_key, keys))
+                pipe.unlink(*tag_keys)
+                results = await pipe.execute()
+            return [key for key, deleted in zip(keys, results) if deleted]
+        except Exception as e:
+            logger.error(f"Error invalidating cache tags {tag_keys}: {e}", exc_info=True)
+            return []
+
+    async def acquire_lock(self, key: str, ttl: float) -> Optional[str]:
+        """Take a short-lived lock shared by every process using this Redis.
+
+        Args:
+            key: The lock key.
+            ttl: Seconds after which the lock expires if it is not released.
+
+        Returns:
+            A token to release the lock with, or None if the lock is held or Redis is unavailable.
+        """
+        if not self._is_connected or not self._redis_client:
+            return None
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self._redis_client.set(key, token, nx=True, px=max(1, int(ttl * 1000)))
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Error acquiring lock '{key}': {e}", exc_info=True)
+            return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Release a lock taken with acquire_lock, unless it expired and was taken again.
+
+        Args:
+            key: The lock key.
+            token: The token returned by acquire_lock.
+        """
+        if not self._is_connected or not self._redis_client:
+            return
+        try:
+            await self._redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            logger.error(f"Error releasing lock '{key}': {e}", exc_info=True)
+
     async def get_keys_by_pattern(self, pattern: str) -> list[str]:
         """Get a list of keys matching a pattern.
 
+        Iterates with SCAN so Redis is not blocked, but still walks the whole
+        keyspace; prefer tags for anything on a hot path.
+
         Args:
             pattern: The glob-style pattern to match.
 
@@ -209,7 +433,7 @@ class CacheManager:
         if not self._is_connected or not self._redis_client:
             return []
         try:
-            return await self._redis_client.keys(pattern)
+            return [key async for key in self._redis_client.scan_iter(match=pattern, count=1000)]
         except Exception as e:
             logger.error(f"Error getting keys by pattern '{pattern}': {e}", exc_info=True)
             return []
@@ -15,6 +15,13 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 load_dotenv()
 
 
+@pytest.fixture(autouse=True)
+def transient_dead_letter_store(monkeypatch):
+    """Keep the event processor dead letter queue in memory during tests."""
+    from src.events import EVENT_BUS_CONFIG
+    monkeypatch.setitem(EVENT_BUS_CONFIG, "dead_letter_path", ":memory:")
+
+
 @pytest.fixture
 def mock_config_manager():
     """Create a mock configuration manager for testing."""
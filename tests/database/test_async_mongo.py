@@ -0,0 +1,177 @@
+"""
+Unit tests for the async MongoDB access layer.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from src.database.async_mongo import (
+    AsyncClientSession, AsyncMongoClient, AsyncMongoCollection, create_mongo_executor
+)
+from src.database.manager import DatabaseManager
+
+
+async def measure_loop_lag(work, interval: float = 0.005) -> float:
+    """Run a coroutine and return the largest event loop stall observed meanwhile."""
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_lag
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - started - interval)
+
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        await work
+    finally:
+        done.set()
+        await ticker_task
+    return max_lag
+
+
+class TestAsyncMongoCollection:
+    """Test cases for AsyncMongoCollection and its cursors."""
+
+    @pytest.fixture
+    def executor(self):
+        executor = create_mongo_executor(8)
+        yield executor
+        executor.shutdown(wait=True)
+
+    @pytest.mark.asyncio
+    async def test_blocking_calls_do_not_stall_event_loop(self, executor):
+        """Test that slow driver calls run on worker threads, not on the loop."""
+        delegate = Mock()
+
+        def slow_find_one(query):
+            time.sleep(0.05)
+            return {"user_id": query["user_id"]}
+
+        delegate.find_one.side_effect = slow_find_one
+        collection = AsyncMongoCollection(delegate, executor, 5.0)
+
+        started = time.perf_counter()
+        results = []
+
+        async def load():
+            results.extend(await asyncio.gather(
+                *(collection.find_one({"user_id": str(i)}) for i in range(8))
+            ))
+
+        lag = await measure_loop_lag(load())
+
+        assert [doc["user_id"] for doc in results] == [str(i) for i in range(8)]
+        assert lag < 0.03
+        assert time.perf_counter() - started < 8 * 0.05
+
+    @pytest.mark.asyncio
+    async def test_find_applies_modifiers_and_batches(self, executor):
+        """Test that find cursors apply chained modifiers and iterate in batches."""
+        documents = [{"n": i} for i in range(5)]
+        pymongo_cursor = MagicMock()
+        pymongo_cursor.sort.return_value = pymongo_cursor
+        pymongo_cursor.limit.return_value = pymongo_cursor
+        pymongo_cursor.__iter__.return_value = iter(documents)
+        delegate = Mock()
+        delegate.find.return_value = pymongo_cursor
+        collection = AsyncMongoCollection(delegate, executor, 5.0)
+
+        cursor = collection.find({"user_id": "u1"}).sort("n", 1).limit(5)
+        first = await cursor.to_list(length=2)
+        rest = [doc async for doc in cursor]
+
+        delegate.find.assert_called_once_with({"user_id": "u1"})
+        pymongo_cursor.sort.assert_called_once_with("n", 1)
+        pymongo_cursor.limit.assert_called_once_with(5)
+        assert first + rest == documents
+
+    @pytest.mark.asyncio
+    async def test_session_wrapper_is_unwrapped_for_driver(self, executor):
+        """Test that operations receive the pymongo session and transactions commit."""
+        pymongo_session = Mock()
+        pymongo_session.in_transaction = True
+        client_delegate = MagicMock()
+        client_delegate.start_session.return_value = pymongo_session
+        client = AsyncMongoClient(client_delegate, executor, 5.0)
+        users = client["test_db"]["users"]
+
+        async with await client.start_session() as session:
+            assert isinstance(session, AsyncClientSession)
+            async with session.start_transaction():
+                await users.update_one({"user_id": "u1"}, {"$inc": {"besitos": 1}}, session=session)
+
+        kwargs = client_delegate.__getitem__.return_value.__getitem__.return_value.update_one.call_args.kwargs
+        assert kwargs["session"] is pymongo_session
+        pymongo_session.commit_transaction.assert_called_once()
+        pymongo_session.abort_transaction.assert_not_called()
+        pymongo_session.end_session.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_transaction_aborts_on_error(self, executor):
+        """Test that an exception inside a transaction aborts it."""
+        pymongo_session = Mock()
+        pymongo_session.in_transaction = True
+        session = AsyncClientSession(pymongo_session, executor, 5.0)
+
+        with pytest.raises(RuntimeError):
+            async with session.start_transaction():
+                raise RuntimeError("boom")
+
+        pymongo_session.abort_transaction.assert_called_once()
+        pymongo_session.commit_transaction.assert_not_called()
+
+
+class TestDatabaseManagerAsyncMongo:
+    """Test cases for the async MongoDB handle of DatabaseManager."""
+
+    def test_get_async_mongo_db_not_connected(self):
+        """Test that the async handle requires a MongoDB connection."""
+        with pytest.raises(ValueError):
+            DatabaseManager(config_manager=Mock()).get_async_mongo_db()
+
+    @pytest.mark.asyncio
+    async def test_get_async_mongo_db_shares_executor(self):
+        """Test that async handles share one executor sized like the pool."""
+        database_manager = DatabaseManager(config_manager=Mock(), mongo_max_pool_size=4)
+        database_manager._mongo_client = MagicMock()
+        database_manager._mongo_db_name = "test_db"
+
+        first = database_manager.get_async_mongo_db()
+        second = database_manager.get_async_mongo_db()
+
+        assert first.client is second.client
+        assert database_manager._mongo_executor._max_workers == 4
+        database_manager._mongo_client.__getitem__.assert_called_with("test_db")
+        await database_manager.close_all()
+        assert database_manager._mongo_executor is None
+
+
+@pytest.mark.skipif(not os.getenv("MONGODB_TEST_URI"), reason="MONGODB_TEST_URI not set")
+@pytest.mark.asyncio
+async def test_loop_lag_against_local_mongod():
+    """Benchmark loop lag under concurrent reads against a local mongod."""
+    from pymongo import MongoClient
+
+    executor = create_mongo_executor(16)
+    client = MongoClient(os.environ["MONGODB_TEST_URI"], maxPoolSize=16)
+    users = AsyncMongoClient(client, executor, 5.0)[f"loop_lag_{uuid.uuid4().hex[:8]}"]["users"]
+    try:
+        await users.insert_many([{"user_id": str(i), "besitos": i} for i in range(200)])
+
+        async def load():
+            await asyncio.gather(*(users.find_one({"user_id": str(i % 200)}) for i in range(2000)))
+
+        lag = await measure_loop_lag(load())
+        assert lag < 0.02
+    finally:
+        client.drop_database(users.delegate.database.name)
+        client.close()
+        executor.shutdown(wait=True)
@@ -0,0 +1,159 @@
+"""
+Unit tests for the async SQLite access layer.
+"""
+
+import asyncio
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import pytest
+
+from src.database.async_sqlite import AsyncSQLite
+
+
+CREATE_PROFILES = """
+    CREATE TABLE IF NOT EXISTS user_profiles (
+        user_id TEXT PRIMARY KEY,
+        username TEXT
+    )
+"""
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    """Create a temporary WAL database file with a user_profiles table."""
+    path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(CREATE_PROFILES)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@asynccontextmanager
+async def open_sqlite(database_path):
+    """Open an AsyncSQLite handle and close it afterwards."""
+    db = AsyncSQLite(database_path, reader_count=2, commit_interval=0.01)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+class TestAsyncSQLite:
+    """Test cases for AsyncSQLite."""
+
+    @pytest.mark.asyncio
+    async def test_write_then_read(self, database_path):
+        """Test that committed writes are visible to the reader pool."""
+        async with open_sqlite(database_path) as sqlite_db:
+            result = await sqlite_db.execute(
+                "INSERT INTO user_profiles (user_id, username) VALUES (?, ?)", ("u1", "alice")
+            )
+
+            assert result.rowcount == 1
+            assert await sqlite_db.fetchone("SELECT * FROM user_profiles WHERE user_id = ?", ("u1",)) == {
+                "user_id": "u1", "username": "alice"
+            }
+            assert await sqlite_db.fetchone("SELECT * FROM user_profiles WHERE user_id = ?", ("u2",)) is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_share_one_commit(self, database_path):
+        """Test that writes submitted together are committed in one transaction."""
+        async with open_sqlite(database_path) as sqlite_db:
+            with patch.object(sqlite_db, "_commit_group", wraps=sqlite_db._commit_group) as commit_group:
+                await asyncio.gather(*(
+                    sqlite_db.execute("INSERT INTO user_profiles (user_id) VALUES (?)", (f"u{i}",))
+                    for i in range(50)
+                ))
+
+            assert commit_group.call_count == 1
+            rows = await sqlite_db.fetchall("SELECT user_id FROM user_profiles")
+            assert len(rows) == 50
+
+    @pytest.mark.asyncio
+    async def test_failing_unit_does_not_roll_back_its_group(self, database_path):
+        """Test that a failing write unit only rolls back its own statements."""
+        async with open_sqlite(database_path) as sqlite_db:
+            results = await asyncio.gather(
+                sqlite_db.execute("INSERT INTO user_profiles (user_id) VALUES (?)", ("u1",)),
+                sqlite_db.transaction([
+                    ("INSERT INTO user_profiles (user_id) VALUES (?)", ("u2",)),
+                    ("INSERT INTO user_profiles (user_id) VALUES (?)", ("u1",)),
+                ]),
+                sqlite_db.execute("INSERT INTO user_profiles (user_id) VALUES (?)", ("u3",)),
+                return_exceptions=True
+            )
+
+            assert isinstance(results[1], sqlite3.IntegrityError)
+            rows = await sqlite_db.fetchall("SELECT user_id FROM user_profiles ORDER BY user_id")
+            assert [row["user_id"] for row in rows] == ["u1", "u3"]
+
+    @pytest.mark.asyncio
+    async def test_readers_are_read_only(self, database_path):
+        """Test that reader connections reject writes."""
+        async with open_sqlite(database_path) as sqlite_db:
+            with pytest.raises(sqlite3.OperationalError):
+                await sqlite_db.fetchall("DELETE FROM user_profiles")
+
+    @pytest.mark.asyncio
+    async def test_failed_reader_open_is_retried(self, tmp_path):
+        """Test that a read before the database file exists does not break later reads."""
+        async with open_sqlite(str(tmp_path / "new.db")) as sqlite_db:
+            with pytest.raises(sqlite3.OperationalError):
+                await sqlite_db.fetchall("SELECT * FROM user_profiles")
+
+            await sqlite_db.execute(CREATE_PROFILES)
+            await sqlite_db.execute("INSERT INTO user_profiles (user_id) VALUES (?)", ("u1",))
+
+            assert await sqlite_db.fetchone("SELECT user_id FROM user_profiles") == {"user_id": "u1"}
+
+    @pytest.mark.asyncio
+    async def test_close_commits_pending_writes(self, database_path):
+        """Test that closing waits for queued writes to commit."""
+        async with open_sqlite(database_path) as sqlite_db:
+            pending = asyncio.ensure_future(
+                sqlite_db.execute("INSERT INTO user_profiles (user_id) VALUES (?)", ("u1",))
+            )
+            await asyncio.sleep(0)
+            await sqlite_db.close()
+
+            assert (await pending).rowcount == 1
+            conn = sqlite3.connect(sqlite_db.database_path)
+            assert conn.execute("SELECT COUNT(*) FROM user_profiles").fetchone()[0] == 1
+            conn.close()
+
+    @pytest.mark.asyncio
+    async def test_in_memory_database_shares_writer_connection(self):
+        """Test that an in-memory database serves reads from the writer connection."""
+        db = AsyncSQLite(":memory:")
+        try:
+            await db.execute(CREATE_PROFILES)
+            await db.execute("INSERT INTO user_profiles (user_id) VALUES (?)", ("u1",))
+            assert await db.fetchone("SELECT user_id FROM user_profiles") == {"user_id": "u1"}
+        finally:
+            await db.close()
+
+    @pytest.mark.asyncio
+    async def test_start_burst_throughput(self, database_path):
+        """Test that a burst of registrations is absorbed by a few group commits."""
+        async with open_sqlite(database_path) as sqlite_db:
+            burst = 2000
+
+            async def register(i):
+                await sqlite_db.execute(
+                    "INSERT INTO user_profiles (user_id, username) VALUES (?, ?)", (f"u{i}", f"user{i}")
+                )
+                return await sqlite_db.fetchone("SELECT * FROM user_profiles WHERE user_id = ?", (f"u{i}",))
+
+            started = time.perf_counter()
+            with patch.object(sqlite_db, "_commit_group", wraps=sqlite_db._commit_group) as commit_group:
+                profiles = await asyncio.gather(*(register(i) for i in range(burst)))
+            elapsed = time.perf_counter() - started
+
+            assert all(profile is not None for profile in profiles)
+            assert commit_group.call_count <= burst // sqlite_db.max_batch_size + 2
+            assert elapsed < 10.0
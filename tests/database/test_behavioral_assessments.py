@@ -0,0 +1,110 @@
+"""
+Unit tests for bucketed behavioral assessment storage and its migration.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, Mock
+
+import pytest
+
+from src.database.behavioral_assessments import (
+    BEHAVIORAL_ASSESSMENT_BUCKETS, BUCKET_MAX_ASSESSMENTS, RECENT_ASSESSMENT_WINDOW,
+    BehavioralAssessmentStore, bucket_start_for
+)
+from src.database.migrations.behavioral_assessments import (
+    MIGRATED_FLAG, BehavioralAssessmentMigration
+)
+
+
+class TestBehavioralAssessmentStore:
+    """Test cases for BehavioralAssessmentStore."""
+
+    @pytest.fixture
+    def collection(self):
+        collection = Mock()
+        collection.update_one = AsyncMock()
+        cursor = Mock()
+        cursor.to_list = AsyncMock(return_value=[{"assessment_id": "a1"}])
+        collection.aggregate.return_value = cursor
+        return collection
+
+    @pytest.fixture
+    def store(self, collection):
+        db = MagicMock()
+        db.__getitem__.return_value = collection
+        store = BehavioralAssessmentStore(db)
+        db.__getitem__.assert_called_once_with(BEHAVIORAL_ASSESSMENT_BUCKETS)
+        return store
+
+    @pytest.mark.asyncio
+    async def test_add_upserts_open_daily_bucket(self, store, collection):
+        """Test that assessments are pushed into a non-full bucket of their day."""
+        timestamp = datetime(2026, 3, 4, 15, 30)
+
+        await store.add("u1", {"assessment_id": "a1", "timestamp": timestamp})
+
+        query, update = collection.update_one.call_args.args
+        assert query == {
+            "user_id": "u1",
+            "bucket_start": datetime(2026, 3, 4),
+            "count": {"$lt": BUCKET_MAX_ASSESSMENTS}
+        }
+        assert update["$push"] == {"assessments": {"assessment_id": "a1", "timestamp": timestamp}}
+        assert update["$inc"] == {"count": 1}
+        assert collection.update_one.call_args.kwargs == {"upsert": True}
+
+    @pytest.mark.asyncio
+    async def test_find_filters_on_server(self, store, collection):
+        """Test that time, context and limit filters are part of the pipeline."""
+        since = datetime(2026, 3, 4, 12, 0)
+
+        result = await store.find("u1", since=since, assessment_context="menu", limit=10)
+
+        pipeline = collection.aggregate.call_args.args[0]
+        assert pipeline[0] == {"$match": {
+            "user_id": "u1",
+            "bucket_start": {"$gte": datetime(2026, 3, 4)},
+            "last_timestamp": {"$gte": since},
+            "assessments.assessment_context": "menu"
+        }}
+        assert {"$match": {"timestamp": {"$gte": since}, "assessment_context": "menu"}} in pipeline
+        assert pipeline[-2:] == [{"$sort": {"timestamp": -1}}, {"$limit": 10}]
+        assert result == [{"assessment_id": "a1"}]
+
+
+class TestBehavioralAssessmentMigration:
+    """Test cases for BehavioralAssessmentMigration."""
+
+    def test_migrate_user_buckets_history_and_trims_window(self):
+        """Test that embedded history is bucketed by day without duplicates."""
+        day = datetime(2026, 1, 10, 9, 0)
+        history = [
+            {"assessment_id": f"a{i}", "timestamp": (day + timedelta(hours=i)).isoformat()}
+            for i in range(30)
+        ]
+        buckets = Mock()
+        buckets.distinct.return_value = ["a0"]
+        buckets.aggregate.return_value = iter([{"_id": None, "total": 30}])
+        users = Mock()
+        db = MagicMock()
+        db.__getitem__.side_effect = lambda name: buckets if name == BEHAVIORAL_ASSESSMENT_BUCKETS else users
+
+        BehavioralAssessmentMigration(db)._migrate_user("u1", history)
+
+        documents = buckets.insert_many.call_args.args[0]
+        assert [document["bucket_start"] for document in documents] == [
+            bucket_start_for(day), bucket_start_for(day + timedelta(days=1))
+        ]
+        migrated_ids = [a["assessment_id"] for document in documents for a in document["assessments"]]
+        assert migrated_ids == [f"a{i}" for i in range(1, 30)]
+        assert all(isinstance(a["timestamp"], datetime) for a in documents[0]["assessments"])
+
+        query, update = users.update_one.call_args.args
+        assert query == {"user_id": "u1"}
+        assert update["$push"]["lucien_interaction_context.behavioral_assessment_history"]["$slice"] == (
+            -RECENT_ASSESSMENT_WINDOW
+        )
+        assert update["$set"] == {
+            "lucien_interaction_context.behavioral_assessment_count": 30,
+            MIGRATED_FLAG: True
+        }
@@ -0,0 +1,109 @@
+"""
+Tests for the MongoDB index catalogue.
+
+The query plan check needs a MongoDB server and runs when MONGODB_TEST_URI is set.
+"""
+
+import os
+import uuid
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from pymongo import MongoClient
+
+from src.database.indexes import (
+    INDEX_CATALOGUE, REGISTERED_QUERIES, ensure_indexes, find_collection_scans, winning_plan_stages
+)
+
+
+class FakeCollection:
+    """Collection double keeping created indexes like MongoDB does."""
+
+    def __init__(self, indexes=None):
+        self.indexes = indexes or {"_id_": {"key": [("_id", 1)]}}
+        self.create_index = Mock(side_effect=self._create_index)
+
+    def index_information(self):
+        return dict(self.indexes)
+
+    def _create_index(self, keys, name, **options):
+        self.indexes[name] = {"key": list(keys), **options}
+        return name
+
+
+class TestIndexCatalogue:
+    """Test cases for the index catalogue and its sync."""
+
+    def test_registered_queries_target_catalogued_collections(self):
+        """Test that every registered query belongs to a collection in the catalogue."""
+        names = [query["name"] for query in REGISTERED_QUERIES]
+        assert len(names) == len(set(names))
+        for query in REGISTERED_QUERIES:
+            assert query["collection"] in INDEX_CATALOGUE, query["name"]
+
+    def test_index_names_are_unique_per_collection(self):
+        """Test that index names do not collide within a collection."""
+        for collection_name, index_specs in INDEX_CATALOGUE.items():
+            names = [index_spec["name"] for index_spec in index_specs]
+            assert len(names) == len(set(names)), collection_name
+
+    def test_ensure_indexes_is_idempotent(self):
+        """Test that a second sync creates nothing and existing keys are reused."""
+        users = FakeCollection({
+            "_id_": {"key": [("_id", 1)]},
+            # Created before the catalogue existed, under the default name
+            "user_id_1": {"key": [("user_id", 1.0)], "unique": True}
+        })
+        missions = FakeCollection()
+        db = MagicMock()
+        db.__getitem__.side_effect = lambda name: {"users": users, "missions": missions}[name]
+        catalogue = {"users": INDEX_CATALOGUE["users"], "missions": INDEX_CATALOGUE["missions"]}
+
+        created = ensure_indexes(db, catalogue)
+
+        assert "user_id" not in created["users"]
+        assert created["missions"] == [index_spec["name"] for index_spec in INDEX_CATALOGUE["missions"]]
+        assert ensure_indexes(db, catalogue) == {}
+
+    def test_ensure_indexes_keeps_conflicting_index(self):
+        """Test that an index with the catalogue name but other keys is not replaced."""
+        collection = FakeCollection({"user_timestamp": {"key": [("user_id", 1)]}})
+        db = MagicMock()
+        db.__getitem__.return_value = collection
+
+        created = ensure_indexes(db, {"audit_logs": INDEX_CATALOGUE["audit_logs"][:1]})
+
+        assert created == {}
+        collection.create_index.assert_not_called()
+
+    def test_winning_plan_stages(self):
+        """Test that nested and slot-based plans are flattened."""
+        plan = {"queryPlan": {
+            "stage": "FETCH",
+            "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}
+        }}
+
+        assert winning_plan_stages(plan) == ["FETCH", "OR", "IXSCAN", "COLLSCAN"]
+
+
+@pytest.fixture
+def mongo_database():
+    """Create a scratch database on the test MongoDB server."""
+    client = MongoClient(os.environ["MONGODB_TEST_URI"])
+    name = f"yabot_index_check_{uuid.uuid4().hex[:8]}"
+    try:
+        yield client[name]
+    finally:
+        client.drop_database(name)
+        client.close()
+
+
+@pytest.mark.skipif(not os.getenv("MONGODB_TEST_URI"), reason="MONGODB_TEST_URI not set")
+def test_registered_queries_use_indexes(mongo_database):
+    """Test that no registered query is answered by a collection scan."""
+    for collection_name in INDEX_CATALOGUE:
+        # The planner reports EOF instead of a plan for missing collections
+        mongo_database[collection_name].insert_one({"placeholder": True})
+    ensure_indexes(mongo_database)
+
+    assert find_collection_scans(mongo_database) == []
@@ -0,0 +1,117 @@
+"""
+Unit tests for the database command profiler.
+"""
+
+import asyncio
+import sqlite3
+from unittest.mock import Mock
+
+import pytest
+
+from src.database.async_mongo import AsyncMongoCollection, create_mongo_executor
+from src.database.async_sqlite import AsyncSQLite
+from src.database.profiler import DatabaseProfiler, MongoCommandProfiler, current_profile_scope
+
+
+def command_events(command_name, collection, request_id, duration_micros=1500):
+    """Build matching started and succeeded events for one command."""
+    started = Mock(
+        command_name=command_name, command={command_name: collection},
+        connection_id=("localhost", 27017), request_id=request_id
+    )
+    succeeded = Mock(
+        command_name=command_name, connection_id=("localhost", 27017),
+        request_id=request_id, duration_micros=duration_micros
+    )
+    return started, succeeded
+
+
+class TestDatabaseProfiler:
+    """Test cases for DatabaseProfiler and its Mongo and SQLite adapters."""
+
+    @pytest.mark.asyncio
+    async def test_listener_attributes_commands_to_scopes(self):
+        """Test that commands count towards the current scope and its parents."""
+        profiler = DatabaseProfiler()
+        listener = MongoCommandProfiler(profiler)
+
+        async with profiler.scope("update") as update:
+            async with profiler.scope("check_achievements") as operation:
+                for request_id in range(3):
+                    started, succeeded = command_events("find", "user_achievements", request_id)
+                    listener.started(started)
+                    listener.succeeded(succeeded)
+            started, succeeded = command_events("update", "users", 10)
+            listener.started(started)
+            listener.succeeded(succeeded)
+
+        assert operation.commands == {"mongo.find user_achievements": 3}
+        assert update.command_count == 4
+        assert update.duration_ms == pytest.approx(6.0)
+        histogram = profiler.snapshot()["histograms"]["mongo.find"]
+        assert histogram["count"] == 3
+        assert histogram["buckets"]["<=2ms"] == 3
+
+    @pytest.mark.asyncio
+    async def test_scopes_over_budget_are_flagged(self):
+        """Test that an operation issuing more commands than the budget is reported."""
+        profiler = DatabaseProfiler(command_budget=2)
+
+        @profiler.profiled("AchievementSystem.check_achievements")
+        async def check_achievements():
+            for _ in range(3):
+                profiler.record("mongo", "find", "user_achievements", 0.5)
+
+        @profiler.profiled()
+        async def cheap_operation():
+            profiler.record("mongo", "find", "users", 0.5)
+
+        await check_achievements()
+        await cheap_operation()
+
+        assert profiler.snapshot()["budget_violations"] == {"AchievementSystem.check_achievements": 1}
+        assert current_profile_scope() is None
+
+    @pytest.mark.asyncio
+    async def test_async_mongo_calls_keep_the_callers_scope(self):
+        """Test that commands issued on MongoDB worker threads reach the calling coroutine's scope."""
+        profiler = DatabaseProfiler()
+        executor = create_mongo_executor(4)
+        delegate = Mock()
+        delegate.find_one.side_effect = lambda query: profiler.record("mongo", "find", "users", 1.0)
+        users = AsyncMongoCollection(delegate, executor, 5.0)
+
+        async def handle_update(name, reads):
+            async with profiler.scope(name) as scope:
+                await asyncio.gather(*(users.find_one({"user_id": name}) for _ in range(reads)))
+            return scope
+
+        try:
+            first, second = await asyncio.gather(handle_update("a", 3), handle_update("b", 5))
+        finally:
+            executor.shutdown(wait=True)
+
+        assert first.command_count == 3
+        assert second.command_count == 5
+
+    @pytest.mark.asyncio
+    async def test_sqlite_wrapper_records_statements(self, tmp_path):
+        """Test that SQLite statements are recorded per keyword and table."""
+        path = str(tmp_path / "profile.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE user_profiles (user_id TEXT PRIMARY KEY)")
+        conn.commit()
+        conn.close()
+        profiler = DatabaseProfiler()
+        db = profiler.wrap_sqlite(AsyncSQLite(path, reader_count=1, commit_interval=0.001))
+
+        try:
+            async with profiler.scope("update") as scope:
+                await db.execute("INSERT INTO user_profiles (user_id) VALUES (?)", ("u1",))
+                row = await db.fetchone("SELECT user_id FROM user_profiles WHERE user_id = ?", ("u1",))
+        finally:
+            await db.close()
+
+        assert row == {"user_id": "u1"}
+        assert scope.commands == {"sqlite.INSERT user_profiles": 1, "sqlite.SELECT user_profiles": 1}
+        assert set(profiler.snapshot()["histograms"]) == {"sqlite.INSERT", "sqlite.SELECT"}
@@ -0,0 +1,115 @@
+"""
+Tests for pipelined micro-batch publishing in the EventBus.
+"""
+
+import asyncio
+import json
+import pytest
+from unittest.mock import Mock
+
+from src.events.batching import BatchConfig, BatchPublisher
+from src.events.bus import EventBus
+from src.config.manager import ConfigManager
+from tests.utils.events import FakeAsyncRedis
+
+
+def create_batching_bus(fake_redis: FakeAsyncRedis, tmp_path, **config) -> EventBus:
+    """Create a connected EventBus with micro-batch publishing on a fake Redis."""
+    event_bus = EventBus(
+        config_manager=Mock(spec=ConfigManager),
+        batch_config=BatchConfig(**config)
+    )
+    event_bus._persistence_dir = str(tmp_path / "local_queue")
+    event_bus._retry_persistence_dir = str(tmp_path / "retry_queue")
+    event_bus._redis_client = fake_redis
+    event_bus._is_connected = True
+    return event_bus
+
+
+class TestBatchPublishing:
+    """Test cases for the micro-batch publisher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_publishes_share_one_pipeline(self, tmp_path):
+        """Test that publishes within the window are sent in a single round trip."""
+        fake_redis = FakeAsyncRedis()
+        event_bus = create_batching_bus(fake_redis, tmp_path, max_batch_size=50, max_delay=0.01)
+
+        results = await asyncio.gather(*[
+            event_bus.publish("menu_interaction", {"user_id": f"user_{i}"})
+            for i in range(5)
+        ])
+
+        assert results == [True] * 5
+        assert fake_redis.executed_batches == [5]
+        assert [channel for channel, _ in fake_redis.published] == ["menu_interaction"] * 5
+        assert json.loads(fake_redis.published[0][1])["user_id"] == "user_0"
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self, tmp_path):
+        """Test that reaching the size limit flushes before the window elapses."""
+        fake_redis = FakeAsyncRedis()
+        event_bus = create_batching_bus(fake_redis, tmp_path, max_batch_size=3, max_delay=10.0)
+
+        results = await asyncio.wait_for(asyncio.gather(*[
+            event_bus.publish("menu_interaction", {"user_id": f"user_{i}"})
+            for i in range(3)
+        ]), timeout=1.0)
+
+        assert results == [True] * 3
+        assert fake_redis.executed_batches == [3]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_publisher_does_not_strand_its_batch(self):
+        """Test that cancelling the publisher that filled a batch still resolves the others."""
+        release = asyncio.Event()
+
+        async def execute(raise_on_error=True):
+            await release.wait()
+            return [1, 1]
+
+        pipeline = Mock()
+        pipeline.execute = execute
+        publisher = BatchPublisher(BatchConfig(max_batch_size=2, max_delay=10.0), lambda: pipeline, Mock())
+
+        first = asyncio.create_task(publisher.submit("menu_interaction", "{}"))
+        await asyncio.sleep(0)
+        filling = asyncio.create_task(publisher.submit("menu_interaction", "{}"))
+        await asyncio.sleep(0)
+        filling.cancel()
+        release.set()
+
+        assert await asyncio.wait_for(first, timeout=1.0) is True
+        with pytest.raises(asyncio.CancelledError):
+            await filling
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_goes_to_retry_queue(self, tmp_path):
+        """Test that every caller of a failed batch gets False and is scheduled for retry."""
+        fake_redis = FakeAsyncRedis()
+        fake_redis.pipeline_error = ConnectionError("Redis down")
+        event_bus = create_batching_bus(fake_redis, tmp_path, max_batch_size=50, max_delay=0.001)
+
+        results = await asyncio.gather(*[
+            event_bus.publish("menu_interaction", {"user_id": f"user_{i}"})
+            for i in range(2)
+        ])
+
+        assert results == [False, False]
+        assert len(event_bus._retry_queue) == 2
+        assert event_bus._batch_publisher.get_stats()["batch_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_batch(self, tmp_path):
+        """Test that closing the bus sends events still waiting in the window."""
+        fake_redis = FakeAsyncRedis()
+        event_bus = create_batching_bus(fake_redis, tmp_path, max_batch_size=50, max_delay=10.0)
+
+        publish_task = asyncio.create_task(
+            event_bus.publish("menu_interaction", {"user_id": "user_1"})
+        )
+        await asyncio.sleep(0)
+        await event_bus.close()
+
+        assert await publish_task is True
+        assert fake_redis.executed_batches == [1]
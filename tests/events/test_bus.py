@@ -10,14 +10,18 @@ import json
 import pytest
 import tempfile
 import os
+from collections import deque
+from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, MagicMock, patch
 from typing import Dict, Any
 from redis import asyncio as aioredis
 
 from src.events.bus import EventBus, EventBusError, EventPublishError, EventSubscribeError
+from src.events.segment_log import SegmentLog
 from src.events.models import BaseEvent, create_event
 from src.config.manager import ConfigManager
 from src.core.models import RedisConfig
+from tests.utils.events import FakeAsyncRedis
 
 
 class TestEventBus:
@@ -37,9 +41,11 @@ class TestEventBus:
         return mock_config
     
     @pytest.fixture
-    def event_bus(self, mock_config_manager):
+    def event_bus(self, mock_config_manager, tmp_path):
         """Create an EventBus instance with mocked configuration."""
         event_bus = EventBus(config_manager=mock_config_manager)
+        event_bus._persistence_dir = str(tmp_path / "local_queue")
+        event_bus._retry_persistence_dir = str(tmp_path / "retry_queue")
         yield event_bus
         
         # Clean up
@@ -63,7 +69,7 @@ class TestEventBus:
         assert hasattr(event_bus, '_persistence_file')
         assert hasattr(event_bus, '_flush_interval')
         assert event_bus._is_connected is False
-        assert event_bus._local_queue == []
+        assert list(event_bus._local_queue) == []
         assert event_bus._subscribers == {}
         assert isinstance(event_bus.config_manager, ConfigManager)
         
@@ -352,7 +358,7 @@ class TestEventBus:
         event_bus._is_connected = True
         
         # Add some test data
-        event_bus._local_queue = [{"test": "event"}]
+        event_bus._local_queue = deque([{"test": "event"}])
         event_bus._subscribers = {"reaction_detected": [AsyncMock()]}
         
         # Test health check
@@ -404,14 +410,11 @@ class TestEventBus:
         event_bus._flush_task = mock_flush_task
         
         # Add some test data to queue
-        event_bus._local_queue = [{"test": "event"}]
+        event_bus._local_queue = deque([{"test": "event"}])
         
-        # Test closure with mock file persistence
-        with patch('src.events.bus.open') as mock_open, \
-             patch('src.events.bus.pickle.dump') as mock_pickle_dump:
-            
-            mock_file = MagicMock()
-            mock_open.return_value.__enter__.return_value = mock_file
+        # Test closure with mock log persistence
+        with patch.object(EventBus, '_persist_events') as mock_persist_events, \
+             patch.object(EventBus, '_persist_retry_queue') as mock_persist_retry:
             
             # Test closure
             await event_bus.close()
@@ -423,8 +426,8 @@ class TestEventBus:
             assert mock_flush_task.cancel.called
             
             # Verify events were persisted
-            assert mock_open.called
-            assert mock_pickle_dump.called
+            assert mock_persist_events.called
+            assert mock_persist_retry.called
             
             # Verify connected flag is reset
             assert event_bus._is_connected is False
@@ -443,7 +446,7 @@ class TestEventBus:
         event_bus._flush_task = mock_flush_task
         
         # Test closure (should not raise exception even with Redis failure)
-        with patch('src.events.bus.open'), patch('src.events.bus.pickle.dump'):
+        with patch.object(EventBus, '_persist_events'), patch.object(EventBus, '_persist_retry_queue'):
             await event_bus.close()
         
         # Verify Redis close was attempted
@@ -465,7 +468,7 @@ class TestEventBus:
         event_bus._is_connected = True
         
         # Add test events to queue
-        event_bus._local_queue = [
+        event_bus._local_queue = deque([
             {
                 "event_name": "reaction_detected",
                 "payload": {"user_id": "test_user_1", "content_id": "content_1"},
@@ -476,7 +479,7 @@ class TestEventBus:
                 "payload": {"user_id": "test_user_2", "choice_id": "choice_a"},
                 "timestamp": 1234567891.0
             }
-        ]
+        ])
         
         # Test processing
         await event_bus._process_local_queue()
@@ -500,7 +503,7 @@ class TestEventBus:
         event_bus._is_connected = True
         
         # Add test events to queue
-        event_bus._local_queue = [
+        event_bus._local_queue = deque([
             {
                 "event_name": "reaction_detected",
                 "payload": {"user_id": "test_user_1", "content_id": "content_1"},
@@ -511,7 +514,7 @@ class TestEventBus:
                 "payload": {"user_id": "test_user_2", "choice_id": "choice_a"},
                 "timestamp": 1234567891.0
             }
-        ]
+        ])
         
         # Test processing
         await event_bus._process_local_queue()
@@ -537,26 +540,136 @@ class TestEventBus:
             "reaction_type": "like"
         }
         
-        # Test queuing with mock file persistence
-        with patch('src.events.bus.open') as mock_open, \
-             patch('src.events.bus.pickle.dump') as mock_pickle_dump:
-            
-            mock_file = MagicMock()
-            mock_open.return_value.__enter__.return_value = mock_file
-            
-            # Test queuing
-            result = await event_bus._queue_locally("reaction_detected", event_payload)
-            
-            # Verify event was queued
-            assert len(event_bus._local_queue) == 1
-            assert event_bus._local_queue[0]["event_name"] == "reaction_detected"
-            
-            # Verify persistence was attempted
-            assert mock_open.called
-            assert mock_pickle_dump.called
-            
-            # Verify result
-            assert result is True
+        # Test queuing
+        result = await event_bus._queue_locally("reaction_detected", event_payload)
+        
+        # Verify event was queued
+        assert len(event_bus._local_queue) == 1
+        assert event_bus._local_queue[0]["event_name"] == "reaction_detected"
+        
+        # Verify the event was appended to the persistence log
+        event_bus._close_persistence_logs()
+        persisted = list(SegmentLog(event_bus._persistence_dir).replay())
+        assert len(persisted) == 1
+        assert persisted[0][1]["event_name"] == "reaction_detected"
+        assert persisted[0][1]["payload"]["user_id"] == "test_user_123"
+        
+        # Verify result
+        assert result is True
+    
+    @pytest.mark.asyncio
+    async def test_persisted_queues_survive_restart(self, event_bus, mock_config_manager):
+        """Test that queued and retry events are reloaded from the logs on startup."""
+        event_bus._redis_client = None
+        event_bus._is_connected = False
+        
+        await event_bus.publish("reaction_detected", {"user_id": "user_1"})
+        await event_bus.publish("decision_made", {"user_id": "user_2"})
+        await event_bus.close()
+        
+        restarted = EventBus(config_manager=mock_config_manager)
+        restarted._persistence_dir = event_bus._persistence_dir
+        restarted._retry_persistence_dir = event_bus._retry_persistence_dir
+        restarted._load_persisted_events()
+        restarted._load_persisted_retry_queue()
+        
+        assert [e["event_name"] for e in restarted._local_queue] == ["reaction_detected", "decision_made"]
+        assert set(restarted._retry_queue) == set(event_bus._retry_queue)
+        retry_info = next(iter(restarted._retry_queue.values()))
+        assert retry_info.attempt_count == 1
+        assert retry_info.next_retry_time is not None
+    
+    @pytest.mark.asyncio
+    async def test_events_dropped_from_full_queue_are_not_replayed(self, event_bus, mock_config_manager):
+        """Test that events dropped from the full local queue are acknowledged in the log."""
+        event_bus._redis_client = None
+        event_bus._is_connected = False
+        event_bus._max_queue_size = 2
+        for i in range(3):
+            await event_bus._queue_locally("reaction_detected", {"user_id": f"user_{i}"})
+        event_bus._sync_persistence_logs()
+        event_bus._close_persistence_logs()
+        
+        restarted = EventBus(config_manager=mock_config_manager)
+        restarted._persistence_dir = event_bus._persistence_dir
+        restarted._load_persisted_events()
+        
+        assert [e["payload"]["user_id"] for e in restarted._local_queue] == ["user_1", "user_2"]
+        health = await event_bus.health_check()
+        assert health["local_queue_dropped"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_processed_events_are_compacted(self, event_bus):
+        """Test that published events are acknowledged and their segments deleted."""
+        event_bus._redis_client = None
+        event_bus._is_connected = False
+        for i in range(3):
+            await event_bus._queue_locally("reaction_detected", {"user_id": f"user_{i}"})
+        
+        mock_redis_client = AsyncMock()
+        mock_redis_client.publish = AsyncMock(return_value=True)
+        event_bus._redis_client = mock_redis_client
+        event_bus._is_connected = True
+        await event_bus._process_local_queue()
+        event_bus._close_persistence_logs()
+        
+        log = SegmentLog(event_bus._persistence_dir)
+        assert list(log.replay()) == []
+        assert log.segment_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_retry_queue_only_republishes_due_events(self, event_bus):
+        """Test that only due retries are sent, together in one pipeline."""
+        fake_redis = FakeAsyncRedis()
+        event_bus._redis_client = fake_redis
+        event_bus._is_connected = True
+        for i in range(3):
+            await event_bus._add_to_retry_queue(f"event_{i}", "reaction_detected", {"user_id": f"user_{i}"}, "boom")
+        event_bus._retry_queue["event_2"].next_retry_time = datetime.utcnow() + timedelta(hours=1)
+        event_bus._schedule_retry(event_bus._retry_queue["event_2"])
+        for event_id in ("event_0", "event_1"):
+            event_bus._retry_queue[event_id].next_retry_time = datetime.utcnow() - timedelta(seconds=1)
+            event_bus._schedule_retry(event_bus._retry_queue[event_id])
+        
+        await event_bus._process_retry_queue()
+        
+        assert fake_redis.executed_batches == [2]
+        assert sorted(json.loads(payload)["user_id"] for _, payload in fake_redis.published) == ["user_0", "user_1"]
+        assert list(event_bus._retry_queue) == ["event_2"]
+    
+    @pytest.mark.asyncio
+    async def test_failed_retry_batch_is_rescheduled(self, event_bus):
+        """Test that retries from a failed pipeline are rescheduled with backoff."""
+        fake_redis = FakeAsyncRedis()
+        fake_redis.pipeline_error = ConnectionError("Redis down")
+        event_bus._redis_client = fake_redis
+        event_bus._is_connected = True
+        await event_bus._add_to_retry_queue("event_0", "reaction_detected", {"user_id": "user_0"}, "boom")
+        retry_info = event_bus._retry_queue["event_0"]
+        retry_info.next_retry_time = datetime.utcnow() - timedelta(seconds=1)
+        event_bus._schedule_retry(retry_info)
+        
+        await event_bus._process_retry_queue()
+        
+        assert retry_info.attempt_count == 2
+        assert retry_info.next_retry_time > datetime.utcnow()
+        # Rescheduled entry is not due again in the same cycle
+        assert event_bus._pop_due_retries(datetime.utcnow()) == []
+    
+    @pytest.mark.asyncio
+    async def test_retry_schedule_is_rebuilt_after_restart(self, event_bus, mock_config_manager):
+        """Test that backoff deadlines survive a restart."""
+        await event_bus._add_to_retry_queue("event_0", "reaction_detected", {"user_id": "user_0"}, "boom")
+        next_retry_time = event_bus._retry_queue["event_0"].next_retry_time
+        event_bus._close_persistence_logs()
+        
+        restarted = EventBus(config_manager=mock_config_manager)
+        restarted._retry_persistence_dir = event_bus._retry_persistence_dir
+        restarted._load_persisted_retry_queue()
+        
+        assert restarted._pop_due_retries(next_retry_time - timedelta(seconds=1)) == []
+        due = restarted._pop_due_retries(next_retry_time)
+        assert [retry_info.event_id for retry_info in due] == ["event_0"]
 
 
 # Integration tests with temporary files
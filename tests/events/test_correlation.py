@@ -0,0 +1,170 @@
+"""
+Unit tests for the EventCorrelationService indexes and counters.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.events.models import create_event
+from src.shared.events.correlation import _CLEANUP_SCRIPT, EventCorrelationService, EventStatus
+from tests.utils.events import FakeAsyncRedis
+
+
+def make_event(user_id: str = "user_1"):
+    """Create an event to add to a correlation sequence."""
+    return create_event("reaction_detected", user_id=user_id, content_id="content_1", reaction_type="like")
+
+
+class ScriptedRedis(FakeAsyncRedis):
+    """FakeAsyncRedis running the cleanup script in one step, as Redis runs scripts."""
+
+    async def eval(self, script, numkeys, *args):
+        assert script == _CLEANUP_SCRIPT
+        expiry, created, status_index, count_index, stats = args[:numkeys]
+        now, batch_size, key_prefix = args[numkeys:]
+        ids = await self.zrangebyscore(expiry, "-inf", now, start=0, num=batch_size)
+        for correlation_id in ids:
+            status = await self.hget(status_index, correlation_id)
+            if status is not None:
+                events = int(await self.hget(count_index, correlation_id) or 0)
+                await self.hincrby(stats, status, -1)
+                await self.hincrby(stats, "sequences", -1)
+                await self.hincrby(stats, "events", -events)
+            await self.delete(key_prefix + correlation_id, f"out_of_order:{correlation_id}")
+            await self.zrem(expiry, correlation_id)
+            await self.zrem(created, correlation_id)
+            await self.hdel(status_index, correlation_id)
+            await self.hdel(count_index, correlation_id)
+        return len(ids)
+
+
+async def store_expired(service: EventCorrelationService, correlation_id: str) -> None:
+    """Store a timed out sequence holding one event."""
+    sequence = await service.create_correlation_sequence(correlation_id, "user_1")
+    sequence.events.append(make_event().event_id)
+    sequence.status = EventStatus.TIMEOUT
+    sequence.timeout_at = datetime.utcnow() - timedelta(seconds=1)
+    await service._store_correlation_sequence(sequence)
+
+
+class TestEventCorrelationIndexes:
+    """Test cases for the indexed cleanup and statistics of EventCorrelationService."""
+
+    @pytest.mark.asyncio
+    async def test_statistics_follow_status_changes(self):
+        """Test that counters are updated on every write without scanning keys."""
+        service = EventCorrelationService(FakeAsyncRedis())
+        first = await service.create_correlation_sequence("corr_1", "user_1")
+        await service.create_correlation_sequence("corr_2", "user_1")
+        await service.add_event_to_sequence(first.correlation_id, make_event())
+        await service.add_event_to_sequence(first.correlation_id, make_event())
+        await service.complete_correlation_sequence("corr_2")
+
+        stats = await service.get_correlation_statistics()
+
+        assert stats["total_sequences"] == 2
+        assert stats["status_counts"][EventStatus.PENDING.value] == 1
+        assert stats["status_counts"][EventStatus.COMPLETED.value] == 1
+        assert stats["average_events_per_sequence"] == 1
+        assert stats["oldest_sequence"] == "corr_1"
+        assert stats["newest_sequence"] == "corr_2"
+
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_only_expired_sequences_in_batches(self):
+        """Test that cleanup pops expired IDs from the index and keeps live sequences."""
+        redis_client = ScriptedRedis()
+        service = EventCorrelationService(redis_client, cleanup_batch_size=2)
+        for i in range(5):
+            await store_expired(service, f"expired_{i}")
+        await service.create_correlation_sequence("live", "user_1")
+
+        assert await service.cleanup_expired_sequences() == 5
+
+        assert await redis_client.zcard(service.expiry_index_key) == 1
+        assert await service.get_correlation_sequence("expired_0") is None
+        assert await service.get_correlation_sequence("live") is not None
+        stats = await service.get_correlation_statistics()
+        assert stats["total_sequences"] == 1
+        assert stats["status_counts"][EventStatus.TIMEOUT.value] == 0
+        assert stats["status_counts"][EventStatus.PENDING.value] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_cleanups_count_each_sequence_down_once(self):
+        """Test that cleanups running at once remove and uncount every expired sequence once."""
+        redis_client = ScriptedRedis()
+        service = EventCorrelationService(redis_client, cleanup_batch_size=2)
+        for i in range(4):
+            await store_expired(service, f"expired_{i}")
+        await service.create_correlation_sequence("live", "user_1")
+
+        cleaned = await asyncio.gather(*(service.cleanup_expired_sequences() for _ in range(3)))
+
+        assert sum(cleaned) == 4
+        stats = await service.get_correlation_statistics()
+        assert stats["total_sequences"] == 1
+        assert stats["status_counts"][EventStatus.TIMEOUT.value] == 0
+        assert stats["average_events_per_sequence"] == 0
+
+    @pytest.mark.asyncio
+    async def test_empty_statistics(self):
+        """Test statistics when no sequence was stored."""
+        stats = await EventCorrelationService(FakeAsyncRedis()).get_correlation_statistics()
+
+        assert stats["total_sequences"] == 0
+        assert stats["average_events_per_sequence"] == 0
+        assert stats["oldest_sequence"] is None
+
+
+class TestEventCorrelationConcurrency:
+    """Test cases for atomic sequence updates of EventCorrelationService."""
+
+    @pytest.mark.asyncio
+    async def test_parallel_writers_do_not_lose_events(self):
+        """Test that events appended concurrently to one sequence are all kept."""
+        service = EventCorrelationService(FakeAsyncRedis())
+        events = [make_event() for _ in range(30)]
+
+        results = await asyncio.gather(
+            *(service.add_event_to_sequence("corr_1", event) for event in events)
+        )
+
+        sequence = await service.get_correlation_sequence("corr_1")
+        assert all(results)
+        assert sorted(sequence.events) == sorted(event.event_id for event in events)
+        assert sequence.sequence_number == 30
+        stats = await service.get_correlation_statistics()
+        assert stats["total_sequences"] == 1
+        assert stats["average_events_per_sequence"] == 30
+
+    @pytest.mark.asyncio
+    async def test_out_of_order_events_are_applied_once_in_order(self):
+        """Test that queued events are moved into the sequence when the gap is filled."""
+        redis_client = FakeAsyncRedis()
+        service = EventCorrelationService(redis_client)
+        events = [make_event() for _ in range(3)]
+
+        assert not await service.add_event_to_sequence("corr_1", events[2], expected_sequence=3)
+        assert not await service.add_event_to_sequence("corr_1", events[1], expected_sequence=2)
+        assert await service.add_event_to_sequence("corr_1", events[0], expected_sequence=1)
+
+        sequence = await service.get_correlation_sequence("corr_1")
+        assert sequence.events == [event.event_id for event in events]
+        assert await redis_client.zcard("out_of_order:corr_1") == 0
+
+    @pytest.mark.asyncio
+    async def test_status_change_races_with_append(self):
+        """Test that failing a sequence while events are appended keeps both updates."""
+        service = EventCorrelationService(FakeAsyncRedis())
+        await service.create_correlation_sequence("corr_1", "user_1")
+
+        await asyncio.gather(
+            service.add_event_to_sequence("corr_1", make_event()),
+            service.fail_correlation_sequence("corr_1", "boom")
+        )
+
+        sequence = await service.get_correlation_sequence("corr_1")
+        assert sequence.status == EventStatus.FAILED
+        assert sequence.metadata["error_message"] == "boom"
+        assert len(sequence.events) == 1
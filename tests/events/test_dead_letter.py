@@ -0,0 +1,121 @@
+"""
+Unit tests for the persistent dead letter queue of the EventProcessor.
+"""
+
+import time
+import pytest
+from unittest.mock import Mock
+
+from src.events.bus import EventBus
+from src.events.dead_letter import DeadLetterStore
+from src.events.models import create_event
+from src.events.processor import EventProcessor
+
+
+EVENT_FIELDS = {
+    "user_registered": {"telegram_user_id": 1},
+    "user_deleted": {"deletion_reason": "user_request"}
+}
+
+
+def make_entry(event_type: str = "user_registered", retry_count: int = 0, failed_at: float = None) -> dict:
+    """Create a dead letter entry for a failed event."""
+    event = create_event(event_type, user_id="user_1", **EVENT_FIELDS[event_type])
+    return {
+        "event": event.dict(),
+        "error": "boom",
+        "timestamp": failed_at if failed_at is not None else time.time(),
+        "retry_count": retry_count,
+        "last_retry_timestamp": 0
+    }
+
+
+class TestDeadLetterStore:
+    """Test cases for the DeadLetterStore class."""
+
+    def test_entries_survive_reopen(self, tmp_path):
+        """Test that stored entries are still there after a restart."""
+        path = str(tmp_path / "dlq.db")
+        store = DeadLetterStore(path)
+        store.add(make_entry())
+        store.add(make_entry("user_deleted"))
+        store.close()
+
+        reopened = DeadLetterStore(path)
+
+        assert len(reopened) == 2
+        assert [entry["event"]["event_type"] for entry in reopened] == ["user_registered", "user_deleted"]
+
+    def test_query_uses_indexed_filters(self):
+        """Test filtering by event type, failure time and retry count."""
+        store = DeadLetterStore()
+        store.add(make_entry("user_registered", retry_count=0, failed_at=100.0))
+        store.add(make_entry("user_deleted", retry_count=3, failed_at=200.0))
+        store.add(make_entry("user_deleted", retry_count=1, failed_at=300.0))
+
+        assert len(store.query(event_type="user_deleted")) == 2
+        assert len(store.query(failed_before=250.0)) == 2
+        assert [entry["retry_count"] for entry in store.query(min_retry_count=1)] == [3, 1]
+
+    def test_due_entries_are_paged(self):
+        """Test that due entries are returned one page at a time and future ones skipped."""
+        store = DeadLetterStore(retry_delay=lambda retry_count: 10.0)
+        for _ in range(5):
+            store.add(make_entry())
+        store.add({**make_entry(), "last_retry_timestamp": 1000.0})
+
+        first = store.due_entries(now=100.0, limit=2)
+        second = store.due_entries(now=100.0, limit=2, after=(first[-1]["next_retry_at"], first[-1]["dlq_id"]))
+        third = store.due_entries(now=100.0, limit=2, after=(second[-1]["next_retry_at"], second[-1]["dlq_id"]))
+
+        assert [len(first), len(second), len(third)] == [2, 2, 1]
+        assert len({entry["dlq_id"] for entry in first + second + third}) == 5
+
+    def test_evict_oldest(self):
+        """Test that eviction drops the oldest entries."""
+        store = DeadLetterStore()
+        for event_type in ("user_registered", "user_registered", "user_deleted"):
+            store.add(make_entry(event_type))
+
+        assert store.evict_oldest(2) == 2
+        assert len(store) == 1
+        assert store[0]["event"]["event_type"] == "user_deleted"
+
+
+class TestEventProcessorDeadLetterQueue:
+    """Test cases for dead letter handling in the EventProcessor."""
+
+    @pytest.mark.asyncio
+    async def test_retry_processes_backlog_in_pages(self):
+        """Test that a backlog larger than a page is fully retried."""
+        processor = EventProcessor(Mock(spec=EventBus), config_manager=Mock())
+        processor._dead_letter_page_size = 3
+        handled = []
+
+        async def handler(event):
+            handled.append(event.event_id)
+
+        processor._handlers["user_registered"] = [handler]
+        for _ in range(10):
+            processor._dead_letter_queue.append(make_entry())
+
+        await processor.retry_dead_letter_queue()
+
+        assert len(handled) == 10
+        assert len(processor._dead_letter_queue) == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_retries_are_persisted(self, tmp_path):
+        """Test that retry attempts are recorded in the durable store."""
+        path = str(tmp_path / "dlq.db")
+        processor = EventProcessor(Mock(spec=EventBus), config_manager=Mock(),
+                                   dead_letter_store=DeadLetterStore(path, retry_delay=lambda retry_count: 60.0))
+        processor._handlers["user_registered"] = [Mock(side_effect=Exception("still failing"))]
+        processor._dead_letter_queue.append(make_entry())
+
+        await processor.retry_dead_letter_queue()
+        processor._dead_letter_queue.close()
+
+        reopened = DeadLetterStore(path)
+        assert reopened[0]["retry_count"] == 1
+        assert reopened[0]["next_retry_at"] > time.time()
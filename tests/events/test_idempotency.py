@@ -0,0 +1,132 @@
+"""
+Unit tests for the processed event stores used by the EventProcessor.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from src.events.bus import EventBus
+from src.events.idempotency import ProcessedEventStore, RedisProcessedEventStore
+from src.events.models import create_event
+from src.events.processor import EventProcessor
+from tests.utils.events import FakeAsyncRedis
+
+
+class TestProcessedEventStore:
+    """Test cases for the in-memory processed event store."""
+
+    def test_add_and_contains(self):
+        """Test that recorded IDs are found and duplicates are reported."""
+        store = ProcessedEventStore()
+
+        assert store.add("event_1") is True
+        assert store.add("event_1") is False
+        assert store.contains("event_1")
+        assert not store.contains("event_2")
+
+    def test_oldest_ids_are_evicted_at_max_size(self):
+        """Test that the ring drops its oldest IDs when full."""
+        store = ProcessedEventStore(max_size=3)
+        for i in range(5):
+            store.add(f"event_{i}")
+
+        assert len(store) == 3
+        assert not store.contains("event_0")
+        assert not store.contains("event_1")
+        assert store.contains("event_4")
+
+    def test_ids_expire_after_ttl(self):
+        """Test that IDs are forgotten once their TTL elapsed."""
+        store = ProcessedEventStore(ttl=10)
+        with patch("src.events.idempotency.time.monotonic", return_value=100.0):
+            store.add("event_1")
+        with patch("src.events.idempotency.time.monotonic", return_value=105.0):
+            store.add("event_2")
+
+        with patch("src.events.idempotency.time.monotonic", return_value=110.0):
+            assert not store.contains("event_1")
+            assert store.contains("event_2")
+            assert len(store) == 1
+
+
+class TestRedisProcessedEventStore:
+    """Test cases for the Redis backed processed event store."""
+
+    @pytest.mark.asyncio
+    async def test_ids_are_shared_between_workers(self):
+        """Test that an ID recorded by one worker is seen by another."""
+        fake_redis = FakeAsyncRedis()
+        worker_1 = RedisProcessedEventStore(fake_redis, ttl=60)
+        worker_2 = RedisProcessedEventStore(fake_redis, ttl=60)
+
+        assert await worker_1.mark_processed("event_1") is True
+        assert await worker_2.is_processed("event_1") is True
+        assert await worker_2.mark_processed("event_1") is False
+
+    @pytest.mark.asyncio
+    async def test_ids_expire_in_redis(self):
+        """Test that the Redis key is written with the store TTL."""
+        fake_redis = FakeAsyncRedis()
+        store = RedisProcessedEventStore(fake_redis, ttl=60)
+        await store.mark_processed("event_1")
+
+        fake_redis.advance(60000)
+
+        assert await RedisProcessedEventStore(fake_redis, ttl=60).is_processed("event_1") is False
+
+
+    @pytest.mark.asyncio
+    async def test_claim_is_a_single_set_nx(self):
+        """Test that only one worker claims an event and a released claim can be taken again."""
+        fake_redis = FakeAsyncRedis()
+        worker_1 = RedisProcessedEventStore(fake_redis, ttl=60)
+        worker_2 = RedisProcessedEventStore(fake_redis, ttl=60)
+
+        assert await worker_1.claim("event_1") is True
+        assert await worker_2.claim("event_1") is False
+
+        await worker_1.release("event_1")
+
+        assert await worker_2.claim("event_1") is True
+
+
+class TestEventProcessorIdempotency:
+    """Test cases for duplicate event handling in the EventProcessor."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_event_is_processed_once(self):
+        """Test that a redelivered event is skipped."""
+        processor = EventProcessor(Mock(spec=EventBus), config_manager=Mock())
+        event = create_event("user_registered", user_id="user_1", telegram_user_id=1)
+
+        with patch.object(processor, "_process_user_registration") as process:
+            await processor._handle_user_registered(event)
+            await processor._handle_user_registered(event)
+
+        process.assert_called_once()
+        assert processor._metrics["events_processed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_event_releases_its_claim(self):
+        """Test that an event whose processing failed is processed again when redelivered."""
+        processor = EventProcessor(Mock(spec=EventBus), config_manager=Mock(), dead_letter_store=Mock())
+        event = create_event("user_registered", user_id="user_1", telegram_user_id=1)
+
+        with patch.object(processor, "_process_user_registration", side_effect=[RuntimeError("boom"), None]) as process, \
+                patch.object(processor, "_handle_processing_failure") as handle_failure:
+            await processor._handle_user_registered(event)
+            await processor._handle_user_registered(event)
+            await processor._handle_user_registered(event)
+
+        assert process.call_count == 2
+        handle_failure.assert_called_once()
+        assert processor._metrics["events_processed"] == 1
+
+    def test_empty_store_passed_in_is_used(self):
+        """Test that an injected store is kept even though an empty store is falsy."""
+        store = ProcessedEventStore()
+        assert not store
+
+        processor = EventProcessor(Mock(spec=EventBus), config_manager=Mock(), idempotency_store=store)
+
+        assert processor._processed_events is store
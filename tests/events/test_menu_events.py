@@ -54,7 +54,7 @@ class TestMenuEventSystem:
 
         # Mock database retrieval
         mock_mongo_db.__getitem__ = Mock(return_value=mock_collection)
-        mock_db_manager.get_mongo_db.return_value = mock_mongo_db
+        mock_db_manager.get_async_mongo_db.return_value = mock_mongo_db
 
         return mock_db_manager
 
@@ -152,7 +152,7 @@ class TestMenuEventSystem:
     async def test_behavioral_assessment_event_handling(self, menu_assessment_handler, mock_database_manager):
         """Test behavioral assessment event handling (REQ-MENU-007.2)."""
         # Mock database responses
-        mock_collection = mock_database_manager.get_mongo_db.return_value["menu_behavioral_assessments"]
+        mock_collection = mock_database_manager.get_async_mongo_db.return_value["menu_behavioral_assessments"]
         mock_collection.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(
             return_value=[
                 {
@@ -185,7 +185,7 @@ class TestMenuEventSystem:
         assert mock_collection.insert_one.called
 
         # Verify user profile was updated
-        users_collection = mock_database_manager.get_mongo_db.return_value["users"]
+        users_collection = mock_database_manager.get_async_mongo_db.return_value["users"]
         assert users_collection.update_one.called
 
     @pytest.mark.asyncio
@@ -320,7 +320,7 @@ class TestMenuEventSystem:
         ]
 
         # Mock database collection
-        mock_collection = mock_database_manager.get_mongo_db.return_value["menu_behavioral_assessments"]
+        mock_collection = mock_database_manager.get_async_mongo_db.return_value["menu_behavioral_assessments"]
         mock_collection.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(
             return_value=mock_interactions
         )
@@ -542,11 +542,11 @@ class TestMenuEventSystem:
         await menu_assessment_handler._update_behavioral_profile("test_user_123", assessment_data)
 
         # Verify assessment was stored
-        assessments_collection = mock_database_manager.get_mongo_db.return_value["menu_behavioral_assessments"]
+        assessments_collection = mock_database_manager.get_async_mongo_db.return_value["menu_behavioral_assessments"]
         assessments_collection.insert_one.assert_called_once_with(assessment_data)
 
         # Verify user profile was updated
-        users_collection = mock_database_manager.get_mongo_db.return_value["users"]
+        users_collection = mock_database_manager.get_async_mongo_db.return_value["users"]
         users_collection.update_one.assert_called_once()
 
         # Verify update data structure
@@ -608,7 +608,7 @@ class TestMenuEventSystemIntegration:
         mock_collection.insert_one = AsyncMock()
         mock_collection.update_one = AsyncMock()
         mock_mongo_db.__getitem__ = Mock(return_value=mock_collection)
-        mock_database_manager.get_mongo_db.return_value = mock_mongo_db
+        mock_database_manager.get_async_mongo_db.return_value = mock_mongo_db
 
         # Set up behavioral engine responses
         mock_behavioral_engine.analyze_response_timing = AsyncMock(return_value=0.75)
@@ -650,7 +650,7 @@ class TestMenuEventSystemIntegration:
         mock_behavioral_engine = AsyncMock(spec=BehavioralAnalysisEngine)
 
         # Set up database failure
-        mock_database_manager.get_mongo_db.side_effect = Exception("Database connection failed")
+        mock_database_manager.get_async_mongo_db.side_effect = Exception("Database connection failed")
 
         # Create handler
         handler = MenuBehavioralAssessmentHandler(
@@ -691,7 +691,7 @@ class TestMenuEventSystemIntegration:
         mock_collection.insert_one = AsyncMock()
         mock_collection.update_one = AsyncMock()
         mock_mongo_db.__getitem__ = Mock(return_value=mock_collection)
-        mock_database_manager.get_mongo_db.return_value = mock_mongo_db
+        mock_database_manager.get_async_mongo_db.return_value = mock_mongo_db
 
         mock_behavioral_engine.analyze_response_timing = AsyncMock(return_value=0.8)
 
@@ -845,7 +845,7 @@ class TestMenuEventPerformance:
         mock_collection.insert_one = AsyncMock()
         mock_collection.update_one = AsyncMock()
         mock_mongo_db.__getitem__ = Mock(return_value=mock_collection)
-        mock_database_manager.get_mongo_db.return_value = mock_mongo_db
+        mock_database_manager.get_async_mongo_db.return_value = mock_mongo_db
 
         mock_behavioral_engine.analyze_response_timing = AsyncMock(return_value=0.8)
 
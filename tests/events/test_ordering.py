@@ -0,0 +1,130 @@
+"""
+Unit tests for the per-user EventOrderingBuffer.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.events.models import create_event
+from src.events.ordering import EventOrderingBuffer
+
+
+def make_event(user_id: str, seconds: int):
+    """Create an event with a timestamp relative to a fixed base time."""
+    return create_event(
+        "reaction_detected",
+        user_id=user_id,
+        content_id="content_1",
+        reaction_type="like",
+        timestamp=datetime(2025, 1, 1) + timedelta(seconds=seconds)
+    )
+
+
+class FlakyProcessor:
+    """Processor that fails until released, recording processed timestamps."""
+
+    def __init__(self):
+        self.failing = True
+        self.processed = []
+
+    async def __call__(self, event):
+        if self.failing:
+            raise RuntimeError("not ready")
+        self.processed.append(event.timestamp)
+
+
+class TestEventOrderingBuffer:
+    """Test cases for the EventOrderingBuffer class."""
+
+    @pytest.mark.asyncio
+    async def test_buffered_events_are_processed_in_timestamp_order(self):
+        """Test that events added out of order are released chronologically."""
+        buffer = EventOrderingBuffer()
+        processor = FlakyProcessor()
+        for seconds in (30, 10, 20):
+            await buffer.add_event(make_event("user_1", seconds), processor)
+        assert buffer.get_buffer_size("user_1") == 3
+
+        processor.failing = False
+        await buffer.flush_user_buffer("user_1")
+        await buffer.close()
+
+        assert [ts.second for ts in processor.processed] == [10, 20, 30]
+
+    @pytest.mark.asyncio
+    async def test_event_arriving_during_processing_is_not_lost(self):
+        """Test that an earlier event added while the head is processed runs exactly once."""
+        buffer = EventOrderingBuffer()
+        release = asyncio.Event()
+        processed = []
+
+        async def processor(event):
+            if not processed:
+                await release.wait()
+            processed.append(event.timestamp.second)
+
+        late = asyncio.ensure_future(buffer.add_event(make_event("user_1", 30), processor))
+        await asyncio.sleep(0)
+        early = asyncio.ensure_future(buffer.add_event(make_event("user_1", 10), processor))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(late, early)
+        await buffer.close()
+
+        assert processed == [30, 10]
+        assert buffer.get_buffer_size("user_1") == 0
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_drops_oldest_event(self):
+        """Test that the earliest event is dropped when a user buffer is full."""
+        buffer = EventOrderingBuffer(max_buffer_size=2)
+        processor = FlakyProcessor()
+        for seconds in (10, 20, 30):
+            await buffer.add_event(make_event("user_1", seconds), processor)
+
+        processor.failing = False
+        await buffer.flush_user_buffer("user_1")
+        await buffer.close()
+
+        assert [ts.second for ts in processor.processed] == [20, 30]
+        assert buffer.get_metrics()["events_dropped"] == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_loop_releases_overdue_events(self):
+        """Test that the timer loop processes events held longer than max_buffer_time."""
+        buffer = EventOrderingBuffer(max_buffer_time=0.0, flush_interval=0.01)
+        processor = FlakyProcessor()
+        await buffer.add_event(make_event("user_1", 10), processor)
+        processor.failing = False
+
+        await asyncio.sleep(0.05)
+
+        assert [ts.second for ts in processor.processed] == [10]
+        assert buffer.get_buffer_size("user_1") == 0
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_idle_users_are_evicted(self):
+        """Test that empty buffers and locks of idle users are dropped."""
+        buffer = EventOrderingBuffer(idle_timeout=0.0)
+        processor = FlakyProcessor()
+        processor.failing = False
+        for i in range(100):
+            await buffer.add_event(make_event(f"user_{i}", i % 60), processor)
+        assert buffer.get_metrics()["users_tracked"] == 100
+
+        assert buffer._evict_idle_users() == 100
+        assert buffer.get_metrics()["users_tracked"] == 0
+        await buffer.close()
+
+    @pytest.mark.asyncio
+    async def test_users_with_pending_events_are_kept(self):
+        """Test that a user with buffered events is not evicted."""
+        buffer = EventOrderingBuffer(idle_timeout=0.0)
+        await buffer.add_event(make_event("user_1", 10), FlakyProcessor())
+
+        assert buffer._evict_idle_users() == 0
+        assert buffer.get_buffer_size("user_1") == 1
+        await buffer.close()
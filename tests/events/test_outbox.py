@@ -0,0 +1,210 @@
+"""
+Tests for the transactional event outbox and its relay.
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.database.manager import DatabaseManager
+from src.events.bus import EventBus
+from src.events.outbox import EventOutbox, OutboxRelay, outbox_record
+from src.services.user import UserService
+from src.services.user_scope import user_identity_scope
+
+
+class FakeSession:
+    """Client session double recording whether its transaction committed."""
+
+    def __init__(self):
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return None
+
+    def start_transaction(self):
+        return FakeTransaction(self)
+
+
+class FakeTransaction:
+    """Transaction context committing on success."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        return self.session
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.session.committed = exc_type is None
+
+
+class FakeCursor:
+    """Cursor double supporting the chain used by the relay."""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, key, direction):
+        self.documents.sort(key=lambda document: document[key], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.documents = self.documents[:count]
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+
+class FakeOutboxCollection:
+    """In-memory outbox collection remembering the session of each insert."""
+
+    def __init__(self):
+        self.records = {}
+        self.sessions = []
+
+    async def insert_one(self, record, session=None):
+        self.records[record["_id"]] = dict(record)
+        self.sessions.append(session)
+
+    async def insert_many(self, records, ordered=True, session=None):
+        for record in records:
+            await self.insert_one(record, session=session)
+
+    def find(self, query):
+        due = query["available_at"]["$lte"]
+        return FakeCursor([dict(r) for r in self.records.values() if r["available_at"] <= due])
+
+    async def delete_many(self, query):
+        for record_id in query["_id"]["$in"]:
+            self.records.pop(record_id, None)
+
+    async def update_many(self, query, update):
+        for record_id in query["_id"]["$in"]:
+            self.records[record_id].update(update["$set"])
+            self.records[record_id]["attempts"] += update["$inc"]["attempts"]
+
+
+def create_outbox():
+    """Create an outbox on an in-memory collection with a fake client."""
+    collection = FakeOutboxCollection()
+    database = Mock()
+    database.__getitem__ = Mock(return_value=collection)
+    session = FakeSession()
+    database.client.start_session = AsyncMock(return_value=session)
+    return EventOutbox(database), collection, session
+
+
+class TestEventOutbox:
+    """Test cases for outbox records and the relay."""
+
+    def test_record_keeps_event_identity(self):
+        """Test that records carry the payload's event ID and a JSON payload."""
+        now = datetime(2026, 1, 1)
+
+        record = outbox_record("besitos_awarded", {"event_id": "e1", "user_id": "u1", "at": now}, now)
+
+        assert record["_id"] == "e1"
+        assert record["available_at"] == now
+        assert json.loads(record["payload"]) == {
+            "event_id": "e1", "user_id": "u1", "at": now.isoformat(), "timestamp": now.timestamp()
+        }
+
+    @pytest.mark.asyncio
+    async def test_relay_publishes_and_reschedules_failures(self):
+        """Test that published records are deleted and failed ones retried later."""
+        outbox, collection, _ = create_outbox()
+        await outbox.add_many([("user_updated", {"event_id": "ok"}), ("user_updated", {"event_id": "fail"})])
+        event_bus = Mock(spec=EventBus)
+        event_bus.publish = AsyncMock(side_effect=lambda name, payload: payload["event_id"] == "ok")
+        relay = OutboxRelay(outbox, event_bus, batch_size=10, retry_delay=30.0)
+
+        published = await relay.relay_once()
+
+        assert published == 1
+        assert list(collection.records) == ["fail"]
+        assert collection.records["fail"]["attempts"] == 1
+        assert collection.records["fail"]["available_at"] > datetime.utcnow() + timedelta(seconds=20)
+        assert await relay.relay_once() == 0
+        assert relay.get_stats() == {"published": 1, "failed": 1, "batches": 1}
+
+
+class TestUserServiceOutbox:
+    """Test cases for UserService state changes written through the outbox."""
+
+    @pytest.fixture
+    def outbox_user_service(self):
+        """Create a UserService whose events go to an in-memory outbox."""
+        outbox, collection, session = create_outbox()
+        users = AsyncMock()
+        users.find_one.return_value = {"user_id": "u1", "besitos": 10}
+        users.update_one.return_value = Mock(matched_count=1, modified_count=1)
+        mongo_db = Mock()
+        mongo_db.__getitem__ = Mock(return_value=users)
+        database_manager = Mock(spec=DatabaseManager)
+        database_manager.get_async_mongo_db.return_value = mongo_db
+        event_bus = Mock(spec=EventBus)
+        event_bus.publish = AsyncMock()
+        service = UserService(database_manager, event_bus, outbox=outbox)
+        return service, users, collection, session, event_bus
+
+    @pytest.mark.asyncio
+    async def test_events_commit_with_buffered_writes(self, outbox_user_service):
+        """Test that an update's state writes and events are committed in one transaction."""
+        service, users, collection, session, event_bus = outbox_user_service
+
+        async with user_identity_scope():
+            await service.update_user_state("u1", {"current_state.menu_context": "store"})
+            await service.award_besitos("u1", 5)
+            await service.update_user_state("u1", {"current_state.session_data": {"page": 2}})
+            assert collection.records == {}
+
+        users.update_one.assert_called_once()
+        assert users.update_one.call_args.args[1]["$inc"] == {"besitos": 5}
+        assert users.update_one.call_args.kwargs["session"] is session
+        assert session.committed
+        assert collection.sessions == [session, session]
+        payloads = [json.loads(record["payload"]) for record in collection.records.values()]
+        assert [record["event_name"] for record in collection.records.values()] == ["user_updated"] * 2
+        assert payloads[1]["updated_fields"]["current_state.session_data"] == {"page": 2}
+        event_bus.publish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unmodified_write_emits_no_event(self, outbox_user_service):
+        """Test that outside an update scope an event is only recorded if the write matched."""
+        service, users, collection, session, _ = outbox_user_service
+        users.update_one.return_value = Mock(modified_count=0)
+
+        assert not await service.update_user_state("missing", {"current_state.menu_context": "store"})
+
+        assert users.update_one.call_args.kwargs["session"] is session
+        assert collection.records == {}
+
+    @pytest.mark.asyncio
+    async def test_buffered_events_need_a_matched_write(self, outbox_user_service):
+        """Test that a buffered write's events are dropped if the commit matched no document."""
+        service, users, collection, session, _ = outbox_user_service
+        users.bulk_write.return_value = Mock(matched_count=1)
+        users.find = Mock(return_value=FakeCursor([{"user_id": "u1"}]))
+
+        async with user_identity_scope():
+            await service.update_user_state("u1", {"current_state.menu_context": "store"})
+            await service.update_user_state("missing", {"current_state.menu_context": "store"})
+
+        assert users.bulk_write.call_args.kwargs["session"] is session
+        assert users.find.call_args.args[0] == {"user_id": {"$in": ["u1", "missing"]}}
+        payloads = [json.loads(record["payload"]) for record in collection.records.values()]
+        assert [payload["user_id"] for payload in payloads] == ["u1"]
@@ -0,0 +1,87 @@
+"""
+Unit tests for the append-only segment log used by the EventBus.
+"""
+
+import os
+import pytest
+
+from src.events.segment_log import SegmentLog, SegmentLogConfig
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    """Directory for a segment log."""
+    return str(tmp_path / "log")
+
+
+class TestSegmentLog:
+    """Test cases for the SegmentLog class."""
+
+    def test_append_assigns_increasing_sequences(self, log_dir):
+        """Test that appended records get consecutive sequence numbers."""
+        log = SegmentLog(log_dir)
+
+        assert [log.append({"n": i}) for i in range(3)] == [1, 2, 3]
+        assert log.last_seq == 3
+        assert log.pending_count == 3
+
+    def test_replay_after_reopen(self, log_dir):
+        """Test that records written before a restart are replayed in order."""
+        log = SegmentLog(log_dir)
+        for i in range(5):
+            log.append({"n": i})
+        log.close()
+
+        reopened = SegmentLog(log_dir)
+
+        assert [record["n"] for _, record in reopened.replay()] == [0, 1, 2, 3, 4]
+        assert reopened.append({"n": 5}) == 6
+
+    def test_segments_roll_at_size_limit(self, log_dir):
+        """Test that a new segment file is started when the active one is full."""
+        log = SegmentLog(log_dir, SegmentLogConfig(segment_max_records=2))
+        for i in range(5):
+            log.append({"n": i})
+
+        assert log.segment_count == 3
+        assert len([name for name in os.listdir(log_dir) if name.endswith(".log")]) == 3
+
+    def test_commit_skips_acknowledged_records_and_compacts(self, log_dir):
+        """Test that the cursor hides acknowledged records and deletes their segments."""
+        log = SegmentLog(log_dir, SegmentLogConfig(segment_max_records=2))
+        for i in range(5):
+            log.append({"n": i})
+
+        log.commit(4)
+
+        assert [record["n"] for _, record in log.replay()] == [4]
+        assert log.segment_count == 1
+
+        log.close()
+        reopened = SegmentLog(log_dir)
+        assert reopened.cursor == 4
+        assert [seq for seq, _ in reopened.replay()] == [5]
+
+    def test_fully_acknowledged_log_is_removed_on_close(self, log_dir):
+        """Test that no segment is kept once every record was acknowledged."""
+        log = SegmentLog(log_dir)
+        log.append({"n": 0})
+        log.commit(log.last_seq)
+        log.close()
+
+        assert log.segment_count == 0
+        assert SegmentLog(log_dir).append({"n": 1}) == 2
+
+    def test_torn_last_record_is_ignored(self, log_dir):
+        """Test that a partially written last line does not break replay."""
+        log = SegmentLog(log_dir)
+        log.append({"n": 0})
+        log.close()
+        segment = os.path.join(log_dir, sorted(os.listdir(log_dir))[0])
+        with open(segment, "ab") as f:
+            f.write(b'{"seq": 2, "da')
+
+        reopened = SegmentLog(log_dir)
+
+        assert [record["n"] for _, record in reopened.replay()] == [0]
+        assert reopened.append({"n": 1}) == 2
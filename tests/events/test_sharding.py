@@ -0,0 +1,200 @@
+"""
+Unit tests for the user-sharded worker pool of the EventProcessor.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import Mock
+
+from src.config.manager import ConfigManager
+from src.events.bus import EventBus
+from src.events.models import create_event
+from src.events.processor import EventProcessor
+from src.events.sharding import ShardConfig, ShardedWorkerPool
+from src.events.streams import RedisStreamTransport, StreamConfig
+from tests.utils.events import FakeAsyncRedis
+
+
+def create_stream_bus(fake_redis: FakeAsyncRedis) -> EventBus:
+    """Create a connected EventBus using the Streams transport on a fake Redis."""
+    stream_config = StreamConfig(consumer_name="worker-1", block_ms=0)
+    event_bus = EventBus(config_manager=Mock(spec=ConfigManager), stream_config=stream_config)
+    event_bus._redis_client = fake_redis
+    event_bus._is_connected = True
+    event_bus._stream_transport = RedisStreamTransport(
+        fake_redis, stream_config, event_bus._dispatch_to_subscribers,
+        event_bus._handle_stream_delivery_exhausted
+    )
+    return event_bus
+
+
+class TestShardedWorkerPool:
+    """Test cases for the ShardedWorkerPool class."""
+
+    def test_same_key_maps_to_same_shard(self):
+        """Test that routing is stable for a key."""
+        pool = ShardedWorkerPool(ShardConfig(num_shards=4), Mock())
+
+        assert pool.shard_for("user_1") == pool.shard_for("user_1")
+        assert {pool.shard_for(f"user_{i}") for i in range(100)} == {0, 1, 2, 3}
+
+    @pytest.mark.asyncio
+    async def test_items_of_one_key_are_handled_in_order(self):
+        """Test that a slow item does not let later items of the same key overtake it."""
+        handled = []
+
+        async def handler(item):
+            key, index = item
+            if index == 0:
+                await asyncio.sleep(0.01)
+            handled.append(item)
+
+        pool = ShardedWorkerPool(ShardConfig(num_shards=4), handler)
+        pool.start()
+        for index in range(5):
+            await pool.submit("user_1", ("user_1", index))
+        await pool.stop()
+
+        assert handled == [("user_1", index) for index in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_keys_on_different_shards_run_concurrently(self):
+        """Test that a blocked user does not hold up users on other shards."""
+        release = asyncio.Event()
+        handled = []
+
+        async def handler(key):
+            if key == "blocked":
+                await release.wait()
+            handled.append(key)
+
+        pool = ShardedWorkerPool(ShardConfig(num_shards=4), handler)
+        other = next(f"user_{i}" for i in range(100) if pool.shard_for(f"user_{i}") != pool.shard_for("blocked"))
+        pool.start()
+        await pool.submit("blocked", "blocked")
+        await pool.submit(other, other)
+        await asyncio.sleep(0.01)
+
+        assert handled == [other]
+        release.set()
+        await pool.stop()
+        assert handled == [other, "blocked"]
+
+    @pytest.mark.asyncio
+    async def test_run_waits_for_the_handler_and_raises_its_error(self):
+        """Test that run returns after the item is handled and raises the handler's error."""
+        handled = []
+
+        async def handler(item):
+            if item == "bad":
+                raise ValueError(item)
+            handled.append(item)
+
+        pool = ShardedWorkerPool(ShardConfig(num_shards=2), handler)
+        pool.start()
+        await pool.run("user_1", "good")
+        assert handled == ["good"]
+        with pytest.raises(ValueError):
+            await pool.run("user_1", "bad")
+        await pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_shard_applies_backpressure(self):
+        """Test that submitting to a full shard waits until the worker catches up."""
+        release = asyncio.Event()
+
+        async def handler(item):
+            await release.wait()
+
+        pool = ShardedWorkerPool(ShardConfig(num_shards=1, queue_size=1), handler)
+        pool.start()
+        await pool.submit("user_1", 1)
+        await asyncio.sleep(0)  # worker takes the first item
+        await pool.submit("user_1", 2)
+
+        blocked = asyncio.create_task(pool.submit("user_1", 3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        release.set()
+        await asyncio.wait_for(blocked, timeout=1.0)
+        await pool.stop()
+
+        stats = pool.get_stats()[0]
+        assert stats["processed"] == 3
+        assert stats["max_depth"] == 1
+        assert stats["max_lag_ms"] > 0
+
+
+class TestEventProcessorSharding:
+    """Test cases for event dispatch through the worker pool."""
+
+    @pytest.mark.asyncio
+    async def test_process_event_runs_handlers_on_workers(self):
+        """Test that events submitted while processing reach their handlers."""
+        processor = EventProcessor(Mock(spec=EventBus), config_manager=Mock())
+        handled = []
+
+        async def handler(event):
+            handled.append(event.user_id)
+
+        await processor.start_processing()
+        processor._handlers = {"reaction_detected": [handler]}
+        for i in range(3):
+            await processor.handle_bus_event(
+                create_event("reaction_detected", user_id=f"user_{i}", content_id="c", reaction_type="like").dict()
+            )
+        await processor.stop_processing()
+
+        assert sorted(handled) == ["user_0", "user_1", "user_2"]
+        health = await processor.health_check()
+        assert sum(shard["processed"] for shard in health["shards"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_attached_processor_receives_bus_events(self):
+        """Test that a bus event is handled on a worker before its stream entry is acknowledged."""
+        fake_redis = FakeAsyncRedis()
+        event_bus = create_stream_bus(fake_redis)
+        processor = EventProcessor(event_bus, config_manager=Mock())
+        handled = []
+
+        async def handler(event):
+            handled.append(event.user_id)
+
+        await processor.start_processing()
+        await processor.register_handler("reaction_detected", handler)
+        assert await processor.attach() is True
+        await event_bus.publish(
+            "reaction_detected",
+            create_event("reaction_detected", user_id="user_1", content_id="c", reaction_type="like").dict()
+        )
+        assert await event_bus._stream_transport.read_once() == 1
+
+        assert handled == ["user_1"]
+        assert fake_redis.pending_count("yabot:events:reaction_detected", "yabot") == 0
+        await processor.stop_processing()
+        health = await processor.health_check()
+        assert sum(shard["processed"] for shard in health["shards"]) == 1
+        assert "besitos_awarded" in event_bus._subscribers
+
+    @pytest.mark.asyncio
+    async def test_failed_bus_event_is_left_pending(self):
+        """Test that a stream entry whose handler fails on a worker is not acknowledged."""
+        fake_redis = FakeAsyncRedis()
+        event_bus = create_stream_bus(fake_redis)
+        processor = EventProcessor(event_bus, config_manager=Mock())
+
+        async def handler(event):
+            raise RuntimeError("boom")
+
+        await processor.start_processing()
+        await processor.register_handler("reaction_detected", handler)
+        await processor.attach()
+        await event_bus.publish(
+            "reaction_detected",
+            create_event("reaction_detected", user_id="user_1", content_id="c", reaction_type="like").dict()
+        )
+        await event_bus._stream_transport.read_once()
+        await processor.stop_processing()
+
+        assert fake_redis.pending_count("yabot:events:reaction_detected", "yabot") == 1
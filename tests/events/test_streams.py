@@ -0,0 +1,132 @@
+"""
+Tests for the Redis Streams transport of the EventBus.
+
+These tests run several EventBus instances against one in-process fake Redis
+server to check that a consumer group spreads events across workers, that
+acknowledged entries are not redelivered and that pending entries are reclaimed.
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from src.events.bus import EventBus
+from src.events.streams import RedisStreamTransport, StreamConfig
+from src.config.manager import ConfigManager
+from tests.utils.events import FakeAsyncRedis
+
+
+def create_worker(fake_redis: FakeAsyncRedis, consumer_name: str, **config) -> EventBus:
+    """Create a connected EventBus using the Streams transport on a fake Redis."""
+    stream_config = StreamConfig(consumer_name=consumer_name, block_ms=0, **config)
+    event_bus = EventBus(config_manager=Mock(spec=ConfigManager), stream_config=stream_config)
+    event_bus._redis_client = fake_redis
+    event_bus._is_connected = True
+    event_bus._stream_transport = RedisStreamTransport(
+        fake_redis,
+        stream_config,
+        event_bus._dispatch_to_subscribers,
+        event_bus._handle_stream_delivery_exhausted
+    )
+    return event_bus
+
+
+class TestRedisStreamTransport:
+    """Test cases for the Streams transport."""
+
+    @pytest.mark.asyncio
+    async def test_publish_appends_to_stream(self):
+        """Test that publishing uses XADD instead of PUBLISH."""
+        fake_redis = FakeAsyncRedis()
+        event_bus = create_worker(fake_redis, "worker-1")
+
+        result = await event_bus.publish("reaction_detected", {"user_id": "user_1"})
+
+        assert result is True
+        assert fake_redis.published == []
+        entries = fake_redis.streams["yabot:events:reaction_detected"]
+        assert len(entries) == 1
+        assert entries[0][1]["event_name"] == "reaction_detected"
+        assert json.loads(entries[0][1]["payload"])["user_id"] == "user_1"
+
+    @pytest.mark.asyncio
+    async def test_consumer_group_spreads_events_across_workers(self):
+        """Test that each event is handled by exactly one worker of the group."""
+        fake_redis = FakeAsyncRedis()
+        handled = []
+
+        workers = []
+        for name in ("worker-1", "worker-2"):
+            worker = create_worker(fake_redis, name, read_count=5)
+
+            async def handler(payload, name=name):
+                handled.append((name, payload["user_id"]))
+
+            await worker.subscribe("reaction_detected", handler)
+            workers.append(worker)
+
+        for i in range(10):
+            await workers[0].publish("reaction_detected", {"user_id": f"user_{i}"})
+
+        assert await workers[0]._stream_transport.read_once() == 5
+        assert await workers[1]._stream_transport.read_once() == 5
+        assert await workers[0]._stream_transport.read_once() == 0
+
+        assert sorted(user for _, user in handled) == sorted(f"user_{i}" for i in range(10))
+        assert {name for name, _ in handled} == {"worker-1", "worker-2"}
+        assert fake_redis.pending_count("yabot:events:reaction_detected", "yabot") == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_entry_is_reclaimed_by_another_worker(self):
+        """Test that an entry left pending by a failing worker is claimed after idling."""
+        fake_redis = FakeAsyncRedis()
+        failing = create_worker(fake_redis, "worker-1", claim_min_idle_ms=1000)
+        healthy = create_worker(fake_redis, "worker-2", claim_min_idle_ms=1000)
+        healthy_handler = AsyncMock()
+
+        await failing.subscribe("decision_made", AsyncMock(side_effect=Exception("boom")))
+        await healthy.subscribe("decision_made", healthy_handler)
+
+        await failing.publish("decision_made", {"user_id": "user_1"})
+        await failing._stream_transport.read_once()
+        assert fake_redis.pending_count("yabot:events:decision_made", "yabot") == 1
+
+        # Not idle long enough yet
+        assert await healthy._stream_transport.reclaim_pending() == 0
+
+        fake_redis.advance(1000)
+        assert await healthy._stream_transport.reclaim_pending() == 1
+        healthy_handler.assert_awaited_once()
+        assert fake_redis.pending_count("yabot:events:decision_made", "yabot") == 0
+
+    @pytest.mark.asyncio
+    async def test_entry_is_dropped_after_max_deliveries(self):
+        """Test that an entry failing on every delivery is acknowledged and reported."""
+        fake_redis = FakeAsyncRedis()
+        worker = create_worker(fake_redis, "worker-1", claim_min_idle_ms=0, max_deliveries=2)
+        await worker.subscribe("decision_made", AsyncMock(side_effect=Exception("boom")))
+        worker._publish_retry_failure_event = AsyncMock()
+
+        await worker.publish("decision_made", {"user_id": "user_1"})
+        await worker._stream_transport.read_once()
+        await worker._stream_transport.reclaim_pending()
+        await worker._stream_transport.reclaim_pending()
+
+        assert fake_redis.pending_count("yabot:events:decision_made", "yabot") == 0
+        worker._publish_retry_failure_event.assert_awaited_once()
+        retry_info = worker._publish_retry_failure_event.call_args[0][0]
+        assert retry_info.event_name == "decision_made"
+        assert retry_info.attempt_count == 2
+
+    @pytest.mark.asyncio
+    async def test_health_check_reports_stream_stats(self):
+        """Test that the health check exposes transport statistics."""
+        fake_redis = FakeAsyncRedis()
+        worker = create_worker(fake_redis, "worker-1")
+        await worker.subscribe("user_registered", AsyncMock())
+
+        health = await worker.health_check()
+
+        assert health["transport"] == "streams"
+        assert health["streams"]["consumer_name"] == "worker-1"
+        assert health["streams"]["streams"] == ["user_registered"]
@@ -2,11 +2,14 @@
 Unit tests for the CallbackProcessor and ActionDispatcher classes.
 """
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, ANY, patch
 from datetime import datetime
 
-from src.handlers.callback_processor import CallbackProcessor, ActionDispatcher, CallbackActionResult
+from src.handlers.callback_processor import (
+    CallbackProcessor, ActionDispatcher, CallbackActionResult, _publish_event, wait_for_pending_publishes
+)
 from src.ui.menu_factory import Menu, MenuType, MenuItem, ActionType, UserRole
 from src.events.models import BaseEvent
 
@@ -16,6 +19,8 @@ CHAT_ID = 12345
 USER_ID = 67890
 MESSAGE_ID = 54321
 
+REACTION = {"user_id": str(USER_ID), "content_id": "content_1", "reaction_type": "like"}
+
 USER_CONTEXT = {
     "user_id": USER_ID,
     "role": "free_user",
@@ -27,7 +32,9 @@ USER_CONTEXT = {
 @pytest.fixture
 def mock_event_bus():
     """Create a mock event bus for testing."""
-    return AsyncMock()
+    event_bus = AsyncMock()
+    event_bus.is_batching = False
+    return event_bus
 
 
 @pytest.fixture
@@ -190,6 +197,37 @@ async def test_callback_processor_cleanup_after_callback(callback_processor, moc
     assert mock_event_bus.publish.call_count == 2  # cleanup_started and cleanup_completed events
 
 
+@pytest.mark.asyncio
+async def test_publish_event_awaits_the_publish_without_batching(mock_event_bus):
+    """Test that callback events are published before returning when batching is off."""
+    await _publish_event(mock_event_bus, "reaction_detected", **REACTION)
+
+    mock_event_bus.publish.assert_awaited_once_with("reaction_detected", ANY)
+
+
+@pytest.mark.asyncio
+async def test_publish_event_runs_in_background_with_batching(mock_event_bus):
+    """Test that with batching on, callback events are published in the background until drained."""
+    release = asyncio.Event()
+    published = []
+
+    async def publish(event_name, payload):
+        await release.wait()
+        published.append(event_name)
+        return True
+
+    mock_event_bus.is_batching = True
+    mock_event_bus.publish = publish
+    await _publish_event(mock_event_bus, "reaction_detected", **REACTION)
+    await _publish_event(mock_event_bus, "user_interaction", user_id=str(USER_ID), action="menu")
+    assert published == []
+
+    release.set()
+    await wait_for_pending_publishes()
+
+    assert published == ["reaction_detected", "user_interaction"]
+
+
 @pytest.mark.asyncio
 async def test_callback_processor_validate_callback_data():
     """Test CallbackProcessor callback data validation."""
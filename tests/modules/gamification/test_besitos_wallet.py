@@ -14,8 +14,10 @@ from src.modules.gamification.besitos_wallet import (
     BesitosWalletError,
     InsufficientFundsError,
     TransactionError,
-    Transaction
+    Transaction,
+    create_besitos_wallet
 )
+from src.modules.gamification.achievement_system import AchievementSystem
 from src.database.mongodb import MongoDBHandler
 from src.events.bus import EventBus
 from src.database.schemas.gamification import TransactionStatus
@@ -336,5 +338,63 @@ class TestBesitosWallet:
             await besitos_wallet.get_balance(user_id)
 
 
+class TestBesitosWalletOutbox:
+    """Test suite for wallets built with the transactional outbox."""
+
+    @pytest.fixture
+    def transactional_handler(self):
+        """Create a MongoDB handler double whose sessions run transactions."""
+        session = MagicMock()
+        session.__aenter__.return_value = session
+        handler = Mock(spec=MongoDBHandler)
+        handler.get_users_collection.return_value = AsyncMock()
+        handler.get_users_collection.return_value.find_one.return_value = {"besitos_balance": 10}
+        handler.get_besitos_transactions_collection.return_value = AsyncMock()
+        handler._db = Mock()
+        handler._db.client.start_session = AsyncMock(return_value=session)
+        return handler, session
+
+    @pytest.mark.asyncio
+    async def test_factory_wallet_stages_events_in_outbox(self, transactional_handler, mock_event_bus):
+        """Test that a wallet built by the factory writes its event through the outbox."""
+        handler, session = transactional_handler
+        outbox = Mock()
+        outbox.add = AsyncMock()
+
+        wallet = await create_besitos_wallet(handler, mock_event_bus, outbox)
+        await wallet.add_besitos("test_user_123", 5, "Test reward")
+
+        outbox.add.assert_awaited_once()
+        assert outbox.add.call_args.args[0] == "besitos_awarded"
+        assert outbox.add.call_args.kwargs["session"] is session
+        outbox.notify.assert_called_once()
+        mock_event_bus.publish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_achievement_rewards_use_the_outbox(self, transactional_handler, mock_event_bus):
+        """Test that the achievement system hands its outbox to the reward wallet."""
+        handler, _ = transactional_handler
+        handler.get_user_achievements_collection.return_value = AsyncMock()
+        outbox = Mock()
+        outbox.add = AsyncMock()
+        achievement_system = AchievementSystem(handler, mock_event_bus, outbox)
+        achievement = next(definition for definition in achievement_system.achievement_definitions.values()
+                           if definition.reward_besitos > 0)
+
+        await achievement_system._award_achievement_reward("test_user_123", achievement)
+
+        outbox.add.assert_awaited_once()
+
+    def test_dependency_passes_outbox_to_wallet(self, mock_mongodb_handler):
+        """Test that the API dependency builds the wallet with the overridden outbox."""
+        from src.dependencies import get_besitos_wallet
+
+        outbox = Mock()
+        with patch("src.dependencies.get_mongodb_handler", return_value=mock_mongodb_handler):
+            wallet = get_besitos_wallet(outbox)
+
+        assert wallet.outbox is outbox
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
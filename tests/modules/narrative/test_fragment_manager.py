@@ -22,8 +22,8 @@ from src.events.bus import EventBus
 def mock_mongodb_handler():
     """Create a mock MongoDB handler for testing."""
     mock_handler = Mock(spec=MongoDBHandler)
-    mock_handler.get_narrative_fragments_collection.return_value = Mock()
-    mock_handler.get_users_collection.return_value = Mock()
+    mock_handler.get_narrative_fragments_collection.return_value = AsyncMock()
+    mock_handler.get_users_collection.return_value = AsyncMock()
     return mock_handler
 
 
@@ -0,0 +1,37 @@
+"""
+Performance tests for event processor deduplication.
+"""
+
+import time
+
+import pytest
+
+from src.events.idempotency import ProcessedEventStore
+
+
+def _per_event_cost(tracked_ids: int, samples: int = 20000) -> float:
+    """Measure the cost of one check-and-mark with a given number of tracked IDs."""
+    store = ProcessedEventStore(ttl=3600, max_size=tracked_ids)
+    for i in range(tracked_ids):
+        store.add(f"seed_{i}")
+
+    start_time = time.perf_counter()
+    for i in range(samples):
+        event_id = f"event_{i}"
+        store.contains(event_id)
+        store.add(event_id)
+    return (time.perf_counter() - start_time) / samples
+
+
+class TestProcessedEventStorePerformance:
+    """Benchmarks for the processed event store."""
+
+    @pytest.mark.performance
+    def test_per_event_cost_is_flat(self):
+        """Test that per-event cost does not grow with the number of tracked IDs."""
+        costs = {tracked: _per_event_cost(tracked) for tracked in (1000, 100000, 1000000)}
+
+        for tracked, cost in costs.items():
+            print(f"{tracked:>8} tracked IDs: {cost * 1e6:.2f} us/event")
+
+        assert costs[1000000] < costs[1000] * 5
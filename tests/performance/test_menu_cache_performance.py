@@ -0,0 +1,45 @@
+"""
+Performance tests for menu cache hits.
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.ui.menu_cache import MenuCacheOptimizer
+from src.ui.menu_config import MenuType, UserRole
+from src.ui.menu_factory import Menu
+
+
+async def _hit_latency(cached_menus: int, samples: int = 20000) -> float:
+    """Measure the latency of one memory hit with a given number of cached menus."""
+    optimizer = MenuCacheOptimizer(Mock(), max_memory_entries=cached_menus)
+    context = {"user_id": "1", "role": "free_user", "besitos": 10}
+    for i in range(cached_menus):
+        menu = Menu(
+            menu_id=f"menu_{i}", title="Menu", description="",
+            menu_type=MenuType.MAIN, required_role=UserRole.FREE_USER
+        )
+        await optimizer.cache_menu(menu, context)
+
+    start_time = time.perf_counter()
+    for i in range(samples):
+        await optimizer.get_cached_menu(f"menu_{i % cached_menus}", context)
+    return (time.perf_counter() - start_time) / samples
+
+
+class TestMenuCachePerformance:
+    """Benchmarks for the menu cache memory tier."""
+
+    @pytest.mark.performance
+    def test_memory_hit_latency_is_flat(self):
+        """Test that memory hits stay in microseconds however many menus are cached."""
+        latencies = {cached: asyncio.run(_hit_latency(cached)) for cached in (10, 1000)}
+        report = ", ".join(
+            f"{cached} cached menus: {latency * 1e6:.2f} us/hit" for cached, latency in latencies.items()
+        )
+
+        assert latencies[1000] < latencies[10] * 5, report
+        assert latencies[1000] < 0.001, report
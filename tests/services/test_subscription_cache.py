@@ -0,0 +1,141 @@
+"""
+Tests for cached subscription statuses and the subscription expiry sweep.
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.database.async_sqlite import AsyncSQLite
+from src.database.manager import DatabaseManager
+from src.database.schemas.sqlite import SQLiteSchemas
+from src.events.bus import EventBus
+from src.services.subscription import SubscriptionService, SubscriptionServiceError
+from src.services.subscription_cache import SubscriptionStatusCache
+
+
+@pytest.fixture
+def subscription_db_path(tmp_path):
+    """Create a SQLite database with the subscription schema."""
+    path = str(tmp_path / "subscriptions.db")
+    conn = sqlite3.connect(path)
+    SQLiteSchemas.initialize_database(conn)
+    conn.close()
+    return path
+
+
+def create_service(sqlite):
+    """Create a SubscriptionService on an AsyncSQLite handle with a mocked event bus."""
+    database_manager = Mock(spec=DatabaseManager)
+    database_manager.get_async_sqlite.return_value = sqlite
+    event_bus = Mock(spec=EventBus)
+    event_bus.publish = AsyncMock(return_value=True)
+    return SubscriptionService(database_manager, event_bus, SubscriptionStatusCache()), event_bus
+
+
+class TestSubscriptionStatusCache:
+    """Test cases for read-through statuses and event-driven invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_status_is_read_through_and_invalidated_by_events(self, subscription_db_path):
+        """Test that cached statuses skip SQLite until a subscription_updated event arrives."""
+        sqlite = AsyncSQLite(subscription_db_path, reader_count=1, commit_interval=0.001)
+        service, _ = create_service(sqlite)
+        try:
+            await service.create_subscription("u1", "vip", end_date=datetime.utcnow() + timedelta(days=30))
+            assert await service.validate_vip_access("u1")
+
+            sqlite.fetchone = AsyncMock(side_effect=AssertionError("status should be cached"))
+            assert await service.validate_vip_access("u1")
+            assert service.status_cache.get_stats()["hits"] == 1
+
+            await service.status_cache.handle_subscription_updated({"user_id": "u1"})
+            assert await service.status_cache.get("u1") is None
+        finally:
+            await sqlite.close()
+
+    @pytest.mark.asyncio
+    async def test_status_never_outlives_end_date(self):
+        """Test that an active status is not cached past the subscription's end date."""
+        cache = SubscriptionStatusCache(ttl=300)
+        ends_soon = {"is_active": True, "end_date": (datetime.utcnow() + timedelta(seconds=30)).isoformat()}
+        ended = {"is_active": True, "end_date": (datetime.utcnow() - timedelta(seconds=1)).isoformat()}
+
+        await cache.set("soon", ends_soon)
+        await cache.set("ended", ended)
+
+        assert cache._entries["soon"][0] <= time.monotonic() + 30
+        assert await cache.get("ended") is None
+
+    @pytest.mark.asyncio
+    async def test_read_path_does_not_write_and_sweep_expires_in_bulk(self, subscription_db_path):
+        """Test that expired rows are reported inactive on read and marked expired by the sweep."""
+        sqlite = AsyncSQLite(subscription_db_path, reader_count=1, commit_interval=0.001)
+        service, event_bus = create_service(sqlite)
+        try:
+            past = datetime.utcnow() - timedelta(days=1)
+            for user_id in ("u1", "u2"):
+                await service.create_subscription(user_id, "vip", end_date=past)
+            await service.create_subscription("u3", "vip", end_date=datetime.utcnow() + timedelta(days=1))
+            event_bus.publish.reset_mock()
+
+            status = await service.check_subscription_status("u1")
+            assert status["is_expired"] and not status["is_active"]
+            assert (await service.get_subscription("u1"))["status"] == "active"
+
+            expired = await service.expire_subscriptions()
+
+            assert sorted(expired) == ["u1", "u2"]
+            assert (await service.get_subscription("u1"))["status"] == "expired"
+            assert (await service.get_subscription("u3"))["status"] == "active"
+            assert await service.status_cache.get("u1") is None
+            published = [call.args[1]["user_id"] for call in event_bus.publish.call_args_list]
+            assert sorted(published) == ["u1", "u2"]
+            assert await service.expire_subscriptions() == []
+        finally:
+            await sqlite.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_read_is_not_cached_as_free_user(self, subscription_db_path):
+        """Test that a database error fails the status check instead of caching an inactive status."""
+        sqlite = AsyncSQLite(subscription_db_path, reader_count=1, commit_interval=0.001)
+        service, _ = create_service(sqlite)
+        try:
+            await service.create_subscription("u1", "vip", end_date=datetime.utcnow() + timedelta(days=30))
+            read = sqlite.fetchone
+            sqlite.fetchone = AsyncMock(side_effect=sqlite3.OperationalError("database is locked"))
+
+            with pytest.raises(SubscriptionServiceError):
+                await service.check_subscription_status("u1")
+            assert await service.status_cache.get("u1") is None
+
+            sqlite.fetchone = read
+            assert await service.validate_vip_access("u1")
+        finally:
+            await sqlite.close()
+
+    @pytest.mark.asyncio
+    async def test_sweep_reports_only_rows_it_changed(self, subscription_db_path):
+        """Test that the sweep expires and announces exactly the rows its update changed."""
+        sqlite = AsyncSQLite(subscription_db_path, reader_count=1, commit_interval=0.001)
+        service, event_bus = create_service(sqlite)
+        try:
+            past = datetime.utcnow() - timedelta(days=1)
+            await service.create_subscription("u1", "vip", end_date=past)
+            await service.create_subscription("u2", "vip", end_date=past)
+            await sqlite.execute(
+                "UPDATE subscriptions SET end_date = ? WHERE user_id = ?",
+                ((datetime.utcnow() + timedelta(days=30)).isoformat(), "u2")
+            )
+            event_bus.publish.reset_mock()
+
+            assert await service.expire_subscriptions() == ["u1"]
+
+            assert (await service.get_subscription("u2"))["status"] == "active"
+            published = [call.args[1] for call in event_bus.publish.call_args_list]
+            assert [(event["user_id"], event["status"]) for event in published] == [("u1", "expired")]
+        finally:
+            await sqlite.close()
@@ -8,7 +8,7 @@ implementing the testing requirements specified in fase1 specification section 1
 import pytest
 import asyncio
 from unittest.mock import Mock, AsyncMock, MagicMock, patch
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, Any
 
 from src.services.user import (
@@ -17,6 +17,8 @@ from src.services.user import (
     UserCreationError, 
     UserNotFoundError
 )
+from src.database.async_sqlite import SQLiteWriteResult
+from src.database.behavioral_assessments import RECENT_ASSESSMENT_WINDOW
 from src.database.manager import DatabaseManager
 from src.events.bus import EventBus
 from src.events.models import BaseEvent
@@ -30,19 +32,21 @@ class TestUserService:
         """Create a mock database manager for testing."""
         mock_db_manager = Mock(spec=DatabaseManager)
         
-        # Mock SQLite connection
-        mock_sqlite_conn = Mock()
-        mock_sqlite_cursor = Mock()
-        mock_sqlite_conn.cursor.return_value = mock_sqlite_cursor
-        mock_db_manager.get_sqlite_conn.return_value = mock_sqlite_conn
+        # Mock async SQLite handle
+        mock_sqlite = Mock()
+        mock_sqlite.fetchone = AsyncMock(return_value=None)
+        mock_sqlite.execute = AsyncMock(return_value=SQLiteWriteResult(rowcount=1, lastrowid=None))
+        mock_sqlite.transaction = AsyncMock(return_value=[])
+        mock_db_manager.get_async_sqlite.return_value = mock_sqlite
         
-        # Mock MongoDB connection
+        # Mock async MongoDB connection
         mock_mongo_db = Mock()
-        mock_users_collection = Mock()
+        mock_users_collection = AsyncMock()
+        mock_users_collection.find_one.return_value = None
         mock_mongo_db.__getitem__ = Mock(return_value=mock_users_collection)
-        mock_db_manager.get_mongo_db.return_value = mock_mongo_db
+        mock_db_manager.get_async_mongo_db.return_value = mock_mongo_db
         
-        return mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection
+        return mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection
     
     @pytest.fixture
     def mock_event_bus(self):
@@ -54,12 +58,12 @@ class TestUserService:
     @pytest.fixture
     def user_service(self, mock_database_manager, mock_event_bus):
         """Create a UserService instance with mocked dependencies."""
-        mock_db_manager, _, _, _, _ = mock_database_manager
+        mock_db_manager, _, _, _ = mock_database_manager
         return UserService(mock_db_manager, mock_event_bus)
     
     def test_init(self, mock_database_manager, mock_event_bus):
         """Test UserService initialization."""
-        mock_db_manager, _, _, _, _ = mock_database_manager
+        mock_db_manager, _, _, _ = mock_database_manager
         user_service = UserService(mock_db_manager, mock_event_bus)
         
         assert user_service.database_manager == mock_db_manager
@@ -68,11 +72,9 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_create_user_success(self, user_service, mock_database_manager, mock_event_bus):
         """Test successful user creation."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock successful operations
-        mock_sqlite_cursor.execute.return_value = None
-        mock_sqlite_conn.commit.return_value = None
         mock_insert_result = Mock()
         mock_insert_result.acknowledged = True
         mock_users_collection.insert_one.return_value = mock_insert_result
@@ -90,9 +92,10 @@ class TestUserService:
         # Call the method
         result = await user_service.create_user(telegram_user)
         
-        # Verify SQLite operations
-        assert mock_sqlite_cursor.execute.call_count >= 1
-        assert mock_sqlite_conn.commit.call_count == 1
+        # Verify SQLite operations were submitted as one write unit
+        assert mock_sqlite.transaction.call_count == 1
+        statements = mock_sqlite.transaction.call_args[0][0]
+        assert "INSERT INTO user_profiles" in statements[-1][0]
         
         # Verify MongoDB operations
         assert mock_users_collection.insert_one.call_count == 1
@@ -113,10 +116,10 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_create_user_sqlite_failure(self, user_service, mock_database_manager, mock_event_bus):
         """Test user creation failure when SQLite operation fails."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock SQLite failure
-        mock_sqlite_cursor.execute.side_effect = Exception("SQLite error")
+        mock_sqlite.transaction.side_effect = Exception("SQLite error")
         
         # Test data
         telegram_user = {
@@ -137,11 +140,9 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_create_user_mongo_failure(self, user_service, mock_database_manager, mock_event_bus):
         """Test user creation failure when MongoDB operation fails."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock successful SQLite but failed MongoDB
-        mock_sqlite_cursor.execute.return_value = None
-        mock_sqlite_conn.commit.return_value = None
         mock_users_collection.insert_one.side_effect = Exception("MongoDB error")
         
         # Test data
@@ -163,17 +164,14 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_get_user_context_success(self, user_service, mock_database_manager):
         """Test successful user context retrieval."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock successful data retrieval
-        mock_sqlite_cursor.fetchone.return_value = (
-            "test_user_123", 123456789, "testuser", "Test", "User", "en", 
-            datetime.utcnow(), datetime.utcnow(), 1
-        )
-        mock_cursor_desc = [("user_id",), ("telegram_user_id",), ("username",), 
-                           ("first_name",), ("last_name",), ("language_code",), 
-                           ("registration_date",), ("last_login",), ("is_active",)]
-        mock_sqlite_cursor.description = mock_cursor_desc
+        mock_sqlite.fetchone.return_value = {
+            "user_id": "test_user_123", "telegram_user_id": 123456789, "username": "testuser",
+            "first_name": "Test", "last_name": "User", "language_code": "en",
+            "registration_date": datetime.utcnow(), "last_login": datetime.utcnow(), "is_active": 1
+        }
         
         mock_users_collection.find_one.return_value = {
             "_id": "some_mongo_id",
@@ -202,8 +200,8 @@ class TestUserService:
         result = await user_service.get_user_context("test_user_123")
         
         # Verify SQLite query
-        assert mock_sqlite_cursor.execute.call_count == 1
-        args, kwargs = mock_sqlite_cursor.execute.call_args
+        assert mock_sqlite.fetchone.call_count == 1
+        args, kwargs = mock_sqlite.fetchone.call_args
         assert "SELECT * FROM user_profiles WHERE user_id = ?" in args[0]
         
         # Verify MongoDB query
@@ -221,10 +219,10 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_get_user_context_not_found(self, user_service, mock_database_manager):
         """Test user context retrieval when user is not found."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock user not found
-        mock_sqlite_cursor.fetchone.return_value = None
+        mock_sqlite.fetchone.return_value = None
         
         # Call the method and expect failure
         with pytest.raises(UserNotFoundError):
@@ -233,7 +231,7 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_update_user_state_success(self, user_service, mock_database_manager):
         """Test successful user state update."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock successful update
         mock_update_result = Mock()
@@ -262,7 +260,7 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_update_user_state_no_changes(self, user_service, mock_database_manager):
         """Test user state update when no changes are made."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock update with no changes
         mock_update_result = Mock()
@@ -285,11 +283,10 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_update_user_profile_success(self, user_service, mock_database_manager):
         """Test successful user profile update."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock successful update
-        mock_sqlite_cursor.rowcount = 1
-        mock_sqlite_conn.commit.return_value = None
+        mock_sqlite.execute.return_value = SQLiteWriteResult(rowcount=1, lastrowid=None)
         
         # Test data
         profile_updates = {
@@ -301,8 +298,8 @@ class TestUserService:
         result = await user_service.update_user_profile("test_user_123", profile_updates)
         
         # Verify SQLite update
-        assert mock_sqlite_cursor.execute.call_count == 1
-        args, kwargs = mock_sqlite_cursor.execute.call_args
+        assert mock_sqlite.execute.call_count == 1
+        args, kwargs = mock_sqlite.execute.call_args
         assert "UPDATE user_profiles SET" in args[0]
         assert "username = ?" in args[0]
         assert "first_name = ?" in args[0]
@@ -314,11 +311,10 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_delete_user_success(self, user_service, mock_database_manager, mock_event_bus):
         """Test successful user deletion."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock successful deletions
-        mock_sqlite_cursor.rowcount = 1
-        mock_sqlite_conn.commit.return_value = None
+        mock_sqlite.execute.return_value = SQLiteWriteResult(rowcount=1, lastrowid=None)
         mock_delete_result = Mock()
         mock_delete_result.deleted_count = 1
         mock_users_collection.delete_one.return_value = mock_delete_result
@@ -327,8 +323,8 @@ class TestUserService:
         result = await user_service.delete_user("test_user_123", "test_reason")
         
         # Verify SQLite deletion
-        assert mock_sqlite_cursor.execute.call_count == 1
-        args, kwargs = mock_sqlite_cursor.execute.call_args
+        assert mock_sqlite.execute.call_count == 1
+        args, kwargs = mock_sqlite.execute.call_args
         assert "DELETE FROM user_profiles WHERE user_id = ?" in args[0]
         
         # Verify MongoDB deletion
@@ -347,11 +343,10 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_delete_user_failure(self, user_service, mock_database_manager, mock_event_bus):
         """Test user deletion failure."""
-        mock_db_manager, mock_sqlite_conn, mock_sqlite_cursor, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
         
         # Mock SQLite success but MongoDB failure
-        mock_sqlite_cursor.rowcount = 1
-        mock_sqlite_conn.commit.return_value = None
+        mock_sqlite.execute.return_value = SQLiteWriteResult(rowcount=1, lastrowid=None)
         mock_delete_result = Mock()
         mock_delete_result.deleted_count = 0  # Indicates failure
         mock_users_collection.delete_one.return_value = mock_delete_result
@@ -362,6 +357,48 @@ class TestUserService:
         # Verify result is False due to MongoDB failure
         assert result is False
 
+    
+    @pytest.mark.asyncio
+    async def test_add_behavioral_assessment_buckets_and_caps_window(self, user_service, mock_database_manager):
+        """Test that assessments go to the bucket collection and only a capped window is embedded."""
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
+        user_service.get_lucien_interaction_context = AsyncMock(return_value={"behavioral_assessment_count": 7})
+        user_service.update_lucien_interaction_context = AsyncMock(return_value=True)
+        mock_users_collection.update_one.return_value = Mock(modified_count=1)
+        
+        result = await user_service.add_behavioral_assessment("test_user_123", {
+            "behavior_observed": "patience",
+            "assessment_context": "menu",
+            "worthiness_impact": 0.1
+        })
+        
+        assert result is True
+        context_updates = user_service.update_lucien_interaction_context.call_args.args[1]
+        assert "behavioral_assessment" not in context_updates
+        bucket_call, user_call = mock_users_collection.update_one.call_args_list
+        assert bucket_call.args[1]["$push"]["assessments"]["session_context"]["previous_assessments_count"] == 7
+        assert bucket_call.kwargs == {"upsert": True}
+        push = user_call.args[1]["$push"]["lucien_interaction_context.behavioral_assessment_history"]
+        assert push["$slice"] == -RECENT_ASSESSMENT_WINDOW
+        assert push["$each"][0]["behavior_observed"] == "patience"
+        assert user_call.args[1]["$inc"] == {"lucien_interaction_context.behavioral_assessment_count": 1}
+    
+    @pytest.mark.asyncio
+    async def test_analyze_behavioral_patterns_filters_in_database(self, user_service, mock_database_manager):
+        """Test that pattern analysis asks MongoDB for the analysis window only."""
+        mock_db_manager, mock_sqlite, mock_mongo_db, mock_users_collection = mock_database_manager
+        mock_cursor = Mock()
+        mock_cursor.to_list = AsyncMock(return_value=[])
+        mock_users_collection.aggregate = Mock(return_value=mock_cursor)
+        
+        result = await user_service.analyze_behavioral_patterns("test_user_123", analysis_window_days=7)
+        
+        assert result["assessments_analyzed"] == 0
+        pipeline = mock_users_collection.aggregate.call_args.args[0]
+        cutoff = pipeline[0]["$match"]["last_timestamp"]["$gte"]
+        assert datetime.utcnow() - cutoff >= timedelta(days=7)
+        assert {"$match": {"timestamp": {"$gte": cutoff}}} in pipeline
+        assert {"$limit": 200} in pipeline
 
 # Test convenience function
 @pytest.mark.asyncio
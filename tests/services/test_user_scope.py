@@ -0,0 +1,291 @@
+"""
+Unit tests for the request-scoped user identity map.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.database.async_sqlite import SQLiteWriteResult
+from src.database.manager import DatabaseManager
+from src.events.bus import EventBus
+from src.services.user import UserService, resolve_state_fields
+from src.services.user_scope import (
+    PendingUserUpdate, current_identity_map, project_document, user_identity_middleware,
+    user_identity_scope
+)
+
+
+class TestUserIdentityScope:
+    """Test cases for UserService reads inside an update scope."""
+
+    @pytest.fixture
+    def mock_database_manager(self):
+        """Create a database manager whose SQLite and MongoDB calls are counted."""
+        mock_db_manager = Mock(spec=DatabaseManager)
+
+        mock_sqlite = Mock()
+        mock_sqlite.fetchone = AsyncMock(side_effect=lambda sql, params: {
+            "user_id": params[0], "role": "free_user", "has_vip": False
+        })
+        mock_sqlite.execute = AsyncMock(return_value=SQLiteWriteResult(rowcount=1, lastrowid=None))
+        mock_db_manager.get_async_sqlite.return_value = mock_sqlite
+
+        def find_one(query, projection=None):
+            document = {
+                "_id": "object-id",
+                "user_id": query["user_id"],
+                "besitos": 10,
+                "current_state": {"menu_context": "main_menu", "navigation_path": ["main_menu"]},
+                "lucien_interaction_context": {
+                    "relationship_with_lucien": "trusted_confidant",
+                    "behavioral_assessment_history": [{"score": 0.5}] * 20
+                }
+            }
+            if projection is None:
+                return document
+            return project_document(document, [path for path, include in projection.items() if include])
+
+        mock_users_collection = AsyncMock()
+        mock_users_collection.find_one.side_effect = find_one
+        mock_users_collection.update_one.return_value = Mock(matched_count=1, modified_count=1)
+        mock_mongo_db = Mock()
+        mock_mongo_db.__getitem__ = Mock(return_value=mock_users_collection)
+        mock_db_manager.get_async_mongo_db.return_value = mock_mongo_db
+
+        return mock_db_manager, mock_sqlite, mock_users_collection
+
+    @pytest.fixture
+    def user_service(self, mock_database_manager):
+        """Create a UserService instance with counted database calls."""
+        mock_event_bus = Mock(spec=EventBus)
+        mock_event_bus.publish = AsyncMock()
+        return UserService(mock_database_manager[0], mock_event_bus)
+
+    @pytest.mark.asyncio
+    async def test_enhanced_menu_context_reads_each_database_once(self, user_service, mock_database_manager):
+        """Test that one update costs one SQLite and one MongoDB read."""
+        _, mock_sqlite, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope():
+            context = await user_service.get_enhanced_user_menu_context("u1")
+            await user_service.get_user_besitos("u1")
+
+        assert context["besitos_balance"] == 10
+        assert mock_sqlite.fetchone.call_count == 1
+        assert mock_users_collection.find_one.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_reads_outside_scope_are_not_cached(self, user_service, mock_database_manager):
+        """Test that reads outside an update scope always hit the databases."""
+        _, mock_sqlite, mock_users_collection = mock_database_manager
+
+        await user_service.get_user_context("u1")
+        await user_service.get_user_context("u1")
+
+        assert mock_sqlite.fetchone.call_count == 2
+        assert mock_users_collection.find_one.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_are_merged_into_scope(self, user_service, mock_database_manager):
+        """Test that writes in an update are visible to later reads of that update."""
+        _, mock_sqlite, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope():
+            await user_service.get_user_context("u1")
+            await user_service.update_user_state("u1", {"current_state.menu_context": "store"})
+            await user_service.update_user_profile("u1", {"has_vip": True})
+            await user_service.award_besitos("u1", 5)
+            context = await user_service.get_user_menu_context("u1")
+
+        assert context["current_menu_id"] == "store"
+        assert context["has_vip"] is True
+        assert context["besitos_balance"] == 15
+        assert mock_sqlite.fetchone.call_count == 1
+        assert mock_users_collection.find_one.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_callers_cannot_mutate_cached_documents(self, user_service):
+        """Test that mutating a returned context does not change the cached copy."""
+        async with user_identity_scope():
+            first = await user_service.get_user_context("u1")
+            first["state"]["besitos"] = 999
+            second = await user_service.get_user_context("u1")
+
+        assert second["state"]["besitos"] == 10
+
+    @pytest.mark.asyncio
+    async def test_scope_is_discarded_and_isolated(self):
+        """Test that scopes end with the update and concurrent updates do not share one."""
+        maps = []
+
+        async def handle_update():
+            async with user_identity_scope() as identity_map:
+                async with user_identity_scope() as nested:
+                    assert nested is identity_map
+                await asyncio.sleep(0)
+                maps.append(current_identity_map())
+
+        await asyncio.gather(handle_update(), handle_update())
+
+        assert maps[0] is not maps[1]
+        assert current_identity_map() is None
+
+    @pytest.mark.asyncio
+    async def test_middleware_runs_handler_in_scope(self):
+        """Test that the dispatcher middleware opens a scope around the handler."""
+        async def handler(event, data):
+            return current_identity_map()
+
+        assert await user_identity_middleware(handler, Mock(), {}) is not None
+        assert current_identity_map() is None
+
+    @pytest.mark.asyncio
+    async def test_wallet_read_projects_besitos(self, user_service, mock_database_manager):
+        """Test that hot paths request only the fields they use."""
+        _, _, mock_users_collection = mock_database_manager
+
+        assert await user_service.get_user_besitos("u1") == 10
+
+        args, _ = mock_users_collection.find_one.call_args
+        assert args == ({"user_id": "u1"}, {"_id": 0, "besitos": 1, "user_id": 1})
+
+    @pytest.mark.asyncio
+    async def test_partial_states_are_extended_in_scope(self, user_service, mock_database_manager):
+        """Test that a wider projection only reads again when fields are missing."""
+        _, _, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope():
+            menu = await user_service.get_user_menu_context("u1")
+            enhanced = await user_service.get_enhanced_user_menu_context("u1")
+            await user_service.get_user_menu_context("u1")
+
+        assert menu["relationship_level"] == "trusted_confidant"
+        assert menu["navigation_path"] == ["main_menu"]
+        assert enhanced["behavioral_assessment_count"] == 20
+        assert enhanced["navigation_path"] == ["main_menu"]
+        assert mock_users_collection.find_one.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_in_update_are_committed_once(self, user_service, mock_database_manager):
+        """Test that all state writes for a user in one update become a single update."""
+        _, _, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope():
+            await user_service.update_user_state("u1", {"current_state.menu_context": "store"})
+            await user_service.update_user_state("u1", {"current_state.session_data": {"page": 2}})
+            await user_service.award_besitos("u1", 5)
+            await user_service.deduct_besitos("u1", 3)
+            assert await user_service.get_user_besitos("u1") == 12
+            assert mock_users_collection.update_one.call_count == 0
+
+        mock_users_collection.update_one.assert_called_once()
+        query, update = mock_users_collection.update_one.call_args.args
+        assert query == {"user_id": "u1"}
+        assert update["$inc"] == {"besitos": 2}
+        assert update["$set"]["current_state.menu_context"] == "store"
+        assert update["$set"]["current_state.session_data"] == {"page": 2}
+
+    @pytest.mark.asyncio
+    async def test_writes_for_several_users_use_bulk_write(self, user_service, mock_database_manager):
+        """Test that pending updates of several users are committed in one bulk_write."""
+        _, _, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope():
+            await user_service.award_besitos("u1", 5)
+            await user_service.award_besitos("u2", 7)
+
+        assert mock_users_collection.update_one.call_count == 0
+        requests = mock_users_collection.bulk_write.call_args.args[0]
+        assert [request._filter for request in requests] == [{"user_id": "u1"}, {"user_id": "u2"}]
+        assert requests[1]._doc["$inc"] == {"besitos": 7}
+
+    @pytest.mark.asyncio
+    async def test_writes_are_read_back_before_commit(self, user_service, mock_database_manager):
+        """Test that fields first read after a buffered write include that write."""
+        _, _, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope():
+            await user_service.award_besitos("u1", 5)
+            assert await user_service.get_user_besitos("u1") == 15
+
+        assert mock_users_collection.update_one.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_is_raised_from_scope(self, user_service, mock_database_manager):
+        """Test that an error committing buffered writes reaches the caller of the scope."""
+        _, _, mock_users_collection = mock_database_manager
+        mock_users_collection.update_one.side_effect = RuntimeError("write failed")
+
+        with pytest.raises(RuntimeError, match="write failed"):
+            async with user_identity_scope():
+                await user_service.award_besitos("u1", 5)
+
+    @pytest.mark.asyncio
+    async def test_discard_drops_pending_writes(self, user_service, mock_database_manager):
+        """Test that discarding a user also drops the user's buffered writes."""
+        _, _, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope() as identity_map:
+            await user_service.award_besitos("u1", 5)
+            await user_service.award_besitos("u2", 7)
+            identity_map.discard("u1")
+
+        mock_users_collection.update_one.assert_called_once()
+        assert mock_users_collection.update_one.call_args.args[0] == {"user_id": "u2"}
+
+    @pytest.mark.asyncio
+    async def test_events_are_published_after_the_write_matches(self, user_service, mock_database_manager):
+        """Test that without an outbox a buffered write's events are published once it matched."""
+        _, _, mock_users_collection = mock_database_manager
+
+        async with user_identity_scope():
+            await user_service.update_user_state("u1", {"current_state.menu_context": "store"})
+            user_service.event_bus.publish.assert_not_called()
+
+        assert user_service.event_bus.publish.call_args.args[0] == "user_updated"
+
+        user_service.event_bus.publish.reset_mock()
+        mock_users_collection.update_one.return_value = Mock(matched_count=0, modified_count=0)
+        async with user_identity_scope():
+            await user_service.update_user_state("missing", {"current_state.menu_context": "store"})
+
+        user_service.event_bus.publish.assert_not_called()
+
+    def test_pending_update_merges_operations(self):
+        """Test how $set, $inc and $push operations on the same paths are folded."""
+        pending = PendingUserUpdate()
+
+        assert pending.merge({"$inc": {"besitos": 5}, "$set": {"updated_at": "t1"}})
+        assert pending.merge({"$inc": {"besitos": -2}, "$set": {"updated_at": "t2"}})
+        assert pending.merge({"$set": {"context": {"history": [1]}}})
+        assert pending.merge({"$push": {"context.history": {"$each": [2, 3], "$slice": -2}}})
+        assert pending.merge({"$inc": {"context.count": 1}})
+
+        assert pending.to_update() == {
+            "$set": {"updated_at": "t2", "context": {"history": [2, 3], "count": 1}},
+            "$inc": {"besitos": 3}
+        }
+        assert pending.merge({"$set": {"besitos": 0}})
+        assert pending.to_update()["$set"]["besitos"] == 0
+        assert "$inc" not in pending.to_update()
+
+    def test_pending_update_rejects_conflicts(self):
+        """Test that updates which cannot be folded leave the pending update unchanged."""
+        pending = PendingUserUpdate()
+        pending.merge({"$push": {"history": {"$each": [1], "$slice": -20}}})
+
+        assert not pending.merge({"$push": {"history": {"$each": [2], "$slice": -5}}})
+        assert not pending.merge({"$inc": {"history.count": 1}})
+        assert not pending.merge({"$unset": {"history": ""}})
+        assert pending.to_update() == {"$push": {"history": {"$each": [1], "$slice": -20}}}
+
+    def test_resolve_state_fields(self):
+        """Test that projections always include user_id and avoid path collisions."""
+        assert resolve_state_fields(None) is None
+        assert resolve_state_fields(["current_state.menu_context", "current_state"]) == (
+            "current_state", "user_id"
+        )
+        with pytest.raises(ValueError):
+            resolve_state_fields("unknown")
@@ -113,7 +113,7 @@ async def test_publish_redis_failure_queue_locally():
             mock_redis.return_value = mock_redis_client
             
             # Mock the persistence methods
-            with patch.object(EventBus, '_persist_events') as mock_persist:
+            with patch.object(EventBus, '_persist_event') as mock_persist:
                 event_bus = EventBus()
                 await event_bus.connect()
                 
@@ -198,7 +198,7 @@ async def test_queue_locally():
     event_bus = EventBus()
     
     # Mock the persistence method
-    with patch.object(EventBus, '_persist_events') as mock_persist:
+    with patch.object(EventBus, '_persist_event') as mock_persist:
         payload = {"user_id": "12345", "action": "test"}
         result = await event_bus._queue_locally("test_event", payload)
         
@@ -225,8 +225,9 @@ async def test_process_local_queue():
             mock_redis_client.publish = AsyncMock(return_value=True)
             mock_redis.return_value = mock_redis_client
             
-            # Mock the persistence method
-            with patch.object(EventBus, '_persist_events') as mock_persist:
+            # Mock the persistence methods
+            with patch.object(EventBus, '_persist_event') as mock_persist_event, \
+                 patch.object(EventBus, '_persist_events') as mock_persist:
                 event_bus = EventBus()
                 await event_bus.connect()
                 
@@ -242,7 +243,8 @@ async def test_process_local_queue():
                 # Verify events were published
                 assert mock_redis_client.publish.call_count == 2
                 assert len(event_bus._local_queue) == 0
-                assert mock_persist.call_count == 3  # Once for queueing each event, once for processing
+                assert mock_persist_event.call_count == 2  # Once for queueing each event
+                assert mock_persist.call_count == 1  # Once for processing
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ Test for the MongoDBHandler class.
 
 import asyncio
 from unittest.mock import Mock
+from src.database.indexes import INDEX_CATALOGUE
 from src.database.mongodb import MongoDBHandler
 
 
@@ -54,39 +55,25 @@ def test_collection_access_methods():
 
 async def test_initialize_collections():
     """Test collection initialization."""
-    # Create a mock database and collections
+    # Create a mock database whose collections have no indexes yet
     mock_db = Mock()
-    mock_users_collection = Mock()
-    mock_narrative_collection = Mock()
-    mock_items_collection = Mock()
-    
-    # Set up mock return values
-    mock_db.__getitem__ = Mock(side_effect=[
-        mock_users_collection,
-        mock_narrative_collection,
-        mock_items_collection
-    ])
+    mock_collection = Mock()
+    mock_collection.index_information = Mock(return_value={})
+    mock_db.__getitem__ = Mock(return_value=mock_collection)
     
     # Create handler
     handler = MongoDBHandler(mock_db)
     
-    # Mock the index creation methods to do nothing
-    mock_users_collection.create_index = Mock()
-    mock_narrative_collection.create_index = Mock()
-    mock_items_collection.create_index = Mock()
-    
     # Test initialization
     result = await handler.initialize_collections()
     
     # Verify success
     assert result is True
     
-    # Verify that indexes were created 
-    # Users collection has 5 indexes
-    assert mock_users_collection.create_index.call_count == 5
-    # NarrativeFragments and Items collections have 4 indexes each
-    assert mock_narrative_collection.create_index.call_count == 4
-    assert mock_items_collection.create_index.call_count == 4
+    # Verify that every catalogue index was created
+    assert mock_collection.create_index.call_count == sum(
+        len(index_specs) for index_specs in INDEX_CATALOGUE.values()
+    )
 
 
 async def test_initialize_collections_error():
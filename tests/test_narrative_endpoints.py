@@ -21,4 +21,58 @@ class TestNarrativeAPIEndpoints:
     def test_router_prefix_and_tags(self):
         """Test that router has correct prefix and tags."""
         assert router.prefix == "/api/v1/narrative"
-        assert "Narrative" in router.tags
\ No newline at end of file
+        assert "Narrative" in router.tags
+
+class TestNarrativeEndpointsThroughDependencies:
+    """Test narrative endpoints with the fragment manager built by src.dependencies."""
+
+    def setup_method(self):
+        """Set up a test client whose dependencies use an async-wrapped database."""
+        from unittest.mock import AsyncMock, MagicMock, Mock
+
+        from src import dependencies
+        from src.database.async_mongo import AsyncMongoDatabase, create_mongo_executor
+        from src.database.mongodb import MongoDBHandler
+        from src.shared.api.auth import authenticate_module_request
+
+        self.collections = {"users": Mock(), "narrative_fragments": Mock()}
+        database = MagicMock()
+        database.__getitem__.side_effect = self.collections.__getitem__
+        handler = MongoDBHandler(AsyncMongoDatabase(database, create_mongo_executor(1), None))
+        event_bus = Mock()
+        event_bus.publish = AsyncMock()
+
+        self.patches = pytest.MonkeyPatch()
+        self.patches.setattr(dependencies, "get_mongodb_handler", lambda: handler)
+        self.patches.setattr(dependencies, "get_event_bus", lambda: event_bus)
+
+        self.app = FastAPI()
+        self.app.include_router(router)
+        self.app.dependency_overrides[authenticate_module_request] = lambda: "test_module"
+        self.client = TestClient(self.app)
+
+    def teardown_method(self):
+        """Undo the dependency patches."""
+        self.patches.undo()
+
+    def test_progress_endpoint_returns_documents(self):
+        """Test that the progress endpoint returns the stored progress, not a coroutine."""
+        self.collections["users"].find_one.return_value = {
+            "current_state": {"narrative_progress": {"current_fragment": "chapter_2"}}
+        }
+
+        response = self.client.get("/narrative/progress/user_1")
+
+        assert response.status_code == 200
+        assert response.json() == {"current_fragment": "chapter_2", "user_id": "user_1"}
+
+    def test_fragment_endpoint_returns_documents(self):
+        """Test that the fragment endpoint returns the stored fragment."""
+        self.collections["narrative_fragments"].find_one.return_value = {
+            "_id": "object_id", "fragment_id": "f1", "title": "Start", "vip_required": False
+        }
+
+        response = self.client.get("/narrative/fragment/f1", params={"user_id": "user_1"})
+
+        assert response.status_code == 200
+        assert response.json()["title"] == "Start"
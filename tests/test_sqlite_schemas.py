@@ -38,11 +38,12 @@ def test_get_user_profiles_indexes():
 def test_get_subscriptions_indexes():
     """Test getting Subscriptions indexes."""
     indexes = SQLiteSchemas.get_subscriptions_indexes()
-    assert len(indexes) == 4
+    assert len(indexes) == 5
     assert "idx_subscriptions_user_id" in indexes[0]
     assert "idx_subscriptions_plan_type" in indexes[1]
     assert "idx_subscriptions_status" in indexes[2]
     assert "idx_subscriptions_dates" in indexes[3]
+    assert "idx_subscriptions_status_end_date" in indexes[4]
 
 
 def test_initialize_database():
@@ -75,6 +76,7 @@ def test_initialize_database():
     assert "idx_subscriptions_plan_type" in indexes
     assert "idx_subscriptions_status" in indexes
     assert "idx_subscriptions_dates" in indexes
+    assert "idx_subscriptions_status_end_date" in indexes
 
 
 def test_constants():
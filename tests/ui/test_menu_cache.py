@@ -0,0 +1,211 @@
+"""
+Tests for the memory tier of the menu cache optimizer.
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.events.bus import EventBus
+from src.ui.menu_cache import INVALIDATING_EVENTS, MenuCacheOptimizer
+from src.ui.menu_config import MenuType, UserRole
+from src.ui.menu_factory import Menu
+
+
+def create_menu(menu_id, description=""):
+    """Create a main menu with a given description."""
+    return Menu(
+        menu_id=menu_id, title=menu_id, description=description,
+        menu_type=MenuType.MAIN, required_role=UserRole.FREE_USER
+    )
+
+
+class TestMemoryTier:
+    """Test cases for the object LRU of the memory tier."""
+
+    @pytest.mark.asyncio
+    async def test_hits_return_the_cached_object(self):
+        """Test that memory hits return the cached menu without rebuilding it."""
+        optimizer = MenuCacheOptimizer(Mock())
+        menu = create_menu("main_menu")
+        await optimizer.cache_menu(menu, {"role": "free_user"})
+
+        assert await optimizer.get_cached_menu("main_menu", {"role": "free_user"}) is menu
+        assert optimizer.get_cache_statistics()["layers"]["memory"] == 1
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entry_is_evicted(self):
+        """Test that the entry limit evicts the least recently used menu."""
+        optimizer = MenuCacheOptimizer(Mock(), max_memory_entries=2)
+        context = {"role": "free_user"}
+        for menu_id in ("a", "b"):
+            await optimizer.cache_menu(create_menu(menu_id), context)
+        await optimizer.get_cached_menu("a", context)
+
+        await optimizer.cache_menu(create_menu("c"), context)
+
+        assert await optimizer.get_cached_menu("a", context) is not None
+        assert await optimizer.get_cached_menu("b", context) is None
+        assert optimizer.get_cache_statistics()["memory_cache"]["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_byte_budget_bounds_memory_tier(self):
+        """Test that entries are evicted to stay within the byte budget."""
+        optimizer = MenuCacheOptimizer(Mock(), max_memory_bytes=3000)
+        context = {"role": "free_user"}
+
+        for menu_id in ("a", "b", "c"):
+            await optimizer.cache_menu(create_menu(menu_id, "x" * 1000), context)
+        await optimizer.cache_menu(create_menu("huge", "x" * 5000), context)
+
+        stats = optimizer.get_cache_statistics()["memory_cache"]
+        assert stats["entries"] == 2
+        assert 0 < stats["bytes"] <= 3000
+        assert await optimizer.get_cached_menu("a", context) is None
+        assert await optimizer.get_cached_menu("huge", context) is None
+
+
+@pytest.fixture
+def indexed_optimizer():
+    """Create an optimizer whose Redis tag invalidation is mocked."""
+    cache_manager = Mock()
+    cache_manager.set_value = AsyncMock()
+    cache_manager.delete_key = AsyncMock()
+    cache_manager.delete_tagged_keys = AsyncMock(return_value=[])
+    return MenuCacheOptimizer(cache_manager)
+
+
+class TestDependencyInvalidation:
+    """Test cases for the dependency reverse index."""
+
+    @pytest.mark.asyncio
+    async def test_invalidation_drops_only_dependent_entries(self, indexed_optimizer):
+        """Test that a dependency invalidates exactly the entries indexed under it."""
+        free = {"user_id": "1", "role": "free_user"}
+        vip = {"user_id": "2", "role": "vip_user", "has_vip": True}
+        await indexed_optimizer.cache_menu(create_menu("a"), free)
+        await indexed_optimizer.cache_menu(create_menu("b"), vip, dependencies={"narrative:chapter_1"})
+
+        assert await indexed_optimizer.invalidate_cache("vip:True") == 1
+
+        assert await indexed_optimizer.get_cached_menu("a", free) is not None
+        assert await indexed_optimizer.get_cached_menu("b", vip) is None
+        assert "user:2" not in indexed_optimizer._dependency_index
+        indexed_optimizer.cache_manager.delete_tagged_keys.assert_awaited_with(["vip:True"])
+        assert "narrative:chapter_1" in indexed_optimizer.cache_manager.set_value.call_args.kwargs["tags"]
+
+    @pytest.mark.asyncio
+    async def test_entry_in_memory_and_redis_is_counted_once(self, indexed_optimizer):
+        """Test that a key removed from memory and from Redis counts as one invalidation."""
+        context = {"user_id": "1", "role": "free_user"}
+        await indexed_optimizer.cache_menu(create_menu("a"), context, dependencies={"narrative:chapter_1"})
+        cache_key = indexed_optimizer._generate_cache_key("a", context)
+        indexed_optimizer.cache_manager.delete_tagged_keys.return_value = [cache_key, "menu_opt:elsewhere"]
+
+        assert await indexed_optimizer.invalidate_dependencies(["narrative:chapter_1"]) == 2
+        assert indexed_optimizer._metrics.invalidations == 2
+
+    @pytest.mark.asyncio
+    async def test_user_events_invalidate_the_users_entries(self, indexed_optimizer):
+        """Test that attached user events changing a tier input invalidate the user's entries."""
+        event_bus = Mock(spec=EventBus)
+        event_bus.subscribe = AsyncMock(return_value=True)
+        await indexed_optimizer.attach(event_bus)
+        await indexed_optimizer.attach(event_bus)
+        context = {"user_id": "1", "role": "free_user"}
+        await indexed_optimizer.cache_menu(create_menu("a"), context, dependencies={"user:1"})
+
+        assert [call.args[0] for call in event_bus.subscribe.call_args_list] == list(INVALIDATING_EVENTS)
+        handler = event_bus.subscribe.call_args.args[1]
+        await handler({"user_id": "1", "amount": 5, "balance_after": 60})
+        await handler({"user_id": "1", "updated_fields": {"first_name": "Ana"}})
+
+        assert await indexed_optimizer.get_cached_menu("a", context) is not None
+        indexed_optimizer.cache_manager.delete_tagged_keys.assert_not_awaited()
+
+        await handler({"user_id": "1", "amount": 30, "balance_after": 60})
+
+        assert await indexed_optimizer.get_cached_menu("a", context) is None
+        assert indexed_optimizer._dependency_index == {}
+        indexed_optimizer.cache_manager.delete_tagged_keys.assert_awaited_with(["user:1"])
+
+    @pytest.mark.asyncio
+    async def test_user_event_keeps_other_users_templates(self, indexed_optimizer):
+        """Test that one user's tier change leaves the templates other users are served."""
+        alice = {"user_id": "1", "role": "free_user"}
+        bob = {"user_id": "2", "role": "free_user"}
+        carol = {"user_id": "3", "role": "vip_user", "has_vip": True}
+        await indexed_optimizer.cache_menu(create_menu("a"), alice)
+        await indexed_optimizer.cache_menu(create_menu("a"), carol)
+
+        await indexed_optimizer.handle_user_event({"user_id": "1", "updated_fields": {"role": "vip_user"}})
+
+        assert await indexed_optimizer.get_cached_menu("a", bob) is not None
+        assert await indexed_optimizer.get_cached_menu("a", carol) is not None
+        assert not any(tag.startswith("user:") for tag in indexed_optimizer._dependency_index)
+
+
+class TestSingleFlight:
+    """Test cases for coalesced menu builds."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_build(self, indexed_optimizer):
+        """Test that concurrent misses for a key await the first miss's build."""
+        release = asyncio.Event()
+        menu = create_menu("main_menu")
+
+        async def build():
+            await release.wait()
+            return menu
+
+        builder = AsyncMock(side_effect=build)
+        context = {"role": "free_user"}
+        waiters = [
+            asyncio.ensure_future(indexed_optimizer.get_or_build("main_menu", context, builder))
+            for _ in range(10)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert all(result is menu for result in await asyncio.gather(*waiters))
+        assert builder.await_count == 1
+        assert indexed_optimizer.cache_manager.set_value.await_count == 1
+        assert indexed_optimizer._performance_stats["coalesced_misses"] == 9
+        assert indexed_optimizer._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_served_while_rebuilt(self, indexed_optimizer):
+        """Test that an expired entry is returned at once and refreshed in the background."""
+        context = {"role": "free_user"}
+        stale_menu, fresh_menu = create_menu("main_menu", "stale"), create_menu("main_menu", "fresh")
+        await indexed_optimizer.cache_menu(stale_menu, context)
+        cache_key = indexed_optimizer._generate_cache_key("main_menu", context)
+        indexed_optimizer._memory_cache[cache_key].expires_at = time.monotonic() - 1
+        builder = AsyncMock(return_value=fresh_menu)
+
+        assert await indexed_optimizer.get_or_build("main_menu", context, builder) is stale_menu
+        assert await indexed_optimizer.get_or_build("main_menu", context, builder) is stale_menu
+        await asyncio.gather(*indexed_optimizer._inflight.values())
+
+        assert builder.await_count == 1
+        assert await indexed_optimizer.get_or_build("main_menu", context, builder) is fresh_menu
+
+    @pytest.mark.asyncio
+    async def test_locked_build_waits_for_other_process(self, indexed_optimizer):
+        """Test that a miss whose lock is held elsewhere takes the menu from Redis."""
+        optimizer = MenuCacheOptimizer(indexed_optimizer.cache_manager, use_redis_lock=True, lock_ttl=1.0)
+        cache_manager = optimizer.cache_manager
+        cache_manager.is_connected = True
+        cache_manager.acquire_lock = AsyncMock(return_value=None)
+        menu_data = await optimizer._serialize_menu(create_menu("main_menu", "built elsewhere"))
+        cache_manager.get_value = AsyncMock(side_effect=[None, None, json.dumps(menu_data)])
+        builder = AsyncMock()
+
+        menu = await optimizer.get_or_build("main_menu", {"role": "free_user"}, builder)
+
+        assert menu.description == "built elsewhere"
+        builder.assert_not_awaited()
+        assert await optimizer.get_cached_menu("main_menu", {"role": "free_user"}) is menu
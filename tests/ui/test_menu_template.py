@@ -0,0 +1,88 @@
+"""
+Tests for menu templates with per-user slots and their caching.
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.ui.menu_cache import MenuCacheOptimizer
+from src.ui.menu_config import ActionType, MenuType, UserRole
+from src.ui.menu_factory import Menu, MenuFactory, MenuItem
+from src.ui.menu_template import menu_tier, render_menu, slot
+
+
+def create_template():
+    """Create a menu template with slots in its header and items."""
+    return Menu(
+        menu_id="tienda_menu",
+        title="Tienda",
+        description="",
+        menu_type=MenuType.STORE,
+        required_role=UserRole.FREE_USER,
+        header_text=f"Besitos: {slot('besitos')}",
+        items=[MenuItem(
+            id="resume", text="Continuar", action_type=ActionType.CALLBACK,
+            action_data=f"continue_from:{slot('current_fragment')}"
+        )]
+    )
+
+
+@pytest.fixture
+def template_factory():
+    """Create a MenuFactory with a memory-only menu cache."""
+    cache_manager = Mock()
+    cache_manager.connect = AsyncMock(return_value=False)
+    factory = MenuFactory()
+    factory.menu_cache = MenuCacheOptimizer(cache_manager)
+    return factory
+
+
+class TestMenuTemplates:
+    """Test cases for rendering and caching menu templates."""
+
+    def test_render_fills_slots_without_mutating_template(self):
+        """Test that rendering returns a filled copy and leaves the template as it was."""
+        template = create_template()
+
+        menu = render_menu(template, {"besitos": 42, "current_fragment": "f7"})
+
+        assert menu.header_text == "Besitos: 42"
+        assert menu.items[0].action_data == "continue_from:f7"
+        assert template.header_text == "Besitos: {{besitos}}"
+        assert template.items[0].action_data == "continue_from:{{current_fragment}}"
+
+    @pytest.mark.asyncio
+    async def test_users_of_a_tier_share_one_template(self, template_factory):
+        """Test that one cached template serves users with different slot values."""
+        builder = template_factory.builders[MenuType.STORE]
+        builder.build_menu = AsyncMock(wraps=builder.build_menu)
+        alice = {"user_id": "1", "role": "free_user", "besitos": 10, "besitos_balance": 100}
+        bob = {"user_id": "2", "role": "free_user", "besitos": 99, "besitos_balance": 110}
+        try:
+            assert menu_tier(alice) == menu_tier(bob)
+
+            alice_menu = await template_factory.create_menu(MenuType.STORE, alice)
+            bob_menu = await template_factory.create_menu(MenuType.STORE, bob)
+
+            assert builder.build_menu.await_count == 1
+            assert "Tus Besitos: 10" in alice_menu.header_text
+            assert "Tus Besitos: 99" in bob_menu.header_text
+            performance = template_factory.menu_cache.get_cache_statistics()["performance"]
+            assert performance["hit_rate"] == 50.0
+            assert performance["per_user_key_hit_rate"] == 0.0
+        finally:
+            await template_factory.menu_cache.close()
+
+    @pytest.mark.asyncio
+    async def test_serialized_template_round_trips(self):
+        """Test that a template survives serialization for Redis with its slots intact."""
+        optimizer = MenuCacheOptimizer(Mock())
+        template = create_template()
+
+        restored = await optimizer._deserialize_menu(await optimizer._serialize_menu(template))
+
+        assert restored.menu_type is MenuType.STORE
+        assert [item.id for item in restored.items] == [item.id for item in template.items]
+        assert restored.items[0].action_type is ActionType.CALLBACK
+        assert render_menu(restored, {"besitos": 5}).header_text == "Besitos: 5"
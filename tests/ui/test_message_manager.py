@@ -39,7 +39,8 @@ def mock_cache_manager():
     cache.set_value = AsyncMock()
     cache.get_value = AsyncMock()
     cache.delete_key = AsyncMock()
-    cache.get_keys_by_pattern = AsyncMock()
+    cache.get_keys_by_tag = AsyncMock()
+    cache.untag_key = AsyncMock()
     return cache
 
 @pytest.fixture
@@ -136,7 +137,7 @@ async def test_delete_old_messages(message_manager, mock_cache_manager, mock_bot
         json.dumps(MessageTrackingRecord(CHAT_ID, deletable_msg_id, 'notification', should_delete=True).__dict__, default=str),
         json.dumps(MessageTrackingRecord(CHAT_ID, preserved_msg_id, 'system', should_delete=False).__dict__, default=str),
     ]
-    mock_cache_manager.get_keys_by_pattern.return_value = [
+    mock_cache_manager.get_keys_by_tag.return_value = [
         f"msg_track:{CHAT_ID}:{main_menu_id}",
         f"msg_track:{CHAT_ID}:{deletable_msg_id}",
         f"msg_track:{CHAT_ID}:{preserved_msg_id}",
@@ -144,6 +145,8 @@ async def test_delete_old_messages(message_manager, mock_cache_manager, mock_bot
 
     await message_manager.delete_old_messages(CHAT_ID)
 
+    mock_cache_manager.get_keys_by_tag.assert_called_once_with(f"chat:{CHAT_ID}")
+
     # Assert that only the deletable message was deleted
     mock_bot.delete_message.assert_called_once_with(CHAT_ID, deletable_msg_id)
     assert mock_bot.delete_message.call_count == 1
@@ -170,7 +173,7 @@ async def test_periodic_cleanup_deletes_expired(mock_gather, message_manager, mo
         CHAT_ID, permanent_id, 'main_menu', ttl_seconds=-1
     )
 
-    mock_cache_manager.get_keys_by_pattern.return_value = [
+    mock_cache_manager.get_keys_by_tag.return_value = [
         f"msg_track:{CHAT_ID}:{expired_id}",
         f"msg_track:{CHAT_ID}:{not_expired_id}",
         f"msg_track:{CHAT_ID}:{permanent_id}",
@@ -193,6 +196,19 @@ async def test_periodic_cleanup_deletes_expired(mock_gather, message_manager, mo
     # Optional: Check the name of the coroutine
     assert args[0].__name__ == 'delete_message'
 
+@pytest.mark.asyncio
+async def test_periodic_cleanup_untags_missing_records(message_manager, mock_cache_manager, mock_bot):
+    """Test that the periodic cleanup removes keys whose records are gone from their tag sets."""
+    message_manager._initialized = True
+    missing_key = f"msg_track:{CHAT_ID}:401"
+    mock_cache_manager.get_keys_by_tag.return_value = [missing_key]
+    mock_cache_manager.get_value.return_value = None
+
+    await message_manager._cleanup_expired_messages()
+
+    mock_cache_manager.untag_key.assert_awaited_once_with(missing_key, ["msg_track", f"chat:{CHAT_ID}"])
+    mock_bot.delete_message.assert_not_called()
+
 def test_scheduler_management(message_manager):
     """Test that the scheduler is started and shut down correctly."""
     manager = message_manager
@@ -58,7 +58,7 @@ async def test_detect_archetype_patterns(behavioral_analysis_engine):
     mock_db = AsyncMock()
     mock_db["emotional_interactions"].find.return_value.sort.return_value.limit.return_value = mock_cursor
     
-    behavioral_analysis_engine.database_manager.get_mongo_db.return_value = mock_db
+    behavioral_analysis_engine.database_manager.get_async_mongo_db.return_value = mock_db
 
     # Act
     archetype = await behavioral_analysis_engine.detect_archetype_patterns(user_id)
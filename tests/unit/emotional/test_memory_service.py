@@ -9,7 +9,7 @@ def mock_database_manager():
     """Fixture for a mocked DatabaseManager."""
     mock_manager = Mock()
     mock_db = MagicMock()
-    mock_manager.get_mongo_db.return_value = mock_db
+    mock_manager.get_async_mongo_db.return_value = mock_db
     return mock_manager
 
 @pytest.fixture
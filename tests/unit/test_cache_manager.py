@@ -0,0 +1,183 @@
+"""
+Unit tests for tagged entries in the cache manager.
+"""
+
+import math
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from src.utils.cache_manager import _ADD_TAGS_SCRIPT, CacheManager
+
+
+class FakePipeline:
+    """Pipeline double buffering commands for a FakeRedis."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return None
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """In-memory Redis double for strings, sets and sorted sets, without KEYS."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiries = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == _ADD_TAGS_SCRIPT:
+            return self._add_tags(keys, *argv)
+        key, token = keys[0], argv[0]
+        if self.data.get(key) != token:
+            return 0
+        del self.data[key]
+        return 1
+
+    def _add_tags(self, keys, key, now, expires_at, ttl):
+        """Run _ADD_TAGS_SCRIPT, keeping expiries as absolute times or None."""
+        self.data.setdefault(keys[0], set()).update(keys[1:])
+        self.expiries[keys[0]] = now + ttl if ttl else None
+        for tag_key in keys[1:]:
+            members = self.data.setdefault(tag_key, {})
+            for member, score in list(members.items()):
+                if score < now:
+                    del members[member]
+            members[key] = float(expires_at)
+            last = max(members.values())
+            self.expiries[tag_key] = None if last == math.inf else math.ceil(last) + 1
+        return len(keys) - 1
+
+    async def srem(self, key, *members):
+        self.data.get(key, set()).difference_update(members)
+        return len(members)
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def zrem(self, key, *members):
+        removed = sum(self.data.get(key, {}).pop(member, None) is not None for member in members)
+        if key in self.data and not self.data[key]:
+            del self.data[key]
+        return removed
+
+    async def zrange(self, key, start, end):
+        return sorted(self.data.get(key, {}), key=self.data.get(key, {}).get)
+
+    async def zrangebyscore(self, key, min_score, max_score):
+        members = self.data.get(key, {})
+        return [member for member in sorted(members, key=members.get)
+                if float(min_score) <= members[member] <= float(max_score)]
+
+    async def unlink(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+@pytest.fixture
+def tagged_cache():
+    """Create a connected CacheManager on a FakeRedis."""
+    cache = CacheManager(Mock())
+    cache._redis_client = FakeRedis()
+    cache._is_connected = True
+    return cache
+
+
+class TestCacheManagerTags:
+    """Test cases for tag sets and tag invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_tagged_write_registers_key_in_one_round_trip(self, tagged_cache):
+        """Test that a tagged value and its tag sets are written together."""
+        await tagged_cache.set_value("menu_opt:a", {"id": "a"}, ttl=600, tags=["user:1", "role:vip"])
+
+        redis = tagged_cache._redis_client
+        assert redis.round_trips == 1
+        assert await tagged_cache.get_keys_by_tag("user:1") == ["menu_opt:a"]
+        assert redis.data["cache_key_tags:menu_opt:a"] == {"cache_tag:user:1", "cache_tag:role:vip"}
+
+    @pytest.mark.asyncio
+    async def test_tag_sets_drop_expired_keys_and_expire_with_them(self, tagged_cache):
+        """Test that a tag set keeps only live keys and expires with its longest-lived key."""
+        redis = tagged_cache._redis_client
+        await tagged_cache.set_value("msg_track:1:1", "old", ttl=60, tags=["msg_track"])
+        redis.data["cache_tag:msg_track"]["msg_track:1:1"] = time.time() - 1
+
+        await tagged_cache.set_value("msg_track:1:2", "new", ttl=60, tags=["msg_track"])
+
+        assert list(redis.data["cache_tag:msg_track"]) == ["msg_track:1:2"]
+        assert redis.expiries["cache_tag:msg_track"] <= time.time() + 62
+
+        await tagged_cache.set_value("msg_track:1:3", "kept", tags=["msg_track"])
+
+        assert redis.expiries["cache_tag:msg_track"] is None
+        assert await tagged_cache.get_keys_by_tag("msg_track") == ["msg_track:1:2", "msg_track:1:3"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags_unlinks_only_affected_keys(self, tagged_cache):
+        """Test that invalidation deletes the tagged keys and the tag sets."""
+        await tagged_cache.set_value("menu_opt:a", "a", tags=["user:1", "role:vip"])
+        await tagged_cache.set_value("menu_opt:b", "b", tags=["user:2", "role:vip"])
+        await tagged_cache.set_value("menu_opt:c", "c", tags=["user:3", "role:free"])
+
+        assert await tagged_cache.invalidate_tags(["role:vip", "user:1"]) == 2
+
+        redis = tagged_cache._redis_client
+        assert set(redis.data) == {
+            "menu_opt:c", "cache_tag:user:3", "cache_tag:role:free", "cache_key_tags:menu_opt:c",
+        }
+        assert await tagged_cache.invalidate_tags(["role:vip"]) == 0
+
+    @pytest.mark.asyncio
+    async def test_untag_key(self, tagged_cache):
+        """Test that an untagged key is no longer invalidated with its former tag."""
+        await tagged_cache.set_value("msg_track:1:5", "record", tags=["chat:1"])
+
+        await tagged_cache.untag_key("msg_track:1:5", ["chat:1"])
+
+        assert await tagged_cache.get_keys_by_tag("chat:1") == []
+        assert await tagged_cache.invalidate_tags(["chat:1"]) == 0
+
+
+class TestCacheManagerLocks:
+    """Test cases for short-lived Redis locks."""
+
+    @pytest.mark.asyncio
+    async def test_lock_is_exclusive_and_released_by_owner(self, tagged_cache):
+        """Test that a held lock cannot be taken and only its owner releases it."""
+        token = await tagged_cache.acquire_lock("menu_lock:a", ttl=5)
+
+        assert token is not None
+        assert await tagged_cache.acquire_lock("menu_lock:a", ttl=5) is None
+        await tagged_cache.release_lock("menu_lock:a", "not-the-owner")
+        assert await tagged_cache.acquire_lock("menu_lock:a", ttl=5) is None
+
+        await tagged_cache.release_lock("menu_lock:a", token)
+        assert await tagged_cache.acquire_lock("menu_lock:a", ttl=5) is not None
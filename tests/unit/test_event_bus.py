@@ -29,7 +29,7 @@ class TestEventBus:
         assert event_bus.config_manager is not None
         assert event_bus._redis_client is None
         assert event_bus._is_connected is False
-        assert event_bus._local_queue == []
+        assert list(event_bus._local_queue) == []
         assert event_bus._subscribers == {}
         assert hasattr(event_bus, '_max_queue_size')
         assert hasattr(event_bus, '_persistence_file')
@@ -162,7 +162,7 @@ class TestEventBus:
                 mock_redis.return_value = mock_redis_client
                 
                 # Mock the persistence methods
-                with patch.object(EventBus, '_persist_events') as mock_persist:
+                with patch.object(EventBus, '_persist_event') as mock_persist:
                     event_bus = EventBus()
                     await event_bus.connect()
                     
@@ -267,7 +267,7 @@ class TestEventBus:
         event_bus = EventBus()
         
         # Mock the persistence method
-        with patch.object(EventBus, '_persist_events') as mock_persist:
+        with patch.object(EventBus, '_persist_event') as mock_persist:
             payload = {"user_id": "12345", "action": "test"}
             result = await event_bus._queue_locally("test_event", payload)
             
@@ -293,7 +293,7 @@ class TestEventBus:
             })
         
         # Mock the persistence method
-        with patch.object(EventBus, '_persist_events') as mock_persist:
+        with patch.object(EventBus, '_persist_event') as mock_persist:
             payload = {"user_id": "12345", "action": "test"}
             result = await event_bus._queue_locally("test_event", payload)
             
@@ -321,8 +321,9 @@ class TestEventBus:
                 mock_redis_client.publish = AsyncMock(return_value=True)
                 mock_redis.return_value = mock_redis_client
                 
-                # Mock the persistence method
-                with patch.object(EventBus, '_persist_events') as mock_persist:
+                # Mock the persistence methods
+                with patch.object(EventBus, '_persist_event') as mock_persist_event, \
+                     patch.object(EventBus, '_persist_events') as mock_persist:
                     event_bus = EventBus()
                     await event_bus.connect()
                     
@@ -338,8 +339,9 @@ class TestEventBus:
                     # Verify events were published
                     assert mock_redis_client.publish.call_count == 2
                     assert len(event_bus._local_queue) == 0
-                    # Called once for each queue operation and once for processing
-                    assert mock_persist.call_count == 3
+                    # Each queued event is appended once, the cursor is committed once
+                    assert mock_persist_event.call_count == 2
+                    assert mock_persist.call_count == 1
 
     def test_is_connected_property(self):
         """Test the is_connected property."""
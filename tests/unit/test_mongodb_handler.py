@@ -4,6 +4,7 @@ Unit tests for the MongoDBHandler class.
 
 import pytest
 from unittest.mock import Mock, AsyncMock, MagicMock
+from src.database.indexes import INDEX_CATALOGUE
 from src.database.mongodb import MongoDBHandler
 
 
@@ -54,33 +55,19 @@ class TestMongoDBHandler:
 
     @pytest.mark.asyncio
     async def test_initialize_collections_success(self):
-        """Test successful collection initialization."""
+        """Test that collection initialization creates the catalogue indexes."""
         mock_db = MagicMock()
-        mock_users_collection = Mock()
-        mock_narrative_collection = Mock()
-        mock_items_collection = Mock()
-        
-        # Set up mock return values for collections
-        mock_db.__getitem__.side_effect = [
-            mock_users_collection,
-            mock_narrative_collection,
-            mock_items_collection
-        ]
-        
-        # Mock the index creation methods
-        mock_users_collection.create_index = Mock()
-        mock_narrative_collection.create_index = Mock()
-        mock_items_collection.create_index = Mock()
+        mock_collection = Mock()
+        mock_collection.index_information.return_value = {}
+        mock_db.__getitem__.return_value = mock_collection
         
         handler = MongoDBHandler(mock_db)
         result = await handler.initialize_collections()
         
         assert result is True
-        # Users collection has 5 indexes
-        assert mock_users_collection.create_index.call_count == 5
-        # NarrativeFragments and Items collections have 4 indexes each
-        assert mock_narrative_collection.create_index.call_count == 4
-        assert mock_items_collection.create_index.call_count == 4
+        assert mock_collection.create_index.call_count == sum(
+            len(index_specs) for index_specs in INDEX_CATALOGUE.values()
+        )
 
     @pytest.mark.asyncio
     async def test_initialize_collections_error(self):
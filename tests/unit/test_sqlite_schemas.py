@@ -55,7 +55,7 @@ class TestSQLiteSchemas:
         """Test getting Subscriptions indexes."""
         indexes = SQLiteSchemas.get_subscriptions_indexes()
         assert isinstance(indexes, list)
-        assert len(indexes) == 4
+        assert len(indexes) == 5
         
         # Check that each index creation statement is present
         index_sql_statements = [stmt for stmt in indexes]
@@ -63,6 +63,7 @@ class TestSQLiteSchemas:
         assert any("idx_subscriptions_plan_type" in stmt for stmt in index_sql_statements)
         assert any("idx_subscriptions_status" in stmt for stmt in index_sql_statements)
         assert any("idx_subscriptions_dates" in stmt for stmt in index_sql_statements)
+        assert any("idx_subscriptions_status_end_date" in stmt for stmt in index_sql_statements)
 
     def test_initialize_database_success(self):
         """Test successful database initialization."""
@@ -94,7 +95,8 @@ class TestSQLiteSchemas:
             "idx_subscriptions_user_id",
             "idx_subscriptions_plan_type",
             "idx_subscriptions_status",
-            "idx_subscriptions_dates"
+            "idx_subscriptions_dates",
+            "idx_subscriptions_status_end_date"
         ]
         
         for index in expected_indexes:
@@ -70,7 +70,32 @@ class MockDatabaseManager:
         
         mock_db.__getitem__.side_effect = get_collection
         return mock_db
-    
+
+    def get_async_mongo_db(self):
+        """Mock get async MongoDB database.
+
+        Returns:
+            MagicMock: Mock MongoDB database whose collection operations are awaitable
+        """
+        self._method_calls.append("get_async_mongo_db")
+        if not self._is_connected:
+            raise ValueError("MongoDB is not connected")
+
+        mock_db = MagicMock()
+        mock_db.name = self._mongo_db_name
+
+        def get_collection(name):
+            key = f"async:{name}"
+            if key not in self._mock_mongo_collections:
+                self._mock_mongo_collections[key] = AsyncMock()
+                self._mock_mongo_collections[key].name = name
+                self._mock_mongo_collections[key].find = MagicMock()
+                self._mock_mongo_collections[key].aggregate = MagicMock()
+            return self._mock_mongo_collections[key]
+
+        mock_db.__getitem__.side_effect = get_collection
+        return mock_db
+
     def get_sqlite_conn(self):
         """Mock get SQLite connection.
         
@@ -81,7 +106,28 @@ class MockDatabaseManager:
         if not self._is_connected:
             raise ValueError("SQLite is not connected")
         return MagicMock()
-    
+
+    def get_async_sqlite(self):
+        """Mock get async SQLite handle.
+
+        Returns:
+            Mock: Mock async SQLite handle with awaitable reads and writes
+        """
+        self._method_calls.append("get_async_sqlite")
+        if not self._is_connected:
+            raise ValueError("SQLite is not connected")
+        mock_sqlite = Mock()
+        mock_sqlite.fetchone = AsyncMock(return_value=None)
+        mock_sqlite.fetchall = AsyncMock(return_value=[])
+        mock_sqlite.execute = AsyncMock(return_value=Mock(rowcount=1, lastrowid=1))
+        mock_sqlite.transaction = AsyncMock(return_value=[Mock(rowcount=1, lastrowid=1)])
+        return mock_sqlite
+
+    def start_index_sync(self) -> None:
+        """Mock starting the background index sync."""
+        self._method_calls.append("start_index_sync")
+        return None
+
     async def health_check(self) -> Dict[str, bool]:
         """Mock database health check.
         
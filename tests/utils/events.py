@@ -13,6 +13,7 @@ import uuid
 from unittest.mock import Mock, AsyncMock, MagicMock, patch
 from typing import Any, Dict, List, Optional, Callable, Awaitable
 from datetime import datetime
+from redis.exceptions import WatchError
 
 from src.events.bus import EventBus, EventBusError, EventPublishError, EventSubscribeError
 from src.events.models import BaseEvent, create_event, EVENT_MODELS
@@ -163,6 +164,347 @@ class MockEventBus:
         self._should_fail_subscribe = False
 
 
+class FakeAsyncRedis:
+    """In-process fake of the async Redis client used by the event bus.
+
+    Implements Pub/Sub publishing, string keys with expiry (SET NX EX, SETEX,
+    GET, EXISTS, INCR), hashes, sorted sets and the Streams consumer-group
+    commands (XADD, XGROUP CREATE, XREADGROUP, XACK, XPENDING, XCLAIM) so several
+    clients can share it like worker processes share a server. Pipelines support
+    WATCH/MULTI/EXEC optimistic transactions.
+    """
+    
+    def __init__(self):
+        """Initialize the fake Redis server state."""
+        self.published: List[tuple] = []
+        self.streams: Dict[str, List[tuple]] = {}
+        self.values: Dict[str, tuple] = {}  # key -> (value, expiry in ms or None)
+        self.hashes: Dict[str, Dict[str, Any]] = {}
+        self.zsets: Dict[str, Dict[str, float]] = {}
+        self.groups: Dict[tuple, Dict[str, Any]] = {}
+        self.now_ms = 0
+        self._next_id = 0
+        self.closed = False
+        self.executed_batches: List[int] = []
+        self.pipeline_error: Optional[Exception] = None
+    
+    def advance(self, milliseconds: int) -> None:
+        """Advance the fake server clock.
+        
+        Args:
+            milliseconds (int): Milliseconds to advance
+        """
+        self.now_ms += milliseconds
+    
+    async def ping(self) -> bool:
+        return True
+    
+    async def close(self) -> None:
+        self.closed = True
+    
+    def _snapshot(self, key: str) -> tuple:
+        """Capture the state of a key so a watched transaction can detect changes."""
+        return (
+            self._live_value(key),
+            dict(self.hashes.get(key) or {}),
+            dict(self.zsets.get(key) or {})
+        )
+    
+    def _live_value(self, key: str) -> Optional[tuple]:
+        entry = self.values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.now_ms:
+            del self.values[key]
+            return None
+        return entry
+    
+    async def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if nx and self._live_value(key) is not None:
+            return None
+        expiry = self.now_ms + ex * 1000 if ex else None
+        self.values[key] = (value, expiry)
+        return True
+    
+    async def setex(self, key: str, seconds: int, value: Any) -> bool:
+        return await self.set(key, value, ex=seconds)
+    
+    async def get(self, key: str) -> Any:
+        entry = self._live_value(key)
+        return entry[0] if entry else None
+    
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._live_value(key) is not None)
+    
+    async def incr(self, key: str) -> int:
+        entry = self._live_value(key)
+        value = int(entry[0]) + 1 if entry else 1
+        self.values[key] = (value, entry[1] if entry else None)
+        return value
+    
+    async def expire(self, key: str, seconds: int) -> bool:
+        entry = self._live_value(key)
+        if entry is None:
+            return key in self.hashes or key in self.zsets
+        self.values[key] = (entry[0], self.now_ms + seconds * 1000)
+        return True
+    
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            for store in (self.values, self.hashes, self.zsets):
+                if store.pop(key, None) is not None:
+                    deleted += 1
+        return deleted
+    
+    async def hset(self, name: str, key: str = None, value: Any = None, mapping: Dict = None) -> int:
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        hash_ = self.hashes.setdefault(name, {})
+        added = sum(1 for field in fields if field not in hash_)
+        hash_.update({field: str(value) for field, value in fields.items()})
+        return added
+    
+    async def hget(self, name: str, key: str) -> Any:
+        return self.hashes.get(name, {}).get(key)
+    
+    async def hmget(self, name: str, keys: List[str]) -> List[Any]:
+        hash_ = self.hashes.get(name, {})
+        return [hash_.get(key) for key in keys]
+    
+    async def hgetall(self, name: str) -> Dict[str, Any]:
+        return dict(self.hashes.get(name, {}))
+    
+    async def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        hash_ = self.hashes.setdefault(name, {})
+        value = int(hash_.get(key, 0)) + amount
+        hash_[key] = str(value)
+        return value
+    
+    async def hdel(self, name: str, *keys: str) -> int:
+        hash_ = self.hashes.get(name, {})
+        return sum(1 for key in keys if hash_.pop(key, None) is not None)
+    
+    async def zadd(self, name: str, mapping: Dict[str, float], nx: bool = False) -> int:
+        zset = self.zsets.setdefault(name, {})
+        added = 0
+        for member, score in mapping.items():
+            if member not in zset:
+                added += 1
+            elif nx:
+                continue
+            zset[member] = float(score)
+        return added
+    
+    async def zrem(self, name: str, *members: str) -> int:
+        zset = self.zsets.get(name, {})
+        return sum(1 for member in members if zset.pop(member, None) is not None)
+    
+    async def zcard(self, name: str) -> int:
+        return len(self.zsets.get(name, {}))
+    
+    async def zscore(self, name: str, member: str) -> Optional[float]:
+        return self.zsets.get(name, {}).get(member)
+    
+    def _sorted_members(self, name: str) -> List[tuple]:
+        return sorted(self.zsets.get(name, {}).items(), key=lambda item: (item[1], item[0]))
+    
+    async def zrange(self, name: str, start: int, end: int, withscores: bool = False) -> List[Any]:
+        members = self._sorted_members(name)
+        end = len(members) + end if end < 0 else end
+        start = max(len(members) + start, 0) if start < 0 else start
+        selected = members[start:end + 1]
+        return selected if withscores else [member for member, _ in selected]
+    
+    async def zrangebyscore(self, name: str, min: Any, max: Any, start: int = None,
+                            num: int = None, withscores: bool = False) -> List[Any]:
+        low = float(min) if min != "-inf" else float("-inf")
+        high = float(max) if max != "+inf" else float("inf")
+        selected = [(member, score) for member, score in self._sorted_members(name) if low <= score <= high]
+        if start is not None:
+            selected = selected[start:start + num]
+        return selected if withscores else [member for member, _ in selected]
+    
+    async def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        return 0
+    
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        self._next_id += 1
+        entry_id = f"{self._next_id}-0"
+        entries = self.streams.setdefault(name, [])
+        entries.append((entry_id, dict(fields)))
+        if maxlen is not None and len(entries) > maxlen:
+            del entries[:len(entries) - maxlen]
+        return entry_id
+    
+    async def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        from redis.exceptions import ResponseError
+        if name not in self.streams:
+            if not mkstream:
+                raise ResponseError("ERR no such key")
+            self.streams[name] = []
+        if (name, groupname) in self.groups:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.groups[(name, groupname)] = {"delivered": 0, "pending": {}}
+        return True
+    
+    async def xreadgroup(self, groupname, consumername, streams, count=None, block=None, noack=False):
+        response = []
+        for name in streams:
+            group = self.groups[(name, groupname)]
+            entries = [
+                entry for entry in self.streams.get(name, [])
+                if int(entry[0].split("-")[0]) > group["delivered"]
+            ][:count]
+            for entry_id, _ in entries:
+                group["delivered"] = int(entry_id.split("-")[0])
+                group["pending"][entry_id] = {
+                    "consumer": consumername,
+                    "delivered_at": self.now_ms,
+                    "times_delivered": 1
+                }
+            if entries:
+                response.append([name, entries])
+        return response
+    
+    async def xack(self, name, groupname, *ids):
+        pending = self.groups[(name, groupname)]["pending"]
+        return sum(1 for entry_id in ids if pending.pop(entry_id, None) is not None)
+    
+    async def xpending_range(self, name, groupname, min, max, count, consumername=None, idle=None):
+        pending = self.groups[(name, groupname)]["pending"]
+        result = []
+        for entry_id, info in pending.items():
+            idle_time = self.now_ms - info["delivered_at"]
+            if idle is not None and idle_time < idle:
+                continue
+            result.append({
+                "message_id": entry_id,
+                "consumer": info["consumer"],
+                "time_since_delivered": idle_time,
+                "times_delivered": info["times_delivered"]
+            })
+        return result[:count]
+    
+    async def xclaim(self, name, groupname, consumername, min_idle_time, message_ids):
+        pending = self.groups[(name, groupname)]["pending"]
+        entries = dict(self.streams.get(name, []))
+        claimed = []
+        for entry_id in message_ids:
+            info = pending.get(entry_id)
+            if info is None or self.now_ms - info["delivered_at"] < min_idle_time:
+                continue
+            info["consumer"] = consumername
+            info["delivered_at"] = self.now_ms
+            info["times_delivered"] += 1
+            claimed.append((entry_id, entries.get(entry_id)))
+        return claimed
+    
+    def pipeline(self, transaction: bool = True) -> "FakeAsyncRedisPipeline":
+        """Create a pipeline that buffers commands until execute().
+        
+        Args:
+            transaction (bool): Ignored, accepted for API compatibility
+            
+        Returns:
+            FakeAsyncRedisPipeline: Pipeline bound to this fake server
+        """
+        return FakeAsyncRedisPipeline(self)
+    
+    def pending_count(self, name: str, groupname: str) -> int:
+        """Get the number of pending entries of a consumer group.
+        
+        Args:
+            name (str): Stream key
+            groupname (str): Consumer group name
+            
+        Returns:
+            int: Number of delivered but unacknowledged entries
+        """
+        return len(self.groups[(name, groupname)]["pending"])
+
+
+class FakeAsyncRedisPipeline:
+    """Pipeline for FakeAsyncRedis that records each executed batch.
+    
+    After WATCH, commands run immediately until MULTI, and EXEC raises
+    WatchError if a watched key changed in between. Watched commands yield to
+    the event loop like a network round trip, so concurrent writers interleave.
+    """
+    
+    def __init__(self, redis: FakeAsyncRedis):
+        """Initialize the pipeline.
+        
+        Args:
+            redis (FakeAsyncRedis): Fake server the commands are sent to
+        """
+        self._redis = redis
+        self._commands: List[tuple] = []
+        self._watched: Optional[Dict[str, tuple]] = None
+        self._in_multi = False
+    
+    async def __aenter__(self) -> "FakeAsyncRedisPipeline":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.reset()
+    
+    def __getattr__(self, name: str):
+        command = getattr(self._redis, name)
+        
+        if self._watched is not None and not self._in_multi:
+            async def immediate(*args, **kwargs):
+                await asyncio.sleep(0)
+                return await command(*args, **kwargs)
+            return immediate
+        
+        def stage(*args, **kwargs):
+            self._commands.append((command, args, kwargs))
+            return self
+        return stage
+    
+    async def watch(self, *keys: str) -> bool:
+        await asyncio.sleep(0)
+        if self._watched is None:
+            self._watched = {}
+        for key in keys:
+            self._watched[key] = self._redis._snapshot(key)
+        return True
+    
+    def multi(self) -> None:
+        self._in_multi = True
+    
+    async def unwatch(self) -> bool:
+        self._watched = None
+        return True
+    
+    async def reset(self) -> None:
+        self._commands = []
+        self._watched = None
+        self._in_multi = False
+    
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        if self._redis.pipeline_error is not None:
+            raise self._redis.pipeline_error
+        if self._watched is not None:
+            await asyncio.sleep(0)
+            changed = any(self._redis._snapshot(key) != state for key, state in self._watched.items())
+            if changed:
+                await self.reset()
+                raise WatchError("Watched variable changed.")
+        self._redis.executed_batches.append(len(self._commands))
+        results = []
+        for command, args, kwargs in self._commands:
+            try:
+                results.append(await command(*args, **kwargs))
+            except Exception as e:
+                if raise_on_error:
+                    raise
+                results.append(e)
+        await self.reset()
+        return results
+
+
 class EventTestConfig:
     """Configuration utilities for event testing."""
     